@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Event awaiter for asyncio code (Python 3 only)
+"""
+
+__author__ = 'Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com'
+
+import asyncio
+import threading
+
+
+class AsyncioEventAwaiter(object):
+    """
+    Counterpart of moler.event_awaiter.EventAwaiter to be awaited inside 'async def' without blocking events loop.
+    Events may become done in any thread (of any runner) - awaiting coroutine is woken up inside its own loop.
+    """
+
+    @staticmethod
+    async def wait_for_all(timeout, events):
+        """
+        Wait for all events are done or timeout occurs
+        :param timeout: time in seconds
+        :param events: list of events to check
+        :return: True if all events are done, False otherwise
+        """
+        return await AsyncioEventAwaiter.wait_for_n_of(timeout=timeout, events=events, n=len(events))
+
+    @staticmethod
+    async def wait_for_any(timeout, events):
+        """
+        :param timeout: time in seconds
+        :param events: list of events to check
+        :return: True if any event is done, False otherwise
+        """
+        return await AsyncioEventAwaiter.wait_for_n_of(timeout=timeout, events=events, n=1)
+
+    @staticmethod
+    async def wait_for_n_of(timeout, events, n):
+        """
+        Wait for at least n events are done or timeout occurs
+        :param timeout: time in seconds
+        :param events: list of events to check
+        :param n: number of events that have to be done
+        :return: True if at least n events are done, False otherwise
+        """
+        loop = asyncio.get_event_loop()
+        enough_done = loop.create_future()
+        done_events = list()
+        lock = threading.Lock()
+
+        def set_enough_done():
+            if not enough_done.done():
+                enough_done.set_result(True)
+
+        def on_done(event):
+            with lock:
+                done_events.append(event)
+                if len(done_events) != n:
+                    return
+            loop.call_soon_threadsafe(set_enough_done)
+
+        if n <= 0:
+            return True
+        for event in events:
+            event.add_done_callback(on_done)
+        try:
+            await asyncio.wait_for(enough_done, timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            for event in events:
+                event.remove_done_callback(on_done)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Records iterator of streaming commands for asyncio code (Python 3 only)
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import asyncio
+import threading
+
+from moler.util.bounded_stream import BoundedStream
+
+
+class AsyncioRecordsIterator(BoundedStream):
+    """
+    Counterpart of CommandTextualGeneric.iter_records() to be used by 'async for' without blocking events loop.
+    Records are emitted by command in thread processing connection data - consuming coroutine is woken up inside
+    its own loop.
+
+    Usage:
+        async for packet in AsyncioRecordsIterator(tcpdump_cmd):
+            ...
+    """
+
+    def __init__(self, command, maxsize=1000, put_timeout=None):
+        """
+        Switches command into streaming mode. Create iterator before command is started to not miss any record.
+
+        :param command: command derived from CommandTextualGeneric.
+        :param maxsize: max number of records not consumed yet (next records are dropped), 0 for no limit.
+        :param put_timeout: max time [sec] thread processing connection data waits for consumer before record is
+         dropped, None for no waiting. Records emitted inside events loop of consumer are never waiting.
+        """
+        super(AsyncioRecordsIterator, self).__init__(maxsize=maxsize, put_timeout=put_timeout,
+                                                     on_close=command._remove_records_stream)
+        self._loop = asyncio.get_event_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._waiter = None
+        command._add_records_stream(self)
+
+    __iter__ = None  # iterated only by 'async for', blocking next() would stop events loop
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            with self._condition:
+                record_taken, record = self._take_item()
+                if record_taken:
+                    return record
+                if self._ended or self._closed:
+                    break
+                waiter = self._waiter = self._loop.create_future()
+            await waiter
+        self.close()
+        raise StopAsyncIteration
+
+    def _wake_up_consumer(self):
+        # must be called with self._condition acquired
+        super(AsyncioRecordsIterator, self)._wake_up_consumer()
+        if self._waiter is not None:
+            waiter, self._waiter = self._waiter, None
+            if threading.get_ident() == self._loop_thread_id:
+                self._set_done(waiter)
+            else:
+                self._loop.call_soon_threadsafe(self._set_done, waiter)
+
+    def _wait_for_free_place(self):
+        # must be called with self._condition acquired
+        if threading.get_ident() == self._loop_thread_id:  # consumer can't run while its loop thread is waiting
+            self._producer_gave_up = True
+            return
+        super(AsyncioRecordsIterator, self)._wait_for_free_place()
+
+    @staticmethod
+    def _set_done(waiter):
+        if not waiter.done():
+            waiter.set_result(True)
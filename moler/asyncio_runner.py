@@ -28,6 +28,8 @@ from moler.util.connection_observer import exception_stored_if_not_main_thread
 from moler.io.raw import TillDoneThread
 from moler.runner import ConnectionObserverRunner
 from moler.runner import result_for_runners, time_out_observer, his_remaining_time, await_future_or_eol
+from moler.runner import pass_data_to_observer
+from moler.util import metrics
 from moler.util.loghelper import debug_into_logger
 
 
@@ -120,7 +122,7 @@ def thread_secure_get_event_loop(logger_name="moler.runner.asyncio"):
         else:
             raise
 
-    loop.set_debug(enabled=True)
+    # debug mode of loop is opt-in (PYTHONASYNCIODEBUG=1 or python -X dev) - it is costly for many observers
     return loop, new_loop
 
 
@@ -266,11 +268,12 @@ class AsyncioRunner(ConnectionObserverRunner):
         if its_new:
             with AsyncioRunner.runner_lock:
                 self._started_ev_loops.append(event_loop)
+        submit_time = metrics.runner_observer_submitted(self)
         subscribed_data_receiver = self._start_feeding(connection_observer, observer_lock)
         self.logger.debug("scheduling feed({})".format(connection_observer))
         connection_observer_future = asyncio.ensure_future(self.feed(connection_observer,
                                                                      subscribed_data_receiver,
-                                                                     observer_lock),
+                                                                     observer_lock, submit_time),
                                                            loop=event_loop)
         self.logger.debug("runner submit() returning - future: {}:{}".format(instance_id(connection_observer_future),
                                                                              connection_observer_future))
@@ -532,7 +535,7 @@ class AsyncioRunner(ConnectionObserverRunner):
                 if connection_observer.done() or self._in_shutdown:
                     return  # even not unsubscribed secure_data_received() won't pass data to done observer
                 with observer_lock:
-                    connection_observer.data_received(data)
+                    pass_data_to_observer(connection_observer, data, line_oriented=False)
 
             except Exception as exc:  # TODO: handling stacktrace
                 # observers should not raise exceptions during data parsing
@@ -553,11 +556,12 @@ class AsyncioRunner(ConnectionObserverRunner):
             connection_observer.send_command()
         return secure_data_received  # to know what to unsubscribe
 
-    async def feed(self, connection_observer, subscribed_data_receiver, observer_lock):
+    async def feed(self, connection_observer, subscribed_data_receiver, observer_lock, submit_time=None):
         """
         Feeds connection_observer by transferring data from connection and passing it to connection_observer.
         Should be called from background-processing of connection observer.
         """
+        metrics.runner_feed_started(self, submit_time)
         remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
                                               from_start_time=connection_observer.start_time)
         self.logger.debug("{} started, {}".format(connection_observer, msg))
@@ -790,6 +794,283 @@ class AsyncioInThreadRunner(AsyncioRunner):
         raise StopIteration(res)  # Python 2 compatibility
 
 
+class AsyncioSharedLoopRunner(ConnectionObserverRunner):
+    """
+    All observers of process run inside one events loop (the one of AsyncioLoopThread).
+
+    Observers are fed directly from connection callback. Feeder of observer doesn't poll - it awaits future
+    set by done-callback of observer, and timeout of observer is scheduled via loop.call_at().
+    So, idle observers cost no CPU and no file descriptors (no loop per thread).
+    """
+
+    def __init__(self, logger_name='moler.runner.asyncio-shared-loop'):
+        """Create instance of AsyncioSharedLoopRunner class"""
+        self._in_shutdown = False
+        self.logger = logging.getLogger(logger_name)
+        # AsyncioLoopThread must be created from MainThread since it adds signal handlers
+        self._thread4async = get_asyncio_loop_thread()
+        self._running = dict()  # id(connection_observer): (connection_observer, observer_lock) - modified inside loop
+        self._timers = dict()  # id(connection_observer): asyncio.TimerHandle - used only inside loop thread
+        self.logger.debug("created")
+        atexit.register(self.shutdown)
+
+    def shutdown(self):
+        self.logger.debug("shutting down")
+        self._in_shutdown = True
+        # cancelled observer wakes its feeder via done-callback
+        for connection_observer, _ in list(self._running.values()):
+            self.logger.debug("shutdown so cancelling {}".format(connection_observer))
+            connection_observer.cancel()
+
+    def submit(self, connection_observer):
+        """
+        Submit connection observer to background execution.
+        Returns Future that could be used to await for connection_observer done.
+        """
+        assert connection_observer.start_time > 0.0  # connection-observer lifetime should already been started
+        remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                              from_start_time=connection_observer.start_time)
+        self.logger.debug("go background: {!r} - {}".format(connection_observer, msg))
+
+        # Data path is established here (not inside feed()) so, no data will be lost-for-observer after submit().
+        # submit() doesn't await feed() to be started inside loop - it may be called from loop thread itself
+        # (for ex. when connection data make command done and next command is submitted from commands queue).
+        observer_lock = threading.Lock()  # against threads race write-access to observer
+        submit_time = metrics.runner_observer_submitted(self)
+        subscribed_data_receiver = self._start_feeding(connection_observer, observer_lock)
+        connection_observer_future = self._thread4async.start_async_coroutine(self.feed(connection_observer,
+                                                                                        subscribed_data_receiver,
+                                                                                        observer_lock,
+                                                                                        submit_time))
+        # need injecting new attribute inside Future object to allow passing lock to wait_for()
+        connection_observer_future.observer_lock = observer_lock
+        return connection_observer_future
+
+    def wait_for(self, connection_observer, connection_observer_future, timeout=None):
+        """
+        Await for connection_observer running in background or timeout.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :param timeout: Max time (in float seconds) to await before give up. None - use connection_observer.timeout
+        :return:
+        """
+        if connection_observer.done():
+            self.logger.debug("go foreground: {} is already done".format(connection_observer))
+            return None
+        if threading.current_thread() is self._thread4async:
+            # wait_for() should not be called from 'async def' running in our loop - it would block that loop
+            self._raise_wrong_usage_of_wait_for(connection_observer)
+
+        max_timeout = timeout
+        observer_timeout = connection_observer.timeout
+        # we count timeout from now if timeout is given; else we use .start_time and .timeout of observer
+        start_time = time.time() if max_timeout else connection_observer.start_time
+        await_timeout = max_timeout if max_timeout else observer_timeout
+        if max_timeout:
+            remain_time, msg = his_remaining_time("await max.", timeout=max_timeout, from_start_time=start_time)
+        else:
+            remain_time, msg = his_remaining_time("remaining", timeout=observer_timeout, from_start_time=start_time)
+        self.logger.debug("go foreground: {} - {}".format(connection_observer, msg))
+
+        if connection_observer_future is None:
+            end_of_life, remain_time = await_future_or_eol(connection_observer, remain_time, start_time, await_timeout,
+                                                           self.logger)
+            if end_of_life:
+                return None
+            connection_observer_future = connection_observer._future
+            if connection_observer_future is None:  # timed out inside commands queue
+                self._time_out_in_foreground(connection_observer, await_timeout, lock=None)
+                connection_observer.set_end_of_life()
+                return None
+
+        if max_timeout:
+            self._wait_with_max_timeout(connection_observer, connection_observer_future, remain_time, await_timeout)
+        else:
+            # loop timers handle observer timeout and terminating timeout - here we just await future
+            concurrent.futures.wait([connection_observer_future])
+        return None
+
+    def _wait_with_max_timeout(self, connection_observer, connection_observer_future, remain_time, await_timeout):
+        done, not_done = concurrent.futures.wait([connection_observer_future], timeout=remain_time)
+        if done or connection_observer.done():
+            return
+        self._time_out_in_foreground(connection_observer, await_timeout,
+                                     lock=connection_observer_future.observer_lock)
+        if connection_observer.terminating_timeout > 0.0:
+            connection_observer.in_terminating = True
+            concurrent.futures.wait([connection_observer_future], timeout=connection_observer.terminating_timeout)
+        if not connection_observer.done():
+            connection_observer.set_end_of_life()
+
+    def wait_for_iterator(self, connection_observer, connection_observer_future):
+        """
+        Version of wait_for() intended to be used by Python3 to implement awaitable object.
+
+        Note: we don't have timeout parameter here. If you want to await with timeout please do use asyncio machinery.
+        For ex.:  await asyncio.wait_for(connection_observer, timeout=10)
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :return: iterator
+        """
+        self.logger.debug("go foreground: {!r}".format(connection_observer))
+        # feed() runs inside loop of AsyncioLoopThread, awaiting one is running inside loop of caller
+        yield from asyncio.wrap_future(connection_observer_future)
+        return result_for_runners(connection_observer)
+
+    async def feed(self, connection_observer, subscribed_data_receiver, observer_lock, submit_time=None):
+        """
+        Awaits connection_observer done (by data, cancel or timeout) and breaks data path to it.
+        Data are passed to connection_observer directly by connection via secure_data_received() installed by submit().
+        """
+        metrics.runner_feed_started(self, submit_time)
+        loop = asyncio.get_event_loop()
+        observer_done = loop.create_future()
+
+        def set_observer_done():
+            if not observer_done.done():
+                observer_done.set_result(None)
+
+        def on_observer_done(observer):
+            loop.call_soon_threadsafe(set_observer_done)  # observer may become done inside any thread
+
+        observer_id = id(connection_observer)
+        self._running[observer_id] = (connection_observer, observer_lock)
+        connection_observer.add_done_callback(on_observer_done)
+        self._schedule_timeout(connection_observer, observer_lock)
+        moler_conn = connection_observer.connection
+        try:
+            if self._in_shutdown:
+                self.logger.debug("shutdown so cancelling {}".format(connection_observer))
+                connection_observer.cancel()
+            await observer_done
+        except asyncio.CancelledError:
+            self.logger.debug("cancelling {}.feed".format(self))
+            with observer_lock:
+                connection_observer.cancel()
+            raise  # need to reraise to inform "I agree for cancellation"
+        finally:
+            connection_observer.remove_done_callback(on_observer_done)
+            self._running.pop(observer_id, None)
+            timer = self._timers.pop(observer_id, None)
+            if timer:
+                timer.cancel()
+            self.logger.debug("unsubscribing {}".format(connection_observer))
+            moler_conn.unsubscribe(observer=subscribed_data_receiver,
+                                   connection_closed_handler=connection_observer.connection_closed_handler)
+            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                  from_start_time=connection_observer.start_time)
+            connection_observer._log(logging.INFO, "{} finished, {}".format(connection_observer.get_short_desc(), msg))
+        return None
+
+    def timeout_change(self, timedelta):
+        """Timeout of running observer has been changed - reschedule timers inside loop."""
+        self._thread4async.ev_loop.call_soon_threadsafe(self._reschedule_timeouts)
+
+    def _reschedule_timeouts(self):
+        for observer_id, timer in list(self._timers.items()):
+            timer.cancel()
+            connection_observer, observer_lock = self._running[observer_id]
+            self._schedule_timeout(connection_observer, observer_lock)
+
+    def _schedule_timeout(self, connection_observer, observer_lock):
+        """Must be called inside loop thread."""
+        loop = self._thread4async.ev_loop
+        if connection_observer.in_terminating:
+            deadline = connection_observer.start_time + connection_observer.timeout + connection_observer.terminating_timeout
+        else:
+            deadline = connection_observer.start_time + connection_observer.timeout
+        # loop.time() is monotonic clock, observer lifetime is counted in time.time()
+        when = loop.time() + (deadline - time.time())
+        self._timers[id(connection_observer)] = loop.call_at(when, self._on_timeout, connection_observer, observer_lock)
+
+    def _on_timeout(self, connection_observer, observer_lock):
+        self._timers.pop(id(connection_observer), None)
+        if connection_observer.done():
+            return
+        now = time.time()
+        run_duration = now - connection_observer.start_time
+        if connection_observer.in_terminating:
+            if run_duration < connection_observer.timeout + connection_observer.terminating_timeout:
+                self._schedule_timeout(connection_observer, observer_lock)
+                return
+            self.logger.info("{} underlying real command failed to finish during {} seconds. It will be forcefully"
+                             " terminated".format(connection_observer, connection_observer.terminating_timeout))
+            connection_observer.set_end_of_life()
+            return
+        if run_duration < connection_observer.timeout:  # timeout has been extended
+            self._schedule_timeout(connection_observer, observer_lock)
+            return
+        with observer_lock:
+            time_out_observer(connection_observer,
+                              timeout=connection_observer.timeout,
+                              passed_time=run_duration,
+                              runner_logger=self.logger)
+        if not connection_observer.done():
+            # observer has timed out but it may still do something (like command awaiting prompt after Ctrl+C)
+            connection_observer.in_terminating = True
+            self._schedule_timeout(connection_observer, observer_lock)
+
+    def _time_out_in_foreground(self, connection_observer, timeout, lock):
+        passed = time.time() - connection_observer.start_time
+        if lock:
+            with lock:
+                time_out_observer(connection_observer=connection_observer,
+                                  timeout=timeout, passed_time=passed,
+                                  runner_logger=self.logger, kind="await_done")
+        else:
+            time_out_observer(connection_observer=connection_observer,
+                              timeout=timeout, passed_time=passed,
+                              runner_logger=self.logger, kind="await_done")
+
+    def _raise_wrong_usage_of_wait_for(self, connection_observer):
+        err_msg = "Can't call await_done() from 'async def' - it is blocking call"
+        err_msg += "\nconsider using:"
+        err_msg += "\n    await observer"
+        err_msg += "\ninstead of:"
+        err_msg += "\n    observer.await_done()"
+        self.logger.error(msg=err_msg)
+        raise WrongUsage(err_msg)
+
+    def _start_feeding(self, connection_observer, observer_lock):
+        """
+        Start feeding connection_observer by establishing data-channel from connection to observer.
+        """
+        moler_conn = connection_observer.connection
+        # line oriented observers get data already split into lines - splitting is done once by connection
+        line_oriented = connection_observer.is_line_oriented() and hasattr(moler_conn, 'subscribe_lines')
+
+        def secure_data_received(data):
+            try:
+                if connection_observer.done() or self._in_shutdown:
+                    return  # even not unsubscribed secure_data_received() won't pass data to done observer
+                with observer_lock:
+                    pass_data_to_observer(connection_observer, data, line_oriented)
+
+            except Exception as exc:  # TODO: handling stacktrace
+                # observers should not raise exceptions during data parsing
+                # but if they do so - we fix it
+                with observer_lock:
+                    connection_observer.set_exception(exc)
+
+        self.logger.debug("subscribing for data {}".format(connection_observer))
+        with observer_lock:
+            if line_oriented:
+                moler_conn.subscribe_lines(observer=secure_data_received,
+                                           connection_closed_handler=connection_observer.connection_closed_handler,
+                                           keywords=connection_observer.get_required_keywords())
+            else:
+                moler_conn.subscribe(observer=secure_data_received,
+                                     connection_closed_handler=connection_observer.connection_closed_handler)
+            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                  from_start_time=connection_observer.start_time)
+            connection_observer._log(logging.INFO, "{} started, {}".format(connection_observer.get_long_desc(), msg))
+        if connection_observer.is_command():
+            connection_observer.send_command()
+        return secure_data_received  # to know what to unsubscribe
+
+
 def cleanup_remaining_tasks(loop, logger):
     # https://stackoverflow.com/questions/30765606/whats-the-correct-way-to-clean-up-after-an-interrupted-event-loop
     # https://medium.com/python-pandemonium/asyncio-coroutine-patterns-beyond-await-a6121486656f
@@ -832,8 +1113,6 @@ class AsyncioLoopThread(TillDoneThread):
         #
         asyncio.get_child_watcher().attach_loop(self.ev_loop)
 
-        self.ev_loop.set_debug(enabled=True)
-
         self.logger.debug("created asyncio loop: {}:{}".format(id(self.ev_loop), self.ev_loop))
         self.ev_loop_done = AsyncioEventThreadsafe(loop=self.ev_loop)
         self.ev_loop_done.clear()
@@ -15,6 +15,8 @@ import six
 
 from moler.cmd import RegexHelper
 from moler.command import Command
+from moler.helpers import split_into_lines, default_newline_chars
+from moler.util.bounded_stream import BoundedStream, StreamsFeeder
 from threading import Lock
 
 
@@ -63,6 +65,8 @@ class CommandTextualGeneric(Command):
         # command starts, False to split lines on every new line char
         self._stored_exception = None  # Exception stored before it is passed to base class when command is done.
         self._lock_is_done = Lock()
+        self._records_streams = StreamsFeeder()  # Not empty in streaming mode - records are passed to them, not current_ret
+        self._ends_records_streams = False  # done-callback ending streams is registered
 
         if not self._newline_chars:
             self._newline_chars = CommandTextualGeneric._default_newline_chars
@@ -176,9 +180,17 @@ class CommandTextualGeneric(Command):
         :param data: List of strings sent by device.
         :return: None.
         """
-        lines = data.splitlines(True)
-        for current_chunk in lines:
-            line, is_full_line = self._update_from_cached_incomplete_line(current_chunk=current_chunk)
+        self.lines_received(lines=split_into_lines(data, newline_chars=self._newline_chars))
+
+    def lines_received(self, lines):
+        """
+        Called by framework when any data are sent by device, data already split into lines by connection.
+
+        :param lines: tuple of (current_chunk, line, is_full_line) - see moler.helpers.split_into_lines().
+        :return: None.
+        """
+        for current_chunk, line, is_full_line in lines:
+            line = self._update_from_cached_incomplete_line(line=line, is_full_line=is_full_line)
             if self._cmd_output_started:
                 self._process_line_from_command(line=line, current_chunk=current_chunk, is_full_line=is_full_line)
             else:
@@ -210,24 +222,94 @@ class CommandTextualGeneric(Command):
         if self._concatenate_before_command_starts and not self._cmd_output_started and is_full_line:
             self._last_not_full_line = line
 
-    def _update_from_cached_incomplete_line(self, current_chunk):
+    def _update_from_cached_incomplete_line(self, line, is_full_line):
         """
         Concatenates (if necessary) previous chunk(s) of line and current.
 
-        :param current_chunk: line from connection (full line or incomplete one).
-        :return: Concatenated (if necessary) line from connection without newline char(s). Flag: True if line had
-         newline char(s), False otherwise.
+        :param line: chunk of line from connection (full line or incomplete one) without newline char(s).
+        :param is_full_line: True if chunk of line had newline char(s), False otherwise.
+        :return: Concatenated (if necessary) line from connection without newline char(s).
         """
-        line = current_chunk
         if self._last_not_full_line is not None:
             line = "{}{}".format(self._last_not_full_line, line)
             self._last_not_full_line = None
-        is_full_line = self.has_endline_char(line)
-        if is_full_line:
-            line = self._strip_new_lines_chars(line)
-        else:
+        if not is_full_line:
             self._last_not_full_line = line
-        return line, is_full_line
+        return line
+
+    def is_line_oriented(self):
+        """
+        :return: True if command may get lines split by connection, False if it needs raw data.
+        """
+        return self._newline_chars == default_newline_chars and (
+            six.get_unbound_function(type(self).data_received) is six.get_unbound_function(
+                CommandTextualGeneric.data_received))
+
+    def iter_records(self, maxsize=0, put_timeout=None):
+        """
+        Switches command into streaming mode and returns iterator of records (like packets, lines, interval reports)
+        parsed from command output from now. Iteration ends when command is done.
+        In streaming mode records are not stored in current_ret, it keeps only summary data, so memory usage of long
+        running command is flat. Call it before command is started to not miss any record.
+        When iterator has maxsize records not consumed yet then next records are dropped (counted by its 'dropped'
+        attribute). With put_timeout given the command waits for consumer (back-pressure) before dropping record - it
+        stops processing of connection data for that time. Close iterator (or use it as context manager) if you stop
+        iterating before its end.
+
+        :param maxsize: max number of records not consumed yet, 0 for no limit.
+        :param put_timeout: max time [sec] the command waits for consumer, None for no waiting.
+        :return: iterator of records (moler.util.bounded_stream.BoundedStream).
+        """
+        records = BoundedStream(maxsize=maxsize, put_timeout=put_timeout, on_close=self._remove_records_stream)
+        self._add_records_stream(records)
+        return records
+
+    def is_streaming(self):
+        """
+        :return: True if records parsed from output are passed to consumers (see iter_records()), False if they are
+         stored in current_ret.
+        """
+        return len(self._records_streams) > 0
+
+    def _add_records_stream(self, stream):
+        """
+        :param stream: object with put(record), end() and is_closed() methods (like BoundedStream), referenced
+         weakly by command. Its put() is called in thread processing connection data.
+        :return: None
+        """
+        # registered here, not at first next(), to not miss records before it
+        self._records_streams.add(stream)
+        if not self._ends_records_streams:
+            self._ends_records_streams = True
+            self.add_done_callback(self._end_records_streams)
+        elif self.done():  # done-callback already called
+            stream.end()
+
+    def _remove_records_stream(self, stream):
+        self._records_streams.remove(stream)
+
+    def _end_records_streams(self, command):
+        self._flush_records()  # once for all streams
+        self._records_streams.end()
+
+    def _emit_record(self, record):
+        """
+        Passes record parsed from command output to consumers (in streaming mode).
+
+        :param record: record (usually dict) parsed from output.
+        :return: True if record was passed to consumers, False if command is not in streaming mode and parser should
+         store record in current_ret.
+        """
+        return self._records_streams.put(record)
+
+    def _flush_records(self):
+        """
+        Called when command is done and before iteration of records ends. Override it to emit record that is still
+        being completed by parser (like multiline packet description).
+
+        :return: None
+        """
+        pass
 
     @abc.abstractmethod
     def build_command_string(self):
@@ -326,12 +408,12 @@ class CommandTextualGeneric(Command):
         else:
             if self._stored_exception is None:
                 self._log(logging.INFO,
-                          "{}.{} has set exception {!r}".format(self.__class__.__module__, self, exception),
+                          lambda: "{}.{} has set exception {!r}".format(self.__class__.__module__, self, exception),
                           levels_to_go_up=2)
                 self._stored_exception = exception
             else:
                 self._log(logging.INFO,
-                          "{}.{} tried set exception {!r} on already set exception {!r}".format(
+                          lambda: "{}.{} tried set exception {!r} on already set exception {!r}".format(
                               self.__class__.__module__,
                               self, exception,
                               self._stored_exception),
@@ -366,6 +448,8 @@ class CommandTextualGeneric(Command):
         """
         if self.break_on_timeout:
             self.break_cmd()
+        if not self._is_log_enabled(logging.INFO):
+            return
         msg = ("Timeout when command_string='{}', _cmd_escaped='{}', _cmd_output_started='{}', ret_required='{}', "
                "break_on_timeout='{}', _last_not_full_line='{}', _re_prompt='{}', do_not_process_after_done='{}', "
                "newline_after_command_string='{}', wait_for_prompt_on_exception='{}', _stored_exception='{}', "
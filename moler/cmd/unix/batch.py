@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Batch command module - many commands sent as one line, in one round trip.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import re
+import uuid
+
+from moler.cmd.unix.genericunix import GenericUnixCommand
+from moler.cmd.unix.uname import Uname
+from moler.cmd.unix.whoami import Whoami
+from moler.exceptions import CommandFailure, ParsingDone
+
+
+class Batch(GenericUnixCommand):
+    """
+    Runs commands as one command line: "echo 'delimiter'_0; cmd_0; echo 'delimiter'_1; cmd_1; ... echo 'delimiter'_N".
+    Output of each command is taken from between delimiters and passed to parser of that command.
+    Delimiter after command output is seen by command as its prompt.
+    Result is list of results of commands (in order of commands), each command keeps its result too.
+
+    Only commands sending one command line without further interaction (like passwords) may be batched.
+    Commands passed to batch are consumed by it - they are not run on their own.
+    """
+
+    def __init__(self, connection, commands, delimiter=None, prompt=None, newline_chars=None, runner=None):
+        """
+        :param connection: Moler connection to device, terminal when command is executed.
+        :param commands: list of commands - objects of commands or classes of commands or pairs (class, kwargs)
+        :param delimiter: text of delimiters of commands outputs, unique one is generated if not given
+        :param prompt: prompt (on system where command runs).
+        :param newline_chars: Characters to split lines - list.
+        :param runner: Runner to run command.
+        """
+        super(Batch, self).__init__(connection=connection, prompt=prompt, newline_chars=newline_chars, runner=runner)
+        self.delimiter = delimiter if delimiter else "MOLER_BATCH_{}".format(uuid.uuid4().hex[:8])
+        self.commands = [self._create_command(command) for command in commands]
+        self._re_delimiter = re.compile(r"^{}_(?P<INDEX>\d+)\s*$".format(re.escape(self.delimiter)))
+        for index, command in enumerate(self.commands):
+            # delimiter after output of command is its prompt
+            command._re_prompt = re.compile(r"^{}_{}\s*$".format(re.escape(self.delimiter), index + 1))
+        self._current_command_index = None
+        self._expected_delimiter_index = 0
+        self.current_ret = list()
+        if self.commands:
+            self.timeout = sum(command.timeout for command in self.commands)
+
+    def build_command_string(self):
+        if not self.commands:
+            raise CommandFailure(self, "No commands to run in batch")
+        cmd_parts = list()
+        for index, command in enumerate(self.commands):
+            cmd_parts.append(self._build_echo_delimiter(index))
+            cmd_parts.append(command.command_string)
+        cmd_parts.append(self._build_echo_delimiter(len(self.commands)))
+        return "; ".join(cmd_parts)
+
+    def on_new_line(self, line, is_full_line):
+        if is_full_line:
+            try:
+                self._parse_delimiter(line)
+                self._pass_line_to_command(line)
+            except ParsingDone:
+                return
+        self._check_delimiters_count(line)
+        return super(Batch, self).on_new_line(line, is_full_line)
+
+    def _parse_delimiter(self, line):
+        if self._regex_helper.match_compiled(self._re_delimiter, line):
+            index = int(self._regex_helper.group("INDEX"))
+            if index != self._expected_delimiter_index:
+                if self._stored_exception is None:  # report only first of unexpected delimiters
+                    self._fail_on_unexpected_delimiter(line)
+            else:
+                if self._current_command_index is not None:
+                    self._finish_command(line)
+                self._expected_delimiter_index = index + 1
+                if index < len(self.commands):
+                    self._current_command_index = index
+                    self.commands[index]._cmd_output_started = True
+                else:
+                    self._current_command_index = None
+            raise ParsingDone
+
+    def _fail_on_unexpected_delimiter(self, delimiter_line):
+        msg = "delimiter '{}' while expected delimiter of index {}".format(delimiter_line, self._expected_delimiter_index)
+        if self._current_command_index is not None:
+            command = self.commands[self._current_command_index]
+            if not command.done():
+                command.set_exception(CommandFailure(command, msg))
+            self._current_command_index = None
+        self.set_exception(CommandFailure(self, msg))
+
+    def _check_delimiters_count(self, line):
+        expected_count = len(self.commands) + 1
+        if self._stored_exception is None and not self.done() and self.is_end_of_cmd_output(line):
+            if self._expected_delimiter_index != expected_count:
+                self.set_exception(CommandFailure(self, "got {} of {} delimiters of commands outputs".format(
+                    self._expected_delimiter_index, expected_count)))
+
+    def _pass_line_to_command(self, line):
+        if self._current_command_index is not None:
+            command = self.commands[self._current_command_index]
+            self._feed_command(command, line, is_full_line=True)
+            raise ParsingDone
+
+    def _finish_command(self, delimiter_line):
+        command = self.commands[self._current_command_index]
+        self._feed_command(command, delimiter_line, is_full_line=False)  # prompt has no newline
+        if not command.done():
+            command.set_exception(CommandFailure(command, "no result before delimiter '{}'".format(delimiter_line)))
+        try:
+            self.current_ret.append(command.result())
+        except Exception as exc:
+            self.current_ret.append(None)
+            self.set_exception(CommandFailure(self, "command '{}' failed: {}".format(command.command_string, exc)))
+
+    def _feed_command(self, command, line, is_full_line):
+        if command.done():
+            return
+        if command.is_line_oriented():
+            command.lines_received(lines=((line, line, is_full_line),))
+        else:
+            command.data_received(line + command._newline_chars[0] if is_full_line else line)
+
+    def _build_echo_delimiter(self, index):
+        # quoted part of delimiter makes echoed command line different than printed delimiter
+        return "echo '{}'_{}".format(self.delimiter, index)
+
+    def _create_command(self, command):
+        if isinstance(command, type):
+            return command(connection=self.connection)
+        if isinstance(command, (list, tuple)):
+            command_class, command_kwargs = command
+            return command_class(connection=self.connection, **command_kwargs)
+        return command
+
+
+COMMAND_OUTPUT = """
+host:~ # echo 'BATCH_3f1c'_0; whoami; echo 'BATCH_3f1c'_1; uname -a; echo 'BATCH_3f1c'_2
+BATCH_3f1c_0
+ute
+BATCH_3f1c_1
+Linux debian 4.9.0-6-amd64 #1 SMP Debian 4.9.88-1+deb9u1 (2018-05-07) x86_64 GNU/Linux
+BATCH_3f1c_2
+host:~ #"""
+
+COMMAND_KWARGS = {
+    'commands': [Whoami, (Uname, {'options': '-a'})],
+    'delimiter': 'BATCH_3f1c',
+}
+
+COMMAND_RESULT = [
+    {'USER': 'ute'},
+    {'RESULT': ['Linux debian 4.9.0-6-amd64 #1 SMP Debian 4.9.88-1+deb9u1 (2018-05-07) x86_64 GNU/Linux']},
+]
@@ -45,7 +45,8 @@ class Cat(GenericUnixCommand):
 
     def _parse_line(self, line):
         if not line == "":
-            self.current_ret["LINES"].append(line)
+            if not self._emit_record(line):
+                self.current_ret["LINES"].append(line)
         raise ParsingDone
 
 
@@ -13,7 +13,7 @@ import six
 
 from moler.cmd.commandtextualgeneric import CommandTextualGeneric
 from moler.exceptions import CommandFailure
-from moler.helpers import remove_all_known_special_chars
+from moler.helpers import remove_all_known_special_chars, is_terminal_output_sanitized
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -61,6 +61,6 @@ class GenericUnixCommand(CommandTextualGeneric):
         :param line: Line with special chars, raw string from device
         :return: line without special chars.
         """
-        if self.remove_all_known_special_chars_from_terminal_output:
+        if self.remove_all_known_special_chars_from_terminal_output and not is_terminal_output_sanitized(self.connection):
             line = remove_all_known_special_chars(line)
         return line
@@ -274,7 +274,10 @@ class Iperf2(GenericUnixCommand):
         return iperf_record
 
     def _update_current_ret(self, connection_name, info_dict):
-        if connection_name in self.current_ret['CONNECTIONS']:
+        if self._emit_record(dict(info_dict, connection=connection_name)):
+            # streaming mode: keep only last record of connection (to detect final report)
+            self.current_ret['CONNECTIONS'][connection_name] = [info_dict]
+        elif connection_name in self.current_ret['CONNECTIONS']:
             self.current_ret['CONNECTIONS'][connection_name].append(info_dict)
         else:
             connection_dict = {connection_name: [info_dict]}
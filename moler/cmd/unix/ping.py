@@ -54,6 +54,7 @@ class Ping(GenericUnixCommand):
         """
         if is_full_line:
             try:
+                self._parse_reply(line)
                 self._parse_trans_recv_loss_time_plus_errors(line)
                 self._parse_trans_recv_loss_time(line)
                 self._parse_min_avg_max_mdev_unit_time(line)
@@ -61,6 +62,30 @@ class Ping(GenericUnixCommand):
                 pass  # line has been fully parsed by one of above parse-methods
         return super(Ping, self).on_new_line(line, is_full_line)
 
+    # 64 bytes from localhost (127.0.0.1): icmp_seq=1 ttl=64 time=0.047 ms
+    _re_reply = re.compile(
+        r"(?P<BYTES>\d+) bytes from (?P<SOURCE>[^:]+): icmp_seq=(?P<SEQ>\d+) ttl=(?P<TTL>\d+) time=(?P<TIME>[\d\.]+)\s*(?P<UNIT>\w+)")
+
+    def _parse_reply(self, line):
+        """
+        Parses reply for single packet. Replies are passed as records in streaming mode only (see iter_records()).
+        :param line: Line of output of command.
+        :return: Nothing but raises ParsingDone if line has information to handle by this method.
+        """
+        if self.is_streaming() and self._regex_helper.search_compiled(Ping._re_reply, line):
+            unit = self._regex_helper.group('UNIT')
+            time = float(self._regex_helper.group('TIME'))
+            self._emit_record({
+                'bytes': int(self._regex_helper.group('BYTES')),
+                'source': self._regex_helper.group('SOURCE'),
+                'icmp_seq': int(self._regex_helper.group('SEQ')),
+                'ttl': int(self._regex_helper.group('TTL')),
+                'time': time,
+                'time_unit': unit,
+                'time_seconds': self._converter_helper.to_seconds(time, unit),
+            })
+            raise ParsingDone
+
     # 11 packets transmitted, 11 received, 0 % packet loss, time 9999 ms
     _re_trans_recv_loss_time = re.compile(
         r"(?P<PKTS_TRANS>\d+) packets transmitted, (?P<PKTS_RECV>\d+) received, (?P<PKT_LOSS>\S+)% packet loss, time (?P<TIME>\d+)\s*(?P<UNIT>\w+)")
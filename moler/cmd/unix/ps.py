@@ -4,7 +4,6 @@ __author__ = 'Dariusz Rosinski, Marcin Usielski'
 __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'dariusz.rosinski@nokia.com, marcin.usielski@nokia.com'
 
-import re
 from moler.cmd.unix.genericunix import GenericUnixCommand
 from moler.parser.table_text import TableText
 
@@ -78,11 +77,10 @@ class Ps(GenericUnixCommand):
         :param line: line from device to process
         :return: list of columns or None
         """
-        parsed_line = str.strip(str(line))
         # split with whitespaces
-        parsed_line = re.split(r'\s+', parsed_line)
+        parsed_line = line.split()
         # If no enough columns leave this line
-        if len(self._columns) > len(parsed_line) or parsed_line == ['']:
+        if len(self._columns) > len(parsed_line) or not parsed_line:
             parsed_line = None
         # When data is avaliable proceed with parsing
         return parsed_line
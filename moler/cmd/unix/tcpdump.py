@@ -20,6 +20,7 @@ class Tcpdump(GenericUnixCommand):
         # Parameters defined by calling the command
         self.options = options
         self.packets_counter = 0
+        self._packet = None  # packet described by current line(s)
 
         self.ret_required = False
 
@@ -60,12 +61,11 @@ class Tcpdump(GenericUnixCommand):
 
     def _parse_timestamp_src_dst_details(self, line):
         if self._regex_helper.search_compiled(Tcpdump._re_timestamp_src_dst_details, line):
-            self.packets_counter += 1
-            self.current_ret[str(self.packets_counter)] = {}
-            self.current_ret[str(self.packets_counter)]['timestamp'] = self._regex_helper.group("TIMESTAMP")
-            self.current_ret[str(self.packets_counter)]['source'] = self._regex_helper.group("SRC")
-            self.current_ret[str(self.packets_counter)]['destination'] = self._regex_helper.group("DEST")
-            self.current_ret[str(self.packets_counter)]['details'] = self._regex_helper.group("DETAILS")
+            self._start_new_packet()
+            self._packet['timestamp'] = self._regex_helper.group("TIMESTAMP")
+            self._packet['source'] = self._regex_helper.group("SRC")
+            self._packet['destination'] = self._regex_helper.group("DEST")
+            self._packet['details'] = self._regex_helper.group("DETAILS")
             raise ParsingDone
 
     # 13:31:33.176710 IP (tos 0xc0, ttl 64, id 4236, offset 0, flags [DF], proto UDP (17), length 76)
@@ -75,16 +75,15 @@ class Tcpdump(GenericUnixCommand):
 
     def _parse_timestamp_tos_ttl_id_offset_flags_proto_length(self, line):
         if self._regex_helper.search_compiled(Tcpdump._re_timestamp_tos_ttl_id_offset_flags_proto_length, line):
-            self.packets_counter += 1
-            self.current_ret[str(self.packets_counter)] = {}
-            self.current_ret[str(self.packets_counter)]['timestamp'] = self._regex_helper.group("TIMESTAMP")
-            self.current_ret[str(self.packets_counter)]['tos'] = self._regex_helper.group("TOS")
-            self.current_ret[str(self.packets_counter)]['ttl'] = self._regex_helper.group("TTL")
-            self.current_ret[str(self.packets_counter)]['id'] = self._regex_helper.group("ID")
-            self.current_ret[str(self.packets_counter)]['offset'] = self._regex_helper.group("OFFSET")
-            self.current_ret[str(self.packets_counter)]['flags'] = self._regex_helper.group("FLAGS")
-            self.current_ret[str(self.packets_counter)]['proto'] = self._regex_helper.group("PROTO")
-            self.current_ret[str(self.packets_counter)]['length'] = self._regex_helper.group("LENGTH")
+            self._start_new_packet()
+            self._packet['timestamp'] = self._regex_helper.group("TIMESTAMP")
+            self._packet['tos'] = self._regex_helper.group("TOS")
+            self._packet['ttl'] = self._regex_helper.group("TTL")
+            self._packet['id'] = self._regex_helper.group("ID")
+            self._packet['offset'] = self._regex_helper.group("OFFSET")
+            self._packet['flags'] = self._regex_helper.group("FLAGS")
+            self._packet['proto'] = self._regex_helper.group("PROTO")
+            self._packet['length'] = self._regex_helper.group("LENGTH")
             raise ParsingDone
 
     # debdev.ntp > ntp.wdc1.us.leaseweb.net.ntp: [bad udp cksum 0x7aab -> 0x9cd3!] NTPv4, length 48
@@ -92,9 +91,9 @@ class Tcpdump(GenericUnixCommand):
 
     def _parse_src_dst_details(self, line):
         if self._regex_helper.search_compiled(Tcpdump._re_src_dst_details, line):
-            self.current_ret[str(self.packets_counter)]['source'] = self._regex_helper.group("SRC")
-            self.current_ret[str(self.packets_counter)]['destination'] = self._regex_helper.group("DST")
-            self.current_ret[str(self.packets_counter)]['details'] = self._regex_helper.group("DETAILS")
+            self._packet['source'] = self._regex_helper.group("SRC")
+            self._packet['destination'] = self._regex_helper.group("DST")
+            self._packet['details'] = self._regex_helper.group("DETAILS")
             raise ParsingDone
 
     # Root Delay: 0.000000, Root dispersion: 1.031906, Reference-ID: (unspec)
@@ -103,11 +102,9 @@ class Tcpdump(GenericUnixCommand):
 
     def _parse_root_delay_root_dipersion_ref_id(self, line):
         if self._regex_helper.search_compiled(Tcpdump._re_root_delay_root_dispersion_ref_id, line):
-            self.current_ret[str(self.packets_counter)][self._regex_helper.group("ROOT")] = self._regex_helper.group(
-                "DELAY")
-            self.current_ret[str(self.packets_counter)][self._regex_helper.group("ROOT_2")] = self._regex_helper.group(
-                "DISPERSION")
-            self.current_ret[str(self.packets_counter)][self._regex_helper.group("REF")] = self._regex_helper.group("ID")
+            self._packet[self._regex_helper.group("ROOT")] = self._regex_helper.group("DELAY")
+            self._packet[self._regex_helper.group("ROOT_2")] = self._regex_helper.group("DISPERSION")
+            self._packet[self._regex_helper.group("REF")] = self._regex_helper.group("ID")
             raise ParsingDone
 
     # Reference Timestamp:  0.000000000
@@ -115,10 +112,22 @@ class Tcpdump(GenericUnixCommand):
 
     def _parse_header_timestamp_details(self, line):
         if self._regex_helper.search_compiled(Tcpdump._re_timestamp_header_details, line):
-            self.current_ret[str(self.packets_counter)][
-                self._regex_helper.group("TIMESTAMP_HEADER")] = self._regex_helper.group("DETAILS")
+            self._packet[self._regex_helper.group("TIMESTAMP_HEADER")] = self._regex_helper.group("DETAILS")
             raise ParsingDone
 
+    def _start_new_packet(self):
+        self._flush_records()
+        self.packets_counter += 1
+        self._packet = dict()
+        if not self.is_streaming():
+            self.current_ret[str(self.packets_counter)] = self._packet
+
+    def _flush_records(self):
+        # packet is described by many lines so it is passed to consumers when next packet starts or command is done
+        if self.is_streaming() and self._packet is not None:
+            packet, self._packet = self._packet, None
+            self._emit_record(dict(packet, number=str(self.packets_counter)))
+
     # 5 packets received by filter
     _re_packets = re.compile(
         r"(?P<PCKT>\d+)\s+(?P<GROUP>packets captured|packets received by filter|packets dropped by kernel)")
@@ -116,18 +116,15 @@ class W(GenericUnixCommand):
         """
         if self._regex_helper.search_compiled(W._re_header, line):
             if not self.headers:
-                for value in re.findall(W._re_header, line):
-                    self.headers.append(value[0])
+                self.headers.extend(line.split())
                 raise ParsingDone
             else:
                 # Dictionary which is going to be appended to the returned list
                 ret = dict()
                 # List of entries
-                _entries = list()
+                _entries = line.split()
                 # List of values in WHAT entry
                 _what_entry = list()
-                for value in re.findall(W._re_header, line):
-                    _entries.append(value[0])
                 for what_index in range(len(self.headers) - 1, len(_entries)):
                     _what_entry.append(_entries[what_index])
                 _what_entry_string = ' '.join(_what_entry)
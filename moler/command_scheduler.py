@@ -4,10 +4,14 @@ __author__ = 'Marcin Usielski'
 __copyright__ = 'Copyright (C) 2019, Nokia'
 __email__ = 'marcin.usielski@nokia.com'
 
+import heapq
+import itertools
 import threading
 import time
 import logging
+from collections import deque
 from moler.exceptions import CommandTimeout
+from moler.helpers import instance_id
 from threading import Thread
 
 
@@ -16,8 +20,9 @@ class CommandScheduler(object):
     @staticmethod
     def enqueue_starting_on_connection(connection_observer):
         """
-        Waits for free slot and runs command when no other command is in run mode. If connection_observer is not
-         a command then runs immediately.
+        Runs command when no other command is in run mode or puts it into queue of connection. Command from queue is
+         run when previous command is removed from connection. If connection_observer is not a command then runs
+         immediately.
         :param connection_observer: Object of ConnectionObserver to run. Maybe a command or an observer.
         :return: Nothing
         """
@@ -25,13 +30,7 @@ class CommandScheduler(object):
         if not connection_observer.is_command():  # Passed observer, not command.
             scheduler._submit(connection_observer)
             return
-        if scheduler._add_command_to_connection(cmd=connection_observer, wait_for_slot=False):
-            #  We have a free slot available
-            return
-        # We have to wait to finish other command(s) so let's do it in another thread.
-        t1 = Thread(target=scheduler._add_command_to_connection, args=(connection_observer, True))
-        t1.setDaemon(True)
-        t1.start()
+        scheduler._add_command_to_connection(cmd=connection_observer)
 
     @staticmethod
     def dequeue_running_on_connection(connection_observer):
@@ -58,6 +57,34 @@ class CommandScheduler(object):
             return scheduler._does_it_wait_in_queue(cmd=connection_observer)
         return False
 
+    @staticmethod
+    def get_queue_statistics(connection):
+        """
+        Returns statistics of commands queue of connection.
+
+        :param connection: connection of commands.
+        :return: dict with: 'queue_depth' - number of commands waiting now, 'max_queue_depth' - max number of commands
+         waiting at the same time, 'queued_commands' - number of commands that had to wait, 'total_wait_time',
+         'max_wait_time' and 'avg_wait_time' - time (in float seconds) commands spent in queue.
+        """
+        scheduler = CommandScheduler._get_scheduler()
+        return scheduler._get_queue_statistics(connection=connection)
+
+    @staticmethod
+    def get_all_queues_statistics():
+        """
+        Returns statistics of commands queues of all connections that had any command.
+
+        :return: dict of connection name (id of connection without name) -> statistics as returned by
+         get_queue_statistics().
+        """
+        scheduler = CommandScheduler._get_scheduler()
+        with CommandScheduler._conn_lock:
+            connections = list(scheduler._locks)
+        return dict((getattr(connection, 'name', instance_id(connection)),
+                     scheduler._get_queue_statistics(connection=connection))
+                    for connection in connections)
+
     # internal methods and variables
 
     _conn_lock = threading.Lock()
@@ -67,6 +94,10 @@ class CommandScheduler(object):
         with CommandScheduler._conn_lock:
             if CommandScheduler._scheduler is None:
                 self._locks = dict()
+                self._timeouts_condition = threading.Condition()
+                self._timeouts = list()  # heap of (deadline, sequence, cmd) for commands waiting in queues
+                self._timeouts_sequence = itertools.count()
+                self._timeouts_thread = None
                 CommandScheduler._scheduler = self
 
     @staticmethod
@@ -75,32 +106,29 @@ class CommandScheduler(object):
             CommandScheduler()
         return CommandScheduler._scheduler
 
-    def _add_command_to_connection(self, cmd, wait_for_slot=True):
+    def _add_command_to_connection(self, cmd):
         """
         Adds command to execute on connection.
         :param cmd: Command object to add to connection
-        :param wait_for_slot: If True then waits till command timeout or there is free slot to execute command. If False
-        then returns immediately regardless there is free slot or not.
-        :return: True if command was marked as current executed, False if command cannot be set as current executed.
+        :return: True if command was marked as current executed, False if command was put into queue.
         """
-        if self._add_command_to_execute(cmd=cmd):
-            self._submit(cmd)
-            return True
-        else:
-            if wait_for_slot:
-                self._add_command_to_queue(cmd=cmd)
-                start_time = cmd.start_time
-                if self._wait_for_slot_for_command(cmd=cmd):
-                    self._submit(connection_observer=cmd)
-                    return True
-                # If we are here it means command timeout before it really starts.
-                cmd.set_exception(CommandTimeout(cmd,
-                                                 timeout=cmd.timeout,
-                                                 kind="scheduler.await_done",
-                                                 passed_time=time.time() - start_time))
-                cmd.set_end_of_life()
-                self._remove_command(cmd=cmd)
-        return False
+        connection = cmd.connection
+        lock = self._lock_for_connection(connection)
+        conn_atr = self._locks[connection]
+        with lock:
+            if conn_atr['current_cmd'] is None:
+                conn_atr['current_cmd'] = cmd
+            else:
+                conn_atr['queue'].append(cmd)
+                conn_atr['enqueue_times'][cmd] = time.time()
+                conn_atr['max_queue_depth'] = max(conn_atr['max_queue_depth'], len(conn_atr['enqueue_times']))
+                conn_atr['queued_commands'] += 1
+                queued_cmd, cmd = cmd, None
+        if cmd is None:
+            self._schedule_queue_timeout(cmd=queued_cmd)
+            return False
+        self._submit(cmd)
+        return True
 
     def _lock_for_connection(self, connection):
         """
@@ -120,87 +148,179 @@ class CommandScheduler(object):
         """
         ret = dict()
         ret['lock'] = threading.Lock()
-        ret['queue'] = list()
+        ret['queue'] = deque()  # FIFO of commands, commands removed from the middle are skipped when dequeued
+        ret['enqueue_times'] = dict()  # commands really waiting in queue -> time they were put into queue
         ret['current_cmd'] = None
+        ret['max_queue_depth'] = 0
+        ret['queued_commands'] = 0
+        ret['total_wait_time'] = 0.0
+        ret['max_wait_time'] = 0.0
         return ret
 
-    def _wait_for_slot_for_command(self, cmd):
+    def _take_command_from_queue(self, conn_atr, cmd):
         """
-        Waits for free slot for the command.
+        Removes command from queue and updates wait time statistics. Must be called with lock of connection acquired.
+        :param conn_atr: dict of connection.
         :param cmd: Command object.
-        :return: True if command was marked as ready to execute, False if timeout.
+        :return: True if command was waiting in queue, False otherwise.
         """
-        connection = cmd.connection
-        lock = self._lock_for_connection(connection)
-        start_time = time.time()
-        conn_atr = self._locks[connection]
-        while cmd.timeout >= (time.time() - start_time):
-            time.sleep(0.005)
-            with lock:
-                if conn_atr['current_cmd'] is None and len(conn_atr['queue']) >= 1 and cmd == conn_atr['queue'][0]:
-                    conn_atr['queue'].pop(0)
-                    conn_atr['current_cmd'] = cmd
-                    cmd._log(logging.DEBUG,
-                             ">'{}': added  added cmd ('{}') from queue.".format(
-                                 cmd.connection.name, cmd))
-                    return True
-        return False
+        enqueue_time = conn_atr['enqueue_times'].pop(cmd, None)
+        if enqueue_time is None:
+            return False
+        wait_time = time.time() - enqueue_time
+        conn_atr['total_wait_time'] += wait_time
+        conn_atr['max_wait_time'] = max(conn_atr['max_wait_time'], wait_time)
+        return True
+
+    def _next_command_from_queue(self, conn_atr):
+        """
+        Marks first command from queue as current executed. Must be called with lock of connection acquired.
+        :param conn_atr: dict of connection.
+        :return: Command object or None if queue is empty.
+        """
+        queue = conn_atr['queue']
+        while queue:
+            cmd = queue.popleft()
+            if self._take_command_from_queue(conn_atr, cmd):
+                conn_atr['current_cmd'] = cmd
+                return cmd
+        return None
 
     def _remove_command(self, cmd):
         """
-        Removes command object from queue and/or current executed. It is safe to call this method many times for the
-         same command object.
+        Removes command object from queue and/or current executed. If command was current executed then next command
+         from queue is submitted. It is safe to call this method many times for the same command object.
         :param cmd: Command object
         :return: Nothing.
         """
         connection = cmd.connection
         lock = self._lock_for_connection(connection)
         conn_atr = self._locks[connection]
+        next_cmd = None
         with lock:
             if cmd == conn_atr['current_cmd']:
                 conn_atr['current_cmd'] = None
-            try:
-                queue = conn_atr['queue']
-                index = queue.index(cmd)
-                queue.pop(index)
-            except ValueError:  # command object does not exist in the list
-                pass
+                next_cmd = self._next_command_from_queue(conn_atr)
+            else:
+                self._take_command_from_queue(conn_atr, cmd)  # left in deque, skipped when dequeued
+        if next_cmd is not None:
+            next_cmd._log(logging.DEBUG,
+                          ">'{}': added cmd ('{}') from queue.".format(next_cmd.connection.name, next_cmd))
+            self._submit_from_queue(next_cmd)
 
-    def _add_command_to_execute(self, cmd):
+    def _submit_from_queue(self, cmd):
         """
-        Tries to mark command object as current in run mode .
+        Submits command taken from queue in other thread. Previous command is usually removed inside thread of
+         connection which is notifying observers, that thread must not be blocked by start of next command (sending
+         its command string).
         :param cmd: Command object.
-        :return: True if command object was marked as current run, False otherwise.
+        :return: Nothing.
         """
+        executor = getattr(cmd.runner, 'executor', None)
+        if executor is not None:
+            try:
+                executor.submit(self._start_command_from_queue, cmd)
+                return
+            except RuntimeError:  # executor is shut down
+                pass
+        starting_thread = Thread(target=self._start_command_from_queue, args=(cmd,),
+                                 name="CommandScheduler-start")
+        starting_thread.daemon = True
+        starting_thread.start()
+
+    def _start_command_from_queue(self, cmd):
+        try:
+            self._submit(cmd)
+        except Exception as exc:
+            cmd.set_exception(exc)
+
+    def _does_it_wait_in_queue(self, cmd):
         connection = cmd.connection
         lock = self._lock_for_connection(connection)
         conn_atr = self._locks[connection]
         with lock:
-            if conn_atr['current_cmd'] is None:
-                conn_atr['current_cmd'] = cmd
+            if cmd in conn_atr['enqueue_times']:
                 return True
         return False
 
-    def _add_command_to_queue(self, cmd):
+    def _get_queue_statistics(self, connection):
+        lock = self._lock_for_connection(connection)
+        conn_atr = self._locks[connection]
+        with lock:
+            queued_commands = conn_atr['queued_commands']
+            queue_depth = len(conn_atr['enqueue_times'])
+            finished_waiting = queued_commands - queue_depth
+            return {
+                'queue_depth': queue_depth,
+                'max_queue_depth': conn_atr['max_queue_depth'],
+                'queued_commands': queued_commands,
+                'total_wait_time': conn_atr['total_wait_time'],
+                'max_wait_time': conn_atr['max_wait_time'],
+                'avg_wait_time': conn_atr['total_wait_time'] / finished_waiting if finished_waiting else 0.0,
+            }
+
+    def _schedule_queue_timeout(self, cmd):
         """
-        Adds command object to queue fot connection of command.
+        Schedules check of timeout of command waiting in queue. All commands of all connections are checked by one
+         thread.
         :param cmd: Command object.
         :return: Nothing.
         """
-        connection = cmd.connection
-        lock = self._lock_for_connection(connection)
-        conn_atr = self._locks[connection]
-        with lock:
-            conn_atr['queue'].append(cmd)
+        deadline = cmd.start_time + cmd.timeout
+        with self._timeouts_condition:
+            heapq.heappush(self._timeouts, (deadline, next(self._timeouts_sequence), cmd))
+            if self._timeouts_thread is None:
+                self._timeouts_thread = Thread(target=self._queue_timeouts_loop, name="CommandScheduler-timeouts")
+                self._timeouts_thread.daemon = True
+                self._timeouts_thread.start()
+            elif self._timeouts[0][2] is cmd:
+                self._timeouts_condition.notify()  # new nearest deadline
 
-    def _does_it_wait_in_queue(self, cmd):
+    def _queue_timeouts_loop(self):
+        with self._timeouts_condition:
+            while True:
+                now = time.time()
+                expired = list()
+                while self._timeouts and self._timeouts[0][0] <= now:
+                    expired.append(heapq.heappop(self._timeouts)[2])
+                if expired:
+                    self._timeouts_condition.release()
+                    try:
+                        for cmd in expired:
+                            self._check_queue_timeout(cmd)
+                    finally:
+                        self._timeouts_condition.acquire()
+                    continue
+                sleep_time = (self._timeouts[0][0] - now) if self._timeouts else None
+                self._timeouts_condition.wait(timeout=sleep_time)
+
+    def _check_queue_timeout(self, cmd):
+        """
+        Sets CommandTimeout for command that timed out before it left queue.
+        :param cmd: Command object.
+        :return: Nothing.
+        """
         connection = cmd.connection
         lock = self._lock_for_connection(connection)
         conn_atr = self._locks[connection]
+        passed_time = time.time() - cmd.start_time
         with lock:
-            if cmd in conn_atr['queue']:
-                return True
-        return False
+            if cmd not in conn_atr['enqueue_times']:  # already started or removed
+                return
+            if passed_time < cmd.timeout:  # timeout was extended
+                timed_out = False
+            else:
+                timed_out = self._take_command_from_queue(conn_atr, cmd)
+        if not timed_out:
+            self._schedule_queue_timeout(cmd)
+            return
+        # If we are here it means command timeout before it really starts.
+        cmd.set_exception(CommandTimeout(cmd,
+                                         timeout=cmd.timeout,
+                                         kind="scheduler.await_done",
+                                         passed_time=passed_time))
+        cmd.set_end_of_life()
+        self._remove_command(cmd=cmd)
 
     def _submit(self, connection_observer):
         """
@@ -13,6 +13,8 @@ from contextlib import contextmanager
 from moler.helpers import compare_objects
 from moler.exceptions import MolerException
 from moler.exceptions import WrongUsage
+from moler.io.raw import terminal_pool
+from moler.util import metrics
 from . import connections as conn_cfg
 from . import devices as dev_cfg
 from . import loggers as log_cfg
@@ -102,6 +104,7 @@ def load_config(config=None, from_env_var=None, *args, **kwargs):
     # TODO: check schema
     if add_devices_only is False:
         load_logger_from_config(config)
+        load_metrics_from_config(config)
         load_connection_from_config(config)
     load_device_from_config(config=config, add_only=add_devices_only)
 
@@ -116,6 +119,14 @@ def load_connection_from_config(config):
             defaults = config['IO_TYPES']['default_variant']
             for io_type, variant in defaults.items():
                 conn_cfg.set_default_variant(io_type, variant)
+    if 'SANITIZE_TERMINAL_OUTPUT' in config:
+        conn_cfg.set_terminal_output_sanitizing(config['SANITIZE_TERMINAL_OUTPUT'] is True)
+    if 'TERMINAL_POOL' in config:
+        terminal_pool_config = config['TERMINAL_POOL']
+        if terminal_pool_config is True:
+            terminal_pool.enable_terminal_pool()
+        elif isinstance(terminal_pool_config, dict):  # like {'size': 4, 'idle_timeout': 300}
+            terminal_pool.enable_terminal_pool(**terminal_pool_config)
 
 
 def _load_topology(topology):
@@ -138,7 +149,6 @@ def load_device_from_config(config, add_only=False):
     create_at_startup = False
     topology = None
     cloned_devices = dict()
-    cloned_id = 'CLONED_FROM'
 
     from moler.device.device import DeviceFactory
 
@@ -153,34 +163,76 @@ def load_device_from_config(config, add_only=False):
             create_at_startup = config['DEVICES'].pop('CREATE_AT_STARTUP')
 
         topology = config['DEVICES'].pop('LOGICAL_TOPOLOGY', None)
-
-        for device_name in config['DEVICES']:
-            device_def = config['DEVICES'][device_name]
-
-            # check if device name is already used
-            if not _is_device_creation_needed(device_name, device_def):
-                continue
-            if cloned_id in device_def:
-                cloned_devices[device_name] = dict()
-                cloned_devices[device_name]['source'] = device_def[cloned_id]
-                cloned_devices[device_name]['state'] = device_def.get('INITIAL_STATE', None)
-            else:  # create all devices defined directly
-                dev_cfg.define_device(
-                    name=device_name,
-                    device_class=device_def['DEVICE_CLASS'],
-                    connection_desc=device_def.get('CONNECTION_DESC', dev_cfg.default_connection),
-                    connection_hops={'CONNECTION_HOPS': device_def.get('CONNECTION_HOPS', {})},
-                    initial_state=device_def.get('INITIAL_STATE', None),
-                )
+        cloned_devices = _define_devices(devices=config['DEVICES'])
 
     for device_name, device_desc in cloned_devices.items():
         cloned_from = device_desc['source']
         initial_state = device_desc['state']
         DeviceFactory.get_cloned_device(source_device=cloned_from, new_name=device_name, initial_state=initial_state,
                                         establish_connection=False)
-    if create_at_startup is True:
-        DeviceFactory.create_all_devices()
+    summary = _create_devices_at_startup(create_at_startup=create_at_startup)
     _load_topology(topology=topology)
+    _raise_if_devices_creation_failed(summary=summary)
+
+
+def _define_devices(devices):
+    """
+    Defines devices from passed dict, devices cloned from other devices are only collected.
+
+    :param devices: dict where key is device name and value is device definition.
+    :return: dict where key is name of device to clone and value is dict with 'source' and 'state' of clone.
+    """
+    cloned_devices = dict()
+    cloned_id = 'CLONED_FROM'
+    for device_name in devices:
+        device_def = devices[device_name]
+
+        # check if device name is already used
+        if not _is_device_creation_needed(device_name, device_def):
+            continue
+        if cloned_id in device_def:
+            cloned_devices[device_name] = dict()
+            cloned_devices[device_name]['source'] = device_def[cloned_id]
+            cloned_devices[device_name]['state'] = device_def.get('INITIAL_STATE', None)
+        else:  # create all devices defined directly
+            dev_cfg.define_device(
+                name=device_name,
+                device_class=device_def['DEVICE_CLASS'],
+                connection_desc=device_def.get('CONNECTION_DESC', dev_cfg.default_connection),
+                connection_hops={'CONNECTION_HOPS': device_def.get('CONNECTION_HOPS', {})},
+                initial_state=device_def.get('INITIAL_STATE', None),
+            )
+    return cloned_devices
+
+
+def _create_devices_at_startup(create_at_startup):
+    """
+    Creates devices as requested by CREATE_AT_STARTUP.
+
+    :param create_at_startup: True to create devices one by one, dict with parameters of
+     DeviceFactory.create_all_devices() (like {'max_workers': 20, 'max_per_host': 4}) to create them in parallel.
+    :return: summary of creation (see DeviceFactory.create_devices()) or None if devices were not created in parallel.
+    """
+    from moler.device.device import DeviceFactory
+    if create_at_startup is True:
+        return DeviceFactory.create_all_devices()
+    elif isinstance(create_at_startup, dict):
+        return DeviceFactory.create_all_devices(**create_at_startup)
+    return None
+
+
+def _raise_if_devices_creation_failed(summary):
+    """
+    Raises exception if any device from summary of creation was not created.
+
+    :param summary: summary of creation (see DeviceFactory.create_devices()) or None.
+    :return: None
+    """
+    if summary:
+        failures = dict((name, result['error']) for name, result in summary.items() if result['error'] is not None)
+        if failures:
+            errors = ", ".join("'{}': {!r}".format(name, failures[name]) for name in sorted(failures))
+            raise MolerException("Creation of devices at startup failed: {}.".format(errors))
 
 
 def _is_device_creation_needed(name, requested_device_def):
@@ -215,10 +267,28 @@ def load_logger_from_config(config):
             log_cfg.configure_debug_level(level=config['LOGGER']['DEBUG_LEVEL'])
         if 'DATE_FORMAT' in config['LOGGER']:
             log_cfg.set_date_format(config['LOGGER']['DATE_FORMAT'])
+        if 'ASYNC_LOGGING' in config['LOGGER']:
+            _load_async_logging_from_config(config['LOGGER']['ASYNC_LOGGING'])
 
     log_cfg.configure_moler_main_logger()
 
 
+def _load_async_logging_from_config(async_logging):
+    if async_logging is True:
+        log_cfg.configure_async_logging()
+    elif isinstance(async_logging, dict):
+        log_cfg.configure_async_logging(**async_logging)
+
+
+def load_metrics_from_config(config):
+    if 'METRICS' in config:
+        metrics_config = config['METRICS']
+        if metrics_config is True:
+            metrics.enable_metrics()
+        elif isinstance(metrics_config, dict):
+            metrics.enable_metrics(**metrics_config)
+
+
 def reconfigure_logging_path(logging_path):
     """
     Set up new logging path when Moler script is running
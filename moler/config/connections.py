@@ -14,6 +14,7 @@ from moler.exceptions import MolerException
 
 default_variant = {}
 named_connections = {}
+sanitize_terminal_output = False
 
 
 def set_default_variant(io_type, variant):
@@ -41,15 +42,28 @@ def define_connection(name, io_type, **constructor_kwargs):
     named_connections[name] = (io_type, constructor_kwargs)
 
 
+def set_terminal_output_sanitizing(sanitize):
+    """
+    Set if Moler connections of builtin connections remove terminal control sequences (colors, window title)
+    from received data once for all observers (see ObservableConnection.sanitize_terminal_output)
+    """
+    global sanitize_terminal_output
+    sanitize_terminal_output = sanitize
+
+
 def clear():
     """Cleanup configuration related to connections"""
+    global sanitize_terminal_output
     default_variant.clear()
     named_connections.clear()
+    sanitize_terminal_output = False
 
 
 def set_defaults():
     """Set defaults for connections configuration"""
     set_default_variant(io_type="terminal", variant="threaded")
+    set_default_variant(io_type="subprocess", variant="threaded")
+    set_default_variant(io_type="replay", variant="threaded")
 
 
 def _running_python_3_5_or_above():
@@ -81,17 +95,24 @@ def register_builtin_connections(connection_factory, moler_conn_class):
 
 
 def mlr_conn_no_encoding(moler_conn_class, name):
-    return moler_conn_class(name=name)
+    return _configure_sanitizing(moler_conn_class(name=name))
 
 
 def mlr_conn_utf8(moler_conn_class, name):
-    return moler_conn_class(encoder=lambda data: data.encode("utf-8"),
-                            decoder=lambda data: data.decode("utf-8"),
-                            name=name)
+    return _configure_sanitizing(moler_conn_class(encoder=lambda data: data.encode("utf-8"),
+                                                  decoder=lambda data: data.decode("utf-8"),
+                                                  name=name))
+
+
+def _configure_sanitizing(mlr_conn):
+    if sanitize_terminal_output:
+        mlr_conn.sanitize_terminal_output = True
+    return mlr_conn
 
 
 def _register_builtin_connections(connection_factory, moler_conn_class):
     from moler.io.raw.memory import ThreadedFifoBuffer
+    from moler.io.raw.replay import ThreadedReplay
     from moler.io.raw.tcp import ThreadedTcp
 
     def mem_thd_conn(name=None, echo=True, **kwargs):  # kwargs to pass  logger_name
@@ -106,6 +127,12 @@ def _register_builtin_connections(connection_factory, moler_conn_class):
                               port=port, host=host, **kwargs)  # TODO: add name
         return io_conn
 
+    def replay_thd_conn(raw_log_path, name=None, **kwargs):  # kwargs to pass trace_log_path, speed, wait_for_sent ...
+        # ThreadedReplay decodes recorded data so moler_connection must do no encoding
+        mlr_conn = mlr_conn_no_encoding(moler_conn_class, name=name)
+        io_conn = ThreadedReplay(moler_connection=mlr_conn, raw_log_path=raw_log_path, **kwargs)
+        return io_conn
+
     # TODO: unify passing logger to io_conn (logger/logger_name - see above comments)
     connection_factory.register_construction(io_type="memory",
                                              variant="threaded",
@@ -113,10 +140,14 @@ def _register_builtin_connections(connection_factory, moler_conn_class):
     connection_factory.register_construction(io_type="tcp",
                                              variant="threaded",
                                              constructor=tcp_thd_conn)
+    connection_factory.register_construction(io_type="replay",
+                                             variant="threaded",
+                                             constructor=replay_thd_conn)
 
 
 def _register_python3_builtin_connections(connection_factory, moler_conn_class):
     from moler.io.asyncio.tcp import AsyncioTcp, AsyncioInThreadTcp
+    from moler.io.raw.reactor import ReactorTcp
 
     def tcp_asyncio_conn(port, host='localhost', name=None, **kwargs):  # kwargs to pass  receive_buffer_size and logger
         mlr_conn = mlr_conn_utf8(moler_conn_class, name=name)
@@ -130,6 +161,12 @@ def _register_python3_builtin_connections(connection_factory, moler_conn_class):
                                      port=port, host=host, **kwargs)  # TODO: add name
         return io_conn
 
+    def tcp_reactor_conn(port, host='localhost', name=None, **kwargs):  # kwargs to pass  receive_buffer_size and logger
+        mlr_conn = mlr_conn_utf8(moler_conn_class, name=name)
+        io_conn = ReactorTcp(moler_connection=mlr_conn,
+                             port=port, host=host, **kwargs)  # TODO: add name
+        return io_conn
+
     # TODO: unify passing logger to io_conn (logger/logger_name - see above comments)
     connection_factory.register_construction(io_type="tcp",
                                              variant="asyncio",
@@ -137,25 +174,49 @@ def _register_python3_builtin_connections(connection_factory, moler_conn_class):
     connection_factory.register_construction(io_type="tcp",
                                              variant="asyncio-in-thread",
                                              constructor=tcp_asyncio_in_thrd_conn)
+    connection_factory.register_construction(io_type="tcp",
+                                             variant="reactor",
+                                             constructor=tcp_reactor_conn)
 
 
 def _register_builtin_unix_connections(connection_factory, moler_conn_class):
+    from moler.io.raw import terminal_pool
     from moler.io.raw.terminal import ThreadedTerminal
+    from moler.io.raw.subprocess import ThreadedSubprocess
 
-    def terminal_thd_conn(name=None):
+    def new_terminal_thd_conn(name=None):
         # ThreadedTerminal works on unicode so moler_connection must do no encoding
         mlr_conn = mlr_conn_no_encoding(moler_conn_class, name=name)
         io_conn = ThreadedTerminal(moler_connection=mlr_conn)  # TODO: add name, logger
         return io_conn
 
+    def terminal_thd_conn(name=None):
+        io_conn = terminal_pool.get_terminal(name=name)  # pre-warmed one if pool is enabled
+        if io_conn is None:
+            io_conn = new_terminal_thd_conn(name=name)
+        return io_conn
+
+    terminal_pool.set_terminal_factory(new_terminal_thd_conn)
+
+    def subprocess_thd_conn(name=None, **kwargs):  # kwargs to pass command, cwd, env, prompt ...
+        # ThreadedSubprocess decodes process output so moler_connection must do no encoding
+        mlr_conn = mlr_conn_no_encoding(moler_conn_class, name=name)
+        io_conn = ThreadedSubprocess(moler_connection=mlr_conn, **kwargs)
+        return io_conn
+
     # TODO: unify passing logger to io_conn (logger/logger_name)
     connection_factory.register_construction(io_type="terminal",
                                              variant="threaded",
                                              constructor=terminal_thd_conn)
+    connection_factory.register_construction(io_type="subprocess",
+                                             variant="threaded",
+                                             constructor=subprocess_thd_conn)
 
 
 def _register_builtin_py3_unix_connections(connection_factory, moler_conn_class):
     from moler.io.asyncio.terminal import AsyncioTerminal, AsyncioInThreadTerminal
+    from moler.io.raw.reactor import ReactorTerminal
+    from moler.io.asyncio.subprocess import AsyncioSubprocess, AsyncioInThreadSubprocess
 
     def terminal_asyncio_conn(name=None):
         mlr_conn = mlr_conn_utf8(moler_conn_class, name=name)
@@ -167,6 +228,22 @@ def _register_builtin_py3_unix_connections(connection_factory, moler_conn_class)
         io_conn = AsyncioInThreadTerminal(moler_connection=mlr_conn)  # TODO: add name, logger
         return io_conn
 
+    def terminal_reactor_conn(name=None):
+        # ReactorTerminal works on unicode so moler_connection must do no encoding
+        mlr_conn = mlr_conn_no_encoding(moler_conn_class, name=name)
+        io_conn = ReactorTerminal(moler_connection=mlr_conn)  # TODO: add name, logger
+        return io_conn
+
+    def subprocess_asyncio_conn(name=None, **kwargs):
+        mlr_conn = mlr_conn_no_encoding(moler_conn_class, name=name)
+        io_conn = AsyncioSubprocess(moler_connection=mlr_conn, **kwargs)
+        return io_conn
+
+    def subprocess_asyncio_in_thrd_conn(name=None, **kwargs):
+        mlr_conn = mlr_conn_no_encoding(moler_conn_class, name=name)
+        io_conn = AsyncioInThreadSubprocess(moler_connection=mlr_conn, **kwargs)
+        return io_conn
+
     # TODO: unify passing logger to io_conn (logger/logger_name)
     connection_factory.register_construction(io_type="terminal",
                                              variant="asyncio",
@@ -174,3 +251,12 @@ def _register_builtin_py3_unix_connections(connection_factory, moler_conn_class)
     connection_factory.register_construction(io_type="terminal",
                                              variant="asyncio-in-thread",
                                              constructor=terminal_asyncio_in_thrd_conn)
+    connection_factory.register_construction(io_type="terminal",
+                                             variant="reactor",
+                                             constructor=terminal_reactor_conn)
+    connection_factory.register_construction(io_type="subprocess",
+                                             variant="asyncio",
+                                             constructor=subprocess_asyncio_conn)
+    connection_factory.register_construction(io_type="subprocess",
+                                             variant="asyncio-in-thread",
+                                             constructor=subprocess_asyncio_in_thrd_conn)
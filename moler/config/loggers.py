@@ -7,14 +7,18 @@ __author__ = 'Grzegorz Latuszek, Marcin Usielski, Michal Ernst'
 __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.ernst@nokia.com'
 
+import atexit
 import codecs
 import logging
 import os
 import sys
 import copy
 import re
+import threading
+import time
 import pkg_resources
 import platform
+from six.moves.queue import Queue, Empty, Full
 
 _logging_path = os.getcwd()  # Logging path that is used as a prefix for log file paths
 active_loggers = set()  # Active loggers created by Moler
@@ -29,6 +33,8 @@ TEST_CASE = 45
 debug_level = None  # means: inactive
 raw_logs_active = False
 write_mode = "a"
+async_logging_active = False  # connection logs written by background thread, see configure_async_logging()
+async_log_writer = None
 
 moler_logo = """
                         %%%%%%%%%%%%%%%%%%%%%
@@ -141,6 +147,43 @@ def want_raw_logs():
     return raw_logs_active
 
 
+def configure_async_logging(queue_size=10000, drop_when_full=False, flush_interval=0.5, flush_size=1000):
+    """
+    Activate asynchronous writing of connection logs (of loggers configured after this call).
+    Log records are passed via queue to single writer thread that writes them in batches and flushes files
+    every flush_interval or after flush_size records.
+
+    :param queue_size: max number of records waiting for writer, 0 means unbounded queue (set only by first call)
+    :param drop_when_full: if True records are dropped when queue is full, if False logging call blocks till
+     writer makes room in queue
+    :param flush_interval: max time [sec] between writing and flushing record to file
+    :param flush_size: max number of records written without flushing files
+    :return: None
+    """
+    global async_logging_active
+    global async_log_writer
+    if async_log_writer is None:
+        async_log_writer = AsyncLogWriter(queue_size=queue_size, drop_when_full=drop_when_full,
+                                          flush_interval=flush_interval, flush_size=flush_size)
+    else:  # handlers of already configured loggers keep using the same writer (and its queue)
+        async_log_writer.drop_when_full = drop_when_full
+        async_log_writer.flush_interval = flush_interval
+        async_log_writer.flush_size = flush_size
+    async_logging_active = True
+
+
+def get_async_logging_statistics():
+    """
+    Returns statistics of asynchronous logging to check if logging keeps up with data.
+
+    :return: dict with numbers of 'queued', 'written', 'dropped' and 'blocked' (waiting for room in queue) records
+     and 'max_queue_depth' or None if asynchronous logging is not active
+    """
+    if async_log_writer is None:
+        return None
+    return async_log_writer.get_statistics()
+
+
 def reconfigure_logging_path(log_path):
     """
     Set up new logging path when Moler script is running
@@ -159,6 +202,8 @@ def _reopen_all_logfiles_in_new_path(old_logging_path, new_logging_path):
         logger_handlers = copy.copy(logger.handlers)
 
         for handler in logger_handlers:
+            if isinstance(handler, QueueingHandler):
+                handler = handler.target
             if isinstance(handler, logging.FileHandler):
                 handler.close()
                 handler.baseFilename = handler.baseFilename.replace(old_logging_path, new_logging_path)
@@ -177,7 +222,7 @@ def debug_level_or_info_level():
     return level
 
 
-def setup_new_file_handler(logger_name, log_level, log_filename, formatter, filter=None):
+def setup_new_file_handler(logger_name, log_level, log_filename, formatter, filter=None, asynchronous=False):
     """
     Sets up new file handler for given logger
     :param logger_name: name of logger to which filelogger is added
@@ -185,6 +230,7 @@ def setup_new_file_handler(logger_name, log_level, log_filename, formatter, filt
     :param log_filename: path to log file
     :param formatter: formatter for file logger
     :param filter: filter for file logger
+    :param asynchronous: if True file is written by writer thread of asynchronous logging
     :return:  logging.FileHandler object
     """
     global write_mode
@@ -194,12 +240,18 @@ def setup_new_file_handler(logger_name, log_level, log_filename, formatter, filt
     cfh.setFormatter(formatter)
     if filter:
         cfh.addFilter(filter)
-    logger.addHandler(cfh)
+    _add_handler(logger, cfh, asynchronous)
     return cfh
 
 
+def _add_handler(logger, handler, asynchronous):
+    if asynchronous and async_log_writer is not None:
+        handler = QueueingHandler(target=handler, writer=async_log_writer)
+    logger.addHandler(handler)
+
+
 def _add_new_file_handler(logger_name,
-                          log_file, formatter, log_level=TRACE, filter=None):
+                          log_file, formatter, log_level=TRACE, filter=None, asynchronous=False):
     """
     Add file writer into Logger
     :param logger_name: Logger name
@@ -207,6 +259,7 @@ def _add_new_file_handler(logger_name,
     :param log_level: only log records with equal and greater level will be accepted for storage in log
     :param formatter: formatter for file logger
     :param filter: filter for file logger
+    :param asynchronous: if True file is written by writer thread of asynchronous logging
     :return: None
     """
 
@@ -217,7 +270,8 @@ def _add_new_file_handler(logger_name,
                            log_level=log_level,
                            log_filename=logfile_full_path,
                            formatter=formatter,
-                           filter=filter)
+                           filter=filter,
+                           asynchronous=asynchronous)
 
 
 def _add_raw_file_handler(logger_name, log_file):
@@ -232,7 +286,7 @@ def _add_raw_file_handler(logger_name, log_file):
     _prepare_logs_folder(logfile_full_path)
     logger = logging.getLogger(logger_name)
     rfh = RawFileHandler(filename=logfile_full_path, mode='{}b'.format(write_mode))
-    logger.addHandler(rfh)
+    _add_handler(logger, rfh, asynchronous=async_logging_active)
 
 
 def _add_raw_trace_file_handler(logger_name, log_file):
@@ -250,7 +304,7 @@ def _add_raw_trace_file_handler(logger_name, log_file):
     # exchange Formatter
     raw_trace_formatter = RawTraceFormatter()
     trace_rfh.setFormatter(raw_trace_formatter)
-    logger.addHandler(trace_rfh)
+    _add_handler(logger, trace_rfh, asynchronous=async_logging_active)
 
 
 def create_logger(name,
@@ -336,7 +390,8 @@ def configure_device_logger(connection_name, propagate=False):
         _add_new_file_handler(logger_name=logger_name,
                               log_file='{}.log'.format(logger_name),
                               log_level=logging.INFO,
-                              formatter=conn_formatter)
+                              formatter=conn_formatter,
+                              asynchronous=async_logging_active)
         if want_raw_logs():
             # RAW_LOGS is lowest log-level so we need to change log-level of logger
             # to make it pass data into raw-log-handler
@@ -456,16 +511,206 @@ class RawFileHandler(logging.FileHandler):
         stream.write(self.terminator)
         We are not adding any \n to bytes-message from record.
         """
-        if self.stream is None:
-            self.stream = self._open()
         try:
-            msg = self.format(record)
-            stream = self.stream
-            stream.write(msg)
+            self.write_record(record)
             self.flush()
         except Exception:
             self.handleError(record)
 
+    def write_record(self, record):
+        """Write record without flushing stream."""
+        if self.stream is None:
+            self.stream = self._open()
+        msg = self.format(record)
+        self.stream.write(msg)
+
+
+def _write_record(handler, record):
+    """Write record via stream of handler without flushing it."""
+    if hasattr(handler, "write_record"):
+        handler.write_record(record)
+        return
+    if handler.stream is None:
+        handler.stream = handler._open()
+    msg = handler.format(record)
+    handler.stream.write(msg + handler.terminator)
+
+
+class QueueingHandler(logging.Handler):
+    """
+    Passes records accepted by target handler to AsyncLogWriter that writes them in its own thread.
+    """
+
+    def __init__(self, target, writer):
+        super(QueueingHandler, self).__init__(level=target.level)
+        self.target = target
+        self.writer = writer
+
+    def handle(self, record):
+        # level and filters of target are checked here to not put into queue records that target would reject
+        if record.levelno < self.target.level or not self.target.filter(record):
+            return False
+        self.emit(record)
+        return True
+
+    def emit(self, record):
+        self.writer.put(self.target, self.prepare(record))
+
+    def prepare(self, record):
+        """
+        Prepares record for queue like logging.handlers.QueueHandler.prepare(): message is merged with its args and
+        exception info in logging thread, so writer thread doesn't format objects that may change in meantime.
+        Record is copied since formatters of other handlers may modify it. Raw data (bytes) is not formatted.
+        """
+        record = copy.copy(record)
+        if isinstance(record.msg, (bytes, bytearray)):
+            return record
+        record.msg = self.format(record)
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.flush()
+        self.target.close()
+        super(QueueingHandler, self).close()
+
+    @property
+    def baseFilename(self):
+        return self.target.baseFilename
+
+
+class AsyncLogWriter(object):
+    """
+    Writes log records in single background thread: records are written in batches and files are flushed
+    every flush_interval or after flush_size records, not after each record.
+    """
+
+    def __init__(self, queue_size=10000, drop_when_full=False, flush_interval=0.5, flush_size=1000):
+        self.drop_when_full = drop_when_full
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._queue = Queue(maxsize=queue_size)
+        self._statistics_lock = threading.Lock()
+        self._queued = 0
+        self._written = 0
+        self._dropped = 0
+        self._blocked = 0
+        self._max_queue_depth = 0
+        self._stop_record = object()
+        self._flush_request = object()
+        self._flush_done = threading.Condition()
+        self._flushes_nb = 0
+        self._thread = threading.Thread(target=self._write_loop, name="MolerLogWriter")
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def put(self, handler, record):
+        """
+        Put record into queue of writer. Called from logging thread.
+
+        :param handler: handler that will write record
+        :param record: log record
+        :return: None
+        """
+        try:
+            self._queue.put_nowait((handler, record))
+        except Full:
+            if self.drop_when_full:
+                with self._statistics_lock:
+                    self._dropped += 1
+                return
+            with self._statistics_lock:
+                self._blocked += 1
+            self._queue.put((handler, record))
+        with self._statistics_lock:
+            self._queued += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+
+    def flush(self, timeout=5.0):
+        """
+        Wait till all records queued so far are written and flushed.
+
+        :param timeout: max time [sec] to wait
+        :return: None
+        """
+        if not self._thread.is_alive() or threading.current_thread() is self._thread:
+            return
+        end_time = time.time() + timeout
+        with self._flush_done:
+            flushes_nb = self._flushes_nb
+            self._queue.put((None, self._flush_request))
+            while self._flushes_nb == flushes_nb:
+                remaining_time = end_time - time.time()
+                if remaining_time <= 0:
+                    break
+                self._flush_done.wait(timeout=remaining_time)
+
+    def stop(self):
+        """Write all queued records and stop writer thread."""
+        if self._thread.is_alive():
+            self._queue.put((None, self._stop_record))
+            self._thread.join(timeout=5.0)
+
+    def get_statistics(self):
+        with self._statistics_lock:
+            return {
+                'queued': self._queued,
+                'written': self._written,
+                'dropped': self._dropped,
+                'blocked': self._blocked,
+                'max_queue_depth': self._max_queue_depth,
+            }
+
+    def _write_loop(self):
+        dirty_handlers = set()
+        not_flushed_nb = 0
+        last_flush_time = time.time()
+        while True:
+            try:
+                handler, record = self._queue.get(timeout=self.flush_interval)
+            except Empty:
+                handler, record = None, None
+            if record is self._stop_record:
+                self._flush_handlers(dirty_handlers)
+                return
+            if handler is not None:
+                self._write(handler, record)
+                dirty_handlers.add(handler)
+                not_flushed_nb += 1
+            flush_requested = record is self._flush_request
+            if flush_requested or (not_flushed_nb >= self.flush_size) or \
+                    (time.time() - last_flush_time >= self.flush_interval):
+                self._flush_handlers(dirty_handlers)
+                not_flushed_nb = 0
+                last_flush_time = time.time()
+            if flush_requested:
+                with self._flush_done:
+                    self._flushes_nb += 1
+                    self._flush_done.notify_all()
+
+    def _write(self, handler, record):
+        handler.acquire()
+        try:
+            _write_record(handler, record)
+        except Exception:
+            handler.handleError(record)
+        finally:
+            handler.release()
+        with self._statistics_lock:
+            self._written += 1
+
+    @staticmethod
+    def _flush_handlers(handlers):
+        for handler in handlers:
+            handler.flush()
+        handlers.clear()
+
 
 class MultilineWithDirectionFormatter(logging.Formatter):
     """
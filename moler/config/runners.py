@@ -32,17 +32,24 @@ def register_builtin_runners(runner_factory):
 
 def _register_builtin_runners(runner_factory):
     from moler.runner import ThreadPoolExecutorRunner
+    from moler.runner_single_thread import RunnerSingleThread
 
     def thd_runner(executor=None):
         runner = ThreadPoolExecutorRunner(executor=executor)
         return runner
 
+    def single_thd_runner():
+        runner = RunnerSingleThread()
+        return runner
+
     runner_factory.register_construction(variant="threaded", constructor=thd_runner)
+    runner_factory.register_construction(variant="single-thread", constructor=single_thd_runner)
 
 
 def _register_python3_builtin_runners(runner_factory):
     from moler.asyncio_runner import AsyncioRunner
     from moler.asyncio_runner import AsyncioInThreadRunner
+    from moler.asyncio_runner import AsyncioSharedLoopRunner
 
     def asyncio_runner():
         runner = AsyncioRunner()
@@ -52,5 +59,10 @@ def _register_python3_builtin_runners(runner_factory):
         runner = AsyncioInThreadRunner()
         return runner
 
+    def asyncio_shared_loop_runner():
+        runner = AsyncioSharedLoopRunner()
+        return runner
+
     runner_factory.register_construction(variant="asyncio", constructor=asyncio_runner)
     runner_factory.register_construction(variant="asyncio-in-thread", constructor=asyncio_thd_runner)
+    runner_factory.register_construction(variant="asyncio-shared-loop", constructor=asyncio_shared_loop_runner)
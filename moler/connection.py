@@ -21,7 +21,8 @@ import six
 from moler.config.loggers import RAW_DATA, TRACE
 from moler.exceptions import WrongUsage
 from moler.helpers import instance_id
-from moler.util.loghelper import log_into_logger
+from moler.util import metrics
+from moler.util.loghelper import log_into_logger, is_logging_enabled
 
 
 def identity_transformation(data):
@@ -144,6 +145,7 @@ class Connection(object):
                        extra={'transfer_direction': '>', 'encoder': lambda data: data.encode('utf-8')})
 
         encoded_data = self.encode(data)
+        metrics.connection_data_sent(self.name, encoded_data)
         self.how2send(encoded_data)
 
     def change_newline_seq(self, newline_seq="\n"):
@@ -205,12 +207,23 @@ class Connection(object):
 
     def _log_data(self, msg, level, extra=None):
         try:
-            self.data_logger.log(level, msg, extra=extra)
+            if self.data_logger.isEnabledFor(level):
+                self.data_logger.log(level, msg, extra=extra)
         except Exception as err:
             print(err)  # logging errors should not propagate
 
+    def _is_log_enabled(self, level):
+        """Check if record of level would be logged by _log() - to not build messages that would be dropped."""
+        return is_logging_enabled(level, self.logger)
+
     def _log(self, level, msg, extra=None, levels_to_go_up=1):
-        if self.logger:
+        """
+        Log into logger of connection.
+
+        :param level: logging level
+        :param msg: message or callable returning message (called only if level is enabled)
+        """
+        if self._is_log_enabled(level):
             extra_params = {
                 'log_name': self.name
             }
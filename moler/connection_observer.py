@@ -23,7 +23,7 @@ from moler.helpers import camel_case_to_lower_case_underscore
 from moler.helpers import instance_id
 from moler.helpers import copy_list
 from moler.util.connection_observer import exception_stored_if_not_main_thread
-from moler.util.loghelper import log_into_logger
+from moler.util.loghelper import log_into_logger, is_logging_enabled
 from moler.runner_factory import get_runner
 from moler.command_scheduler import CommandScheduler
 
@@ -59,6 +59,8 @@ class ConnectionObserver(object):
         #                              during normal timeout. For Runners only!
         self.was_on_timeout_called = False  # Set True if method on_timeout was called. False otherwise. For Runners
         #                                     only!
+        self._done_callbacks = list()  # callables to call (with self as parameter) when observer becomes done
+        self._done_callbacks_lock = threading.Lock()
 
     def __str__(self):
         return '{}(id:{})'.format(self.__class__.__name__, instance_id(self))
@@ -101,6 +103,7 @@ class ConnectionObserver(object):
         self.__is_done = value
         if value:
             CommandScheduler.dequeue_running_on_connection(connection_observer=self)
+            self._call_done_callbacks()
 
     @property
     def timeout(self):
@@ -109,9 +112,13 @@ class ConnectionObserver(object):
     @timeout.setter
     def timeout(self, value):
         # levels_to_go_up=2 : extract caller info to log where .timeout=XXX has been called from
-        self._log(logging.DEBUG, "Setting {} timeout to {} [sec]".format(ConnectionObserver.__base_str(self), value),
+        self._log(logging.DEBUG,
+                  lambda: "Setting {} timeout to {} [sec]".format(ConnectionObserver.__base_str(self), value),
                   levels_to_go_up=2)
+        prev_timeout = self.__timeout
         self.__timeout = value
+        if self.start_time > 0.0:  # lifetime (and timeout clock) of observer has already started
+            self.runner.timeout_change(value - prev_timeout)
 
     def get_logger_name(self):
         if self.connection and hasattr(self.connection, "name"):
@@ -232,6 +239,46 @@ class ConnectionObserver(object):
         """
         self._is_done = True
 
+    def add_done_callback(self, callback):
+        """
+        Attach callable to be called when connection-observer becomes done (result, exception, cancel, timeout).
+
+        Callback is called with connection-observer as its only parameter. It is called from thread
+        that has made observer done, so it should be quick and must not block.
+        If observer is already done then callback is called immediately.
+
+        :param callback: callable taking connection-observer as parameter
+        :return: None
+        """
+        with self._done_callbacks_lock:
+            if not self.__is_done:
+                self._done_callbacks.append(callback)
+                return
+        callback(self)
+
+    def remove_done_callback(self, callback):
+        """
+        Detach callable previously attached by add_done_callback().
+
+        :param callback: callable to remove
+        :return: True if callback was removed, False if it was not attached
+        """
+        with self._done_callbacks_lock:
+            if callback in self._done_callbacks:
+                self._done_callbacks.remove(callback)
+                return True
+        return False
+
+    def _call_done_callbacks(self):
+        with self._done_callbacks_lock:
+            callbacks = self._done_callbacks
+            self._done_callbacks = list()
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as exc:
+                self._log(logging.WARNING, "Exception inside done callback {}: {!r}".format(callback, exc))
+
     def cancelled(self):
         """Return True if the connection-observer has been cancelled."""
         return self._is_cancelled
@@ -327,11 +374,25 @@ class ConnectionObserver(object):
         """
         return False
 
+    def is_line_oriented(self):
+        """
+        :return: True if instance of ConnectionObserver may be fed with data already split into lines by connection
+         (via lines_received()). False if it requires raw data (via data_received()).
+        """
+        return False
+
+    def get_required_keywords(self):
+        """
+        :return: collection of strings of which at least one must be present in line to make instance of
+         ConnectionObserver react on that line, None if it needs all lines. Used by connection to skip lines
+         (fed via lines_received()) not interesting for observer.
+        """
+        return None
+
     def extend_timeout(self, timedelta):  # TODO: probably API to remove since we have runner tracking .timeout=XXX
         prev_timeout = self.timeout
-        self.timeout = self.timeout + timedelta
+        self.timeout = self.timeout + timedelta  # runner is notified about change by .timeout setter
         msg = "Extended timeout from %.2f with delta %.2f to %.2f" % (prev_timeout, timedelta, self.timeout)
-        self.runner.timeout_change(timedelta)
         self._log(logging.INFO, msg)
 
     @ClassProperty
@@ -357,7 +418,7 @@ class ConnectionObserver(object):
             ConnectionObserver._log_unraised_exceptions(observer)
             if old_exception:
                 observer._log(logging.DEBUG,
-                              "{} has overwritten exception. From {!r} to {!r}".format(
+                              lambda: "{} has overwritten exception. From {!r} to {!r}".format(
                                   observer,
                                   old_exception,
                                   new_exception,
@@ -366,7 +427,7 @@ class ConnectionObserver(object):
                     ConnectionObserver._not_raised_exceptions.remove(old_exception)
                 else:
                     observer._log(logging.DEBUG,
-                                  "{}: cannot find exception {!r} in _not_raised_exceptions.".format(
+                                  lambda: "{}: cannot find exception {!r} in _not_raised_exceptions.".format(
                                       observer,
                                       old_exception,
                                   ))
@@ -377,6 +438,8 @@ class ConnectionObserver(object):
 
     @staticmethod
     def _log_unraised_exceptions(observer):
+        if not observer._is_log_enabled(logging.DEBUG):
+            return
         for i, item in enumerate(ConnectionObserver._not_raised_exceptions):
             observer._log(logging.DEBUG, "{:4d} NOT RAISED: {!r}".format(i + 1, item), levels_to_go_up=2)
 
@@ -386,7 +449,21 @@ class ConnectionObserver(object):
     def get_short_desc(self):
         return "Observer '{}.{}'".format(self.__class__.__module__, self)
 
+    def _is_log_enabled(self, lvl):
+        """Check if record of lvl would be logged by _log() - to not build messages that would be dropped."""
+        return is_logging_enabled(lvl, self.logger, self.device_logger)
+
     def _log(self, lvl, msg, extra=None, levels_to_go_up=1):
+        """
+        Log into logger of observer and logger of device.
+
+        :param lvl: logging level
+        :param msg: message or callable returning message (called only if lvl is enabled)
+        """
+        if not self._is_log_enabled(lvl):
+            return
+        if callable(msg):
+            msg = msg()  # once for both loggers
         extra_params = {
             'log_name': self.get_logger_name()
         }
@@ -12,13 +12,17 @@ from moler.helpers import copy_list
 from moler.exceptions import WrongUsage
 from moler.helpers import copy_dict
 from moler.helpers import compare_objects
+from concurrent.futures import ThreadPoolExecutor
 import six
 import functools
+import logging
 import threading
+import time
 
 
 class DeviceFactory(object):
-    _lock_device = threading.Lock()
+    _lock_device = threading.Lock()  # guards data of factory, not held while connecting/changing state of device
+    _devices_locks = {}  # key is public_name, value is lock held while device of that name is created/connected
 
     _devices = {}
     _devices_params = {}
@@ -27,15 +31,63 @@ class DeviceFactory(object):
     _already_used_names = set()
 
     @classmethod
-    def create_all_devices(cls):
+    def create_all_devices(cls, max_workers=1, max_per_host=None):
         """
         Creates all devices from config.
 
-        :return: None
+        :param max_workers: number of devices created in parallel, 1 to create them one by one.
+        :param max_per_host: max number of devices connecting in parallel via the same host (first hop of device).
+        :return: None if devices are created one by one, summary of creation (see create_devices()) otherwise.
         """
+        if max_workers > 1:
+            return cls.create_devices(names=list(devices_config.named_devices), max_workers=max_workers,
+                                      max_per_host=max_per_host)
         for device_name in devices_config.named_devices:
             cls.get_device(name=device_name)
 
+    @classmethod
+    def create_devices(cls, names, max_workers=10, max_per_host=None, establish_connection=True):
+        """
+        Creates (and connects) devices from config in parallel. Failure of one device doesn't stop creation of others.
+
+        :param names: names of devices defined in configuration.
+        :param max_workers: max number of devices created at the same time.
+        :param max_per_host: max number of devices connecting at the same time via the same host (host of first
+         hop from UNIX_LOCAL, like proxy pc), None for no limit.
+        :param establish_connection: True to open connection, False if it does not matter.
+        :return: dict {device name: {'time': bring-up time in seconds, 'error': exception or None}}
+        """
+        hosts_semaphores = dict()
+        if max_per_host:
+            for name in names:
+                host = cls._first_hop_host(name)
+                if host is not None and host not in hosts_semaphores:
+                    hosts_semaphores[host] = threading.BoundedSemaphore(max_per_host)
+
+        def create_device(name):
+            host_semaphore = hosts_semaphores.get(cls._first_hop_host(name)) if max_per_host else None
+            if host_semaphore is not None:
+                host_semaphore.acquire()
+            start_time = time.time()
+            error = None
+            try:
+                cls.get_device(name=name, establish_connection=establish_connection)
+            except Exception as err:
+                error = err
+                logging.getLogger('moler').warning("Creation of device '{}' failed: {!r}".format(name, err))
+            finally:
+                if host_semaphore is not None:
+                    host_semaphore.release()
+            return {'time': time.time() - start_time, 'error': error}
+
+        executor = ThreadPoolExecutor(max_workers=max(min(max_workers, len(names)), 1))
+        try:
+            futures = [(name, executor.submit(create_device, name)) for name in names]
+            summary = dict((name, future.result()) for name, future in futures)
+        finally:
+            executor.shutdown(wait=True)
+        return summary
+
     @classmethod
     def remove_all_devices(cls):
         """
@@ -43,8 +95,8 @@ class DeviceFactory(object):
 
         :return: None
         """
-        for device in cls._devices.keys():
-            cls._devices[device].remove()
+        for device in list(cls._devices.values()):  # removed device is forgotten by factory
+            device.remove()
 
     @classmethod
     def get_device(cls, name=None, device_class=None, connection_desc=None, connection_hops=None, initial_state=None,
@@ -64,7 +116,7 @@ class DeviceFactory(object):
             raise WrongUsage("Provide either 'name' or 'device_class' parameter (none given)")
         if name and device_class:
             raise WrongUsage("Use either 'name' or 'device_class' parameter (not both)")
-        with cls._lock_device:
+        with cls._get_device_lock(name):
             dev = cls._get_device_without_lock(name=name, device_class=device_class, connection_desc=connection_desc,
                                                connection_hops=connection_hops, initial_state=initial_state,
                                                establish_connection=establish_connection)
@@ -93,33 +145,47 @@ class DeviceFactory(object):
         :param establish_connection: True to open connection, False if it does not matter.
         :return: Device object.
         """
+        if isinstance(source_device, six.string_types):
+            source_device = cls.get_device(name=source_device)
+        # Locks of both devices are taken always in the same (sorted by name) order, so clones made at the same time
+        # in opposite directions (A from B and B from A) don't deadlock.
+        locks = [cls._get_device_lock(name) for name in sorted({source_device.public_name, new_name})]
+        for lock in locks:
+            lock.acquire()
+        try:
+            dev = cls._get_cloned_device_without_lock(source_device=source_device, new_name=new_name,
+                                                      initial_state=initial_state,
+                                                      establish_connection=establish_connection)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        return dev
+
+    @classmethod
+    def _get_cloned_device_without_lock(cls, source_device, new_name, initial_state, establish_connection):
+        source_name = source_device.name  # name already translated to alias.
         with cls._lock_device:
-            if isinstance(source_device, six.string_types):
-                source_device = cls._get_device_without_lock(name=source_device, device_class=None,
-                                                             connection_desc=None, connection_hops=None,
-                                                             initial_state=None, establish_connection=True)
-            source_name = source_device.name  # name already translated to alias.
             if new_name in cls._devices.keys():
                 cached_cloned_from = cls._devices_params[new_name]['cloned_from']
                 if cached_cloned_from == source_name:
                     return cls._devices[new_name]
                 else:
-                    msg = "Attempt to create device '{}' as clone of '{}' but device with such name already created " \
-                          "as clone of '{}'.".format(new_name, source_name, cached_cloned_from)
+                    msg = "Attempt to create device '{}' as clone of '{}' but device with such name already " \
+                          "created as clone of '{}'.".format(new_name, source_name, cached_cloned_from)
                     raise WrongUsage(msg)
-            if initial_state is None:
-                initial_state = source_device.current_state
-
             device_class = cls._devices_params[source_name]['class_fullname']
-            constructor_parameters = cls._devices_params[source_name]['constructor_parameters']
-            constructor_parameters["initial_state"] = initial_state
-            if constructor_parameters["name"]:
-                constructor_parameters["name"] = new_name
-            dev = cls._create_instance_and_remember_it(
-                device_class=device_class, constructor_parameters=constructor_parameters,
-                establish_connection=establish_connection, name=new_name)
-            new_name = dev.name
-            cls._devices_params[new_name]['cloned_from'] = source_name
+            constructor_parameters = copy_dict(cls._devices_params[source_name]['constructor_parameters'])
+        if initial_state is None:
+            initial_state = source_device.current_state
+
+        constructor_parameters["initial_state"] = initial_state
+        if constructor_parameters["name"]:
+            constructor_parameters["name"] = new_name
+        dev = cls._create_instance_and_remember_it(
+            device_class=device_class, constructor_parameters=constructor_parameters,
+            establish_connection=establish_connection, name=new_name)
+        with cls._lock_device:
+            cls._devices_params[dev.name]['cloned_from'] = source_name
         return dev
 
     @classmethod
@@ -140,6 +206,38 @@ class DeviceFactory(object):
                         devices.append(device)
         return devices
 
+    @classmethod
+    def _get_device_lock(cls, name):
+        """
+        Returns lock to hold while device of given name is created or connected, so other devices may be created at
+        the same time.
+
+        :param name: public name of device, None if name is not known yet (new lock is returned).
+        :return: Lock object.
+        """
+        if not name:
+            return threading.RLock()
+        with cls._lock_device:
+            if name not in cls._devices_locks:
+                cls._devices_locks[name] = threading.RLock()
+            return cls._devices_locks[name]
+
+    @classmethod
+    def _first_hop_host(cls, name):
+        """
+        Returns host of first connection hop of device (from UNIX_LOCAL state), like proxy pc.
+
+        :param name: name of device defined in configuration.
+        :return: host name or None if device has no such hop.
+        """
+        connection_hops = devices_config.named_devices.get(name, (None, None, None, None))[2] or dict()
+        connection_hops = connection_hops.get("CONNECTION_HOPS", connection_hops)
+        for hop_params in connection_hops.get("UNIX_LOCAL", dict()).values():
+            host = hop_params.get("command_params", dict()).get("host")
+            if host:
+                return host
+        return None
+
     @classmethod
     def _try_select_device_connection_desc(cls, device_class, connection_desc):
         if connection_desc is None:
@@ -170,6 +268,7 @@ class DeviceFactory(object):
         cls._devices_params = {}
         cls._unique_names = {}  # key is alias, value is real name
         cls._already_used_names = set()
+        cls._devices_locks = {}
 
     @classmethod
     def _create_device(cls, name, device_class, connection_desc, connection_hops, initial_state, establish_connection):
@@ -268,7 +367,8 @@ class DeviceFactory(object):
         """
         org_name = name
         if name:
-            name = cls._calculate_unique_name(name=name)
+            with cls._lock_device:
+                name = cls._calculate_unique_name(name=name)
             constructor_parameters['name'] = name
         device = create_instance_from_class_fullname(class_fullname=device_class,
                                                      constructor_parameters=constructor_parameters)
@@ -278,11 +378,12 @@ class DeviceFactory(object):
         if not name:
             name = device.name
             org_name = name
-        cls._devices[name] = device
-        cls._devices_params[name] = dict()
-        cls._devices_params[name]['class_fullname'] = device_class
-        cls._devices_params[name]['constructor_parameters'] = constructor_parameters
-        cls._devices_params[name]['cloned_from'] = None
+        with cls._lock_device:
+            cls._devices[name] = device
+            cls._devices_params[name] = dict()
+            cls._devices_params[name]['class_fullname'] = device_class
+            cls._devices_params[name]['constructor_parameters'] = constructor_parameters
+            cls._devices_params[name]['cloned_from'] = None
         handler = functools.partial(cls.forget_device_handler, name)
         device.register_device_removal_callback(callback=handler)
         device.public_name = org_name
@@ -291,9 +392,10 @@ class DeviceFactory(object):
     @classmethod
     def _get_device_without_lock(cls, name, device_class, connection_desc, connection_hops, initial_state,
                                  establish_connection):
-        new_name = cls._get_unique_name(name)
-        if new_name in cls._devices.keys():
-            dev = cls._devices[new_name]
+        with cls._lock_device:
+            new_name = cls._get_unique_name(name)
+            dev = cls._devices.get(new_name)
+        if dev is not None:
             if establish_connection and not dev.has_established_connection():
                 dev.goto_state(state=dev.initial_state)
         else:
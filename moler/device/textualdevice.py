@@ -10,10 +10,7 @@ __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.erns
 
 import abc
 import functools
-import importlib
-import inspect
 import logging
-import pkgutil
 import re
 import time
 import traceback
@@ -26,6 +23,7 @@ from moler.exceptions import CommandWrongState, DeviceFailure, EventWrongState,
 from moler.helpers import copy_dict, update_dict
 from moler.helpers import copy_list
 from moler.instance_loader import create_instance_from_class_fullname
+from moler.util.observers_registry import get_observers_of_package
 from moler.device.abstract_device import AbstractDevice
 
 
@@ -37,6 +35,8 @@ class TextualDevice(AbstractDevice):
     not_connected = "NOT_CONNECTED"
     connection_hops = "CONNECTION_HOPS"
 
+    _routing_tables = dict()  # (device class, transitions, state hops) -> routes between all pairs of states
+
     def __init__(self, sm_params=None, name=None, io_connection=None, io_type=None, variant=None,
                  io_constructor_kwargs=None, initial_state=None):
         """
@@ -62,6 +62,7 @@ class TextualDevice(AbstractDevice):
         self.initial_state = initial_state if initial_state is not None else "NOT_CONNECTED"
         self.states = [TextualDevice.not_connected]
         self.goto_states_triggers = []
+        self._goto_state_methods = dict()  # state -> bound GOTO_<state> trigger of SM
         self._name = name
         self.device_data_logger = None
 
@@ -72,6 +73,8 @@ class TextualDevice(AbstractDevice):
                                queued=True)
 
         self._state_hops = dict()
+        self._state_transitions = dict()  # source state -> list of states reachable by direct transition
+        self._routing_table = dict()
         self._state_prompts = dict()
         self._reverse_state_prompts_dict = dict()
         self._prompts_event = None
@@ -89,6 +92,7 @@ class TextualDevice(AbstractDevice):
 
         self._prepare_transitions()
         self._prepare_state_hops()
+        self._prepare_routing_table()
         self._configure_state_machine(sm_params)
         self._prepare_newline_chars()
 
@@ -353,26 +357,130 @@ class TextualDevice(AbstractDevice):
                 if next_stage_timeout <= 0:
                     is_timeout = True
 
+    def plan_route(self, source_state, dest_state):
+        """
+        Returns route between states (taken from routing table computed once per device class and its SM).
+
+        :param source_state: Name of state to start from.
+        :param dest_state: Name of state to go to.
+        :return: List of states entered one after another on the way to dest_state (the last one is dest_state).
+        :raise: DeviceFailure if there is no route between states.
+        """
+        if source_state == dest_state:
+            return []
+        route = self._routing_table.get((source_state, dest_state))
+        if route is None:
+            raise DeviceFailure(
+                device=self.__class__.__name__,
+                message="No route from state '{}' to state '{}'. Available states: {}".format(source_state, dest_state,
+                                                                                              self.states))
+        return list(route)
+
     def _get_next_state(self, dest_state):
-        next_state = None
-        if self.current_state in self._state_hops.keys():
-            if dest_state in self._state_hops[self.current_state].keys():
-                next_state = self._state_hops[self.current_state][dest_state]
+        route = self._routing_table.get((self.current_state, dest_state))
+        if route:
+            return route[0]
+        return dest_state  # direct transition without hops
 
-        if not next_state:  # direct transition without hops
-            next_state = dest_state
+    def _prepare_routing_table(self):
+        """
+        Prepare routes between all pairs of states - shortest paths over transitions of SM where state hops
+        (see _prepare_state_hops) override shortest paths. Routing table is shared by devices of the same class
+        having the same transitions and state hops, so it is calculated and validated once for them.
 
-        return next_state
+        :return: Nothing.
+        :raise: DeviceFailure if there is no route for transition or state hop declared by device.
+        """
+        routing_key = (self.__class__,
+                       tuple((source_state, tuple(dest_states))
+                             for source_state, dest_states in sorted(self._state_transitions.items())),
+                       tuple((source_state, tuple(sorted(hops.items())))
+                             for source_state, hops in sorted(self._state_hops.items())))
+        try:
+            self._routing_table = TextualDevice._routing_tables[routing_key]
+        except KeyError:
+            next_states = self._calculate_next_states()
+            routing_table = self._calculate_routing_table(next_states)
+            self._validate_routing_table(routing_table, next_states)
+            self._routing_table = routing_table
+            TextualDevice._routing_tables[routing_key] = self._routing_table
+
+    def _calculate_next_states(self):
+        """
+        :return: dict next_states[source][dest] - first state of shortest path (breadth-first search from each state).
+        """
+        next_states = dict()
+        for source_state in self.states:
+            first_hops = dict((state, state) for state in self._state_transitions.get(source_state, []))
+            to_visit = list(first_hops.keys())
+            while to_visit:
+                state = to_visit.pop(0)
+                for neighbour_state in self._state_transitions.get(state, []):
+                    if neighbour_state not in first_hops and neighbour_state != source_state:
+                        first_hops[neighbour_state] = first_hops[state]
+                        to_visit.append(neighbour_state)
+            next_states[source_state] = first_hops
+        return next_states
+
+    def _calculate_routing_table(self, next_states):
+        routing_table = dict()
+        for source_state in self.states:
+            for dest_state in self.states:
+                if source_state != dest_state:
+                    route = self._calculate_route(source_state, dest_state, next_states)
+                    if route:
+                        routing_table[(source_state, dest_state)] = tuple(route)
+        return routing_table
+
+    def _validate_routing_table(self, routing_table, next_states):
+        """
+        Checks routes of transitions and state hops declared by device between states of its SM (state hops may be
+        declared also for states not used by SM in current configuration). Routes between other pairs of states are
+        not checked - plan_route() raises when they are requested.
+
+        :param routing_table: routes between pairs of states.
+        :param next_states: first states of shortest paths between pairs of states.
+        :return: Nothing.
+        :raise: DeviceFailure if there is no route for declared transition or state hop.
+        """
+        for source_state, hops in sorted(self._state_hops.items()):
+            for dest_state, hop_state in sorted(hops.items()):
+                if dest_state in next_states and hop_state not in next_states.get(source_state, {}):
+                    self._log(logging.WARNING,
+                              "State hop '{}' declared for route '{}' -> '{}' is not reachable from '{}', shortest "
+                              "route is used instead.".format(hop_state, source_state, dest_state, source_state))
+        declared = set((source_state, dest_state)
+                       for source_state, dest_states in self._state_transitions.items() for dest_state in dest_states)
+        declared.update((source_state, dest_state)
+                        for source_state, hops in self._state_hops.items() for dest_state in hops)
+        unreachable = ["'{}' -> '{}'".format(source_state, dest_state)
+                       for source_state, dest_state in sorted(declared)
+                       if source_state in next_states and dest_state in next_states and source_state != dest_state
+                       if (source_state, dest_state) not in routing_table]
+        if unreachable:
+            exc = DeviceFailure(device=self.__class__.__name__,
+                                message="Incorrect state machine. No route for: {}.".format(", ".join(unreachable)))
+            self._log(logging.ERROR, exc)
+            raise exc
+
+    def _calculate_route(self, source_state, dest_state, next_states):
+        route = []
+        state = source_state
+        while state != dest_state:
+            next_state = next_states[state].get(dest_state)
+            hop_state = self._state_hops.get(state, {}).get(dest_state)
+            if hop_state in next_states[state]:  # hop defined by device overrides shortest path
+                next_state = next_states[state][hop_state]
+            if next_state is None or next_state == source_state or next_state in route:
+                return None  # not reachable or hops make loop
+            route.append(next_state)
+            state = next_state
+        return route
 
     def _trigger_change_state(self, next_state, timeout, rerun, send_enter_after_changed_state,
                               log_stacktrace_on_fail=True):
         self._log(logging.DEBUG, "Changing state from '%s' into '%s'" % (self.current_state, next_state))
-        change_state_method = None
-        # all state triggers used by SM are methods with names starting from "GOTO_"
-        # for e.g. GOTO_REMOTE, GOTO_CONNECTED
-        for goto_method in self.goto_states_triggers:
-            if "GOTO_{}".format(next_state) == goto_method:
-                change_state_method = getattr(self, goto_method)
+        change_state_method = self._get_goto_state_method(next_state)
 
         if change_state_method:
             self._trigger_change_state_loop(rerun=rerun, next_state=next_state, change_state_method=change_state_method,
@@ -389,6 +497,19 @@ class TextualDevice(AbstractDevice):
                 self._log(logging.ERROR, exc)
             raise exc
 
+    def _get_goto_state_method(self, state):
+        try:
+            return self._goto_state_methods[state]
+        except KeyError:
+            # all state triggers used by SM are methods with names starting from "GOTO_"
+            # for e.g. GOTO_REMOTE, GOTO_CONNECTED
+            goto_method = "GOTO_{}".format(state)
+            if goto_method not in self.goto_states_triggers:
+                return None
+            change_state_method = getattr(self, goto_method)
+            self._goto_state_methods[state] = change_state_method
+            return change_state_method
+
     def _trigger_change_state_loop(self, rerun, next_state, change_state_method, timeout, log_stacktrace_on_fail,
                                    send_enter_after_changed_state):
         entered_state = False
@@ -439,21 +560,8 @@ class TextualDevice(AbstractDevice):
         return self.states
 
     def _load_cmds_from_package(self, package_name):
-        available_cmds = dict()
-        basic_module = importlib.import_module(package_name)
-        for importer, modname, is_pkg in pkgutil.iter_modules(basic_module.__path__):
-            module_name = "{}.{}".format(package_name, modname)
-            module = importlib.import_module(module_name)
-            for (cmd_class_name, cmd_module_name) in inspect.getmembers(module, inspect.isclass):
-                if cmd_module_name.__module__ == module_name:
-                    cmd_class_obj = getattr(module, cmd_class_name)
-                    # like:  IpAddr --> ip_addr
-                    cmd_name = cmd_class_obj.observer_name
-                    # like:  IpAddr --> moler.cmd.unix.ip_addr.IpAddr
-                    cmd_class_fullname = "{}.{}".format(module_name, cmd_class_name)
-
-                    available_cmds.update({cmd_name: cmd_class_fullname})
-        return available_cmds
+        # modules of package are not imported here, registry is shared by all devices of process
+        return get_observers_of_package(package_name)
 
     def _get_observer_in_state(self, observer_name, observer_type, for_state, **kwargs):
         """Return Observable object assigned to obserber_name of given device"""
@@ -610,6 +718,8 @@ class TextualDevice(AbstractDevice):
         for source_state in transitions.keys():
             for dest_state in transitions[source_state].keys():
                 self._update_SM_states(dest_state)
+                if dest_state not in self._state_transitions.setdefault(source_state, []):
+                    self._state_transitions[source_state].append(dest_state)
 
                 single_transition = [
                     {'trigger': self.build_trigger_to_state(dest_state),
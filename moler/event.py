@@ -8,10 +8,12 @@ import functools
 import abc
 import six
 import logging
+from collections import deque
 from moler.connection_observer import ConnectionObserver
 from moler.exceptions import MolerException
 from moler.exceptions import ResultAlreadySet
 from moler.helpers import instance_id
+from moler.util.bounded_stream import BoundedStream, StreamsFeeder
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -31,6 +33,12 @@ class Event(ConnectionObserver):
         self.callback = None
         self.callback_params = dict()
         self._occurred = None
+        self._occurrences_nb = 0
+        self._last_occurrence = None
+        self._max_occurrences = None  # None - store all occurrences
+        self._count_only = False
+        self._occurrences_streams = StreamsFeeder()
+        self._ends_occurrences_streams = False  # done-callback ending streams is registered
         self.till_occurs_times = till_occurs_times
         self._log_every_occurrence = True
         self.event_name = Event.observer_name
@@ -77,6 +85,61 @@ class Event(ConnectionObserver):
         """
         self._log_every_occurrence = False
 
+    def set_max_occurrences(self, max_occurrences):
+        """
+        Limits number of stored occurrences of the event. When limit is reached the oldest occurrence is dropped.
+        Use it for infinite events running for long time.
+
+        :param max_occurrences: max number of stored occurrences, None to store all occurrences.
+        :return: None
+        """
+        self._max_occurrences = max_occurrences
+        if self._occurred is not None:
+            self._occurred = self._create_occurrences_storage(self._occurred)
+
+    def enable_count_only(self):
+        """
+        Enables counting occurrences of the event without storing them. Last occurrence is still available via
+        get_last_occurrence() and number of occurrences via get_occurrences_count().
+
+        :return: None
+        """
+        self._count_only = True
+        self._occurred = None
+
+    def get_occurrences_count(self):
+        """
+        Returns number of occurrences of the event (including occurrences not stored).
+
+        :return: Number of occurrences.
+        """
+        return self._occurrences_nb
+
+    def iter_occurrences(self, maxsize=0, put_timeout=None):
+        """
+        Returns iterator of occurrences of the event that happen from now. Iteration ends when event is done.
+        When iterator has maxsize occurrences not consumed yet then next occurrences are dropped (counted by its
+        'dropped' attribute). With put_timeout given the event waits for consumer (back-pressure) before dropping
+        occurrence - it stops processing of connection data for that time. Close iterator (or use it as context
+        manager) if you stop iterating before its end.
+
+        :param maxsize: max number of occurrences not consumed yet, 0 for no limit.
+        :param put_timeout: max time [sec] the event waits for consumer, None for no waiting.
+        :return: iterator of occurrences (moler.util.bounded_stream.BoundedStream).
+        """
+        occurrences = BoundedStream(maxsize=maxsize, put_timeout=put_timeout, on_close=self._occurrences_streams.remove)
+        # registered here, not at first next(), to not miss occurrences before it
+        self._occurrences_streams.add(occurrences)
+        if not self._ends_occurrences_streams:
+            self._ends_occurrences_streams = True
+            self.add_done_callback(self._end_occurrences_streams)
+        elif self.done():  # done-callback already called
+            occurrences.end()
+        return occurrences
+
+    def _end_occurrences_streams(self, event):
+        self._occurrences_streams.end()
+
     def remove_event_occurred_callback(self):
         """
         Removes callback from the event.
@@ -104,14 +167,30 @@ class Event(ConnectionObserver):
         """Should be used to set final result"""
         if self.done():
             raise ResultAlreadySet(self)
-        if self._occurred is None:
-            self._occurred = []
-        self._occurred.append(event_data)
+        self._occurrences_nb += 1
+        self._last_occurrence = event_data
+        if not self._count_only:
+            if self._occurred is None:
+                self._occurred = self._create_occurrences_storage(list())
+            self._occurred.append(event_data)
+        self._occurrences_streams.put(event_data)
         if self.till_occurs_times > 0:
-            if len(self._occurred) >= self.till_occurs_times:
-                self.set_result(self._occurred)
+            if self._occurrences_nb >= self.till_occurs_times:
+                self.set_result(self._get_stored_occurrences())
         self.notify()
 
+    def _get_stored_occurrences(self):
+        if self._occurred is None:
+            return list()
+        if isinstance(self._occurred, deque):
+            return list(self._occurred)
+        return self._occurred
+
+    def _create_occurrences_storage(self, occurrences):
+        if self._max_occurrences is None:
+            return list(occurrences)
+        return deque(occurrences, maxlen=self._max_occurrences)
+
     def _get_module_class(self):
         return "{}.{}".format(self.__class__.__module__, self)
 
@@ -137,10 +216,7 @@ class Event(ConnectionObserver):
 
         :return: ret value form last occurrence or None if there is no occurrence.
         """
-        if self._occurred:
-            return self._occurred[-1]
-        else:
-            return None
+        return self._last_occurrence
 
     def _log_occurred(self):
         """
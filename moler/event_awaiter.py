@@ -8,7 +8,9 @@ __author__ = 'Marcin Usielski'
 __copyright__ = 'Copyright (C) 2018, Nokia'
 __email__ = 'marcin.usielski@nokia.com'
 
+import threading
 import time
+from collections import deque
 
 
 class EventAwaiter(object):
@@ -19,43 +21,119 @@ class EventAwaiter(object):
         Wait for all events are done or timeout occurs
         :param timeout: time in seconds
         :param events: list of events to check
-        :param interval: interval in seconds between checking events
+        :param interval: interval in seconds between checking events without add_done_callback()
         :return: True if all events are done, False otherwise
         """
-        grand_timeout = timeout
-        start_time = time.time()
-        all_done = True
-        while timeout >= 0:
-            time.sleep(interval)
-            all_done = True
-            for event in events:
-                if not event.done():
-                    all_done = False
-                    break
-            if all_done:
-                break
-            timeout = grand_timeout - (time.time() - start_time)
-        return all_done
+        return EventAwaiter.wait_for_n_of(timeout=timeout, events=events, n=len(events), interval=interval)
 
     @staticmethod
     def wait_for_any(timeout, events, interval=0.001):
         """
         :param timeout: time in seconds
         :param events: list of events to check
-        :param interval: interval in seconds between checking events
+        :param interval: interval in seconds between checking events without add_done_callback()
         :return: True if any event is done, False otherwise
         """
+        return EventAwaiter.wait_for_n_of(timeout=timeout, events=events, n=1, interval=interval)
+
+    @staticmethod
+    def wait_for_n_of(timeout, events, n, interval=0.001):
+        """
+        Wait for at least n events are done or timeout occurs
+        :param timeout: time in seconds
+        :param events: list of events to check
+        :param n: number of events that have to be done
+        :param interval: interval in seconds between checking events without add_done_callback()
+        :return: True if at least n events are done, False otherwise
+        """
+        if not EventAwaiter._all_support_done_callbacks(events):
+            return EventAwaiter._wait_for_n_of_polling(timeout=timeout, events=events, n=n, interval=interval)
+        done_events = list()
+        condition = threading.Condition()
+
+        def on_done(event):
+            with condition:
+                done_events.append(event)
+                condition.notify()
+
+        for event in events:
+            event.add_done_callback(on_done)
+        try:
+            end_time = time.time() + timeout
+            with condition:
+                while len(done_events) < n:
+                    remain_time = end_time - time.time()
+                    if remain_time <= 0:
+                        break
+                    condition.wait(timeout=remain_time)
+                return len(done_events) >= n
+        finally:
+            for event in events:
+                event.remove_done_callback(on_done)
+
+    @staticmethod
+    def as_completed(timeout, events):
+        """
+        Iterate over events as they become done
+        :param timeout: time in seconds for all events
+        :param events: list of events to check
+        :return: generator of done events in order of completion, it stops when all events are done or timeout occurs.
+         Events already done when as_completed() is called come first, in order of list.
+        """
+        done_events = deque()
+        condition = threading.Condition()
+
+        def on_done(event):
+            with condition:
+                done_events.append(event)
+                condition.notify()
+
+        # Registered here, not at first next(), so events done before iteration are still yielded in order of completion
+        for event in events:
+            event.add_done_callback(on_done)
+        return EventAwaiter._iter_completed(timeout=timeout, events=events, done_events=done_events,
+                                            condition=condition, on_done=on_done)
+
+    @staticmethod
+    def _iter_completed(timeout, events, done_events, condition, on_done):
+        try:
+            end_time = time.time() + timeout
+            for _ in range(len(events)):
+                with condition:
+                    while not done_events:
+                        remain_time = end_time - time.time()
+                        if remain_time <= 0:
+                            return
+                        condition.wait(timeout=remain_time)
+                    event = done_events.popleft()
+                yield event
+        finally:
+            for event in events:
+                event.remove_done_callback(on_done)
+
+    @staticmethod
+    def _all_support_done_callbacks(events):
+        for event in events:
+            if not hasattr(event, "add_done_callback"):
+                return False
+        return True
+
+    @staticmethod
+    def _wait_for_n_of_polling(timeout, events, n, interval):
         grand_timeout = timeout
         start_time = time.time()
-        any_done = False
-        while timeout >= 0 and not any_done:
+        enough_done = False
+        while timeout >= 0:
             time.sleep(interval)
+            done_nb = 0
             for event in events:
                 if event.done():
-                    any_done = True
-                    break
+                    done_nb += 1
+            enough_done = done_nb >= n
+            if enough_done:
+                break
             timeout = grand_timeout - (time.time() - start_time)
-        return any_done
+        return enough_done
 
     @staticmethod
     def separate_done_events(events):
@@ -11,7 +11,7 @@ import six
 from moler.events.textualevent import TextualEvent
 from moler.exceptions import NoDetectPatternProvided
 from moler.exceptions import WrongUsage
-from moler.helpers import instance_id, copy_list, convert_to_number
+from moler.helpers import instance_id, copy_list, convert_to_number, compile_alternation, required_literal_strings
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -56,6 +56,31 @@ class LineEvent(TextualEvent):
             compiled_patterns.append(pattern)
         return compiled_patterns
 
+    def compile_any_pattern(self, compiled_patterns):
+        """
+        Joins patterns into one alternation to check in single scan of line if any of them matches.
+
+        :param compiled_patterns: list of compiled patterns.
+        :return: compiled alternation with group '_p<index>' around each pattern or None if patterns can't be joined.
+        """
+        return compile_alternation(compiled_patterns)
+
+    def get_required_keywords(self):
+        """
+        Line may be detected only if it contains literal required by any of detect patterns.
+
+        :return: set of keywords or None if any pattern has no required literal (ex. r'\\d+', case insensitive).
+        """
+        if six.get_unbound_function(type(self).on_new_line) is not six.get_unbound_function(LineEvent.on_new_line):
+            return None  # subclass may react on other lines too
+        keywords = set()
+        for pattern in self.compiled_patterns:
+            pattern_keywords = required_literal_strings(pattern)
+            if pattern_keywords is None:
+                return None
+            keywords.update(pattern_keywords)
+        return keywords
+
     def _convert_string_to_number(self, value):
         if self.convert_string_to_number:
             value = convert_to_number(value)
@@ -82,6 +107,9 @@ class LineEvent(TextualEvent):
     def _prepare_parameters(self):
         self.parser = self._get_parser()
         self.compiled_patterns = self.compile_patterns(self.detect_patterns)
+        self._compiled_any_pattern = None
+        if self.match == 'any':
+            self._compiled_any_pattern = self.compile_any_pattern(self.compiled_patterns)
 
         if self.match in ['all', 'sequence']:
             self._prepare_new_cycle_parameters()
@@ -106,25 +134,32 @@ class LineEvent(TextualEvent):
         current_ret["line"] = line
         current_ret["time"] = datetime.datetime.now()
 
-        group_dict = match.groupdict()
-        for named_group in match.groupdict():
-            group_dict[named_group] = self._convert_string_to_number(group_dict[named_group])
+        if match.re.groups:
+            group_dict = match.groupdict()
+            for named_group in group_dict:
+                group_dict[named_group] = self._convert_string_to_number(group_dict[named_group])
+            groups = tuple(self._convert_string_to_number(value) for value in match.groups())
+        else:  # nothing to convert
+            group_dict = dict()
+            groups = tuple()
 
         current_ret["named_groups"] = group_dict
-
-        groups = tuple()
-        for value in match.groups():
-            groups = groups + (self._convert_string_to_number(value),)
-
         current_ret["groups"] = groups
-
         current_ret["matched"] = self._convert_string_to_number(match.group(0))
 
         return current_ret
 
     def _catch_any(self, line):
-        for pattern in self.compiled_patterns:
-            match = re.search(pattern, line)
+        patterns = self.compiled_patterns
+        if self._compiled_any_pattern is not None:
+            any_match = self._compiled_any_pattern.search(line)
+            if not any_match:
+                return
+            # Leftmost match may come from later pattern but pattern earlier on list takes precedence if it matches
+            # anywhere in line. Patterns after the matched one can't win so they are not checked.
+            patterns = patterns[:int(any_match.lastgroup[2:]) + 1]
+        for pattern in patterns:
+            match = pattern.search(line)
             if match:
                 self._set_current_ret(line=line, match=match)
                 return
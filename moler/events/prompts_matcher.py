@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Matcher of device prompts used by Wait4prompts.
+"""
+
+__author__ = 'Michal Ernst, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'michal.ernst@nokia.com, marcin.usielski@nokia.com'
+
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+
+from moler.helpers import compile_alternation, required_literal_chars
+
+
+class PromptsMatcher(object):
+    """
+    Finds which of prompts matches line.
+
+    Prompts are checked in order of their patterns. Line that contains none of chars required by prompts (mostly
+    their ending '$', '#' or '>') is rejected without running any regex, other lines are checked with single
+    alternation of all prompts. Matchers are cached so devices with the same prompts share one matcher, cache keeps
+    at most _matchers_maxsize recently used matchers.
+    """
+
+    _matchers_maxsize = 128
+    _matchers = OrderedDict()  # least recently used first
+    _matchers_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, compiled_prompts):
+        """
+        Returns matcher for prompts, created at first request for such set of prompts.
+
+        :param compiled_prompts: compiled prompt regex -> state dict.
+        :return: instance of PromptsMatcher.
+        """
+        key = tuple(sorted((prompt.pattern, prompt.flags) for prompt in compiled_prompts))
+        with cls._matchers_lock:
+            matcher = cls._matchers.pop(key, None)
+            if matcher is None:
+                matcher = cls(compiled_prompts)
+                while len(cls._matchers) >= cls._matchers_maxsize:
+                    cls._matchers.popitem(last=False)
+            cls._matchers[key] = matcher
+            return matcher
+
+    def __init__(self, compiled_prompts):
+        """
+        :param compiled_prompts: iterable of compiled prompt regexes.
+        """
+        self.prompts = tuple(sorted(compiled_prompts, key=attrgetter('pattern')))
+        self._any_prompt_regex = compile_alternation(self.prompts)
+        self._required_chars = self._find_required_chars(self.prompts)
+
+    def search(self, line):
+        """
+        Searches for prompt in line.
+
+        :param line: line to check.
+        :return: first (in order of patterns) prompt regex found in line or None.
+        """
+        if self._required_chars is not None:
+            for char in self._required_chars:
+                if char in line:
+                    break
+            else:
+                return None
+        prompts = self.prompts
+        if self._any_prompt_regex is not None:
+            any_match = self._any_prompt_regex.search(line)
+            if not any_match:
+                return None
+            # Leftmost match may come from later prompt but prompt earlier on list takes precedence
+            prompts = prompts[:int(any_match.lastgroup[2:]) + 1]
+        for prompt_regex in prompts:
+            if prompt_regex.search(line):
+                return prompt_regex
+        return None
+
+    @staticmethod
+    def _find_required_chars(prompts):
+        required_chars = set()
+        for prompt_regex in prompts:
+            prompt_chars = required_literal_chars(prompt_regex)
+            if not prompt_chars:
+                return None
+            required_chars.update(prompt_chars)
+        return required_chars
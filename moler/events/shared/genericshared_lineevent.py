@@ -11,7 +11,7 @@ import abc
 import six
 import datetime
 from moler.events.lineevent import LineEvent
-from moler.helpers import remove_all_known_special_chars
+from moler.helpers import remove_all_known_special_chars, is_terminal_output_sanitized
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -24,7 +24,8 @@ class GenericSharedLineEvent(LineEvent):
         :param line: line from device to decode.
         :return: decoded line.
         """
-        line = remove_all_known_special_chars(line)
+        if not is_terminal_output_sanitized(self.connection):  # connection already removed them
+            line = remove_all_known_special_chars(line)
         return line
 
 
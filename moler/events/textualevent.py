@@ -8,6 +8,7 @@ import abc
 import six
 from moler.event import Event
 from moler.cmd import RegexHelper
+from moler.helpers import split_into_lines, default_newline_chars
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -40,12 +41,27 @@ class TextualEvent(Event):
         :param data: List of strings sent by device
         :return: None
         """
-        lines = data.splitlines(True)
-        for current_chunk in lines:
+        self.lines_received(lines=split_into_lines(data, newline_chars=self._newline_chars))
+
+    def lines_received(self, lines):
+        """
+        Called by framework when any data are sent by device, data already split into lines by connection.
+        :param lines: tuple of (current_chunk, line, is_full_line) - see moler.helpers.split_into_lines()
+        :return: None
+        """
+        for current_chunk, line, is_full_line in lines:
             if not self.done():
-                line, is_full_line = self._update_from_cached_incomplete_line(current_chunk=current_chunk)
+                line = self._update_from_cached_incomplete_line(line=line, is_full_line=is_full_line)
                 self._process_line_from_output(line=line, current_chunk=current_chunk, is_full_line=is_full_line)
 
+    def is_line_oriented(self):
+        """
+        :return: True if event may get lines split by connection, False if it needs raw data.
+        """
+        return self._newline_chars == default_newline_chars and (
+            six.get_unbound_function(type(self).data_received) is six.get_unbound_function(
+                TextualEvent.data_received))
+
     def _process_line_from_output(self, current_chunk, line, is_full_line):
         """
         Processes line from connection (device) output.
@@ -58,24 +74,20 @@ class TextualEvent(Event):
         decoded_line = self._decode_line(line=line)
         self.on_new_line(line=decoded_line, is_full_line=is_full_line)
 
-    def _update_from_cached_incomplete_line(self, current_chunk):
+    def _update_from_cached_incomplete_line(self, line, is_full_line):
         """
         Concatenates (if necessary) previous chunk(s) of line and current.
 
-        :param current_chunk: line from connection (full line or incomplete one).
-        :return: Concatenated (if necessary) line from connection without newline char(s). Flag: True if line had
-         newline char(s), False otherwise.
+        :param line: chunk of line from connection (full line or incomplete one) without newline char(s).
+        :param is_full_line: True if chunk of line had newline char(s), False otherwise.
+        :return: Concatenated (if necessary) line from connection without newline char(s).
         """
-        line = current_chunk
         if self._last_not_full_line is not None:
             line = "{}{}".format(self._last_not_full_line, line)
             self._last_not_full_line = None
-        is_full_line = self.is_new_line(line)
-        if is_full_line:
-            line = self._strip_new_lines_chars(line)
-        else:
+        if not is_full_line:
             self._last_not_full_line = line
-        return line, is_full_line
+        return line
 
     def is_new_line(self, line):
         """
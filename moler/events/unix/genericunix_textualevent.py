@@ -10,7 +10,7 @@ __email__ = 'michal.ernst@nokia.com'
 import abc
 import six
 from moler.events.textualevent import TextualEvent
-from moler.helpers import remove_all_known_special_chars
+from moler.helpers import remove_all_known_special_chars, is_terminal_output_sanitized
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -23,5 +23,6 @@ class GenericUnixTextualEvent(TextualEvent):
         :param line: line from device to decode.
         :return: decoded line.
         """
-        line = remove_all_known_special_chars(line)
+        if not is_terminal_output_sanitized(self.connection):  # connection already removed them
+            line = remove_all_known_special_chars(line)
         return line
@@ -39,6 +39,12 @@ class UBootCrtm(GenericUnixTextualEvent):
             except ParsingDone:
                 pass
 
+    def get_required_keywords(self):
+        """
+        :return: keywords of lines parsed by event.
+        """
+        return {'U-Boot CRTM', '[CPLD]', 'Reason'}
+
     _re_u_boot_crtm = re.compile(r'U-Boot CRTM.*$')
 
     def _parse_u_boot_crtm(self, line):
@@ -5,9 +5,9 @@ __email__ = 'michal.ernst@nokia.com, marcin.usielski@nokia.com'
 import datetime
 import re
 
+from moler.events.prompts_matcher import PromptsMatcher
 from moler.events.unix.genericunix_textualevent import GenericUnixTextualEvent
 from moler.exceptions import ParsingDone
-from operator import attrgetter
 
 
 class Wait4prompts(GenericUnixTextualEvent):
@@ -21,6 +21,10 @@ class Wait4prompts(GenericUnixTextualEvent):
         """
         super(Wait4prompts, self).__init__(connection=connection, runner=runner, till_occurs_times=till_occurs_times)
         self.compiled_prompts_regex = self._compile_prompts_patterns(prompts)
+        # Matcher may be shared with other devices so its regexes are mapped to states by pattern and flags
+        self._prompts_matcher = PromptsMatcher.get(self.compiled_prompts_regex)
+        self._prompts_states = {(prompt_regex.pattern, prompt_regex.flags): state
+                                for prompt_regex, state in self.compiled_prompts_regex.items()}
         self.process_full_lines_only = False
 
     def on_new_line(self, line, is_full_line):
@@ -30,17 +34,17 @@ class Wait4prompts(GenericUnixTextualEvent):
             pass
 
     def _parse_prompts(self, line):
-        for prompt_regex in sorted(self.compiled_prompts_regex.keys(), key=attrgetter('pattern')):
-            if self._regex_helper.search_compiled(prompt_regex, line):
-                current_ret = {
-                    'line': line,
-                    'prompt_regex': prompt_regex.pattern,
-                    'state': self.compiled_prompts_regex[prompt_regex],
-                    'time': datetime.datetime.now()
-                }
-                self.event_occurred(event_data=current_ret)
+        prompt_regex = self._prompts_matcher.search(line)
+        if prompt_regex is not None:
+            current_ret = {
+                'line': line,
+                'prompt_regex': prompt_regex.pattern,
+                'state': self._prompts_states[(prompt_regex.pattern, prompt_regex.flags)],
+                'time': datetime.datetime.now()
+            }
+            self.event_occurred(event_data=current_ret)
 
-                raise ParsingDone()
+            raise ParsingDone()
 
     def _compile_prompts_patterns(self, patterns):
         compiled_patterns = dict()
@@ -10,12 +10,14 @@ __email__ = 'grzegorz.latuszek@nokia.com, michal.ernst@nokia.com, marcin.usielsk
 import copy
 import datetime
 import importlib
+import itertools
 import logging
 import re
 from functools import wraps
 from types import FunctionType, MethodType
 
 import deepdiff
+import six
 
 if datetime.time not in deepdiff.diff.numbers:
     deepdiff.diff.numbers = deepdiff.diff.numbers + (datetime.time,)
@@ -25,6 +27,11 @@ try:
 except ImportError:
     import collections
 
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
 
 class ClassProperty(property):
     def __get__(self, cls, owner):
@@ -118,6 +125,232 @@ def remove_all_known_special_chars(line):
     return line
 
 
+class TerminalOutputSanitizer(object):
+    """
+    Incremental remover of terminal control sequences: CSI (colors, cursor movements - ESC [ ... final)
+    and OSC (window title - ESC ] ... BEL or ESC \\) from stream of text.
+
+    Works on chunks of stream: sequence split between chunks is kept till next chunk completes it.
+    Chunk without ESC char (and no pending sequence) is returned as is.
+    """
+
+    _re_sequence = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b\n]*(?:\x07|\x1b\\))")
+    _re_sequence_start = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b\n]*\x1b?)?\Z")  # not completed one
+    max_pending_length = 4096  # longer not completed sequence is treated as text
+
+    def __init__(self):
+        self._pending = ""
+
+    def sanitize(self, chunk):
+        """
+        :param chunk: next chunk of text from terminal
+        :return: chunk without control sequences (and without not completed one at its end)
+        """
+        if self._pending:
+            chunk = self._pending + chunk
+            self._pending = ""
+        if "\x1b" not in chunk:
+            return chunk
+        sanitized = list()
+        position = 0
+        while True:
+            esc_position = chunk.find("\x1b", position)
+            if esc_position < 0:
+                sanitized.append(chunk[position:])
+                break
+            sanitized.append(chunk[position:esc_position])
+            sequence = TerminalOutputSanitizer._re_sequence.match(chunk, esc_position)
+            if sequence:
+                position = sequence.end()
+            elif TerminalOutputSanitizer._re_sequence_start.match(chunk, esc_position) and (
+                    len(chunk) - esc_position <= TerminalOutputSanitizer.max_pending_length):
+                self._pending = chunk[esc_position:]
+                break
+            else:
+                sanitized.append("\x1b")  # not a CSI/OSC sequence, left as it is
+                position = esc_position + 1
+        return "".join(sanitized)
+
+    def flush(self):
+        """
+        :return: not completed sequence kept so far (to be treated as text)
+        """
+        pending, self._pending = self._pending, ""
+        return pending
+
+
+def is_terminal_output_sanitized(connection):
+    """
+    :param connection: Moler connection of observer
+    :return: True if connection removes terminal control sequences from data before passing them to observers
+    """
+    return getattr(connection, 'sanitize_terminal_output', False) is True
+
+
+default_newline_chars = ("\n", "\r")  # New line chars on device, not system with script!
+
+
+def split_into_lines(data, newline_chars=default_newline_chars):
+    """
+    Splits data from connection into chunks of lines.
+
+    :param data: string from connection
+    :param newline_chars: chars that end a line on device
+    :return: tuple of (current_chunk, line, is_full_line) - current_chunk is fragment of data as received,
+     line is current_chunk without newline char(s), is_full_line is True if current_chunk ends with newline char(s)
+    """
+    strip_chars = "".join(newline_chars)
+    lines = list()
+    for current_chunk in data.splitlines(True):
+        if current_chunk.endswith(newline_chars):
+            lines.append((current_chunk, current_chunk.rstrip(strip_chars), True))
+        else:
+            lines.append((current_chunk, current_chunk, False))
+    return tuple(lines)
+
+
+_re_backreference = re.compile(r"\\\d|\(\?P=")
+
+
+def compile_alternation(compiled_patterns):
+    """
+    Joins patterns into one alternation to check in single scan of line if any of them matches.
+
+    :param compiled_patterns: list of compiled patterns.
+    :return: compiled alternation with group '_p<index>' around each pattern or None if patterns can't be joined
+     (single pattern, different flags or types, verbose patterns, backreferences, duplicated group names).
+    """
+    if len(compiled_patterns) < 2:
+        return None
+    flags = compiled_patterns[0].flags
+    alternatives = []
+    for index, pattern in enumerate(compiled_patterns):
+        if pattern.flags != flags or (flags & re.VERBOSE) or not isinstance(pattern.pattern, six.string_types):
+            return None
+        if _re_backreference.search(pattern.pattern):
+            return None
+        alternatives.append("(?P<_p{}>{})".format(index, pattern.pattern))
+    try:
+        return re.compile("|".join(alternatives), flags)
+    except re.error:
+        return None
+
+
+def required_literal_chars(compiled_pattern):
+    """
+    Finds chars of which at least one must be present in any string matched by pattern.
+
+    Pattern is scanned from its end (prompts usually end with literal like '$', '#' or '>') skipping anchors,
+    optional parts and everything else that can't be reduced to literal chars.
+
+    :param compiled_pattern: compiled regex.
+    :return: set of chars or None if no such chars could be found.
+    """
+    if compiled_pattern.flags & re.IGNORECASE or not isinstance(compiled_pattern.pattern, six.string_types):
+        return None
+    try:
+        parsed = sre_parse.parse(compiled_pattern.pattern, compiled_pattern.flags)
+    except Exception:  # parser is internal module of re, don't fail on its changes
+        return None
+    return _required_literal_chars(list(parsed))
+
+
+def _required_literal_chars(items):
+    for opcode, value in reversed(items):
+        chars = _item_required_literal_chars(opcode, value)
+        if chars:
+            return chars
+    return None
+
+
+def _item_required_literal_chars(opcode, value):
+    if opcode == sre_parse.LITERAL:
+        return {six.unichr(value)}
+    if opcode == sre_parse.IN:
+        if all(item_opcode == sre_parse.LITERAL for item_opcode, _ in value):
+            return {six.unichr(item_value) for _, item_value in value}
+    elif opcode in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        min_repeat, _, subpattern = value
+        if min_repeat > 0:
+            return _required_literal_chars(list(subpattern))
+    elif opcode == sre_parse.SUBPATTERN:
+        return _required_literal_chars(list(value[-1]))
+    elif opcode == sre_parse.BRANCH:
+        return _branches_required_literal_chars(value[1])
+    return None
+
+
+def _branches_required_literal_chars(branches):
+    chars = set()
+    for branch in branches:
+        branch_chars = _required_literal_chars(list(branch))
+        if branch_chars is None:
+            return None
+        chars.update(branch_chars)
+    return chars
+
+
+def required_literal_strings(compiled_pattern):
+    """
+    Finds strings of which at least one must be present in any string matched by pattern.
+
+    Longest required run of literal chars is taken (alternatives give one string per branch), so strings may be used
+    as keywords for quick rejection of lines that can't match pattern.
+
+    :param compiled_pattern: compiled regex.
+    :return: set of strings or None if no such strings could be found.
+    """
+    if compiled_pattern.flags & re.IGNORECASE or not isinstance(compiled_pattern.pattern, six.string_types):
+        return None
+    try:
+        parsed = sre_parse.parse(compiled_pattern.pattern, compiled_pattern.flags)
+    except Exception:  # parser is internal module of re, don't fail on its changes
+        return None
+    return _required_literal_strings(list(parsed))
+
+
+def _required_literal_strings(items):
+    candidates = []
+    for is_literal, group in itertools.groupby(items, key=lambda item: item[0] == sre_parse.LITERAL):
+        if is_literal:
+            candidates.append({_literal_string(group)})
+        else:
+            for opcode, value in group:
+                strings = _item_required_literal_strings(opcode, value)
+                if strings:
+                    candidates.append(strings)
+    if not candidates:
+        return None
+    return max(candidates, key=lambda strings: min(len(string) for string in strings))
+
+
+def _literal_string(literal_items):
+    return "".join(six.unichr(value) for _, value in literal_items)
+
+
+def _item_required_literal_strings(opcode, value):
+    if opcode in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+        min_repeat, _, subpattern = value
+        if min_repeat > 0:
+            return _required_literal_strings(list(subpattern))
+    elif opcode == sre_parse.SUBPATTERN:
+        if len(value) < 4 or not value[1] & re.IGNORECASE:  # Python 3.6+ has scoped flags like (?i:...)
+            return _required_literal_strings(list(value[-1]))
+    elif opcode == sre_parse.BRANCH:
+        return _branches_required_literal_strings(value[1])
+    return None
+
+
+def _branches_required_literal_strings(branches):
+    strings = set()
+    for branch in branches:
+        branch_strings = _required_literal_strings(list(branch))
+        if branch_strings is None:
+            return None
+        strings.update(branch_strings)
+    return strings
+
+
 def create_object_from_name(full_class_name, constructor_params):
     name_splitted = full_class_name.split('.')
     module_name = ".".join(name_splitted[:-1])
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+External-IO connections based on asyncio subprocess (process talking via pipes, not pseudo-terminal).
+
+The only 3 requirements for these connections are:
+(1) store Moler's connection inside self.moler_connection attribute
+(2) plugin into Moler's connection the way IO outputs data to external world:
+
+    self.moler_connection.how2send = self.send
+
+(3) forward IO received data into self.moler_connection.data_received(data)
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import asyncio
+import codecs
+import subprocess
+
+from moler.asyncio_runner import get_asyncio_loop_thread
+from moler.io.io_connection import IOConnection
+from moler.io.io_exceptions import RemoteEndpointNotConnected
+from moler.io.raw.subprocess import Subprocess
+
+
+class AsyncioSubprocess(Subprocess):
+    """Implementation of subprocess connection using asyncio - process output is read by events loop."""
+
+    def __init__(self, moler_connection, command=None, cwd=None, env=None, prompt=r'moler_bash#',
+                 encoding='utf-8'):
+        """For parameters see moler.io.raw.subprocess.Subprocess."""
+        super(AsyncioSubprocess, self).__init__(moler_connection=moler_connection, command=command, cwd=cwd,
+                                                env=env, prompt=prompt, encoding=encoding)
+        self._transport = None
+        self._protocol = None
+        self._operable_future = None
+
+    async def open(self):
+        """Start process and start reading its output inside asyncio loop."""
+        if self._transport is None:
+            loop = asyncio.get_event_loop()
+            self._operable_future = loop.create_future()
+            self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+            self._shell_operable.clear()
+            self.read_buffer = ""
+            self._transport, self._protocol = await loop.subprocess_exec(
+                lambda: PipesSubprocessProtocol(forward_data=self._pipe_data_received,
+                                                process_exited=self._process_exited,
+                                                connection_lost=self._process_connection_lost),
+                *self.command, cwd=self.cwd, env=self.env,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            if self.prompt is None:
+                self._set_operable()
+            try:
+                await self._operable_future
+            except RemoteEndpointNotConnected:
+                self._forget_transport()  # process exited before prompt
+                raise
+
+    async def close(self):
+        """
+        Stop process.
+
+        Connection should allow for calling close on closed/not-open connection.
+        """
+        if self._transport is not None:
+            if self._transport.get_returncode() is None:
+                self._transport.kill()
+            await self._protocol.exited
+            self._forget_transport()
+
+    def send(self, data):
+        """Write data into process stdin."""
+        if self._transport is None:
+            raise RemoteEndpointNotConnected()
+        if not isinstance(data, bytes):
+            data = data.encode(self.encoding)
+        self._transport.get_pipe_transport(0).write(data)
+
+    def _pipe_data_received(self, data):
+        data = self._decoder.decode(data)
+        self.logger.debug("<|{}".format(data.encode("UTF-8", "replace")))
+        self.data_received(data)
+
+    def _set_operable(self):
+        super(AsyncioSubprocess, self)._set_operable()
+        if not self._operable_future.done():
+            self._operable_future.set_result(True)
+
+    def _process_exited(self):
+        if self.prompt is not None and not self._operable_future.done():  # open() awaits prompt
+            self._operable_future.set_exception(RemoteEndpointNotConnected(
+                "Process {} exited before prompt.\nREAD_BUFFER: '{}'".format(self.command, self.read_buffer)))
+
+    def _process_connection_lost(self):
+        """Process exited and its whole output is read."""
+        self._process_exited()
+        self._forget_transport()
+
+    def _forget_transport(self):
+        if self._transport is not None:
+            transport, self._transport = self._transport, None
+            transport.close()
+            self._protocol = None
+            self._notify_on_disconnect()
+
+
+class AsyncioInThreadSubprocess(IOConnection):
+    """Implementation of subprocess connection using asyncio running in dedicated thread."""
+
+    def __init__(self, moler_connection, command=None, cwd=None, env=None, prompt=r'moler_bash#',
+                 encoding='utf-8'):
+        """For parameters see moler.io.raw.subprocess.Subprocess."""
+        self._async_subprocess = AsyncioSubprocess(moler_connection=moler_connection, command=command, cwd=cwd,
+                                                   env=env, prompt=prompt, encoding=encoding)
+        super(AsyncioInThreadSubprocess, self).__init__(moler_connection=moler_connection)
+
+    def open(self):
+        """Start process."""
+        ret = super(AsyncioInThreadSubprocess, self).open()
+        thread4async = get_asyncio_loop_thread()
+        thread4async.run_async_coroutine(self._async_subprocess.open(), timeout=600.5)  # await first prompt
+        return ret
+
+    def close(self):
+        """
+        Stop process.
+
+        Connection should allow for calling close on closed/not-open connection.
+        """
+        if self._async_subprocess._transport:
+            thread4async = get_asyncio_loop_thread()
+            thread4async.run_async_coroutine(self._async_subprocess.close(), timeout=0.5)
+
+    def send(self, data):
+        """Write data into process stdin (inside thread of events loop since asyncio transports are not thread safe)."""
+        thread4async = get_asyncio_loop_thread()
+        thread4async.ev_loop.call_soon_threadsafe(self._async_subprocess.send, data)
+
+    def notify(self, callback, when):
+        """
+        Adds subscriber to list of functions to call
+        :param callback: reference to function to call when connection is open/established
+        :param when: connection state change
+        :return: Nothing
+        """
+        self._async_subprocess.notify(callback, when)
+
+    @property
+    def name(self):
+        return self._async_subprocess.name
+
+    @name.setter
+    def name(self, value):
+        self._async_subprocess.name = value
+
+    @property
+    def logger(self):
+        return self._async_subprocess.logger
+
+    @logger.setter
+    def logger(self, value):
+        self._async_subprocess.logger = value
+
+
+class PipesSubprocessProtocol(asyncio.SubprocessProtocol):
+    def __init__(self, forward_data, process_exited=None, connection_lost=None):
+        super(PipesSubprocessProtocol, self).__init__()
+        self.forward_data = forward_data  # expecting function like:   lambda data: ...
+        self.on_process_exited = process_exited  # expecting function like:   lambda: ...
+        self.on_connection_lost = connection_lost  # called when process exited and its pipes are closed
+        self.exited = asyncio.get_event_loop().create_future()
+
+    def pipe_data_received(self, fd, data):
+        self.forward_data(data)
+
+    def process_exited(self):
+        if not self.exited.done():
+            self.exited.set_result(True)
+        if self.on_process_exited is not None:
+            self.on_process_exited()
+
+    def connection_lost(self, exc):
+        if self.on_connection_lost is not None:
+            self.on_connection_lost()
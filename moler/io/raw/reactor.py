@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+External-IO connections served by IO reactor (Python 3 only).
+
+Threaded connections (ThreadedTcp, ThreadedTerminal) own pulling thread per connection.
+Here one IO thread (or few of them - see set_reactor_threads_nb()) waits on selector (epoll on Linux)
+for data of many connections and forwards it into their Moler's connections.
+
+The only 3 requirements for these connections are the same as for other raw connections:
+(1) store Moler's connection inside self.moler_connection attribute
+(2) plugin into Moler's connection the way IO outputs data to external world:
+
+    self.moler_connection.how2send = self.send
+
+(3) forward IO received data into self.moler_connection.data_received(data)
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import logging
+import os
+import selectors
+import socket
+import threading
+from collections import deque
+
+from moler.io.io_exceptions import ConnectionTimeout
+from moler.io.raw.tcp import Tcp
+from moler.io.raw.terminal import ThreadedTerminal
+
+_reactor = None
+_reactor_lock = threading.Lock()
+_reactor_threads_nb = 1
+
+
+def set_reactor_threads_nb(threads_nb):
+    """
+    Set number of IO threads of process-wide reactor. Must be called before first reactor connection is open.
+
+    :param threads_nb: number of IO threads (connections are spread across them).
+    :return: None
+    """
+    global _reactor_threads_nb
+    _reactor_threads_nb = threads_nb
+
+
+def get_reactor():
+    """
+    :return: process-wide IOReactor used by reactor connections if they are not given other one.
+    """
+    global _reactor
+    with _reactor_lock:
+        if _reactor is None:
+            _reactor = IOReactor(threads_nb=_reactor_threads_nb)
+        return _reactor
+
+
+class IOReactor(object):
+    """
+    Calls readers of registered file descriptors when they are readable.
+    Readers are called inside IO thread so they must not block - they should read available data,
+    forward it and return.
+    """
+
+    def __init__(self, threads_nb=1, request_timeout=5.0):
+        """
+        :param threads_nb: number of IO threads, each one has its own selector.
+        :param request_timeout: max time [sec] register()/unregister() wait for IO thread (blocked by reader).
+        """
+        self.logger = logging.getLogger('moler.io.reactor')
+        self._threads = [_ReactorThread(name="MolerIOReactor-{}".format(nb), logger=self.logger,
+                                        request_timeout=request_timeout)
+                         for nb in range(1, threads_nb + 1)]
+        self._fd_threads = dict()
+        self._lock = threading.Lock()
+
+    def register(self, fd, reader):
+        """
+        Start calling reader (without parameters) each time fd is readable.
+
+        :param fd: file descriptor (int).
+        :param reader: callable reading data from fd.
+        :return: None
+        :raise ConnectionTimeout: if IO thread didn't start calling reader within request_timeout.
+        """
+        with self._lock:
+            io_thread = min(self._threads, key=lambda thread: thread.fds_nb)
+            self._fd_threads[fd] = io_thread
+            io_thread.fds_nb += 1
+        io_thread.request(io_thread.add_reader, fd, reader)
+
+    def unregister(self, fd):
+        """
+        Stop calling reader of fd. When returns reader is not running and won't be called any more
+        (may be called also by reader itself).
+
+        :param fd: file descriptor registered before.
+        :return: None
+        :raise ConnectionTimeout: if IO thread didn't stop calling reader within request_timeout.
+        """
+        with self._lock:
+            io_thread = self._fd_threads.pop(fd, None)
+            if io_thread is None:
+                return
+            io_thread.fds_nb -= 1
+        io_thread.request(io_thread.remove_reader, fd)
+
+    def get_statistics(self):
+        """
+        :return: list of numbers of file descriptors served by each IO thread.
+        """
+        with self._lock:
+            return [io_thread.fds_nb for io_thread in self._threads]
+
+
+class _ReactorThread(threading.Thread):
+    def __init__(self, name, logger, request_timeout):
+        super(_ReactorThread, self).__init__(name=name)
+        self.daemon = True
+        self.logger = logger
+        self.request_timeout = request_timeout
+        self.fds_nb = 0
+        self._selector = selectors.DefaultSelector()
+        self._requests = deque()
+        self._requests_lock = threading.Lock()
+        self._wakeup_read_fd, self._wakeup_write_fd = os.pipe()
+        self._selector.register(self._wakeup_read_fd, selectors.EVENT_READ, None)
+        self._start_lock = threading.Lock()
+
+    def request(self, action, *args):
+        """Run action inside IO thread and wait till it is done (run directly if called by IO thread)."""
+        if threading.current_thread() is self:
+            action(*args)
+            return
+        with self._start_lock:
+            if not self.is_alive():
+                self.start()
+        done = threading.Event()
+        with self._requests_lock:
+            self._requests.append((action, args, done))
+        os.write(self._wakeup_write_fd, b'x')
+        if not done.wait(self.request_timeout):
+            raise ConnectionTimeout("Timeout (> {:.3f} sec) on request {}{} to {} (blocked by reader?)".format(
+                self.request_timeout, action.__name__, args, self.name))
+
+    def add_reader(self, fd, reader):
+        self._selector.register(fd, selectors.EVENT_READ, reader)
+
+    def remove_reader(self, fd):
+        try:
+            self._selector.unregister(fd)
+        except (KeyError, ValueError):  # already removed
+            pass
+
+    def run(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.data is None:
+                    self._handle_requests()
+                else:
+                    current_key = self._selector.get_map().get(key.fd)  # may be removed by previous reader
+                    if current_key is not None:
+                        self._call_reader(current_key)
+
+    def _handle_requests(self):
+        os.read(self._wakeup_read_fd, 4096)
+        with self._requests_lock:
+            requests, self._requests = self._requests, deque()
+        for action, args, done in requests:
+            try:
+                action(*args)
+            except Exception as err:
+                self.logger.warning("Reactor request {}{} failed: {!r}".format(action.__name__, args, err))
+            finally:
+                done.set()
+
+    def _call_reader(self, key):
+        try:
+            key.data()
+        except Exception as err:
+            self.logger.exception("Reader of fd {} failed, not called any more: {!r}".format(key.fd, err))
+            self.remove_reader(key.fd)
+
+
+class ReactorTcp(Tcp):
+    """
+    TCP connection feeding Moler's connection inside IO thread of reactor (drop-in variant of ThreadedTcp).
+    """
+
+    def __init__(self, moler_connection,
+                 port, host="localhost", receive_buffer_size=64 * 4096,
+                 logger=None, reactor=None):
+        """Initialization of TCP connection served by reactor."""
+        super(ReactorTcp, self).__init__(port=port, host=host,
+                                         receive_buffer_size=receive_buffer_size,
+                                         logger=logger)
+        self._reactor = reactor if reactor is not None else get_reactor()
+        self._registered_fd = None
+        # make Moler happy (3 requirements) :-)
+        self.moler_connection = moler_connection  # (1)
+        self.moler_connection.how2send = self.send  # (2)
+
+    def open(self):
+        """Open TCP connection & register it in reactor."""
+        ret = super(ReactorTcp, self).open()
+        self._registered_fd = self.socket.fileno()
+        self._reactor.register(self._registered_fd, self._read_data)
+        return ret
+
+    def close(self):
+        """Unregister TCP connection from reactor & close it."""
+        self._unregister()
+        super(ReactorTcp, self).close()
+
+    def _unregister(self):
+        if self._registered_fd is not None:
+            self._reactor.unregister(self._registered_fd)
+            self._registered_fd = None
+
+    def _read_data(self):
+        """Read data available on TCP connection (called by reactor when socket is readable)."""
+        try:
+            data = self.socket.recv(self.receive_buffer_size)
+        except socket.error as serr:
+            self._debug("connection {} broken: {}".format(self, serr))
+            data = None
+        if not data:
+            self._unregister()
+            self._close_ignoring_exceptions()
+            return
+        self._debug('< {}'.format(data))
+        # make Moler happy :-)
+        self.moler_connection.data_received(data)  # (3)
+
+
+class ReactorTerminal(ThreadedTerminal):
+    """
+    Works on Unix (like Linux) systems only!
+
+    Shell working under Pty, its output is read inside IO thread of reactor (drop-in variant of ThreadedTerminal).
+    """
+
+    def __init__(self, moler_connection, reactor=None, **kwargs):
+        """
+        :param moler_connection: Moler's connection to join with
+        :param reactor: IOReactor serving connection, process-wide one if not given
+        :param kwargs: see ThreadedTerminal
+        """
+        super(ReactorTerminal, self).__init__(moler_connection=moler_connection, **kwargs)
+        self._reactor = reactor if reactor is not None else get_reactor()
+        self._registered_fd = None
+
+    def _start_pulling(self):
+        self._registered_fd = self._terminal.fd
+        self._reactor.register(self._registered_fd, self._read_data)
+
+    def _stop_pulling(self):
+        if self._registered_fd is not None:
+            self._reactor.unregister(self._registered_fd)
+            self._registered_fd = None
+
+    def _read_data(self):
+        """Read data available on terminal (called by reactor when pty is readable)."""
+        if not self._read_terminal():
+            self._stop_pulling()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+External-IO connections replaying session recorded inside raw logs.
+
+Connection logger (see moler.config.loggers.configure_device_logger) may record session as pair of files:
+- <name>.raw.log - bytes sent and received, one after another,
+- <name>.raw.trace.log - one record per chunk of data, like:
+  - 1536862639.4494998: {time: '20:17:19.449', direction: <, bytesize: 17, offset: 17}
+
+Replay feeds received chunks into Moler's connection (with original timing or as fast as possible) so commands,
+events and devices may be rerun against recorded session without real device.
+Raw log is memory-mapped and trace is read record by record - replay of big recordings runs in constant memory.
+
+The only 3 requirements for these connections are:
+(1) store Moler's connection inside self.moler_connection attribute
+(2) plugin into Moler's connection the way IO outputs data to external world:
+
+    self.moler_connection.how2send = self.send
+
+(3) forward IO received data into self.moler_connection.data_received(data)
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import codecs
+import logging
+import mmap
+import re
+import time
+from threading import Condition, Event
+
+from moler.io.io_connection import IOConnection
+from moler.io.raw import TillDoneThread
+
+
+class RawTraceReader(object):
+    """Reads chunks of data recorded inside raw log in order given by its raw trace log."""
+
+    _re_trace_record = re.compile(r"^- (?P<created>[\d.]+): \{time: '.*', direction: (?P<direction>\S+), "
+                                  r"bytesize: (?P<bytesize>\d+), offset: \d+\}\s*$")
+    _release_size = 16 * 1024 * 1024  # replayed part of memory-mapped raw log is released every 16MB
+
+    def __init__(self, raw_log_path, trace_log_path=None):
+        """
+        :param raw_log_path: path of raw log (like moler.UNIX_LOCAL.raw.log)
+        :param trace_log_path: path of raw trace log, default: raw_log_path with '.log' replaced by '.trace.log'
+        """
+        if trace_log_path is None:
+            trace_log_path = "{}.trace.log".format(raw_log_path[:-len(".log")] if raw_log_path.endswith(".log")
+                                                   else raw_log_path)
+        self.raw_log_path = raw_log_path
+        self.trace_log_path = trace_log_path
+
+    def __iter__(self):
+        """
+        Yield recorded chunks.
+
+        Chunks are taken from raw log one after another (offsets inside trace restart from 0 when logs are appended
+        by next session so, position inside raw log is calculated from sizes of chunks).
+
+        :return: generator of (created, direction, data) - time of record, '<' for received or '>' for sent data,
+         bytes of chunk
+        """
+        with open(self.raw_log_path, 'rb') as raw_log, open(self.trace_log_path, 'r') as trace_log:
+            raw_log_size = self._file_size(raw_log)
+            if raw_log_size == 0:
+                return  # empty file can't be memory-mapped
+            raw_data = mmap.mmap(raw_log.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                position = released = 0
+                for trace_line in trace_log:
+                    found = RawTraceReader._re_trace_record.match(trace_line)
+                    if not found:
+                        continue
+                    bytesize = int(found.group("bytesize"))
+                    if position + bytesize > raw_log_size:
+                        break  # raw log was cut (ex. not flushed when copied)
+                    yield float(found.group("created")), found.group("direction"), raw_data[position:position + bytesize]
+                    position += bytesize
+                    if position - released >= RawTraceReader._release_size:
+                        released = self._release_pages(raw_data, released, position)
+            finally:
+                raw_data.close()
+
+    @staticmethod
+    def _release_pages(raw_data, released, position):
+        """Drop already replayed pages of raw log from memory of process (Python 3.8+). Returns new released offset."""
+        if not hasattr(raw_data, 'madvise'):
+            return position
+        till = position - position % mmap.PAGESIZE
+        raw_data.madvise(mmap.MADV_DONTNEED, released, till - released)
+        return till
+
+    @staticmethod
+    def _file_size(opened_file):
+        opened_file.seek(0, 2)
+        size = opened_file.tell()
+        opened_file.seek(0)
+        return size
+
+
+class Replay(IOConnection):
+    """
+    Replays recorded session in thread calling replay() (useful for profiling parsers).
+    Data sent via this connection is not sent anywhere - it only lets replay follow recorded sends.
+    """
+
+    def __init__(self, moler_connection, raw_log_path, trace_log_path=None, speed=None, wait_for_sent=True,
+                 sent_timeout=10.0, encoding='utf-8'):
+        """
+        :param moler_connection: Moler's connection to join with
+        :param raw_log_path: path of raw log
+        :param trace_log_path: path of raw trace log, default: taken from raw_log_path (see RawTraceReader)
+        :param speed: None - replay as fast as possible, 1.0 - original timing, 2.0 - twice faster than recorded ...
+        :param wait_for_sent: if True data received after recorded send is replayed after something is sent via
+         this connection (so command started on replay gets its output, not output recorded before it)
+        :param sent_timeout: max time to wait for send, after that replay continues
+        :param encoding: encoding of recorded data
+        """
+        super(Replay, self).__init__(moler_connection=moler_connection)
+        self.reader = RawTraceReader(raw_log_path=raw_log_path, trace_log_path=trace_log_path)
+        self.speed = speed
+        self.wait_for_sent = wait_for_sent
+        self.sent_timeout = sent_timeout
+        self.encoding = encoding
+        self._sent_nb = 0
+        self._sent_condition = Condition()
+        self._stop_replay = Event()
+
+    def open(self):
+        """Open connection - prepare replay from beginning of recording."""
+        ret = super(Replay, self).open()
+        self._stop_replay.clear()
+        with self._sent_condition:
+            self._sent_nb = 0
+        self._notify_on_connect()
+        return ret
+
+    def close(self):
+        """Stop replay."""
+        self._stop_replay.set()
+        with self._sent_condition:
+            self._sent_condition.notify_all()
+        super(Replay, self).close()
+
+    def send(self, data):
+        """Count sent data to let replay follow recorded sends."""
+        with self._sent_condition:
+            self._sent_nb += 1
+            self._sent_condition.notify_all()
+
+    def replay(self):
+        """
+        Feed received data of recording into Moler's connection.
+
+        :return: number of replayed chunks of received data
+        """
+        # need to not replace not unicode data instead of raise exception
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        replayed_nb = 0
+        recorded_sent_nb = 0
+        recording_start = replay_start = None
+        for created, direction, data in self.reader:
+            if self._stop_replay.is_set():
+                break
+            if direction == '>':
+                recorded_sent_nb += 1
+                if self.wait_for_sent:
+                    self._await_sent(recorded_sent_nb)
+                    recording_start = None  # pause of recording (command send) is not replayed
+                continue
+            if direction != '<':
+                continue
+            if self.speed:
+                if recording_start is None:
+                    recording_start, replay_start = created, time.time()
+                delay = (created - recording_start) / self.speed - (time.time() - replay_start)
+                if delay > 0 and self._stop_replay.wait(delay):
+                    break
+            decoded_data = decoder.decode(data)
+            if decoded_data:
+                self.data_received(decoded_data)
+            replayed_nb += 1
+        return replayed_nb
+
+    def _await_sent(self, sent_nb):
+        deadline = time.time() + self.sent_timeout
+        with self._sent_condition:
+            while self._sent_nb < sent_nb and not self._stop_replay.is_set():
+                remaining_time = deadline - time.time()
+                if remaining_time <= 0:
+                    self.logger.log(logging.WARNING, "nothing sent within {} sec, replay continues".format(
+                        self.sent_timeout))
+                    self._sent_nb = sent_nb  # replay is ahead now, next sends should not be awaited for
+                    break
+                self._sent_condition.wait(remaining_time)
+
+    def __str__(self):
+        return 'replay:{}'.format(self.reader.raw_log_path)
+
+
+class ThreadedReplay(Replay):
+    """
+    Replays recorded session inside dedicated thread started by open().
+    """
+
+    def __init__(self, moler_connection, raw_log_path, trace_log_path=None, speed=None, wait_for_sent=True,
+                 sent_timeout=10.0, encoding='utf-8'):
+        """For parameters see Replay."""
+        super(ThreadedReplay, self).__init__(moler_connection=moler_connection, raw_log_path=raw_log_path,
+                                             trace_log_path=trace_log_path, speed=speed,
+                                             wait_for_sent=wait_for_sent, sent_timeout=sent_timeout,
+                                             encoding=encoding)
+        self.replay_done = Event()
+        self.pulling_thread = None
+
+    def open(self):
+        """Start thread replaying recording."""
+        ret = super(ThreadedReplay, self).open()
+        if self.pulling_thread is None:
+            self.replay_done.clear()
+            self.pulling_thread = TillDoneThread(target=self.pull_data,
+                                                 done_event=self._stop_replay,
+                                                 kwargs={'pulling_done': self._stop_replay})
+            self.pulling_thread.start()
+        return ret
+
+    def close(self):
+        """Stop replaying thread."""
+        super(ThreadedReplay, self).close()
+        if self.pulling_thread:
+            self.pulling_thread.join()
+            self.pulling_thread = None
+
+    def await_replay_done(self, timeout=None):
+        """
+        Wait till all recorded data is replayed.
+
+        :param timeout: max time to wait, None - wait till done
+        :return: True if replay is done
+        """
+        return self.replay_done.wait(timeout)
+
+    def pull_data(self, pulling_done):
+        """Replay recording."""
+        try:
+            self.replay()
+        finally:
+            self.replay_done.set()
@@ -1,43 +1,221 @@
 # -*- coding: utf-8 -*-
-"""External-IO connections based on pyhon subprocess module."""
+"""
+External-IO connections based on python subprocess module.
 
-__author__ = 'Michal Plichta'
-__copyright__ = 'Copyright (C) 2018, Nokia'
-__email__ = 'michal.plichta@nokia.com'
+Process is spawned with pipes (stderr merged into stdout) instead of pseudo-terminal:
+no terminal line discipline, no 'export PS1' handshake - output of process is read by big non-blocking reads.
+Works on Unix (like Linux) systems only (select() on pipes).
 
+The only 3 requirements for these connections are:
+(1) store Moler's connection inside self.moler_connection attribute
+(2) plugin into Moler's connection the way IO outputs data to external world:
 
-class Subprocess(object):
-    def __init__(self):
-        pass
+    self.moler_connection.how2send = self.send
 
-    def start(self):
-        pass
+(3) forward IO received data into self.moler_connection.data_received(data)
+"""
 
-    def stop(self):
-        pass
+from __future__ import absolute_import
+
+__author__ = 'Michal Plichta, Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2018-2019, Nokia'
+__email__ = 'michal.plichta@nokia.com, grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import codecs
+import errno
+import fcntl
+import os
+import re
+import select
+import subprocess
+from threading import Event
+
+from moler.io.io_connection import IOConnection
+from moler.io.io_exceptions import ConnectionTimeout
+from moler.io.io_exceptions import RemoteEndpointDisconnected
+from moler.io.io_exceptions import RemoteEndpointNotConnected
+from moler.io.raw import TillDoneThread
+
+
+class Subprocess(IOConnection):
+    """
+    Process talking via pipes. Output is read by receive() - data read that way is not forwarded into
+    Moler's connection (use ThreadedSubprocess for that).
+    """
+
+    def __init__(self, moler_connection, command=None, cwd=None, env=None, prompt=r'moler_bash#',
+                 read_buffer_size=64 * 1024, encoding='utf-8'):
+        """
+        :param moler_connection: Moler's connection to join with
+        :param command: list of program and its arguments, default: bash (without rc files) in interactive mode
+        :param cwd: working directory of process
+        :param env: environment of process, default: environment of Moler with PS1 set to match prompt
+        :param prompt: regex of prompt - output till first prompt is not forwarded, None if process has no prompt
+        :param read_buffer_size: max size of single read from process output
+        :param encoding: encoding of process input/output
+        """
+        super(Subprocess, self).__init__(moler_connection=moler_connection)
+        if command is None:
+            command = ['/bin/bash', '--norc', '--noprofile', '-i']  # interactive bash echoes commands and prompts
+            if env is None:
+                env = dict(os.environ, PS1='moler_bash# ')
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.prompt = prompt
+        self.encoding = encoding
+        self._read_buffer_size = read_buffer_size
+        self._process = None
+        self._decoder = None
+        self._shell_operable = Event()
+        self.read_buffer = ""
+
+    def open(self):
+        """Start process."""
+        ret = super(Subprocess, self).open()
+        if self._process is None:
+            self._process = subprocess.Popen(self.command, cwd=self.cwd, env=self.env, bufsize=0, close_fds=True,
+                                             stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                             stderr=subprocess.STDOUT)
+            stdout_fd = self._process.stdout.fileno()
+            fcntl.fcntl(stdout_fd, fcntl.F_SETFL, fcntl.fcntl(stdout_fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+            # need to not replace not unicode data instead of raise exception
+            self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+            self._shell_operable.clear()
+            self.read_buffer = ""
+            if self.prompt is None:
+                self._set_operable()
+        return ret
+
+    def close(self):
+        """
+        Stop process.
+
+        Connection should allow for calling close on closed/not-open connection.
+        """
+        if self._process is not None:
+            process, self._process = self._process, None
+            for pipe in (process.stdin, process.stdout):
+                try:
+                    pipe.close()
+                except (IOError, OSError):
+                    pass
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            self._notify_on_disconnect()
 
     def send(self, data):
-        pass
+        """Write data into process stdin."""
+        if self._process is None:
+            raise RemoteEndpointNotConnected()
+        if not isinstance(data, bytes):
+            data = data.encode(self.encoding)
+        try:
+            self._process.stdin.write(data)
+        except (IOError, OSError) as err:
+            raise RemoteEndpointDisconnected("{} during send msg '{}'".format(err, data))
 
     def receive(self, timeout=30):
-        pass
+        """
+        Read all data available on process output (waiting for it up to timeout).
+
+        :param timeout: time-out, default 30 sec
+        :return: decoded data
+        """
+        if self._process is None:
+            raise RemoteEndpointNotConnected()
+        stdout = self._process.stdout
+        ready, _, _ = select.select([stdout], [], [], timeout)
+        if not ready:
+            raise ConnectionTimeout("Timeout (> {:.3f} sec) on {}".format(timeout, self))
+        chunks = list()
+        while True:
+            try:
+                chunk = os.read(stdout.fileno(), self._read_buffer_size)
+            except OSError as err:
+                if err.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if not chunk:  # EOF
+                if not chunks:
+                    raise RemoteEndpointDisconnected()
+                break
+            chunks.append(chunk)
+            if len(chunk) < self._read_buffer_size:
+                break
+        return self._decoder.decode(b"".join(chunks))
 
     def data_received(self, data):
-        pass
+        """Await first prompt of process, after that - forward data to Moler's connection."""
+        if not self._shell_operable.is_set():
+            self.read_buffer += data
+            found = re.search(self.prompt, self.read_buffer)
+            if not found:
+                return
+            data = self.read_buffer[found.end():]
+            self._set_operable()
+            if not data:
+                return
+        super(Subprocess, self).data_received(data)
+
+    def _set_operable(self):
+        self._notify_on_connect()
+        self._shell_operable.set()
 
-    def read_subprocess_output(self):
-        pass
+    def __str__(self):
+        return 'subprocess:{}'.format(self.command[0])
 
 
 class ThreadedSubprocess(Subprocess):
-    def __init__(self):
-        super(ThreadedSubprocess, self).__init__()
+    """
+    Process talking via pipes, its output is forwarded into Moler's connection by dedicated thread.
+    """
+
+    def __init__(self, moler_connection, command=None, cwd=None, env=None, prompt=r'moler_bash#',
+                 read_buffer_size=64 * 1024, encoding='utf-8', open_timeout=10):
+        """
+        :param open_timeout: max time to await first prompt of process
+        For other parameters see Subprocess.
+        """
+        super(ThreadedSubprocess, self).__init__(moler_connection=moler_connection, command=command, cwd=cwd,
+                                                 env=env, prompt=prompt, read_buffer_size=read_buffer_size,
+                                                 encoding=encoding)
+        self.open_timeout = open_timeout
+        self.pulling_thread = None
 
     def open(self):
-        pass
+        """Start process & thread pulling data from it."""
+        ret = super(ThreadedSubprocess, self).open()
+        if self.pulling_thread is None:
+            done = Event()
+            self.pulling_thread = TillDoneThread(target=self.pull_data,
+                                                 done_event=done,
+                                                 kwargs={'pulling_done': done})
+            self.pulling_thread.start()
+            if not self._shell_operable.wait(timeout=self.open_timeout):
+                self.logger.warning("Process started but no prompt yet.\nREAD_BUFFER: '{}'".format(
+                    self.read_buffer.encode("UTF-8", "replace")))
+        return ret
 
     def close(self):
-        pass
+        """Stop pulling thread & process."""
+        if self.pulling_thread:
+            self.pulling_thread.join()
+            self.pulling_thread = None
+        super(ThreadedSubprocess, self).close()
 
     def pull_data(self, pulling_done):
-        pass
+        """Pull data from process output."""
+        while not pulling_done.is_set():
+            try:
+                data = self.receive(timeout=0.1)
+                self.logger.debug("<|{}".format(data.encode("UTF-8", "replace")))
+                self.data_received(data)
+            except ConnectionTimeout:
+                continue
+            except RemoteEndpointDisconnected:  # process exited
+                self._notify_on_disconnect()
+                break
+            except (RemoteEndpointNotConnected, ValueError):
+                break
@@ -36,6 +36,7 @@ class ThreadedTerminal(IOConnection):
         """
         super(ThreadedTerminal, self).__init__(moler_connection=moler_connection)
         self._terminal = None
+        self._opened = False
         self._shell_operable = Event()
         self._export_sent = False
         self.pulling_thread = None
@@ -55,34 +56,51 @@ class ThreadedTerminal(IOConnection):
         ret = super(ThreadedTerminal, self).open()
 
         if not self._terminal:
-            self._terminal = PtyProcessUnicode.spawn(self._cmd, dimensions=self.dimensions)
-            # need to not replace not unicode data instead of raise exception
-            self._terminal.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
-
-            done = Event()
-            self.pulling_thread = TillDoneThread(target=self.pull_data,
-                                                 done_event=done,
-                                                 kwargs={'pulling_done': done})
-            self.pulling_thread.start()
-            retry = 0
-            is_operable = False
-
-            while (retry < 10) and (not is_operable):
-                is_operable = self._shell_operable.wait(timeout=1)
-                if not is_operable:
-                    self.logger.warning(
-                        "Terminal open but not fully operable yet.\nREAD_BUFFER: '{}'".format(
-                            self.read_buffer.encode("UTF-8", "replace")))
-                    self._terminal.write('\n')
-                    retry += 1
+            self._opened = True
+            self._spawn_terminal()
+        elif not self._opened:  # terminal prepared by warm_up()
+            self._opened = True
+            self._notify_on_connect()
 
         return ret
 
+    def warm_up(self):
+        """
+        Spawn terminal, set its prompt and start pulling data without opening connection.
+        Subscribers of connection are notified about connection made when connection is opened.
+
+        :return: True if shell is operable.
+        """
+        if not self._terminal:
+            self._spawn_terminal()
+        return self.is_warm()
+
+    def is_warm(self):
+        """Check if terminal is spawned, has its prompt set and is not closed."""
+        return bool(self._terminal and self._shell_operable.is_set() and self._terminal.isalive())
+
+    def _spawn_terminal(self):
+        self._terminal = PtyProcessUnicode.spawn(self._cmd, dimensions=self.dimensions)
+        # need to not replace not unicode data instead of raise exception
+        self._terminal.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        self._start_pulling()
+        retry = 0
+        is_operable = False
+
+        while (retry < 10) and (not is_operable):
+            is_operable = self._shell_operable.wait(timeout=1)
+            if not is_operable:
+                self.logger.warning(
+                    "Terminal open but not fully operable yet.\nREAD_BUFFER: '{}'".format(
+                        self.read_buffer.encode("UTF-8", "replace")))
+                self._terminal.write('\n')
+                retry += 1
+
     def close(self):
         """Close ThreadedTerminal connection & stop pulling thread."""
-        if self.pulling_thread:
-            self.pulling_thread.join()
-            self.pulling_thread = None
+        self._opened = False
+        self._stop_pulling()
         self.moler_connection.shutdown()
         super(ThreadedTerminal, self).close()
 
@@ -96,6 +114,18 @@ class ThreadedTerminal(IOConnection):
         if self._terminal:
             self._terminal.write(data)
 
+    def _start_pulling(self):
+        done = Event()
+        self.pulling_thread = TillDoneThread(target=self.pull_data,
+                                             done_event=done,
+                                             kwargs={'pulling_done': done})
+        self.pulling_thread.start()
+
+    def _stop_pulling(self):
+        if self.pulling_thread:
+            self.pulling_thread.join()
+            self.pulling_thread = None
+
     def pull_data(self, pulling_done):
         """Pull data from ThreadedTerminal connection."""
         reads = []
@@ -109,25 +139,36 @@ class ThreadedTerminal(IOConnection):
                 pulling_done.set()
 
             if self._terminal.fd in reads:
-                try:
-                    data = self._terminal.read(self._read_buffer_size)
-                    self.logger.debug("<|{}".format(data.encode("UTF-8", "replace")))
-
-                    if self._shell_operable.is_set():
-                        self.data_received(data)
-                    else:
-                        self._verify_shell_is_operable(data)
-                except EOFError:
-                    self._notify_on_disconnect()
+                if not self._read_terminal():
                     pulling_done.set()
 
+    def _read_terminal(self):
+        """
+        Read data available on terminal and forward it.
+
+        :return: False if terminal is closed (EOF), True otherwise.
+        """
+        try:
+            data = self._terminal.read(self._read_buffer_size)
+            self.logger.debug("<|{}".format(data.encode("UTF-8", "replace")))
+
+            if self._shell_operable.is_set():
+                self.data_received(data)
+            else:
+                self._verify_shell_is_operable(data)
+        except EOFError:
+            self._notify_on_disconnect()
+            return False
+        return True
+
     def _verify_shell_is_operable(self, data):
         self.read_buffer = self.read_buffer + data
         lines = self.read_buffer.splitlines()
 
         for line in lines:
             if not re.search(self._re_set_prompt_cmd, line) and re.search(self.target_prompt, line):
-                self._notify_on_connect()
+                if self._opened:
+                    self._notify_on_connect()
                 self._shell_operable.set()
                 data = re.sub(self.target_prompt, '', self.read_buffer, re.MULTILINE)
                 self.data_received(data)
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide pool of pre-warmed terminals.
+
+Spawning terminal (pty + bash) and setting its prompt takes hundreds of milliseconds.
+When pool is enabled background thread keeps given number of terminals ready (spawned, prompt set,
+pulling data) and "terminal" connection of "threaded" variant takes one of them instead of spawning new one.
+Pool is refilled in background. If no terminal was taken from pool or added to it for idle_timeout seconds
+its terminals are closed and it stays empty till next request of terminal.
+
+Pool is off by default. It may be enabled by enable_terminal_pool() or config key TERMINAL_POOL.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import logging
+import threading
+import time
+from collections import deque
+
+_pool_lock = threading.Lock()
+_terminal_pool = None
+_terminal_factory = None
+
+
+def set_terminal_factory(terminal_factory):
+    """
+    Set how pool creates terminals (done by connections configuration when registering "terminal" connection).
+
+    :param terminal_factory: callable without parameters returning not opened terminal having warm_up() method
+    :return: None
+    """
+    global _terminal_factory
+    _terminal_factory = terminal_factory
+
+
+def enable_terminal_pool(size=2, idle_timeout=None):
+    """
+    Start pool of pre-warmed terminals (restart if already enabled).
+
+    :param size: number of terminals kept ready
+    :param idle_timeout: if given, terminals are closed when pool was idle (no terminal taken or added) for
+     idle_timeout seconds
+    :return: None
+    """
+    global _terminal_pool
+    disable_terminal_pool()
+    if _terminal_factory is None:
+        import moler.connection_factory  # noqa: F401 - registers "terminal" connection giving factory of terminals
+    with _pool_lock:
+        _terminal_pool = TerminalPool(terminal_factory=_terminal_factory, size=size, idle_timeout=idle_timeout)
+
+
+def disable_terminal_pool():
+    """
+    Stop pool and close its ready terminals (terminals already taken from pool are not touched).
+
+    :return: None
+    """
+    global _terminal_pool
+    with _pool_lock:
+        terminal_pool = _terminal_pool
+        _terminal_pool = None
+    if terminal_pool is not None:
+        terminal_pool.close()
+
+
+def is_terminal_pool_enabled():
+    """Check if pool of pre-warmed terminals is running."""
+    return _terminal_pool is not None
+
+
+def get_terminal(name=None):
+    """
+    Take pre-warmed terminal from pool.
+
+    :param name: name to give to Moler's connection of terminal
+    :return: terminal or None if pool is disabled or has no ready terminal
+    """
+    terminal_pool = _terminal_pool
+    if terminal_pool is None:
+        return None
+    return terminal_pool.get_terminal(name=name)
+
+
+def get_terminal_pool_statistics():
+    """
+    Return statistics of pool.
+
+    :return: dict with 'enabled' flag and 'size', 'ready', 'hits', 'misses', 'evicted' of running pool
+    """
+    terminal_pool = _terminal_pool
+    statistics = {'enabled': terminal_pool is not None}
+    if terminal_pool is not None:
+        statistics.update(terminal_pool.get_statistics())
+    return statistics
+
+
+class TerminalPool(object):
+    """Keeps terminals ready to use, refills itself inside background thread."""
+
+    close_timeout = 0.5  # max time [sec] close() waits for refilling thread (terminal may be warming up for seconds)
+
+    def __init__(self, terminal_factory, size=2, idle_timeout=None):
+        """
+        :param terminal_factory: callable without parameters returning not opened terminal having warm_up() method
+        :param size: number of terminals kept ready
+        :param idle_timeout: if given, terminals are closed when pool was idle (no terminal taken or added) for
+         idle_timeout seconds
+        """
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.logger = logging.getLogger('moler.terminal_pool')
+        self._terminal_factory = terminal_factory
+        self._ready_terminals = deque()
+        self._condition = threading.Condition()
+        self._last_activity = time.time()
+        self._stopped = False
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+        self._refilling_thread = threading.Thread(target=self._refill, name="MolerTerminalPool")
+        self._refilling_thread.daemon = True
+        self._refilling_thread.start()
+
+    def get_terminal(self, name=None):
+        """
+        Take ready terminal.
+
+        :param name: name to give to Moler's connection of terminal
+        :return: terminal or None if there is no ready terminal
+        """
+        terminal = None
+        dead_terminals = list()
+        with self._condition:
+            self._last_activity = time.time()
+            while self._ready_terminals:
+                terminal = self._ready_terminals.popleft()
+                if terminal.is_warm():
+                    break
+                dead_terminals.append(terminal)
+                terminal = None
+            if terminal is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            self._condition.notify_all()
+        self._close_terminals(dead_terminals)
+        if terminal is not None and name:
+            terminal.moler_connection.name = name
+        return terminal
+
+    def get_statistics(self):
+        with self._condition:
+            return {'size': self.size, 'ready': len(self._ready_terminals), 'hits': self._hits,
+                    'misses': self._misses, 'evicted': self._evicted}
+
+    def close(self):
+        """
+        Stop refilling and close ready terminals. Terminal warmed up by refilling thread after pool is closed is
+        closed by that thread.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._refilling_thread.join(TerminalPool.close_timeout)
+        with self._condition:
+            terminals = list(self._ready_terminals)
+            self._ready_terminals.clear()
+        self._close_terminals(terminals)
+
+    def _refill(self):
+        while True:
+            idle_terminals = []
+            with self._condition:
+                while not self._stopped and not self._refill_needed():
+                    idle_terminals = self._take_idle_terminals()
+                    if idle_terminals:
+                        break
+                    self._condition.wait(self._time_till_idle())
+                if self._stopped:
+                    return
+            if idle_terminals:
+                self._close_terminals(idle_terminals)
+                continue
+            terminal = self._warm_up_terminal()
+            with self._condition:
+                if terminal is None:
+                    self._condition.wait(1)  # don't hammer system that can't spawn terminal
+                elif not self._stopped:
+                    self._ready_terminals.append(terminal)
+                    self._last_activity = time.time()
+                    terminal = None
+            if terminal is not None:  # pool was closed while terminal was warming up
+                self._close_terminals([terminal])
+                return
+
+    def _warm_up_terminal(self):
+        terminal = self._terminal_factory()
+        try:
+            if terminal.warm_up():
+                return terminal
+            self.logger.warning("Terminal of pool is not operable.")
+        except Exception:
+            self.logger.exception("Can't spawn terminal of pool.")
+        self._close_terminals([terminal])
+        return None
+
+    def _is_idle(self):
+        return self.idle_timeout is not None and time.time() - self._last_activity >= self.idle_timeout
+
+    def _refill_needed(self):
+        return len(self._ready_terminals) < self.size and not self._is_idle()
+
+    def _time_till_idle(self):
+        if self.idle_timeout is None or not self._ready_terminals:
+            return None
+        return max(self.idle_timeout - (time.time() - self._last_activity), 0.001)
+
+    def _take_idle_terminals(self):
+        if not self._is_idle() or not self._ready_terminals:
+            return []
+        terminals = list(self._ready_terminals)
+        self._ready_terminals.clear()
+        self._evicted += len(terminals)
+        return terminals
+
+    def _close_terminals(self, terminals):
+        for terminal in terminals:
+            try:
+                terminal.close()
+            except Exception:
+                self.logger.exception("Can't close terminal of pool.")
@@ -17,12 +17,17 @@ __email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com, michal.erns
 
 import weakref
 import logging
+import re
 import six
 from threading import Lock
 from moler.connection import Connection
 from moler.connection import identity_transformation
 from moler.config.loggers import RAW_DATA, TRACE
 from moler.helpers import instance_id
+from moler.helpers import remove_all_known_special_chars
+from moler.helpers import split_into_lines
+from moler.helpers import TerminalOutputSanitizer
+from moler.util import metrics
 
 
 class ObservableConnection(Connection):
@@ -33,10 +38,19 @@ class ObservableConnection(Connection):
 
     def observer(data):
         # handle that data
+
+    Line oriented observers may subscribe via subscribe_lines() to get data already split into lines.
+    Splitting is done once per received data, not once per each observer.
+
+    If sanitize_terminal_output is set, terminal control sequences (colors, window title) are removed
+    from decoded data once per received data (also sequences split between data chunks) before notifying observers.
     """
 
+    _received_data_log_extra = {'transfer_direction': '<',
+                                'encoder': lambda data: data.encode(encoding='utf-8', errors="replace")}
+
     def __init__(self, how2send=None, encoder=identity_transformation, decoder=identity_transformation,
-                 name=None, newline='\n', logger_name=""):
+                 name=None, newline='\n', logger_name="", sanitize_terminal_output=False):
         """
         Create Connection via registering external-IO
 
@@ -45,6 +59,7 @@ class ObservableConnection(Connection):
         :param decoder: callable restoring data from bytes
         :param name: name assigned to connection
         :param logger_name: take that logger from logging
+        :param sanitize_terminal_output: True to remove terminal control sequences from decoded data
 
         Logger is retrieved by logging.getLogger(logger_name)
         If logger_name == "" - take logger "moler.connection.<name>"
@@ -54,7 +69,31 @@ class ObservableConnection(Connection):
                                                    logger_name=logger_name)
         self._observers = dict()
         self._connection_closed_handlers = dict()
+        self._line_observers = set()  # keys of observers expecting data split into lines
+        self._observers_keywords = dict()  # keys of line observers interested only in lines with keywords
+        self._keywords_index = None
+        self._not_full_line = ""  # received so far part of line not ended yet
+        self._not_full_line_delivered = dict()  # keyword observer key -> length of that part it already has
         self._observers_lock = Lock()
+        self._sanitizer = None
+        self.sanitize_terminal_output = sanitize_terminal_output
+
+    @property
+    def sanitize_terminal_output(self):
+        """Check if terminal control sequences are removed from data before notifying observers"""
+        return self._sanitizer is not None
+
+    @sanitize_terminal_output.setter
+    def sanitize_terminal_output(self, sanitize):
+        """
+        Switch removing of terminal control sequences from data before notifying observers
+
+        :param sanitize: True to remove them
+        """
+        if not sanitize:
+            self._sanitizer = None
+        elif self._sanitizer is None:
+            self._sanitizer = TerminalOutputSanitizer()
 
     def data_received(self, data):
         """
@@ -63,13 +102,18 @@ class ObservableConnection(Connection):
         """
         if not self.is_open():
             return
-        extra = {'transfer_direction': '<', 'encoder': lambda data: data.encode(encoding='utf-8', errors="replace")}
+        metrics.connection_data_received(self.name, data)
         self._log_data(msg=data, level=RAW_DATA,
-                       extra=extra)
+                       extra=ObservableConnection._received_data_log_extra)
 
         decoded_data = self.decode(data)
+        sanitizer = self._sanitizer
+        if sanitizer is not None and isinstance(decoded_data, six.string_types):
+            decoded_data = sanitizer.sanitize(decoded_data)
+            if not decoded_data:
+                return  # only not completed control sequence received, it waits for rest of it
         self._log_data(msg=decoded_data, level=logging.INFO,
-                       extra=extra)
+                       extra=ObservableConnection._received_data_log_extra)
 
         self.notify_observers(decoded_data)
 
@@ -81,12 +125,36 @@ class ObservableConnection(Connection):
         :param connection_closed_handler: callable to be called when connection is closed.
         """
         with self._observers_lock:
-            self._log(level=TRACE, msg="subscribe({})".format(observer))
+            self._log(level=TRACE, msg=lambda: "subscribe({})".format(observer))
+            observer_key, value = self._get_observer_key_value(observer)
+
+            if observer_key not in self._observers:
+                self._observers[observer_key] = value
+                self._connection_closed_handlers[observer_key] = connection_closed_handler
+
+    def subscribe_lines(self, observer, connection_closed_handler, keywords=None):
+        """
+        Subscribe for 'data-received notification' with data already split into lines.
+
+        :param observer: function to be called to notify when data received. It gets tuple of
+         (current_chunk, line, is_full_line) tuples - see moler.helpers.split_into_lines()
+        :param connection_closed_handler: callable to be called when connection is closed.
+        :param keywords: strings of which at least one must be present in line to pass that line to observer,
+         None to pass all lines. Observer is not called at all for data without any of its keywords.
+        """
+        with self._observers_lock:
+            self._log(level=TRACE, msg=lambda: "subscribe_lines({})".format(observer))
             observer_key, value = self._get_observer_key_value(observer)
 
             if observer_key not in self._observers:
                 self._observers[observer_key] = value
                 self._connection_closed_handlers[observer_key] = connection_closed_handler
+                self._line_observers.add(observer_key)
+                if keywords:
+                    self._observers_keywords[observer_key] = frozenset(keywords)
+                    # like observer without keywords it starts from next chunk of currently received line
+                    self._not_full_line_delivered[observer_key] = len(self._not_full_line)
+                    self._build_keywords_index()
 
     def unsubscribe(self, observer, connection_closed_handler):
         """
@@ -95,11 +163,14 @@ class ObservableConnection(Connection):
         :param connection_closed_handler: callable to be called when connection is closed.
         """
         with self._observers_lock:
-            self._log(level=TRACE, msg="unsubscribe({})".format(observer))
+            self._log(level=TRACE, msg=lambda: "unsubscribe({})".format(observer))
             observer_key, _ = self._get_observer_key_value(observer)
             if observer_key in self._observers and observer_key in self._connection_closed_handlers:
                 del self._observers[observer_key]
                 del self._connection_closed_handlers[observer_key]
+                self._line_observers.discard(observer_key)
+                if self._observers_keywords.pop(observer_key, None) is not None:
+                    self._build_keywords_index()
             else:
                 self._log(level=logging.WARNING,
                           msg="{} and {} were not both subscribed.".format(observer, connection_closed_handler),
@@ -118,20 +189,144 @@ class ObservableConnection(Connection):
     def notify_observers(self, data):
         """Notify all subscribed observers about data received on connection"""
         # need copy since calling subscribers may change self._observers
-        current_subscribers = list(self._observers.values())
-        for self_or_none, observer_function in current_subscribers:
+        current_subscribers = list(self._observers.items())
+        lines, keyword_observers_lines = self._prefilter_keyword_observers(data)
+        trace_enabled = self._is_log_enabled(TRACE)  # checked once per data, not per observer
+        for observer_key, (self_or_none, observer_function) in current_subscribers:
+            observer_data = data
+            if observer_key in self._line_observers:
+                if lines is None:  # split only if there is any line oriented observer, and only once for all of them
+                    lines = split_into_lines(data)
+                observer_data = keyword_observers_lines.get(observer_key, lines)
+                if observer_data is None:
+                    continue  # none of its keywords in data
+            self._notify_observer(self_or_none, observer_function, observer_data, trace_enabled)
+
+    def _notify_observer(self, self_or_none, observer_function, observer_data, trace_enabled):
+        try:
+            if trace_enabled:
+                self._log(level=TRACE, msg=r'notifying {}({!r})'.format(observer_function, repr(observer_data)))
             try:
-                self._log(level=TRACE, msg=r'notifying {}({!r})'.format(observer_function, repr(data)))
-                try:
-                    if self_or_none is None:
-                        observer_function(data)
-                    else:
-                        observer_self = self_or_none
-                        observer_function(observer_self, data)
-                except Exception:
-                    self.logger.exception(msg=r'Exception inside: {}({!r})'.format(observer_function, repr(data)))
-            except ReferenceError:
-                pass  # ignore: weakly-referenced object no longer exists
+                if self_or_none is None:
+                    observer_function(observer_data)
+                else:
+                    observer_self = self_or_none
+                    observer_function(observer_self, observer_data)
+            except Exception:
+                self.logger.exception(msg=r'Exception inside: {}({!r})'.format(observer_function,
+                                                                               repr(observer_data)))
+        except ReferenceError:
+            pass  # ignore: weakly-referenced object no longer exists
+
+    def _prefilter_keyword_observers(self, data):
+        """
+        Select lines of data for observers subscribed with keywords.
+
+        :return: tuple (lines of data or None if not split yet, dict of keyword observer key -> its lines or None if
+         none of its keywords is in data).
+        """
+        keywords_index = self._keywords_index
+        if keywords_index is None:
+            return None, dict()
+        lines = split_into_lines(data)
+        observers_lines = self._select_lines_with_keywords(data, lines, keywords_index)
+        keyword_observers = keywords_index[3]
+        return lines, dict((observer_key, observers_lines.get(observer_key)) for observer_key in keyword_observers)
+
+    def _select_lines_with_keywords(self, data, lines, keywords_index):
+        """
+        Select lines for observers subscribed with keywords.
+
+        Keywords are searched in whole line, also when it comes in many chunks of data. Observer which skipped
+        previous chunks of line gets them together with current chunk. Line with terminal control sequences
+        is searched also without them since observers may remove them (see _decode_line() of events) and keyword
+        may be split by them (ex. 'is' colored in 'Network is down').
+
+        :return: dict of observer key -> tuple of (current_chunk, line, is_full_line) tuples with its keywords.
+        """
+        any_keyword_regex = keywords_index[0]
+        observers_lines = dict()
+        with self._observers_lock:  # subscribe_lines() updates not full line state too
+            not_full_line = self._not_full_line
+            delivered = self._not_full_line_delivered
+            # single scan rejects most of data; line boundaries don't matter here since false positive costs only time
+            if self._search_keyword(any_keyword_regex, not_full_line + data) is None:
+                for current_chunk, line, is_full_line in lines:
+                    not_full_line, delivered = self._next_not_full_line(not_full_line + line, is_full_line, delivered,
+                                                                        line_observers=())
+            else:
+                for current_chunk, line, is_full_line in lines:
+                    line_so_far = not_full_line + line
+                    line_observers = self._observers_of_keywords_in_line(line_so_far, keywords_index)
+                    for observer_key in line_observers:
+                        skipped_from = delivered.get(observer_key, 0)
+                        if skipped_from < len(not_full_line):
+                            line_entry = (not_full_line[skipped_from:] + current_chunk, line_so_far[skipped_from:],
+                                          is_full_line)
+                        else:
+                            line_entry = (current_chunk, line, is_full_line)
+                        observers_lines.setdefault(observer_key, []).append(line_entry)
+                    not_full_line, delivered = self._next_not_full_line(line_so_far, is_full_line, delivered,
+                                                                        line_observers)
+            self._not_full_line = not_full_line
+            self._not_full_line_delivered = delivered
+        return dict((observer_key, tuple(observer_lines)) for observer_key, observer_lines in observers_lines.items())
+
+    @staticmethod
+    def _observers_of_keywords_in_line(line, keywords_index):
+        _, each_keyword_regex, observers_of_keyword, _ = keywords_index
+        keywords = set(each_keyword_regex.findall(line))
+        if "\x1b" in line:
+            keywords.update(each_keyword_regex.findall(remove_all_known_special_chars(line)))
+        line_observers = set()
+        for keyword in keywords:
+            line_observers.update(observers_of_keyword[keyword])
+        return line_observers
+
+    @staticmethod
+    def _next_not_full_line(line_so_far, is_full_line, delivered, line_observers):
+        """
+        :return: tuple (not full line after current line, dict of observer key -> length of not full line delivered).
+        """
+        if is_full_line:
+            return "", dict()
+        for observer_key in line_observers:
+            delivered[observer_key] = len(line_so_far)
+        return line_so_far, delivered
+
+    @staticmethod
+    def _search_keyword(any_keyword_regex, text):
+        found = any_keyword_regex.search(text)
+        if found is None and "\x1b" in text:
+            found = any_keyword_regex.search(remove_all_known_special_chars(text))
+        return found
+
+    def _build_keywords_index(self):
+        """
+        Build index finding in single scan of line which keyword observers should get that line.
+
+        Index is one regex alternation of all keywords (instead of checking keywords of each observer separately).
+        It is scanned at each position of line (lookahead) with longer keywords first, so keyword found by regex
+        stands also for all shorter keywords contained in it.
+        """
+        if not self._observers_keywords:
+            self._keywords_index = None
+            self._not_full_line = ""
+            self._not_full_line_delivered = dict()
+            return
+        all_keywords = set()
+        for keywords in self._observers_keywords.values():
+            all_keywords.update(keywords)
+        all_keywords = sorted(all_keywords, key=len, reverse=True)
+        observers_of_keyword = dict()
+        for keyword in all_keywords:
+            contained_keywords = set(other for other in all_keywords if other in keyword)
+            observers_of_keyword[keyword] = frozenset(observer_key for observer_key, keywords
+                                                      in self._observers_keywords.items()
+                                                      if not keywords.isdisjoint(contained_keywords))
+        alternation = "|".join(re.escape(keyword) for keyword in all_keywords)
+        self._keywords_index = (re.compile(alternation), re.compile("(?=({}))".format(alternation)),
+                                observers_of_keyword, frozenset(self._observers_keywords))
 
     @staticmethod
     def _get_observer_key_value(observer):
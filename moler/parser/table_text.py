@@ -23,6 +23,9 @@ import re
 
 class TableText:
 
+    _re_empty_line = re.compile(r'^\s*$')
+    _re_value = re.compile(r'\S+')  # values of line split by default value splitter r'\s+'
+
     def __init__(self, _header_regexps, _header_keys, _skip='',
                  _finish='', value_splitter=r'\s+'):
         self._header_regexps = _header_regexps  # array of regexps defining header parts
@@ -35,6 +38,11 @@ class TableText:
 
         self.header_regexp_groups = self.build_hdr_groups()
         self.header_positions = []  # array of "column position" of header
+        # all regexps are compiled once, not per parsed line
+        self._compiled_header_re = re.compile(self.header_regexp_groups)
+        self._compiled_skip = re.compile(_skip) if _skip != '' else None
+        self._compiled_finish = re.compile(_finish) if _finish != '' else None
+        self._compiled_value_splitter = None if value_splitter == r'\s+' else re.compile(value_splitter)
 
     def build_hdr_groups(self):
         '''
@@ -63,97 +71,72 @@ class TableText:
         :return: returns result dictionary according to your header regexps set during initialization
                  returns None when nothing was found or headers when values were found
         '''
-        result = dict()
         # looking for finish pareser. If found stop processing
-        if re.match(r'^\s*$', data):
+        if TableText._re_empty_line.match(data):
             return None
-        finish = self._finish
-        if finish != '' and re.search(finish, data):
+        if self._compiled_finish is not None and self._compiled_finish.search(data):
             self._finish_found = True
         if self._finish_found:
             return None
         # looking for skip keyword
-        skip = self._skip
-        if skip != '' and re.search(skip, data):
+        if self._compiled_skip is not None and self._compiled_skip.search(data):
             return None
-        hdr_regexp = self.header_regexp_groups
-        compiled_header_re = re.compile(hdr_regexp)
         # finding header in line until headers are found
         if not self.header_positions:
-            header_search_result = re.search(compiled_header_re, data)
-            if header_search_result is not None:
-                groups_found = header_search_result.groupdict()
-                for index in range(0, len(self._header_keys), 1):
-                    hdr_name = self._header_keys[index]
-                    hdr_value = groups_found[hdr_name]
-                    hdr_value_searched = re.search(r'\b' + hdr_value + r'\b', data)
-                    self.header_positions.append(hdr_value_searched)
-        else:
-            header_keys_number = len(self._header_keys)
-            # split values into table of values
-            split_values = re.split(self._value_splitter, str.strip(str(data)))
-            # connect values and end of them in order to manage them correclty
-            split_values_positions = self.split_with_end_position(split_values, data)
-            value_index = 0
-            data_key = self._header_keys
-            for header_index in range(0, header_keys_number, 1):
-                res, value_index = self.get_value_for_header(header_index,
-                                                             split_values_positions, value_index)
-                result[data_key[header_index]] = res
-            return result
-
-    def get_value_for_header(self, current_header_position, values, start_value_index):
+            self._find_header_positions(data)
+            return None
+        values = self._values_with_end_positions(data)
+        return self._assign_values_to_columns(values)
+
+    def _find_header_positions(self, data):
         '''
-        :param current_header_position: matched headers positions (get with re.search(regexp, line)) for which search
-            will take place
-        :param values: values connected into list
-        :param start_value_index: current start from which search will take place
-        :return: Returns found value for specific header
+        Header positions are start positions of columns - value belongs to column if it ends before next column.
+        :param data: line which may be header
+        :return: None
         '''
-        value_index = 0
-        connected_value = ''
-        if current_header_position + 1 < len(self.header_positions):
-            next_header_position = self.header_positions[current_header_position + 1]
-            # for values that stayed in search
-            for i in range(len(values[start_value_index:])):
-                # check if value end is on position of start of next header
-                if values[start_value_index + i]['end'] >= next_header_position.start():
-                    if not connected_value:
-                        connected_value = ' '
-                    break
-                else:
-                    connected_value += " " + values[start_value_index + i]['value']
-                    value_index += 1
-            # if values were connected then set it to data value in other case set only passed value for index
-            if connected_value:
-                data_value = connected_value
-                value_index -= 1
-            else:
-                data_value = ''
-        else:
-            for i in range(len(values[start_value_index:])):
-                connected_value += " " + values[start_value_index + i]["value"]
-            data_value = connected_value
-        data_value = str.strip(str(data_value))
-        return self.convert_data_to_type(data_value), start_value_index + value_index + 1
+        header_search_result = self._compiled_header_re.search(data)
+        if header_search_result is not None:
+            groups_found = header_search_result.groupdict()
+            for hdr_name in self._header_keys:
+                hdr_value = groups_found[hdr_name]
+                hdr_value_searched = re.search(r'\b' + hdr_value + r'\b', data)
+                self.header_positions.append(hdr_value_searched.start())
 
-    @staticmethod
-    def split_with_end_position(values, data):
+    def _assign_values_to_columns(self, values):
+        '''
+        Values are sliced by offsets: column takes values ending before start of next column, last column takes
+        all remaining values.
+        :param values: list of (value, end position of value) tuples
+        :return: dictionary of column key and its value converted to type
+        '''
+        columns_values = [[] for _ in self._header_keys]
+        next_columns_starts = self.header_positions[1:]
+        last_column = len(next_columns_starts)
+        column = 0
+        for value, end in values:
+            while column < last_column and end >= next_columns_starts[column]:
+                column += 1
+            columns_values[column].append(value)
+        result = dict()
+        for key, column_values in zip(self._header_keys, columns_values):
+            result[key] = self.convert_data_to_type(" ".join(column_values).strip())
+        return result
+
+    def _values_with_end_positions(self, data):
         '''
-        :param values: values splitted from data
         :param data: data full line with values in raw form
-        :return: returns list of dictionary where each dict contains 2 keys 'value' and 'end' which is end position of
-            string
+        :return: returns list of (value, end) tuples where end is end position of value in data
         '''
-        current_value = values[0]
-        current_end = re.search(r'[\b\s]??' + current_value + r'[\b\s]??', data).end()
+        if self._compiled_value_splitter is None:  # fast path for whitespace separated values
+            return [(found.group(), found.end()) for found in TableText._re_value.finditer(data)]
+        stripped_data = data.strip()
+        offset = len(data) - len(data.lstrip())
         result = list()
-        result.append({'value': current_value, 'end': current_end})
-        for i in range(1, len(values), 1):
-            current_value = values[i]
-            current_search = re.search(r'[\b\s]??' + re.escape(values[i]) + r'[\b\s]??', data[current_end:])
-            current_end += current_search.end()
-            result.append({'value': current_value, 'end': current_end})
+        value_start = 0
+        for separator in self._compiled_value_splitter.finditer(stripped_data):
+            result.append((stripped_data[value_start:separator.start()], offset + separator.start()))
+            value_start = separator.end()
+        result.append((stripped_data[value_start:], offset + len(stripped_data)))
         return result
 
     @staticmethod
@@ -23,6 +23,7 @@ from six import add_metaclass
 from moler.exceptions import CommandTimeout
 from moler.exceptions import ConnectionObserverTimeout
 from moler.exceptions import MolerException
+from moler.util import metrics
 from moler.util.loghelper import log_into_logger
 
 
@@ -115,6 +116,32 @@ def time_out_observer(connection_observer, timeout, passed_time, runner_logger,
                             levels_to_go_up=1)
 
 
+def pass_data_to_observer(connection_observer, data, line_oriented):
+    """
+    Pass data received by connection to connection_observer (time spent inside observer is measured if metrics
+    are enabled - see moler.util.metrics).
+
+    :param connection_observer: observer to pass data to
+    :param data: data as received - tuple of lines if line_oriented
+    :param line_oriented: True if observer is subscribed for data split into lines
+    :return: None
+    """
+    if not metrics.is_metrics_enabled():
+        if line_oriented:
+            connection_observer.lines_received(data)
+        else:
+            connection_observer.data_received(data)
+        return
+    start_time = time.time()
+    try:
+        if line_oriented:
+            connection_observer.lines_received(data)
+        else:
+            connection_observer.data_received(data)
+    finally:
+        metrics.observer_data_processed(connection_observer, data, line_oriented, time.time() - start_time)
+
+
 def result_for_runners(connection_observer):
     """
     When runner takes result from connection-observer it should not
@@ -224,10 +251,10 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
         Returns Future that could be used to await for connection_observer done.
         """
         assert connection_observer.start_time > 0.0  # connection-observer lifetime should already been started
-        observer_timeout = connection_observer.timeout
-        remain_time, msg = his_remaining_time("remaining", timeout=observer_timeout,
-                                              from_start_time=connection_observer.start_time)
-        self.logger.debug("go background: {!r} - {}".format(connection_observer, msg))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                  from_start_time=connection_observer.start_time)
+            self.logger.debug("go background: {!r} - {}".format(connection_observer, msg))
         # TODO: check dependency - connection_observer.connection
 
         # Our submit consists of two steps:
@@ -253,10 +280,11 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
         stop_feeding = threading.Event()
         feed_done = threading.Event()
         observer_lock = threading.Lock()  # against threads race write-access to observer
+        submit_time = metrics.runner_observer_submitted(self)
         subscribed_data_receiver = self._start_feeding(connection_observer, observer_lock)
         connection_observer_future = self.executor.submit(self.feed, connection_observer,
                                                           subscribed_data_receiver,
-                                                          stop_feeding, feed_done, observer_lock)
+                                                          stop_feeding, feed_done, observer_lock, submit_time)
         if connection_observer_future.done():
             # most probably we have some exception during submit(); it should be stored inside future
             try:
@@ -426,13 +454,16 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
         """
         Start feeding connection_observer by establishing data-channel from connection to observer.
         """
+        moler_conn = connection_observer.connection
+        # line oriented observers get data already split into lines - splitting is done once by connection
+        line_oriented = connection_observer.is_line_oriented() and hasattr(moler_conn, 'subscribe_lines')
 
         def secure_data_received(data):
             try:
                 if connection_observer.done() or self._in_shutdown:
                     return  # even not unsubscribed secure_data_received() won't pass data to done observer
                 with observer_lock:
-                    connection_observer.data_received(data)
+                    pass_data_to_observer(connection_observer, data, line_oriented)
 
             except Exception as exc:  # TODO: handling stacktrace
                 # observers should not raise exceptions during data parsing
@@ -440,21 +471,29 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
                 with observer_lock:
                     connection_observer.set_exception(exc)
             finally:
-                if connection_observer.done() and not connection_observer.cancelled():
+                if connection_observer.done() and not connection_observer.cancelled() and \
+                        self.logger.isEnabledFor(logging.DEBUG):
                     if connection_observer._exception:
                         self.logger.debug("{} raised: {!r}".format(connection_observer, connection_observer._exception))
                     else:
                         self.logger.debug("{} returned: {}".format(connection_observer, connection_observer._result))
 
-        moler_conn = connection_observer.connection
-        self.logger.debug("subscribing for data {}".format(connection_observer))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("subscribing for data {}".format(connection_observer))
         with observer_lock:
-            moler_conn.subscribe(observer=secure_data_received,
-                                 connection_closed_handler=connection_observer.connection_closed_handler)
+            if line_oriented:
+                moler_conn.subscribe_lines(observer=secure_data_received,
+                                           connection_closed_handler=connection_observer.connection_closed_handler,
+                                           keywords=connection_observer.get_required_keywords())
+            else:
+                moler_conn.subscribe(observer=secure_data_received,
+                                     connection_closed_handler=connection_observer.connection_closed_handler)
             # after subscription we have data path so observer is started
-            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
-                                                  from_start_time=connection_observer.start_time)
-            connection_observer._log(logging.INFO, "{} started, {}".format(connection_observer.get_long_desc(), msg))
+            if connection_observer._is_log_enabled(logging.INFO):
+                remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                      from_start_time=connection_observer.start_time)
+                connection_observer._log(logging.INFO, "{} started, {}".format(connection_observer.get_long_desc(),
+                                                                               msg))
         if connection_observer.is_command():
             connection_observer.send_command()
         return secure_data_received  # to know what to unsubscribe
@@ -463,13 +502,16 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
         with observer_lock:
             if not feed_done.is_set():
                 moler_conn = connection_observer.connection
-                self.logger.debug("unsubscribing {}".format(connection_observer))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("unsubscribing {}".format(connection_observer))
                 moler_conn.unsubscribe(observer=subscribed_data_receiver,
                                        connection_closed_handler=connection_observer.connection_closed_handler)
                 # after unsubscription we break data path so observer is finished
-                remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
-                                                      from_start_time=connection_observer.start_time)
-                connection_observer._log(logging.INFO, "{} finished, {}".format(connection_observer.get_short_desc(), msg))
+                if connection_observer._is_log_enabled(logging.INFO):
+                    remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                          from_start_time=connection_observer.start_time)
+                    connection_observer._log(logging.INFO, "{} finished, {}".format(
+                        connection_observer.get_short_desc(), msg))
                 feed_done.set()
 
     def _feed_finish_callback(self, future, connection_observer, subscribed_data_receiver, feed_done, observer_lock):
@@ -477,14 +519,16 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
         self._stop_feeding(connection_observer, subscribed_data_receiver, feed_done, observer_lock)
 
     def feed(self, connection_observer, subscribed_data_receiver, stop_feeding, feed_done,
-             observer_lock):
+             observer_lock, submit_time=None):
         """
         Feeds connection_observer by transferring data from connection and passing it to connection_observer.
         Should be called from background-processing of connection observer.
         """
-        remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
-                                              from_start_time=connection_observer.start_time)
-        self.logger.debug("thread started  for {}, {}".format(connection_observer, msg))
+        metrics.runner_feed_started(self, submit_time)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                  from_start_time=connection_observer.start_time)
+            self.logger.debug("thread started  for {}, {}".format(connection_observer, msg))
 
         if not subscribed_data_receiver:
             subscribed_data_receiver = self._start_feeding(connection_observer, observer_lock)
@@ -493,9 +537,10 @@ class ThreadPoolExecutorRunner(ConnectionObserverRunner):
 
         self._feed_loop(connection_observer, stop_feeding, observer_lock)
 
-        remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
-                                              from_start_time=connection_observer.start_time)
-        self.logger.debug("thread finished for {}, {}".format(connection_observer, msg))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                  from_start_time=connection_observer.start_time)
+            self.logger.debug("thread finished for {}, {}".format(connection_observer, msg))
         self._stop_feeding(connection_observer, subscribed_data_receiver, feed_done, observer_lock)
         return None
 
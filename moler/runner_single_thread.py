@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+Event driven runner.
+
+ThreadPoolExecutorRunner parks one thread per running observer and wakes it each tick just to check
+if observer is done or timed out. Here observers are fed directly from connection callback,
+completion of observer is signalled via its done-callback into concurrent.futures.Future
+and timeouts of all observers are handled by one timer thread sleeping till the nearest deadline.
+So, number of threads used by runner doesn't depend on number of running observers.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import atexit
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, wait
+
+from moler.runner import ConnectionObserverRunner
+from moler.runner import time_out_observer, result_for_runners, his_remaining_time, await_future_or_eol
+from moler.runner import pass_data_to_observer
+from moler.util import metrics
+
+
+class _ObserverEntry(object):
+    """Bookkeeping of single observer running inside RunnerSingleThread."""
+
+    def __init__(self, connection_observer, future, observer_lock):
+        self.connection_observer = connection_observer
+        self.future = future
+        self.observer_lock = observer_lock
+        self.subscribed_data_receiver = None
+        self.done_callback = None
+        self.deadline = 0.0  # not scheduled yet
+        self.terminating_start_time = 0.0
+        self.finished = False
+
+
+class RunnerSingleThread(ConnectionObserverRunner):
+    def __init__(self):
+        """Create instance of RunnerSingleThread class"""
+        self._in_shutdown = False
+        self._deadlines_outdated = False  # set when .timeout of some running observer has changed
+        self._entries = dict()  # id(connection_observer): _ObserverEntry
+        self._deadlines = list()  # heap of (deadline, sequence_nb, _ObserverEntry)
+        self._sequence = itertools.count()
+        self._timer_condition = threading.Condition()
+        self.logger = logging.getLogger('moler.runner.single-thread')
+        self._timer_thread = threading.Thread(target=self._timer_loop, name="RunnerSingleThread-Timer")
+        self._timer_thread.daemon = True
+        self._timer_thread.start()
+        self.logger.debug("created")
+        atexit.register(self.shutdown)
+
+    def shutdown(self):
+        self.logger.debug("shutting down")
+        with self._timer_condition:
+            if self._in_shutdown:
+                return
+            self._in_shutdown = True
+            entries = list(self._entries.values())
+            self._timer_condition.notify()
+        for entry in entries:
+            self.logger.debug("shutdown so cancelling {}".format(entry.connection_observer))
+            entry.connection_observer.cancel()
+            self._finish(entry)  # cancel() of already done observer doesn't call done-callback
+        if self._timer_thread is not threading.current_thread():
+            self._timer_thread.join(timeout=1.0)
+
+    def submit(self, connection_observer):
+        """
+        Submit connection observer to background execution.
+        Returns Future that could be used to await for connection_observer done.
+        """
+        assert connection_observer.start_time > 0.0  # connection-observer lifetime should already been started
+        remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                              from_start_time=connection_observer.start_time)
+        self.logger.debug("go background: {!r} - {}".format(connection_observer, msg))
+
+        observer_lock = threading.Lock()  # against threads race write-access to observer
+        connection_observer_future = Future()
+        connection_observer_future.set_running_or_notify_cancel()
+        # need injecting new attribute inside Future object to allow passing lock to wait_for()
+        connection_observer_future.observer_lock = observer_lock
+        submit_time = metrics.runner_observer_submitted(self)
+        entry = _ObserverEntry(connection_observer, connection_observer_future, observer_lock)
+        with self._timer_condition:
+            self._entries[id(connection_observer)] = entry
+
+        # Our submit consists of three steps:
+        # 1. _start_feeding() which establishes data path from connection to observer
+        # 2. attaching done-callback that breaks data path and completes future
+        # 3. scheduling observer timeout inside timer thread
+        #
+        # There is no "background feed" - data is passed to observer directly from connection.
+        # So, after submit() no data will be lost-for-observer.
+        entry.subscribed_data_receiver = self._start_feeding(connection_observer, observer_lock)
+        metrics.runner_feed_started(self, submit_time)  # fed directly by connection since now
+        entry.done_callback = lambda observer: self._finish(entry)
+        connection_observer.add_done_callback(entry.done_callback)
+        self._schedule_timeout(entry)
+        return connection_observer_future
+
+    def wait_for(self, connection_observer, connection_observer_future, timeout=None):
+        """
+        Await for connection_observer running in background or timeout.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :param timeout: Max time (in float seconds) you want to await before you give up. If None then taken from connection_observer
+        :return:
+        """
+        if connection_observer.done():
+            self.logger.debug("go foreground: {} is already done".format(connection_observer))
+            return None
+
+        max_timeout = timeout
+        observer_timeout = connection_observer.timeout
+        # we count timeout from now if timeout is given; else we use .start_time and .timeout of observer
+        start_time = time.time() if max_timeout else connection_observer.start_time
+        await_timeout = max_timeout if max_timeout else observer_timeout
+        if max_timeout:
+            remain_time, msg = his_remaining_time("await max.", timeout=max_timeout, from_start_time=start_time)
+        else:
+            remain_time, msg = his_remaining_time("remaining", timeout=observer_timeout, from_start_time=start_time)
+        self.logger.debug("go foreground: {} - {}".format(connection_observer, msg))
+
+        if connection_observer_future is None:
+            end_of_life, remain_time = await_future_or_eol(connection_observer, remain_time, start_time, await_timeout,
+                                                           self.logger)
+            if end_of_life:
+                return None
+            connection_observer_future = connection_observer._future
+            if connection_observer_future is None:  # timed out inside commands queue
+                self._time_out_in_foreground(connection_observer, await_timeout, lock=None)
+                connection_observer.set_end_of_life()
+                return None
+
+        if max_timeout:
+            self._wait_with_max_timeout(connection_observer, connection_observer_future, remain_time, await_timeout)
+        else:
+            # timer thread handles observer timeout and terminating timeout - here we just await future
+            wait([connection_observer_future])
+        return None
+
+    def _wait_with_max_timeout(self, connection_observer, connection_observer_future, remain_time, await_timeout):
+        done, not_done = wait([connection_observer_future], timeout=remain_time)
+        if done or connection_observer.done():
+            return
+        self._time_out_in_foreground(connection_observer, await_timeout,
+                                     lock=connection_observer_future.observer_lock)
+        if connection_observer.terminating_timeout > 0.0:
+            with self._timer_condition:
+                entry = self._entries.get(id(connection_observer))
+            if entry:
+                self._start_terminating(entry)
+            wait([connection_observer_future], timeout=connection_observer.terminating_timeout)
+        if not connection_observer.done():
+            connection_observer.set_end_of_life()
+
+    def wait_for_iterator(self, connection_observer, connection_observer_future):
+        """
+        Version of wait_for() intended to be used by Python3 to implement iterable/awaitable object.
+
+        Note: we don't have timeout parameter here. If you want to await with timeout please do use timeout machinery
+        of selected parallelism.
+
+        :param connection_observer: The one we are awaiting for.
+        :param connection_observer_future: Future of connection-observer returned from submit().
+        :return: iterator
+        """
+        while not connection_observer_future.done():
+            yield None
+        res = result_for_runners(connection_observer)
+        return res
+
+    def feed(self, connection_observer):
+        """
+        Feeding is done directly by connection via secure_data_received() installed by submit().
+        There is no separate background-feeder here.
+        """
+        pass
+
+    def timeout_change(self, timedelta):
+        """Timeout of running observer has been changed - wake timer thread to recalculate deadlines."""
+        with self._timer_condition:
+            self._deadlines_outdated = True
+            self._timer_condition.notify()
+
+    def _start_feeding(self, connection_observer, observer_lock):
+        """
+        Start feeding connection_observer by establishing data-channel from connection to observer.
+        """
+        moler_conn = connection_observer.connection
+        # line oriented observers get data already split into lines - splitting is done once by connection
+        line_oriented = connection_observer.is_line_oriented() and hasattr(moler_conn, 'subscribe_lines')
+
+        def secure_data_received(data):
+            try:
+                if connection_observer.done() or self._in_shutdown:
+                    return  # even not unsubscribed secure_data_received() won't pass data to done observer
+                with observer_lock:
+                    pass_data_to_observer(connection_observer, data, line_oriented)
+
+            except Exception as exc:  # TODO: handling stacktrace
+                # observers should not raise exceptions during data parsing
+                # but if they do so - we fix it
+                with observer_lock:
+                    connection_observer.set_exception(exc)
+            finally:
+                if connection_observer.done() and not connection_observer.cancelled():
+                    if connection_observer._exception:
+                        self.logger.debug("{} raised: {!r}".format(connection_observer, connection_observer._exception))
+                    else:
+                        self.logger.debug("{} returned: {}".format(connection_observer, connection_observer._result))
+
+        self.logger.debug("subscribing for data {}".format(connection_observer))
+        with observer_lock:
+            if line_oriented:
+                moler_conn.subscribe_lines(observer=secure_data_received,
+                                           connection_closed_handler=connection_observer.connection_closed_handler,
+                                           keywords=connection_observer.get_required_keywords())
+            else:
+                moler_conn.subscribe(observer=secure_data_received,
+                                     connection_closed_handler=connection_observer.connection_closed_handler)
+            # after subscription we have data path so observer is started
+            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                  from_start_time=connection_observer.start_time)
+            connection_observer._log(logging.INFO, "{} started, {}".format(connection_observer.get_long_desc(), msg))
+        if connection_observer.is_command():
+            connection_observer.send_command()
+        return secure_data_received  # to know what to unsubscribe
+
+    def _finish(self, entry):
+        """Break data path of done observer and complete its future. Safe to call multiple times."""
+        with self._timer_condition:
+            if entry.finished:
+                return
+            entry.finished = True
+            connection_observer = entry.connection_observer
+            self._entries.pop(id(connection_observer), None)
+        if entry.subscribed_data_receiver:
+            moler_conn = connection_observer.connection
+            self.logger.debug("unsubscribing {}".format(connection_observer))
+            moler_conn.unsubscribe(observer=entry.subscribed_data_receiver,
+                                   connection_closed_handler=connection_observer.connection_closed_handler)
+            # after unsubscription we break data path so observer is finished
+            remain_time, msg = his_remaining_time("remaining", timeout=connection_observer.timeout,
+                                                  from_start_time=connection_observer.start_time)
+            connection_observer._log(logging.INFO, "{} finished, {}".format(connection_observer.get_short_desc(), msg))
+        if entry.done_callback:
+            connection_observer.remove_done_callback(entry.done_callback)
+        if not entry.future.done():
+            entry.future.set_result(None)
+
+    def _schedule_timeout(self, entry):
+        with self._timer_condition:
+            if entry.finished:
+                return
+            entry.deadline = self._deadline_of(entry)
+            heapq.heappush(self._deadlines, (entry.deadline, next(self._sequence), entry))
+            if self._deadlines[0][2] is entry:
+                self._timer_condition.notify()  # new nearest deadline - timer thread must shorten its sleep
+
+    @staticmethod
+    def _deadline_of(entry):
+        connection_observer = entry.connection_observer
+        if connection_observer.in_terminating:
+            return entry.terminating_start_time + connection_observer.terminating_timeout
+        return connection_observer.start_time + connection_observer.timeout
+
+    def _timer_loop(self):
+        self.logger.debug("timer thread started")
+        with self._timer_condition:
+            while not self._in_shutdown:
+                if self._deadlines_outdated:
+                    self._deadlines_outdated = False
+                    self._recalculate_deadlines()
+                now = time.time()
+                expired = []
+                while self._deadlines and (self._deadlines[0][0] <= now):
+                    deadline, _, entry = heapq.heappop(self._deadlines)
+                    if (not entry.finished) and (deadline == entry.deadline):  # skip outdated heap items
+                        expired.append(entry)
+                if expired:
+                    self._timer_condition.release()
+                    try:
+                        for entry in expired:
+                            self._handle_deadline(entry)
+                    finally:
+                        self._timer_condition.acquire()
+                    continue
+                sleep_time = (self._deadlines[0][0] - now) if self._deadlines else None
+                self._timer_condition.wait(timeout=sleep_time)
+        self.logger.debug("timer thread finished")
+
+    def _recalculate_deadlines(self):
+        """Observer .timeout may change while it runs (shortened or extended) so, rebuild heap of deadlines."""
+        self._deadlines = []
+        for entry in self._entries.values():
+            entry.deadline = self._deadline_of(entry)
+            self._deadlines.append((entry.deadline, next(self._sequence), entry))
+        heapq.heapify(self._deadlines)
+
+    def _handle_deadline(self, entry):
+        connection_observer = entry.connection_observer
+        if connection_observer.done():
+            self._finish(entry)
+            return
+        deadline = self._deadline_of(entry)
+        now = time.time()
+        if deadline > now:  # timeout has been extended
+            self._schedule_timeout(entry)
+            return
+        if connection_observer.in_terminating:
+            msg = "{} underlying real command failed to finish during {} seconds. It will be forcefully" \
+                  " terminated".format(connection_observer, connection_observer.terminating_timeout)
+            self.logger.info(msg)
+            connection_observer.set_end_of_life()
+            self._finish(entry)
+            return
+        run_duration = now - connection_observer.start_time
+        with entry.observer_lock:
+            time_out_observer(connection_observer,
+                              timeout=connection_observer.timeout,
+                              passed_time=run_duration,
+                              runner_logger=self.logger)
+        if connection_observer.done():
+            self._finish(entry)
+        else:
+            self._start_terminating(entry)
+
+    def _start_terminating(self, entry):
+        """Observer has timed out but it may still do something (like command awaiting prompt after Ctrl+C)."""
+        if not entry.connection_observer.in_terminating:
+            entry.terminating_start_time = time.time()
+            entry.connection_observer.in_terminating = True
+        self._schedule_timeout(entry)
+
+    def _time_out_in_foreground(self, connection_observer, timeout, lock):
+        passed = time.time() - connection_observer.start_time
+        if lock:
+            with lock:
+                time_out_observer(connection_observer=connection_observer,
+                                  timeout=timeout, passed_time=passed,
+                                  runner_logger=self.logger, kind="await_done")
+        else:
+            time_out_observer(connection_observer=connection_observer,
+                              timeout=timeout, passed_time=passed,
+                              runner_logger=self.logger, kind="await_done")
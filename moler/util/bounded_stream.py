@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Streams of items (occurrences of events, records of commands) passed from observer to code iterating them.
+
+Producer is observer processing connection data inside connection (or runner) thread, so it must not block:
+- new item put into stream with maxsize items not consumed yet is dropped (and counted), producer may wait for
+  consumer (back-pressure) only if put_timeout is given explicitly - then items are dropped after that timeout till
+  consumer takes next item,
+- end of stream never blocks (it is called from done-callbacks of observers),
+- producer keeps only weak references to streams, so stream dropped by consumer without iterating it to the end
+  (or never iterated) stops getting items.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import threading
+import time
+import weakref
+from collections import deque
+
+
+class BoundedStream(object):
+    """
+    Iterator of items put by producer, iteration ends when producer ends stream or consumer closes it.
+
+    Usage:
+        with event.iter_occurrences(maxsize=100) as occurrences:
+            for occurrence in occurrences:
+                ...
+    """
+
+    def __init__(self, maxsize=0, put_timeout=None, on_close=None):
+        """
+        :param maxsize: max number of items not consumed yet, 0 for no limit.
+        :param put_timeout: max time [sec] producer waits for free place in stream, then item is dropped. None to drop
+         item of full stream without waiting.
+        :param on_close: callable taking stream, called once when stream is closed.
+        """
+        self.maxsize = maxsize
+        self.put_timeout = put_timeout
+        self.dropped = 0  # items not put since stream was full
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._ended = False
+        self._closed = False
+        self._producer_gave_up = False  # no waiting for consumer till it takes next item
+        self._on_close = on_close
+
+    def put(self, item):
+        """
+        Puts item into stream. If stream is full then item is dropped, after waiting for consumer if put_timeout
+        was given.
+
+        :param item: item for consumer.
+        :return: True if item was put, False if it was dropped (stream full, ended or closed).
+        """
+        with self._condition:
+            if self._ended or self._closed:
+                return False
+            if self.maxsize > 0 and len(self._items) >= self.maxsize:
+                if self.put_timeout is not None and not self._producer_gave_up:
+                    self._wait_for_free_place()
+                if self._closed:
+                    return False
+                if len(self._items) >= self.maxsize:
+                    self.dropped += 1
+                    return False
+            self._items.append(item)
+            self._wake_up_consumer()
+            return True
+
+    def end(self):
+        """
+        Marks end of items, consumer gets items put so far and then iteration stops. Never blocks.
+
+        :return: None
+        """
+        with self._condition:
+            self._ended = True
+            self._wake_up_consumer()
+
+    def close(self):
+        """
+        Stops stream from consumer side: not consumed items are dropped and producer stops putting items.
+
+        :return: None
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._items.clear()
+            self._wake_up_consumer()
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def is_closed(self):
+        """
+        :return: True if stream was closed by consumer.
+        """
+        return self._closed
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._condition:
+            while not self._items and not self._ended and not self._closed:
+                self._condition.wait()
+            item_taken, item = self._take_item()
+        if item_taken:
+            return item
+        self.close()
+        raise StopIteration
+
+    next = __next__  # Python 2
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False  # exceptions (if any) should be re-raised
+
+    def _take_item(self):
+        # must be called with self._condition acquired
+        if not self._items:
+            return False, None
+        item = self._items.popleft()
+        self._producer_gave_up = False
+        self._condition.notify_all()  # producer may wait for free place
+        return True, item
+
+    def _wake_up_consumer(self):
+        # must be called with self._condition acquired
+        self._condition.notify_all()
+
+    def _wait_for_free_place(self):
+        # must be called with self._condition acquired
+        end_time = time.time() + self.put_timeout
+        while len(self._items) >= self.maxsize and not self._closed:
+            remain_time = end_time - time.time()
+            if remain_time <= 0:
+                self._producer_gave_up = True
+                return
+            self._condition.wait(remain_time)
+
+
+class StreamsFeeder(object):
+    """
+    Producer side of streams: passes items to all streams still used by consumers.
+
+    Stream is any object with put(item), end() and is_closed() methods (like BoundedStream).
+    """
+
+    def __init__(self):
+        self._streams = list()  # weak references
+        self._lock = threading.Lock()
+
+    def add(self, stream):
+        """
+        :param stream: stream to get next items, referenced weakly.
+        :return: None
+        """
+        with self._lock:
+            self._streams.append(weakref.ref(stream))
+
+    def remove(self, stream):
+        """
+        :param stream: stream to not get items any more.
+        :return: None
+        """
+        with self._lock:
+            self._streams = [stream_ref for stream_ref in self._streams if stream_ref() not in (None, stream)]
+
+    def put(self, item):
+        """
+        :param item: item to put into all streams.
+        :return: True if there was any stream to put item into (even if stream dropped it), False otherwise.
+        """
+        streams = self._get_streams()
+        for stream in streams:
+            stream.put(item)
+        return len(streams) > 0
+
+    def end(self):
+        """
+        Ends all streams and forgets them. Never blocks.
+
+        :return: None
+        """
+        with self._lock:
+            streams_refs, self._streams = self._streams, list()
+        for stream_ref in streams_refs:
+            stream = stream_ref()
+            if stream is not None:
+                stream.end()
+
+    def __len__(self):
+        return len(self._get_streams())
+
+    def _get_streams(self):
+        with self._lock:
+            streams = [stream_ref() for stream_ref in self._streams]
+        return [stream for stream in streams if stream is not None and not stream.is_closed()]
@@ -18,6 +18,19 @@ def __dummy():
 
 
 _srcfile = os.path.normcase(__dummy.__code__.co_filename)
+_code_inside_loghelper = dict()  # code object -> is it code of this module; normcase() done once per call site
+# (code object, line number) -> (filename, lineno, funcName) of caller; stack walk itself can't be cached since
+# location levels_to_go_up above first frame outside of this module depends on callers chain, not on that frame
+_callers_locations = dict()
+
+
+def _is_inside_loghelper(code):
+    try:
+        return _code_inside_loghelper[code]
+    except KeyError:
+        inside = os.path.normcase(code.co_filename) == _srcfile
+        _code_inside_loghelper[code] = inside
+        return inside
 
 
 def find_caller(levels_to_go_up=0):
@@ -37,8 +50,7 @@ def find_caller(levels_to_go_up=0):
     rv = "(unknown file)", 0, "(unknown function)", None
     while hasattr(f, "f_code"):
         co = f.f_code
-        filename = os.path.normcase(co.co_filename)
-        if filename == _srcfile:
+        if _is_inside_loghelper(co):
             f = f.f_back
             continue
         for lv in range(levels_to_go_up):
@@ -48,11 +60,21 @@ def find_caller(levels_to_go_up=0):
             else:
                 break
 
-        rv = (co.co_filename, f.f_lineno, co.co_name)
+        rv = _caller_location(co, f.f_lineno)
         break
     return rv
 
 
+def _caller_location(code, lineno):
+    key = (code, lineno)
+    try:
+        return _callers_locations[key]
+    except KeyError:
+        location = (code.co_filename, lineno, code.co_name)
+        _callers_locations[key] = location
+        return location
+
+
 def error_into_logger(logger, msg, extra=None, levels_to_go_up=0):
     log_into_logger(logger, logging.ERROR, msg, extra=extra, levels_to_go_up=levels_to_go_up)
 
@@ -69,6 +91,21 @@ def debug_into_logger(logger, msg, extra=None, levels_to_go_up=0):
     log_into_logger(logger, logging.DEBUG, msg, extra=extra, levels_to_go_up=levels_to_go_up)
 
 
+def is_logging_enabled(level, *loggers):
+    """
+    Check if any of loggers would accept record of given level.
+    Use it to not build costly messages (and their extra data) that would be dropped anyway.
+
+    :param level: logging level
+    :param loggers: loggers to check, None is treated as disabled logger
+    :return: True if at least one logger is enabled for level
+    """
+    for logger in loggers:
+        if logger is not None and logger.isEnabledFor(level):
+            return True
+    return False
+
+
 def log_into_logger(logger, level, msg, extra=None, levels_to_go_up=0):
     """
     Log into specific logger
@@ -77,11 +114,13 @@ def log_into_logger(logger, level, msg, extra=None, levels_to_go_up=0):
 
     :param logger: logger to send log record into
     :param level: logging level
-    :param msg: message to be logged
+    :param msg: message to be logged or callable returning message (called only if level is enabled)
     :param levels_to_go_up: 0 - info about function using log_into_logger(), 1 - caller of that function, ...
     :return: None
     """
     if logger.isEnabledFor(level):
+        if callable(msg):
+            msg = msg()
         try:
             fn, lno, func = find_caller(levels_to_go_up)
         except ValueError:  # pragma: no cover
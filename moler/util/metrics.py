@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide registry of hot-path metrics.
+
+Records (when enabled):
+- per connection: bytes and chunks received (ObservableConnection.data_received) and sent (Connection.send),
+- per observer class: number of data notifications, lines processed and time spent inside observer,
+- per runner class: observers waiting for feed to start (queue depth) and submit-to-feed latency.
+Snapshot adds statistics of commands queues of CommandScheduler.
+
+Instrumentation is off by default - disabled metrics cost single flag check per call.
+Snapshot is available as dict or JSON and may be periodically dumped into moler log.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import json
+import logging
+import threading
+import time
+
+import six
+
+_enabled = False
+_metrics_lock = threading.Lock()
+_connections = dict()  # connection name -> [bytes_in, chunks_in, bytes_out, chunks_out]
+_observers = dict()  # observer class name -> [notifications, lines, total_time, max_time]
+_runners = dict()  # runner class name -> [submitted, queue_depth, max_queue_depth, fed, total_latency, max_latency]
+_dumper = None
+
+
+# ------------------------------------ public API
+
+
+def enable_metrics(dump_interval=None):
+    """
+    Turn instrumentation on.
+
+    :param dump_interval: if given, snapshot of metrics is logged (as JSON, into 'moler' logger) every dump_interval
+     seconds by background thread
+    :return: None
+    """
+    global _enabled
+    global _dumper
+    _enabled = True
+    _stop_dumper()
+    if dump_interval:
+        _dumper = _MetricsDumper(interval=dump_interval)
+        _dumper.start()
+
+
+def disable_metrics():
+    """
+    Turn instrumentation off entirely (and stop periodic dump). Already collected metrics are kept.
+
+    :return: None
+    """
+    global _enabled
+    _enabled = False
+    _stop_dumper()
+
+
+def is_metrics_enabled():
+    """Check if instrumentation is on."""
+    return _enabled
+
+
+def reset_metrics():
+    """Forget all collected metrics."""
+    with _metrics_lock:
+        _connections.clear()
+        _observers.clear()
+        _runners.clear()
+
+
+def get_metrics_snapshot():
+    """
+    Return current metrics.
+
+    :return: dict with 'enabled' flag and sections:
+     'connections' - connection name -> 'bytes_in', 'chunks_in', 'bytes_out', 'chunks_out',
+     'observers' - observer class name -> 'notifications', 'lines', 'total_time', 'max_time', 'avg_time',
+     'runners' - runner class name -> 'submitted', 'queue_depth', 'max_queue_depth', 'total_feed_latency',
+     'max_feed_latency', 'avg_feed_latency',
+     'command_scheduler' - connection name -> statistics of commands queue (see CommandScheduler.get_queue_statistics())
+     Times are in float seconds.
+    """
+    from moler.command_scheduler import CommandScheduler  # scheduler uses runners so, import here
+
+    with _metrics_lock:
+        connections = dict((name, {'bytes_in': bytes_in, 'chunks_in': chunks_in,
+                                   'bytes_out': bytes_out, 'chunks_out': chunks_out})
+                           for name, (bytes_in, chunks_in, bytes_out, chunks_out) in _connections.items())
+        observers = dict((name, {'notifications': notifications, 'lines': lines,
+                                 'total_time': total_time, 'max_time': max_time,
+                                 'avg_time': total_time / notifications if notifications else 0.0})
+                         for name, (notifications, lines, total_time, max_time) in _observers.items())
+        runners = dict((name, {'submitted': submitted, 'queue_depth': queue_depth,
+                               'max_queue_depth': max_queue_depth,
+                               'total_feed_latency': total_latency, 'max_feed_latency': max_latency,
+                               'avg_feed_latency': total_latency / fed if fed else 0.0})
+                       for name, (submitted, queue_depth, max_queue_depth, fed, total_latency, max_latency)
+                       in _runners.items())
+    return {
+        'enabled': _enabled,
+        'connections': connections,
+        'observers': observers,
+        'runners': runners,
+        'command_scheduler': CommandScheduler.get_all_queues_statistics(),
+    }
+
+
+def get_metrics_json(**json_kwargs):
+    """
+    Return current metrics as JSON string (see get_metrics_snapshot()).
+
+    :param json_kwargs: parameters passed to json.dumps() like indent
+    """
+    return json.dumps(get_metrics_snapshot(), sort_keys=True, **json_kwargs)
+
+
+def dump_metrics(logger=None, level=logging.INFO):
+    """
+    Log current metrics as JSON.
+
+    :param logger: logger to log into, 'moler' logger if not given
+    :param level: logging level
+    :return: None
+    """
+    if logger is None:
+        logger = logging.getLogger('moler')
+    logger.log(level, "metrics: {}".format(get_metrics_json()))
+
+
+# ------------------------------------ instrumentation points
+
+
+def connection_data_received(connection_name, data):
+    if not _enabled:
+        return
+    with _metrics_lock:
+        connection_metrics = _connection_metrics(connection_name)
+        connection_metrics[0] += len(data)
+        connection_metrics[1] += 1
+
+
+def connection_data_sent(connection_name, data):
+    if not _enabled:
+        return
+    with _metrics_lock:
+        connection_metrics = _connection_metrics(connection_name)
+        connection_metrics[2] += len(data)
+        connection_metrics[3] += 1
+
+
+def observer_data_processed(connection_observer, data, line_oriented, duration):
+    """
+    :param connection_observer: observer that processed data
+    :param data: data passed to observer - tuple of lines if observer is line oriented, raw data otherwise
+    :param line_oriented: True if observer got data split into lines
+    :param duration: time [sec] spent by observer on that data
+    """
+    if not _enabled:
+        return
+    if line_oriented:
+        lines_nb = len(data)
+    elif isinstance(data, six.string_types):
+        lines_nb = data.count("\n")
+    else:
+        lines_nb = 0
+    name = connection_observer.__class__.__name__
+    with _metrics_lock:
+        if name not in _observers:
+            _observers[name] = [0, 0, 0.0, 0.0]
+        observer_metrics = _observers[name]
+        observer_metrics[0] += 1
+        observer_metrics[1] += lines_nb
+        observer_metrics[2] += duration
+        if duration > observer_metrics[3]:
+            observer_metrics[3] = duration
+
+
+def runner_observer_submitted(runner):
+    """
+    :param runner: runner that got observer
+    :return: submit time to pass into runner_feed_started() or None if metrics are disabled
+    """
+    if not _enabled:
+        return None
+    with _metrics_lock:
+        runner_metrics = _runner_metrics(runner)
+        runner_metrics[0] += 1
+        runner_metrics[1] += 1
+        if runner_metrics[1] > runner_metrics[2]:
+            runner_metrics[2] = runner_metrics[1]
+    return time.time()
+
+
+def runner_feed_started(runner, submit_time):
+    """
+    :param runner: runner feeding observer
+    :param submit_time: value returned by runner_observer_submitted(), None means observer was not counted
+    """
+    if submit_time is None:
+        return
+    latency = time.time() - submit_time
+    with _metrics_lock:
+        runner_metrics = _runner_metrics(runner)
+        runner_metrics[1] = max(runner_metrics[1] - 1, 0)  # may be reset in meantime
+        runner_metrics[3] += 1
+        runner_metrics[4] += latency
+        if latency > runner_metrics[5]:
+            runner_metrics[5] = latency
+
+
+# ------------------------------------ implementation
+
+
+def _connection_metrics(connection_name):
+    if connection_name not in _connections:
+        _connections[connection_name] = [0, 0, 0, 0]
+    return _connections[connection_name]
+
+
+def _runner_metrics(runner):
+    name = runner.__class__.__name__
+    if name not in _runners:
+        _runners[name] = [0, 0, 0, 0, 0.0, 0.0]
+    return _runners[name]
+
+
+def _stop_dumper():
+    global _dumper
+    if _dumper is not None:
+        _dumper.stop()
+        _dumper = None
+
+
+class _MetricsDumper(threading.Thread):
+    """Logs snapshot of metrics every interval."""
+
+    def __init__(self, interval):
+        super(_MetricsDumper, self).__init__(name="MolerMetricsDumper")
+        self.daemon = True
+        self.interval = interval
+        self._stop_requested = threading.Event()
+
+    def run(self):
+        while not self._stop_requested.wait(self.interval):
+            try:
+                dump_metrics()
+            except Exception:
+                logging.getLogger('moler').exception("can't dump metrics")
+
+    def stop(self):
+        self._stop_requested.set()
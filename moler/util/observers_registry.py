@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide registry of commands and events available in packages.
+
+Maps observer names (like 'ip_addr') into class fullnames (like 'moler.cmd.unix.ip_addr.IpAddr').
+Modules of package are not imported to build that map - their source code is parsed and classes are registered
+if their bases (followed via imports of modules) lead to ConnectionObserver. Module with class which can't be
+resolved that way (base or observer_name computed at runtime) is imported and inspected.
+Module of observer is imported when observer is instantiated (see moler.instance_loader).
+Map of package is built once per process and may be persisted into manifest file (see set_manifest_path())
+to not parse sources in next processes as long as files of package are not changed.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import ast
+import importlib
+import inspect
+import io
+import json
+import logging
+import os
+import pkgutil
+import sys
+import threading
+
+import six
+
+from moler.helpers import camel_case_to_lower_case_underscore
+
+_registry_lock = threading.Lock()
+_observers_of_package = dict()  # package name -> {observer name: class fullname}
+_modules_sources = dict()  # module name -> _ModuleSource, also of modules with base classes
+_manifest_path = None
+_observer_base_class = ('moler.connection_observer', 'ConnectionObserver')
+_dynamic_observer_name = object()  # observer_name of class set by code other than string literal
+
+
+# ------------------------------------ public API
+
+
+def get_observers_of_package(package_name):
+    """
+    Return observers (commands or events) defined in modules of package.
+
+    :param package_name: name of package like 'moler.cmd.unix'
+    :return: dict {observer_name: class_fullname}, must not be modified by caller
+    """
+    try:
+        return _observers_of_package[package_name]
+    except KeyError:
+        pass
+    with _registry_lock:
+        if package_name not in _observers_of_package:
+            _observers_of_package[package_name] = _load_observers_of_package(package_name)
+        return _observers_of_package[package_name]
+
+
+def set_manifest_path(manifest_path):
+    """
+    Set path of manifest file where observers of packages are persisted between processes.
+
+    :param manifest_path: path to json file, None means: don't persist
+    :return: None
+    """
+    global _manifest_path
+    _manifest_path = manifest_path
+
+
+def clear():
+    """Forget observers of all packages (they will be discovered again at next get_observers_of_package())."""
+    with _registry_lock:
+        _observers_of_package.clear()
+        _modules_sources.clear()
+
+
+# ------------------------------------ implementation
+
+
+def _load_observers_of_package(package_name):
+    package = importlib.import_module(package_name)  # just __init__ of package, not its modules
+    modules = _modules_of_package(package)
+    signature = [[modname, os.path.getmtime(path), os.path.getsize(path)] for modname, path in modules
+                 if path is not None]
+    manifest = _read_manifest()
+    package_manifest = manifest.get(package_name)
+    if package_manifest and package_manifest.get('signature') == signature:
+        return package_manifest['observers']
+    observers = dict()
+    for modname, path in modules:
+        module_name = "{}.{}".format(package_name, modname)
+        if path is None:  # no source code, fallback to import
+            observers.update(_observers_from_module_import(module_name))
+        else:
+            observers.update(_observers_from_module_source(module_name, path))
+    if _manifest_path:
+        manifest[package_name] = {'signature': signature, 'observers': observers}
+        _write_manifest(manifest)
+    return observers
+
+
+def _modules_of_package(package):
+    """Return list of (modname, path of source or None) of modules directly inside package."""
+    modules = list()
+    for importer, modname, is_pkg in pkgutil.iter_modules(package.__path__):
+        path = None
+        if hasattr(importer, 'path'):
+            if is_pkg:
+                path = os.path.join(importer.path, modname, '__init__.py')
+            else:
+                path = os.path.join(importer.path, '{}.py'.format(modname))
+            if not os.path.isfile(path):
+                path = None
+        modules.append((modname, path))
+    return sorted(modules)
+
+
+def _observers_from_module_source(module_name, path):
+    module_source = _get_module_source(module_name, path)
+    observers = dict()
+    try:
+        for class_name in module_source.classes:
+            is_observer, observer_name = _resolve_class(module_name, class_name)
+            if is_observer:
+                # like:  IpAddr --> ip_addr  (the same as default ConnectionObserver.observer_name)
+                if observer_name is None:
+                    observer_name = camel_case_to_lower_case_underscore(class_name)
+                # like:  IpAddr --> moler.cmd.unix.ip_addr.IpAddr
+                observers[observer_name] = "{}.{}".format(module_name, class_name)
+    except _UnresolvedClass:
+        return _observers_from_module_import(module_name)
+    return observers
+
+
+class _UnresolvedClass(Exception):
+    """Class can't be resolved from source code."""
+
+
+class _ModuleSource(object):
+    """Classes and imports defined in source code of module."""
+
+    def __init__(self, module_name, tree, is_package):
+        self.module_name = module_name
+        self.classes = dict()  # class name -> ([dotted names of bases or None if not a name], observer_name)
+        self.imports = dict()  # name in module -> dotted name of imported module or object
+        if is_package:
+            self._package_name = module_name
+        else:
+            self._package_name = module_name.rpartition('.')[0]
+        self._collect(tree.body)
+
+    def resolve_name(self, dotted_name):
+        """
+        :param dotted_name: name used inside module like 'Command' or 'moler.command.Command'
+        :return: (module name, class name) of class or None for builtin class (can't be observer)
+        """
+        if dotted_name is None:
+            raise _UnresolvedClass(self.module_name)
+        head, _, rest = dotted_name.partition('.')
+        if not rest and head in self.classes:
+            return self.module_name, head
+        if head in self.imports:
+            module_name, _, class_name = "{}.{}".format(self.imports[head], rest).rstrip('.').rpartition('.')
+            return module_name, class_name
+        if not rest and head in _builtin_names:
+            return None
+        raise _UnresolvedClass("{}.{}".format(self.module_name, dotted_name))
+
+    def _collect(self, statements):
+        for statement in statements:
+            if isinstance(statement, ast.ClassDef):
+                bases = [_dotted_name(base) for base in statement.bases]
+                self.classes[statement.name] = (bases, _observer_name_of(statement))
+            elif isinstance(statement, ast.Import):
+                self._collect_import(statement)
+            elif isinstance(statement, ast.ImportFrom):
+                from_module = self._absolute_module_name(statement)
+                for alias in statement.names:
+                    self.imports[alias.asname or alias.name] = "{}.{}".format(from_module, alias.name)
+            else:
+                self._collect(_nested_statements(statement))
+
+    def _collect_import(self, import_statement):
+        for alias in import_statement.names:
+            if alias.asname:
+                self.imports[alias.asname] = alias.name
+            else:
+                head = alias.name.partition('.')[0]
+                self.imports[head] = head
+
+    def _absolute_module_name(self, import_from):
+        if not import_from.level:
+            return import_from.module
+        package_name = self._package_name
+        for _ in range(import_from.level - 1):
+            package_name = package_name.rpartition('.')[0]
+        if import_from.module:
+            return "{}.{}".format(package_name, import_from.module)
+        return package_name
+
+
+_builtin_names = frozenset(dir(six.moves.builtins))
+
+
+def _nested_statements(statement):
+    """Return statements of if/try block (may define classes or import names), empty list for other statement."""
+    if isinstance(statement, ast.If):
+        return statement.body + statement.orelse
+    if hasattr(ast, 'Try') and isinstance(statement, ast.Try) or \
+            hasattr(ast, 'TryExcept') and isinstance(statement, ast.TryExcept):
+        nested = statement.body + statement.orelse
+        for handler in statement.handlers:
+            nested.extend(handler.body)
+        return nested
+    return []
+
+
+def _dotted_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        owner_name = _dotted_name(node.value)
+        if owner_name is not None:
+            return "{}.{}".format(owner_name, node.attr)
+    return None  # like: six.with_metaclass(...)
+
+
+def _observer_name_of(class_def):
+    """Return observer_name assigned in body of class, None if not assigned."""
+    observer_name = None
+    for statement in class_def.body:
+        if isinstance(statement, (ast.FunctionDef, ast.ClassDef)) and statement.name == 'observer_name':
+            observer_name = _dynamic_observer_name
+        elif isinstance(statement, ast.Assign) and \
+                any(getattr(target, 'id', None) == 'observer_name' for target in statement.targets):
+            observer_name = _dynamic_observer_name
+            if _is_string_literal(statement.value):
+                observer_name = statement.value.s if hasattr(ast, 'Str') and isinstance(statement.value, ast.Str) \
+                    else statement.value.value
+    return observer_name
+
+
+def _is_string_literal(node):
+    if hasattr(ast, 'Constant') and isinstance(node, ast.Constant):  # Python 3.8+
+        return isinstance(node.value, six.string_types)
+    return hasattr(ast, 'Str') and isinstance(node, ast.Str)
+
+
+def _get_module_source(module_name, path=None):
+    if module_name not in _modules_sources:
+        if path is None:
+            path = _find_module_path(module_name)
+        if path is None or not path.endswith('.py'):
+            raise _UnresolvedClass(module_name)
+        with io.open(path, 'rb') as source_file:
+            tree = ast.parse(source_file.read(), filename=path)
+        is_package = os.path.basename(path) == '__init__.py'
+        _modules_sources[module_name] = _ModuleSource(module_name=module_name, tree=tree, is_package=is_package)
+    return _modules_sources[module_name]
+
+
+def _find_module_path(module_name):
+    try:
+        try:
+            from importlib.util import find_spec
+        except ImportError:  # Python 2
+            loader = pkgutil.find_loader(module_name)
+            return loader.get_filename() if hasattr(loader, 'get_filename') else None
+        spec = find_spec(module_name)  # imports parent packages (just their __init__)
+        return spec.origin if spec is not None else None
+    except ImportError:
+        return None
+
+
+def _resolve_class(module_name, class_name, resolved_subclasses=()):
+    """
+    Check if class is observer without importing module of class (unless module is already imported).
+
+    :return: tuple (True if class is ConnectionObserver, observer_name if set by class or its bases else None)
+    """
+    if (module_name, class_name) == _observer_base_class:
+        return True, None
+    if (module_name, class_name) in resolved_subclasses:  # cycle of names, not real classes
+        raise _UnresolvedClass("{}.{}".format(module_name, class_name))
+    module_source = _get_parsed_module_source(module_name)
+    if module_source is None:
+        return _resolve_class_by_import(module_name, class_name)
+    if class_name not in module_source.classes:  # class imported into module
+        return _resolve_name_of_module(module_source, class_name, resolved_subclasses)
+    bases, observer_name = module_source.classes[class_name]
+    is_observer, bases_observer_names = _resolve_bases(module_source, bases,
+                                                       resolved_subclasses + ((module_name, class_name),))
+    if not is_observer:
+        return False, None
+    return True, _inherited_observer_name(module_name, class_name, observer_name, bases_observer_names)
+
+
+def _get_parsed_module_source(module_name):
+    """Return source of module, None if module is imported already (and not parsed) or it has no source code."""
+    if module_name not in _modules_sources and module_name in sys.modules:
+        return None
+    try:
+        return _get_module_source(module_name)
+    except _UnresolvedClass:  # no source code
+        return None
+
+
+def _resolve_class_by_import(module_name, class_name):
+    try:
+        module = importlib.import_module(module_name)  # just taken from sys.modules if imported already
+    except ImportError:
+        raise _UnresolvedClass(module_name)
+    return _resolve_imported_class(getattr(module, class_name, None))
+
+
+def _resolve_name_of_module(module_source, dotted_name, resolved_subclasses):
+    """Resolve class by name used inside module (name of base class or class imported into module)."""
+    class_location = module_source.resolve_name(dotted_name)
+    if class_location is None:  # builtin class
+        return False, None
+    return _resolve_class(class_location[0], class_location[1], resolved_subclasses)
+
+
+def _resolve_bases(module_source, bases, resolved_subclasses):
+    """
+    :return: tuple (True if any of bases is ConnectionObserver, set of observer_names set by observer bases)
+    """
+    is_observer = False
+    bases_observer_names = set()
+    for base in bases:
+        base_is_observer, base_observer_name = _resolve_name_of_module(module_source, base, resolved_subclasses)
+        if base_is_observer:
+            is_observer = True
+            if base_observer_name is not None:
+                bases_observer_names.add(base_observer_name)
+    return is_observer, bases_observer_names
+
+
+def _inherited_observer_name(module_name, class_name, observer_name, bases_observer_names):
+    if observer_name is None:
+        if len(bases_observer_names) > 1:  # taken from first in MRO
+            raise _UnresolvedClass("{}.{}".format(module_name, class_name))
+        observer_name = bases_observer_names.pop() if bases_observer_names else None
+    if observer_name is _dynamic_observer_name:
+        raise _UnresolvedClass("{}.{}".format(module_name, class_name))
+    return observer_name
+
+
+def _resolve_imported_class(class_obj):
+    from moler.connection_observer import ConnectionObserver
+
+    if not inspect.isclass(class_obj):
+        raise _UnresolvedClass(class_obj)
+    if not issubclass(class_obj, ConnectionObserver):
+        return False, None
+    for mro_class in class_obj.__mro__:
+        if 'observer_name' in vars(mro_class):
+            if mro_class is ConnectionObserver:
+                break  # default one, subclass will have its own default
+            return True, class_obj.observer_name
+    return True, None
+
+
+def _observers_from_module_import(module_name):
+    from moler.connection_observer import ConnectionObserver
+
+    module = importlib.import_module(module_name)
+    observers = dict()
+    for class_name, class_obj in inspect.getmembers(module, inspect.isclass):
+        if class_obj.__module__ == module_name and issubclass(class_obj, ConnectionObserver):
+            observers[class_obj.observer_name] = "{}.{}".format(module_name, class_name)
+    return observers
+
+
+def _read_manifest():
+    if not _manifest_path or not os.path.isfile(_manifest_path):
+        return dict()
+    try:
+        with io.open(_manifest_path, 'r', encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except (IOError, ValueError) as err:
+        logging.getLogger('moler').warning("Can't read observers manifest {}: {}".format(_manifest_path, err))
+        return dict()
+
+
+def _write_manifest(manifest):
+    tmp_path = "{}.{}.tmp".format(_manifest_path, os.getpid())
+    try:
+        with open(tmp_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+        if os.path.exists(_manifest_path):
+            os.remove(_manifest_path)
+        os.rename(tmp_path, _manifest_path)
+    except (IOError, OSError) as err:
+        logging.getLogger('moler').warning("Can't write observers manifest {}: {}".format(_manifest_path, err))
@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+"""
+Regex cost profiler of command and event parsers.
+
+Documented outputs of commands and events (COMMAND_OUTPUT*/EVENT_OUTPUT* walked like moler.util.cmds_events_doc)
+are replayed given number of times directly into parsers (no connection IO, no runner).
+Time is attributed to:
+- compiled patterns - class-level ones (like _re_*) and ones kept by instances (like _re_prompt, _cmd_escaped)
+  are replaced by timing proxies for time of profiling; patterns given to re module functions are timed too,
+- on_new_line() of profiled classes (whole parsing of line, so including its patterns and proxies overhead).
+Each output is also replayed with its lines repeated (enlargement 'lines') and with its lines widened
+(enlargement 'width'). Growth of time is given as exponent: 1.0 means linear growth with size of input.
+Patterns and parsers growing faster than threshold are flagged as super-linear.
+
+Usage:
+    python -m moler.util.parsers_profiler -p moler/cmd -p moler/events [--repeat 10] [--top 30]
+    [--scale 8] [--threshold 1.5] [--json report.json] [--fail-on-super-linear]
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import json
+import math
+import re
+import sys
+import time
+from argparse import ArgumentParser
+
+from moler.command import Command
+from moler.event import Event
+from moler.util.cmds_events_doc import _walk_moler_nonabstract_commands, _retrieve_command_documentation
+from moler.util.cmds_events_doc import _get_doc_variant, check_cmd_or_event
+
+_pattern_type = type(re.compile(""))
+_timed_methods = ('search', 'match', 'fullmatch', 'findall', 'finditer', 'sub', 'subn', 'split')
+_enlargements = ('lines', 'width')
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+def profile_parsers(paths, repeat=10, scale=8, threshold=1.5, min_duration=0.0001):
+    """
+    Profile parsers of all commands/events having documented outputs inside given directories.
+
+    :param paths: list of paths to directories of commands or events ('moler/cmd', 'moler/events')
+    :param repeat: how many times each documented output is replayed
+    :param scale: how many times enlarged outputs are bigger
+    :param threshold: growth exponent above which pattern/parser is flagged as super-linear
+    :param min_duration: time [sec] of enlarged replay below which growth is treated as noise
+    :return: report - dict with 'patterns', 'parsers', 'super_linear' and 'errors'
+    """
+    profiler = ParsersProfiler(repeat=repeat, scale=scale, threshold=threshold, min_duration=min_duration)
+    for path in paths:
+        observer_type, base_class = check_cmd_or_event(path)
+        for moler_module, moler_class in _walk_moler_nonabstract_commands(path=path, base_class=base_class):
+            test_data = _retrieve_command_documentation(moler_module, observer_type)
+            for variant in sorted(test_data):
+                try:
+                    output, kwargs, _ = _get_doc_variant(test_data, variant, observer_type)
+                except KeyError:
+                    continue  # inconsistent documentation is reported by cmds_events_doc
+                profiler.profile(moler_class, output=output, kwargs=kwargs, variant=variant)
+    return profiler.get_report()
+
+
+def format_report(report, top=20):
+    """
+    Format report of profile_parsers() as ranked tables.
+
+    :param report: report returned by profile_parsers()
+    :param top: number of most expensive patterns and parsers shown
+    :return: str
+    """
+    lines = list()
+    for section, title in (('patterns', 'Patterns'), ('parsers', 'Parsers (on_new_line)')):
+        lines.append("{} ranked by total time:".format(title))
+        lines.append("{:>4} {:>11} {:>8} {:>9} {:>9} {:>7} {:>7}  {}".format(
+            "rank", "total [ms]", "calls", "avg [us]", "max [us]", "lines", "width", "name"))
+        ranked = sorted(report[section].items(), key=lambda item: item[1]['total_time'], reverse=True)
+        for rank, (name, stats) in enumerate(ranked[:top], 1):
+            lines.append("{:>4} {:>11.3f} {:>8} {:>9.2f} {:>9.2f} {:>7} {:>7}  {}".format(
+                rank, stats['total_time'] * 1000, stats['calls'], stats['total_time'] * 1e6 / max(stats['calls'], 1),
+                stats['max_time'] * 1e6, _format_growth(stats['growth']['lines']),
+                _format_growth(stats['growth']['width']), name))
+        lines.append("")
+    lines.append("Super-linear (growth > {}):".format(report['threshold']))
+    for flagged in report['super_linear']:
+        lines.append("    {name} growth {growth:.2f} on '{enlargement}' enlargement of {fixture}".format(**flagged))
+    if not report['super_linear']:
+        lines.append("    none")
+    if report['errors']:
+        lines.append("")
+        lines.append("Errors:")
+        lines.extend("    {}".format(error) for error in report['errors'])
+    return "\n".join(lines)
+
+
+class ParsersProfiler(object):
+    """Replays outputs through parsers of commands/events collecting time of patterns and on_new_line()."""
+
+    def __init__(self, repeat=10, scale=8, threshold=1.5, min_duration=0.0001):
+        """
+        :param repeat: how many times each output is replayed
+        :param scale: how many times enlarged outputs are bigger
+        :param threshold: growth exponent above which pattern/parser is flagged as super-linear
+        :param min_duration: time [sec] of enlarged replay below which growth is treated as noise
+        """
+        self.repeat = repeat
+        self.scale = scale
+        self.threshold = threshold
+        self.min_duration = min_duration
+        self._patterns = dict()  # name -> {'pattern', 'calls', 'total_time', 'max_time', 'growth'}
+        self._parsers = dict()  # name -> {'calls', 'total_time', 'max_time', 'growth'}
+        self._super_linear = list()
+        self._errors = list()
+        self._samples = None  # (pattern samples, parser samples) of current replay: name -> [calls, time, max_time]
+
+    def profile(self, moler_class, output, kwargs, variant=""):
+        """
+        Profile parser of given command/event class on given output.
+
+        :param moler_class: class of command or event
+        :param output: output of device as documented by COMMAND_OUTPUT/EVENT_OUTPUT
+        :param kwargs: parameters of command/event as documented by COMMAND_KWARGS/EVENT_KWARGS
+        :param variant: variant of documentation (suffix of COMMAND_OUTPUT)
+        :return: None
+        """
+        fixture = "{}{}".format(moler_class.__name__, variant)
+        patched_classes = _patch_class_patterns(moler_class)
+        try:
+            body_lines = self._find_body_lines(moler_class, output, kwargs)
+            samples = [self._replay(moler_class, output, kwargs) for _ in range(self.repeat)]
+            self._add_samples(samples)
+            for enlargement in _enlargements:
+                if body_lines is not None:
+                    self._measure_growth(moler_class, output, kwargs, body_lines, enlargement, fixture)
+        except Exception as err:
+            self._errors.append("{}: {!r}".format(fixture, err))
+        finally:
+            _restore_class_patterns(patched_classes)
+
+    def get_report(self):
+        """
+        :return: dict with 'patterns', 'parsers' (name -> statistics), 'super_linear' (flagged growths),
+         'errors' and 'threshold'
+        """
+        return {'patterns': self._patterns, 'parsers': self._parsers, 'super_linear': self._super_linear,
+                'errors': self._errors, 'threshold': self.threshold}
+
+    def _replay(self, moler_class, output, kwargs):
+        """Feed output line by line into new observer, return its samples (pattern samples, parser samples)."""
+        observer = self._create_observer(moler_class, kwargs)
+        self._samples = (dict(), dict())
+        patched_re = _patch_re_functions(self)
+        try:
+            for line in output.splitlines(True):
+                if observer.done():
+                    break
+                try:
+                    observer.data_received(line)
+                except Exception:
+                    pass  # enlarged output may not be parsable, its time is what matters
+        finally:
+            _restore_re_functions(patched_re)
+            samples, self._samples = self._samples, None
+        return samples
+
+    def _create_observer(self, moler_class, kwargs):
+        from moler.observable_connection import ObservableConnection
+
+        connection = ObservableConnection(how2send=lambda data: None, name="parsers_profiler")
+        observer = moler_class(connection=connection, **kwargs)
+        if isinstance(observer, Command):
+            _ = observer.command_string  # builds _cmd_escaped
+        elif isinstance(observer, Event):
+            observer.till_occurs_times = -1  # enlarged output must not stop event
+        for name, value in list(vars(observer).items()):
+            if isinstance(value, _pattern_type):
+                setattr(observer, name, _TimedPattern(value, "{}.{}".format(moler_class.__name__, name), self))
+        if hasattr(observer, 'on_new_line'):
+            observer.on_new_line = _timed_on_new_line(observer.on_new_line, moler_class.__name__, self)
+        return observer
+
+    def _find_body_lines(self, moler_class, output, kwargs):
+        """Return (first, last) indexes of lines of output that may be enlarged or None if there are none."""
+        lines = output.splitlines(True)
+        first, last = 0, len(lines)
+        if issubclass(moler_class, Command):
+            command = self._create_observer(moler_class, kwargs)
+            cmd_escaped = getattr(command, '_cmd_escaped', None)
+            if cmd_escaped is None:
+                return None  # not textual command, we don't know where its output starts
+            echoes = [index for index, line in enumerate(lines) if cmd_escaped.search(line)]
+            if not echoes:
+                return None
+            first, last = echoes[0] + 1, last - 1  # without echo of command and final prompt
+        if first >= last:
+            return None
+        return first, last
+
+    def _measure_growth(self, moler_class, output, kwargs, body_lines, enlargement, fixture):
+        base_samples = [self._replay(moler_class, _enlarge(output, body_lines, enlargement, 1), kwargs)
+                        for _ in range(self.repeat)]
+        enlarged_output = _enlarge(output, body_lines, enlargement, self.scale)
+        enlarged_samples = [self._replay(moler_class, enlarged_output, kwargs) for _ in range(self.repeat)]
+        for index, stats in ((0, self._patterns), (1, self._parsers)):
+            base_times = _min_times([samples[index] for samples in base_samples])
+            enlarged_times = _min_times([samples[index] for samples in enlarged_samples])
+            for name, enlarged_time in enlarged_times.items():
+                base_time = base_times.get(name)
+                if not base_time or name not in stats:
+                    continue
+                growth = math.log(max(enlarged_time, 1e-12) / base_time) / math.log(self.scale)
+                if stats[name]['growth'][enlargement] is None or growth > stats[name]['growth'][enlargement]:
+                    stats[name]['growth'][enlargement] = growth
+                if growth > self.threshold and enlarged_time >= self.min_duration:
+                    self._super_linear.append({'name': name, 'fixture': fixture, 'enlargement': enlargement,
+                                               'growth': growth})
+
+    def _add_samples(self, samples):
+        for pattern_samples, parser_samples in samples:
+            for samples_of_kind, stats in ((pattern_samples, self._patterns), (parser_samples, self._parsers)):
+                for name, (calls, total_time, max_time, pattern) in samples_of_kind.items():
+                    if name not in stats:
+                        stats[name] = {'calls': 0, 'total_time': 0.0, 'max_time': 0.0,
+                                       'growth': dict((enlargement, None) for enlargement in _enlargements)}
+                        if pattern is not None:
+                            stats[name]['pattern'] = pattern
+                    stats[name]['calls'] += calls
+                    stats[name]['total_time'] += total_time
+                    stats[name]['max_time'] = max(stats[name]['max_time'], max_time)
+
+    def _record(self, kind, name, duration, pattern=None):
+        if self._samples is None:
+            return  # pattern used outside of replay (like by constructor of observer)
+        samples = self._samples[kind]
+        if name not in samples:
+            samples[name] = [0, 0.0, 0.0, pattern]
+        sample = samples[name]
+        sample[0] += 1
+        sample[1] += duration
+        if duration > sample[2]:
+            sample[2] = duration
+
+    def _record_pattern(self, name, pattern, duration):
+        self._record(0, name, duration, pattern)
+
+    def _record_parser(self, name, duration):
+        self._record(1, name, duration)
+
+
+class _TimedPattern(object):
+    """Proxy of compiled pattern measuring time of its matching methods."""
+
+    def __init__(self, compiled, name, profiler):
+        self._compiled = compiled
+        self._name = name
+        self._profiler = profiler
+
+    def __getattr__(self, attr_name):
+        attr = getattr(self._compiled, attr_name)
+        if attr_name not in _timed_methods:
+            return attr
+
+        def timed_method(*args, **kwargs):
+            start_time = _clock()
+            result = attr(*args, **kwargs)
+            if attr_name == 'finditer':
+                result = iter(list(result))
+            self._profiler._record_pattern(self._name, self._compiled.pattern, _clock() - start_time)
+            return result
+
+        return timed_method
+
+    def __repr__(self):
+        return repr(self._compiled)
+
+
+def _timed_on_new_line(on_new_line, name, profiler):
+    name = "{}.on_new_line".format(name)
+
+    def timed_on_new_line(line, is_full_line):
+        start_time = _clock()
+        try:
+            return on_new_line(line=line, is_full_line=is_full_line)
+        finally:
+            profiler._record_parser(name, _clock() - start_time)
+
+    return timed_on_new_line
+
+
+def _timed_re_function(function, profiler):
+    def timed_function(pattern, *args, **kwargs):
+        if isinstance(pattern, _TimedPattern):
+            return getattr(pattern, function.__name__)(*args, **kwargs)
+        start_time = _clock()
+        result = function(pattern, *args, **kwargs)
+        if function.__name__ == 'finditer':
+            result = iter(list(result))
+        pattern_text = getattr(pattern, 'pattern', pattern)
+        profiler._record_pattern("re.{}({!r})".format(function.__name__, pattern_text), pattern_text,
+                                 _clock() - start_time)
+        return result
+
+    return timed_function
+
+
+def _patch_class_patterns(moler_class):
+    """Replace compiled patterns of classes in hierarchy by timing proxies, return what to restore."""
+    patched = list()
+    for cls in moler_class.__mro__:
+        for name, value in list(cls.__dict__.items()):
+            if isinstance(value, _pattern_type):
+                patched.append((cls, name, value))
+                setattr(cls, name, _TimedPattern(value, "{}.{}".format(cls.__name__, name), _profiler_proxy))
+    return patched
+
+
+def _restore_class_patterns(patched):
+    for cls, name, value in patched:
+        setattr(cls, name, value)
+
+
+def _patch_re_functions(profiler):
+    """Time re module functions (and moler.cmd.RegexHelper ones imported from re), return what to restore."""
+    import moler.cmd
+
+    _profiler_proxy.profiler = profiler
+    patched = list()
+    for module in (re, moler.cmd):
+        for name in _timed_methods:
+            function = module.__dict__.get(name)
+            if function is not None:
+                patched.append((module, name, function))
+                setattr(module, name, _timed_re_function(function, profiler))
+    return patched
+
+
+def _restore_re_functions(patched):
+    _profiler_proxy.profiler = None
+    for module, name, function in patched:
+        setattr(module, name, function)
+
+
+class _ProfilerProxy(object):
+    """Passes records of class-level patterns to profiler running replay (they are shared by all replays)."""
+
+    profiler = None
+
+    def _record_pattern(self, name, pattern, duration):
+        if self.profiler is not None:
+            self.profiler._record_pattern(name, pattern, duration)
+
+
+_profiler_proxy = _ProfilerProxy()
+
+
+def _enlarge(output, body_lines, enlargement, scale):
+    lines = output.splitlines(True)
+    first, last = body_lines
+    body = lines[first:last]
+    if enlargement == 'lines':
+        body = body * scale
+    else:
+        body = [_widen(line, scale) for line in body]
+    return "".join(lines[:first] + body + lines[last:])
+
+
+def _widen(line, scale):
+    content = line.rstrip("\r\n")
+    return " ".join([content] * scale) + line[len(content):]
+
+
+def _min_times(samples_of_replays):
+    """Minimal (least disturbed) time of each name over replays."""
+    times = dict()
+    for samples in samples_of_replays:
+        for name, sample in samples.items():
+            if name not in times or sample[1] < times[name]:
+                times[name] = sample[1]
+    return times
+
+
+def _format_growth(growth):
+    return "-" if growth is None else "{:.2f}".format(growth)
+
+
+def main(args=None):
+    parser = ArgumentParser(description="Profile regular expressions of Moler's commands and events parsers")
+    parser.add_argument('-p', '--path', action='append', required=True,
+                        help='directory of commands or events (moler/cmd, moler/events), may be repeated')
+    parser.add_argument('--repeat', type=int, default=10, help='replays of each documented output')
+    parser.add_argument('--scale', type=int, default=8, help='how many times enlarged outputs are bigger')
+    parser.add_argument('--threshold', type=float, default=1.5, help='growth exponent flagged as super-linear')
+    parser.add_argument('--top', type=int, default=30, help='number of ranked patterns and parsers shown')
+    parser.add_argument('--json', help='file to store whole report as JSON')
+    parser.add_argument('--fail-on-super-linear', action='store_true',
+                        help='exit with status 1 if any pattern or parser is super-linear')
+    options = parser.parse_args(args)
+
+    report = profile_parsers(paths=options.path, repeat=options.repeat, scale=options.scale,
+                             threshold=options.threshold)
+    print(format_report(report, top=options.top))
+    if options.json:
+        with open(options.json, 'w') as json_file:
+            json.dump(report, json_file, indent=2, sort_keys=True)
+    if options.fail_on_super_linear and report['super_linear']:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of creation of UnixRemote devices (memory connection) with commands and events of all device states
+collected by observers registry versus importing and inspecting all modules of packages for each device
+(as done before observers registry).
+
+Usage:
+    python test/benchmarks/bench_devices_creation.py [--devices 1 50 500]
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import argparse
+import importlib
+import inspect
+import pkgutil
+import subprocess
+import sys
+import time
+
+from moler.device.textualdevice import TextualDevice
+from moler.device.unixremote import UnixRemote
+from moler.util import observers_registry
+from moler.util.loghelper import disabled_logging
+
+_sm_params = {
+    'CONNECTION_HOPS': {
+        'UNIX_LOCAL': {
+            'UNIX_REMOTE': {
+                'execute_command': 'ssh',
+                'command_params': {'expected_prompt': 'remote#', 'host': 'remote_host', 'login': 'remote_login',
+                                   'password': 'passwd', 'set_timeout': None}}}}}
+
+
+def load_observers_by_import(device, package_name):
+    """Observers of package found by importing and inspecting all its modules (scan done before registry)."""
+    available_observers = dict()
+    basic_module = importlib.import_module(package_name)
+    for _, modname, _ in pkgutil.iter_modules(basic_module.__path__):
+        module_name = "{}.{}".format(package_name, modname)
+        module = importlib.import_module(module_name)
+        for class_name, class_obj in inspect.getmembers(module, inspect.isclass):
+            if class_obj.__module__ == module_name and hasattr(class_obj, 'observer_name'):
+                available_observers[class_obj.observer_name] = "{}.{}".format(module_name, class_name)
+    return available_observers
+
+
+def measure_devices_creation(devices_nb):
+    """Return time [sec] of creation of devices_nb devices together with collecting their observers."""
+    devices = list()
+    start_time = time.time()
+    for _ in range(devices_nb):
+        device = UnixRemote(sm_params=_sm_params, io_type='memory', variant='threaded')
+        device._collect_cmds_for_state_machine()
+        device._collect_events_for_state_machine()
+        devices.append(device)
+    duration = time.time() - start_time
+    for device in devices:
+        device.remove()
+    return duration
+
+
+def measure_import(module_name):
+    """Return time [sec] of importing module in fresh interpreter."""
+    code = "import time; start = time.time(); import {}; print(time.time() - start)".format(module_name)
+    return float(subprocess.check_output([sys.executable, "-c", code]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare creation of devices with and without observers registry")
+    parser.add_argument('--devices', type=int, nargs='+', default=[1, 50, 500], help="numbers of devices created")
+    args = parser.parse_args()
+
+    for module_name in ['moler', 'moler.device.unixremote']:
+        print("import {}: {:.4f} s".format(module_name, measure_import(module_name)))
+    print("{:>8} {:>12} {:>12}".format("devices", "import [s]", "registry [s]"))
+    registry_loader = TextualDevice._load_cmds_from_package
+    with disabled_logging():
+        measure_devices_creation(1)  # first device imports device and connection modules for both modes
+        for devices_nb in args.devices:
+            TextualDevice._load_cmds_from_package = load_observers_by_import
+            try:
+                import_duration = measure_devices_creation(devices_nb)
+            finally:
+                TextualDevice._load_cmds_from_package = registry_loader
+            observers_registry.clear()
+            registry_duration = measure_devices_creation(devices_nb)
+            print("{:>8} {:>12.4f} {:>12.4f}".format(devices_nb, import_duration, registry_duration))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of data dispatching: cost of ObservableConnection.data_received() notifying N observers
+while moler loggers are enabled at INFO level (TRACE logs of connection are not active).
+
+Usage:
+    python test/benchmarks/bench_notify.py [--observers 1 10 100] [--chunks 20000]
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import argparse
+import logging
+import timeit
+
+from moler.observable_connection import ObservableConnection
+
+
+class DataCounter(object):
+    def __init__(self):
+        self.received_nb = 0
+
+    def on_new_data(self, data):
+        self.received_nb += 1
+
+    def on_connection_closed(self):
+        pass
+
+
+def measure_data_received(observers_nb, chunks_nb):
+    """Return average time [usec] of data_received() of one chunk notifying observers_nb observers."""
+    moler_conn = ObservableConnection(decoder=lambda data: data.decode("utf-8"), name="bench")
+    observers = [DataCounter() for _ in range(observers_nb)]
+    for observer in observers:
+        moler_conn.subscribe(observer.on_new_data, observer.on_connection_closed)
+    chunk = b"64 bytes from 10.0.2.15: icmp_req=1 ttl=64 time=0.045 ms\n"
+    duration = timeit.timeit(lambda: moler_conn.data_received(chunk), number=chunks_nb)
+    assert all(observer.received_nb == chunks_nb for observer in observers)
+    return 1e6 * duration / chunks_nb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cost of data_received -> notify observers")
+    parser.add_argument('--observers', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--chunks', type=int, default=20000, help="number of chunks to dispatch")
+    args = parser.parse_args()
+
+    moler_logger = logging.getLogger("moler")
+    moler_logger.setLevel(logging.INFO)
+    moler_logger.propagate = False
+    moler_logger.addHandler(logging.NullHandler())
+
+    print("{:>10} {:>16} {:>20}".format("observers", "usec/chunk", "usec/chunk/observer"))
+    for observers_nb in args.observers:
+        chunks_nb = max(args.chunks // observers_nb, 100)
+        usec_per_chunk = measure_data_received(observers_nb, chunks_nb)
+        print("{:>10} {:>16.2f} {:>20.3f}".format(observers_nb, usec_per_chunk, usec_per_chunk / observers_nb))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end benchmark of connection -> observer pipeline for each registered runner variant:
+- throughput: bytes/sec passed via data_received() of connection into running event
+  (for ThreadedFifoBuffer, ThreadedTcp against local tcp_server_piped and ThreadedTerminal),
+- commands latency: time from command start till command done when its output is injected (Ls, Ping, Ps),
+- events scaling: time from inject till all of 1..1000 subscribed events are done.
+
+Results are emitted as JSON to track regressions across releases.
+
+Usage:
+    python test/benchmarks/bench_pipeline.py [--runners threaded single-thread] [--transports memory tcp terminal]
+                                             [--events 1 10 100 1000] [--repeat 20] [--output results.json]
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+
+from moler.cmd.unix import ls, ping, ps
+from moler.config.loggers import _get_moler_version
+from moler.events.unix.ping_response import PingResponse
+from moler.io.raw.memory import ThreadedFifoBuffer
+from moler.observable_connection import ObservableConnection
+from moler.runner_factory import RunnerFactory, get_runner
+from moler.util.loghelper import disabled_logging
+
+PING_LINE = "64 bytes from localhost (127.0.0.1): icmp_seq=1 ttl=64 time=0.047 ms\n"
+FILLER_LINE = "PING localhost (127.0.0.1) 56(84) bytes of data. Synthetic output of benchmark.\n"
+
+commands_to_measure = [
+    ('ls', ls.Ls, ls.COMMAND_KWARGS_ver_plain, ls.COMMAND_OUTPUT_ver_plain),
+    ('ping', ping.Ping, ping.COMMAND_KWARGS, ping.COMMAND_OUTPUT),
+    ('ps', ps.Ps, ps.COMMAND_KWARGS, ps.COMMAND_OUTPUT),
+]
+
+
+class BytesCounter(object):
+    """Subscriber of connection counting received data, sets event when expected size is received."""
+
+    def __init__(self):
+        self.received_nb = 0
+        self.expected_nb = None
+        self.all_received = threading.Event()
+
+    def expect(self, size):
+        self.received_nb = 0
+        self.expected_nb = size
+        self.all_received.clear()
+
+    def on_new_data(self, data):
+        self.received_nb += len(data)
+        if (self.expected_nb is not None) and (self.received_nb >= self.expected_nb):
+            self.all_received.set()
+
+    def on_connection_closed(self):
+        pass
+
+
+def memory_connection():
+    moler_conn = ObservableConnection(encoder=lambda data: data.encode("utf-8"),
+                                      decoder=lambda data: data.decode("utf-8"), name="bench")
+    return ThreadedFifoBuffer(moler_connection=moler_conn, echo=False)
+
+
+def statistics(values):
+    """Return min/median/p95/max of list of numbers."""
+    values = sorted(values)
+    return {
+        'min': values[0],
+        'median': values[len(values) // 2],
+        'p95': values[min(int(len(values) * 0.95), len(values) - 1)],
+        'max': values[-1],
+    }
+
+
+def run_with_observed_data(moler_conn, runner, counter, total_size, send_data):
+    """Pass total_size of data via connection while PingResponse event is running; return bytes/sec."""
+    event = PingResponse(connection=moler_conn, runner=runner, till_occurs_times=-1)
+    event.timeout = 600
+    event.start()
+    counter.expect(total_size)
+    start_time = time.time()
+    send_data()
+    counter.all_received.wait(timeout=600)
+    duration = time.time() - start_time
+    event.cancel()
+    return counter.received_nb / duration
+
+
+def measure_memory_throughput(runner, total_size):
+    connection = memory_connection()
+    counter = BytesCounter()
+    chunk = (PING_LINE + FILLER_LINE * 20).encode("utf-8")
+    chunks = [chunk] * (total_size // len(chunk))
+    with connection.open():
+        connection.moler_connection.subscribe(counter.on_new_data, counter.on_connection_closed)
+        bytes_per_sec = run_with_observed_data(connection.moler_connection, runner, counter,
+                                               total_size=len(chunk) * len(chunks),
+                                               send_data=lambda: connection.inject(chunks))
+    return bytes_per_sec
+
+
+def measure_tcp_throughput(runner, total_size):
+    from moler.io.raw.tcp import ThreadedTcp
+    from moler.io.raw.tcpserverpiped import tcp_server_piped
+
+    port = 19545
+    message = (PING_LINE + FILLER_LINE * 200).encode("utf-8")  # ~16kB per message sent by server
+    rounds = max(total_size // len(message), 1)
+    moler_conn = ObservableConnection(decoder=lambda data: data.decode("utf-8"), name="bench")
+    counter = BytesCounter()
+    with tcp_server_piped(port=port) as (server, server_control):
+        connection = ThreadedTcp(moler_connection=moler_conn, port=port, host="localhost")
+        with connection.open():
+            moler_conn.subscribe(counter.on_new_data, counter.on_connection_closed)
+            time.sleep(0.2)  # let server accept client
+
+            def send_messages():
+                for round_nb in range(rounds):
+                    server_control.send(("send async msg", {'msg': message}))
+                    while counter.received_nb < (round_nb + 1) * len(message):
+                        time.sleep(0.0001)
+
+            bytes_per_sec = run_with_observed_data(moler_conn, runner, counter,
+                                                   total_size=rounds * len(message),
+                                                   send_data=send_messages)
+    return bytes_per_sec
+
+
+def measure_terminal_throughput(runner, total_size):
+    from moler.io.raw.terminal import ThreadedTerminal
+
+    lines_nb = total_size // len(PING_LINE)
+    moler_conn = ObservableConnection(name="bench")
+    counter = BytesCounter()
+    terminal = ThreadedTerminal(moler_connection=moler_conn)
+    with terminal.open():
+        moler_conn.subscribe(counter.on_new_data, counter.on_connection_closed)
+        bytes_per_sec = run_with_observed_data(
+            moler_conn, runner, counter, total_size=lines_nb * (len(PING_LINE) + 1),  # pty gives \r\n
+            send_data=lambda: moler_conn.sendline('yes "{}" | head -n {}'.format(PING_LINE.strip(), lines_nb)))
+    return bytes_per_sec
+
+
+throughput_transports = {
+    'memory': measure_memory_throughput,
+    'tcp': measure_tcp_throughput,
+    'terminal': measure_terminal_throughput,
+}
+
+
+def measure_commands_latency(runner, repeat):
+    """Return latency statistics [sec] from command start() till its done() for each of commands_to_measure."""
+    results = dict()
+    connection = memory_connection()
+    with connection.open():
+        moler_conn = connection.moler_connection
+        for cmd_name, cmd_class, cmd_kwargs, cmd_output in commands_to_measure:
+            latencies = list()
+            for _ in range(repeat):
+                done_times = list()
+                connection.inject_response([cmd_output.encode("utf-8")])
+                cmd = cmd_class(connection=moler_conn, runner=runner, **cmd_kwargs)
+                cmd.add_done_callback(lambda observer: done_times.append(time.time()))
+                start_time = time.time()
+                cmd.start(timeout=10)
+                cmd.await_done()
+                latencies.append(done_times[0] - start_time)
+            results[cmd_name] = statistics(latencies)
+    return results
+
+
+def measure_events_scaling(runner, events_nb, repeat):
+    """Return latency statistics [sec] from inject of data till all events_nb events are done."""
+    latencies = list()
+    connection = memory_connection()
+    data = (FILLER_LINE * 100 + PING_LINE).encode("utf-8")
+    with connection.open():
+        moler_conn = connection.moler_connection
+        for _ in range(repeat):
+            all_done = threading.Event()
+            done_times = list()
+            lock = threading.Lock()
+
+            def on_done(observer):
+                with lock:
+                    done_times.append(time.time())
+                    if len(done_times) == events_nb:
+                        all_done.set()
+
+            events = [PingResponse(connection=moler_conn, runner=runner, till_occurs_times=1)
+                      for _ in range(events_nb)]
+            for event in events:
+                event.timeout = 60
+                event.add_done_callback(on_done)
+                event.start()
+            start_time = time.time()
+            connection.inject([data])
+            all_done.wait(timeout=60)
+            latencies.append(max(done_times) - start_time)
+            for event in events:
+                event.cancel()
+    return statistics(latencies)
+
+
+def run_benchmarks(runner_variants, transports, events_numbers, repeat, throughput_size):
+    results = list()
+    for variant in runner_variants:
+        runner = get_runner(variant=variant, reuse_last=False)
+        try:
+            for transport in transports:
+                bytes_per_sec = throughput_transports[transport](runner, throughput_size)
+                results.append({'benchmark': 'throughput', 'runner': variant, 'transport': transport,
+                                'bytes_per_sec': bytes_per_sec})
+                report("{:>20} throughput {:>10}: {:>14.0f} B/s".format(variant, transport, bytes_per_sec))
+            for cmd_name, latency in measure_commands_latency(runner, repeat).items():
+                results.append({'benchmark': 'command_latency', 'runner': variant, 'command': cmd_name,
+                                'latency_sec': latency})
+                report("{:>20} latency    {:>10}: median {:.6f} s, p95 {:.6f} s".format(variant, cmd_name,
+                                                                                         latency['median'],
+                                                                                         latency['p95']))
+            for events_nb in events_numbers:
+                latency = measure_events_scaling(runner, events_nb, repeat=max(repeat // 4, 1))
+                results.append({'benchmark': 'events_scaling', 'runner': variant, 'events': events_nb,
+                                'latency_sec': latency})
+                report("{:>20} events     {:>10}: median {:.6f} s, p95 {:.6f} s".format(variant, events_nb,
+                                                                                         latency['median'],
+                                                                                         latency['p95']))
+        finally:
+            runner.shutdown()
+    return results
+
+
+def report(line):
+    sys.stderr.write(line + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure throughput and latency of connection/observer pipeline")
+    parser.add_argument('--runners', nargs='+', default=sorted(RunnerFactory.available_variants()))
+    parser.add_argument('--transports', nargs='+', default=sorted(throughput_transports.keys()),
+                        choices=sorted(throughput_transports.keys()))
+    parser.add_argument('--events', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=20, help="measurements of each latency")
+    parser.add_argument('--size', type=int, default=4 * 1024 * 1024, help="bytes passed in throughput measurement")
+    parser.add_argument('--output', help="file to store JSON results (default: stdout)")
+    args = parser.parse_args()
+
+    with disabled_logging():
+        results = run_benchmarks(args.runners, args.transports, args.events, args.repeat, args.size)
+    document = {
+        'moler': _get_moler_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(document, output, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(document, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of runners: CPU usage and wake-ups (context switches) of process
+while N observers are running on ThreadedFifoBuffer connection with no data flowing.
+
+Usage:
+    python test/benchmarks/bench_runners.py [--observers 10 100 1000] [--duration 2.0]
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import argparse
+import sys
+import threading
+import time
+
+import psutil
+
+from moler.connection_observer import ConnectionObserver
+from moler.io.raw.memory import ThreadedFifoBuffer
+from moler.observable_connection import ObservableConnection
+from moler.runner import ThreadPoolExecutorRunner
+from moler.runner_single_thread import RunnerSingleThread
+from moler.util.loghelper import disabled_logging
+
+runners_to_compare = {
+    'threaded': ThreadPoolExecutorRunner,
+    'single-thread': RunnerSingleThread,
+}
+if sys.version_info[0] >= 3:
+    from moler.asyncio_runner import AsyncioSharedLoopRunner
+    runners_to_compare['asyncio-shared-loop'] = AsyncioSharedLoopRunner
+
+
+class NetworkDownDetector(ConnectionObserver):
+    def data_received(self, data):
+        if not self.done():
+            if "Network is unreachable" in data:
+                self.set_result(result=time.time())
+
+
+def process_counters():
+    process = psutil.Process()
+    cpu = process.cpu_times()
+    ctx_switches = process.num_ctx_switches()
+    return cpu.user + cpu.system, ctx_switches.voluntary + ctx_switches.involuntary
+
+
+def measure_idle_observers(runner_class, observers_nb, duration):
+    """Run observers_nb observers for duration seconds without data and count used resources."""
+    moler_conn = ObservableConnection(decoder=lambda data: data.decode("utf-8"), name="bench")
+    connection = ThreadedFifoBuffer(moler_connection=moler_conn, echo=False)
+    runner = runner_class()
+    with connection.open():
+        observers = [NetworkDownDetector(connection=moler_conn, runner=runner) for _ in range(observers_nb)]
+        for observer in observers:
+            observer.timeout = duration * 10
+            observer.start()
+        time.sleep(0.2)  # let all feeders start
+        threads_nb = threading.active_count()
+        start_cpu, start_ctx_switches = process_counters()
+        time.sleep(duration)
+        end_cpu, end_ctx_switches = process_counters()
+
+        start_time = time.time()
+        connection.inject([b"ping: sendmsg: Network is unreachable\n"])
+        for observer in observers:
+            observer.await_done(timeout=5.0)
+        all_done_latency = max([observer.result() for observer in observers]) - start_time
+    runner.shutdown()
+    return {
+        'observers': observers_nb,
+        'threads': threads_nb,
+        'cpu_percent': 100.0 * (end_cpu - start_cpu) / duration,
+        'wakeups_per_sec': (end_ctx_switches - start_ctx_switches) / duration,
+        'all_done_latency': all_done_latency,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare runners CPU usage and wake-ups")
+    parser.add_argument('--observers', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--duration', type=float, default=2.0, help="measurement window [sec]")
+    args = parser.parse_args()
+
+    print("{:>20} {:>10} {:>8} {:>8} {:>12} {:>12}".format("runner", "observers", "threads", "CPU %",
+                                                          "wakeups/s", "latency [s]"))
+    with disabled_logging():
+        for observers_nb in args.observers:
+            for variant, runner_class in runners_to_compare.items():
+                stats = measure_idle_observers(runner_class, observers_nb, args.duration)
+                print("{:>20} {observers:>10} {threads:>8} {cpu_percent:>8.1f} {wakeups_per_sec:>12.0f}"
+                      " {all_done_latency:>12.4f}".format(variant, **stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of running commands on local machine: ThreadedTerminal (bash on pty) versus
+ThreadedSubprocess (bash on pipes) - time of Ls/Ps commands (with their parsers) producing large outputs.
+
+Usage:
+    python test/benchmarks/bench_subprocess.py [--repeat 10] [--ls-path /usr/bin] [--files 5000]
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from moler.cmd.unix.ls import Ls
+from moler.cmd.unix.ps import Ps
+from moler.io.raw.subprocess import ThreadedSubprocess
+from moler.io.raw.terminal import ThreadedTerminal
+from moler.observable_connection import ObservableConnection
+from moler.util.loghelper import disabled_logging
+
+connection_classes = [('terminal', ThreadedTerminal), ('subprocess', ThreadedSubprocess)]
+
+
+def directory_with_files(files_nb):
+    """Return path of temporary directory with files_nb files (large output of 'ls -l')."""
+    path = tempfile.mkdtemp(prefix="moler_bench_")
+    for file_nb in range(files_nb):
+        with open(os.path.join(path, "file_{:06d}.txt".format(file_nb)), "w") as bench_file:
+            bench_file.write("x" * (file_nb % 100))
+    return path
+
+
+def measure_command(connection_class, command_factory, repeat):
+    """Return (best, average) time [sec] of running command till it is done, and size of its output."""
+    durations = list()
+    output_size = [0]
+
+    def count_output(data):
+        output_size[0] += len(data)
+
+    moler_conn = ObservableConnection(name="bench")
+    moler_conn.subscribe(count_output, lambda: None)
+    connection = connection_class(moler_connection=moler_conn)
+    with connection.open():
+        for _ in range(repeat):
+            output_size[0] = 0
+            cmd = command_factory(moler_conn)
+            start_time = time.time()
+            cmd(timeout=60)
+            durations.append(time.time() - start_time)
+    return min(durations), sum(durations) / len(durations), output_size[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ThreadedTerminal and ThreadedSubprocess running commands")
+    parser.add_argument('--repeat', type=int, default=10, help="runs of each command")
+    parser.add_argument('--files', type=int, default=5000, help="files in directory listed by 'ls -l'")
+    args = parser.parse_args()
+
+    ls_path = directory_with_files(args.files)
+    commands = [
+        ('ls -l', lambda conn: Ls(connection=conn, options="-l {}".format(ls_path))),
+        ('ps -ef', lambda conn: Ps(connection=conn, options="-ef")),
+    ]
+    print("{:>10} {:>12} {:>12} {:>12} {:>12}".format("command", "connection", "best [s]", "avg [s]", "output [B]"))
+    try:
+        with disabled_logging():
+            for cmd_name, command_factory in commands:
+                for conn_name, connection_class in connection_classes:
+                    best, average, size = measure_command(connection_class, command_factory, args.repeat)
+                    print("{:>10} {:>12} {:>12.4f} {:>12.4f} {:>12}".format(cmd_name, conn_name, best, average, size))
+    finally:
+        shutil.rmtree(ls_path)
+
+
+if __name__ == '__main__':
+    main()
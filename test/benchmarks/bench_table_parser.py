@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of table parsing on large outputs:
+- TableText parsing 'ps -ef' and 'netstat -tn' outputs line by line,
+- Ps command parsing 'ps -ef' output injected into connection (with its runner).
+
+Usage:
+    python test/benchmarks/bench_table_parser.py [--rows 50000] [--repeat 5]
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import argparse
+import time
+
+from moler.cmd.unix.ps import Ps
+from moler.io.raw.memory import ThreadedFifoBuffer
+from moler.observable_connection import ObservableConnection
+from moler.parser.table_text import TableText
+from moler.util.loghelper import disabled_logging
+
+PS_HEADER = "UID        PID  PPID  C STIME TTY          TIME CMD"
+PS_ROW = "root     {pid:5d}     2  0 Mar09 ?        00:00:03 /usr/sbin/daemon --config /etc/daemon.conf -n {pid}"
+NETSTAT_HEADER = "Proto Recv-Q Send-Q Local Address           Foreign Address         State"
+NETSTAT_ROW = "tcp        0      0 10.0.{high}.{low}:22            10.0.0.1:{port:<5d}           ESTABLISHED"
+
+
+def ps_output(rows_nb):
+    rows = [PS_ROW.format(pid=pid) for pid in range(1, rows_nb + 1)]
+    return [PS_HEADER] + rows
+
+
+def netstat_output(rows_nb):
+    rows = [NETSTAT_ROW.format(high=row // 256, low=row % 256, port=1024 + row % 60000) for row in range(rows_nb)]
+    return [NETSTAT_HEADER] + rows
+
+
+def measure_table_text(lines, header_regexps, header_keys, repeat):
+    """Return best time [sec] of parsing lines by TableText."""
+    durations = list()
+    for _ in range(repeat):
+        parser = TableText(list(header_regexps), list(header_keys))
+        start_time = time.time()
+        for line in lines:
+            parser.parse(line)
+        durations.append(time.time() - start_time)
+    return min(durations)
+
+
+def measure_ps_command(lines, repeat):
+    """Return best time [sec] from start of Ps command till it is done with all lines of its output parsed."""
+    output = "ps -ef\n" + "\n".join(lines) + "\nmoler_bash# "
+    durations = list()
+    for _ in range(repeat):
+        moler_conn = ObservableConnection(encoder=lambda data: data.encode("utf-8"),
+                                          decoder=lambda data: data.decode("utf-8"), name="bench")
+        connection = ThreadedFifoBuffer(moler_connection=moler_conn, echo=False)
+        with connection.open():
+            connection.inject_response([output.encode("utf-8")])
+            cmd = Ps(connection=connection.moler_connection, options="-ef", prompt=r'moler_bash#')
+            start_time = time.time()
+            ret = cmd(timeout=120)
+            durations.append(time.time() - start_time)
+            assert len(ret) == len(lines) - 1
+    return min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure table parsing of large outputs")
+    parser.add_argument('--rows', type=int, default=50000, help="rows of table")
+    parser.add_argument('--repeat', type=int, default=5, help="runs of each measurement")
+    args = parser.parse_args()
+
+    ps_lines = ps_output(args.rows)
+    netstat_lines = netstat_output(args.rows)
+    ps_columns = PS_HEADER.split()
+    netstat_regexps = ["Proto", "Recv-Q", "Send-Q", "Local Address", "Foreign Address", "State"]
+    netstat_keys = ["Proto", "Recv_Q", "Send_Q", "Local_Address", "Foreign_Address", "State"]
+    print("{:>24} {:>10} {:>14} {:>14}".format("measurement", "rows", "best of {} [s]".format(args.repeat),
+                                               "rows/sec"))
+    with disabled_logging():
+        measurements = [
+            ("TableText ps -ef", lambda: measure_table_text(ps_lines, ps_columns, ps_columns, args.repeat)),
+            ("TableText netstat -tn", lambda: measure_table_text(netstat_lines, netstat_regexps, netstat_keys,
+                                                                 args.repeat)),
+            ("Ps command", lambda: measure_ps_command(ps_lines, args.repeat)),
+        ]
+        for name, measure in measurements:
+            best = measure()
+            print("{:>24} {:>10} {:>14.4f} {:>14.0f}".format(name, args.rows, best, args.rows / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of UnixLocal device creation (device + ThreadedTerminal connection till device is in UNIX_LOCAL state)
+with fresh terminal spawned per device versus terminal taken from pool of pre-warmed terminals.
+
+Usage:
+    python test/benchmarks/bench_terminal_pool.py [--devices 5] [--pool-size 5]
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import argparse
+import time
+
+from moler.device.unixlocal import UnixLocal
+from moler.io.raw import terminal_pool
+from moler.util.loghelper import disabled_logging
+
+
+def measure_devices_creation(devices_nb):
+    """Return list of creation times [sec] of devices_nb devices created one after another."""
+    durations = list()
+    devices = list()
+    try:
+        for _ in range(devices_nb):
+            start_time = time.time()
+            device = UnixLocal(io_type='terminal', variant='threaded')
+            device.establish_connection()
+            device.goto_state(UnixLocal.unix_local)
+            durations.append(time.time() - start_time)
+            devices.append(device)
+    finally:
+        for device in devices:
+            device.remove()
+    return durations
+
+
+def await_pool_ready(pool_size, timeout=120):
+    """Wait till pool is full - like pool warming up during startup of tests."""
+    start_time = time.time()
+    while terminal_pool.get_terminal_pool_statistics()['ready'] < pool_size and time.time() - start_time < timeout:
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare creation of UnixLocal devices with and without terminal pool")
+    parser.add_argument('--devices', type=int, default=5, help="devices created one after another")
+    parser.add_argument('--pool-size', type=int, default=5, help="terminals kept ready by pool")
+    args = parser.parse_args()
+
+    print("{:>10} {:>8} {:>10} {:>10} {:>10} {:>6} {:>8}".format("mode", "devices", "min [s]", "avg [s]", "max [s]",
+                                                                 "hits", "misses"))
+    with disabled_logging():
+        for mode in ("no pool", "pool"):
+            if mode == "pool":
+                terminal_pool.enable_terminal_pool(size=args.pool_size)
+                await_pool_ready(args.pool_size)
+            try:
+                durations = measure_devices_creation(args.devices)
+                statistics = terminal_pool.get_terminal_pool_statistics()
+            finally:
+                terminal_pool.disable_terminal_pool()
+            print("{:>10} {:>8} {:>10.4f} {:>10.4f} {:>10.4f} {:>6} {:>8}".format(
+                mode, args.devices, min(durations), sum(durations) / len(durations), max(durations),
+                statistics.get('hits', '-'), statistics.get('misses', '-')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Testing of batch command.
+"""
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import pytest
+
+from moler.cmd.unix.batch import Batch
+from moler.cmd.unix.hostname import Hostname
+from moler.cmd.unix.pwd import Pwd
+from moler.cmd.unix.uname import Uname
+from moler.cmd.unix.whoami import Whoami
+from moler.exceptions import CommandFailure
+
+
+def test_batch_returns_proper_command_string(buffer_connection):
+    batch_cmd = Batch(connection=buffer_connection.moler_connection, delimiter="BATCH_1",
+                      commands=[Whoami(connection=buffer_connection.moler_connection), (Uname, {'options': '-a'})])
+    assert "echo 'BATCH_1'_0; whoami; echo 'BATCH_1'_1; uname -a; echo 'BATCH_1'_2" == batch_cmd.command_string
+
+
+def test_batch_passes_outputs_to_commands(buffer_connection, command_output_and_expected_result):
+    command_output, expected_result = command_output_and_expected_result
+    buffer_connection.remote_inject_response([command_output])
+    pwd_cmd = Pwd(connection=buffer_connection.moler_connection)
+    hostname_cmd = Hostname(connection=buffer_connection.moler_connection)
+    batch_cmd = Batch(connection=buffer_connection.moler_connection, commands=[pwd_cmd, hostname_cmd],
+                      delimiter="BATCH_2")
+    result = batch_cmd()
+    assert result == expected_result
+    assert pwd_cmd.result() == expected_result[0]
+    assert hostname_cmd.result() == expected_result[1]
+
+
+def test_batch_raises_exception_when_command_fails(buffer_connection, command_output_with_failure):
+    buffer_connection.remote_inject_response([command_output_with_failure])
+    uname_cmd = Uname(connection=buffer_connection.moler_connection, options="-pk")
+    batch_cmd = Batch(connection=buffer_connection.moler_connection, commands=[Whoami, uname_cmd],
+                      delimiter="BATCH_3")
+    with pytest.raises(CommandFailure):
+        batch_cmd()
+    with pytest.raises(CommandFailure):
+        uname_cmd.result()
+
+
+def test_batch_without_commands_raises_exception(buffer_connection):
+    batch_cmd = Batch(connection=buffer_connection.moler_connection, commands=[])
+    with pytest.raises(CommandFailure):
+        batch_cmd()
+
+
+def test_batch_fails_on_delimiter_out_of_order(buffer_connection):
+    buffer_connection.remote_inject_response(["""host:~ # echo 'BATCH_4'_0; whoami; echo 'BATCH_4'_1; hostname; echo 'BATCH_4'_2
+BATCH_4_0
+ute
+BATCH_4_2
+host
+BATCH_4_1
+host:~ #"""])
+    hostname_cmd = Hostname(connection=buffer_connection.moler_connection)
+    batch_cmd = Batch(connection=buffer_connection.moler_connection, commands=[Whoami, hostname_cmd],
+                      delimiter="BATCH_4")
+    with pytest.raises(CommandFailure) as err:
+        batch_cmd()
+    assert "delimiter 'BATCH_4_2' while expected delimiter of index 1" in str(err.value)
+    assert not hostname_cmd.done()
+
+
+def test_batch_fails_when_delimiter_is_missing(buffer_connection):
+    buffer_connection.remote_inject_response(["""host:~ # echo 'BATCH_5'_0; whoami; echo 'BATCH_5'_1; hostname; echo 'BATCH_5'_2
+BATCH_5_0
+ute
+BATCH_5_1
+host
+host:~ #"""])
+    batch_cmd = Batch(connection=buffer_connection.moler_connection, commands=[Whoami, Hostname],
+                      delimiter="BATCH_5")
+    with pytest.raises(CommandFailure) as err:
+        batch_cmd()
+    assert "got 2 of 3 delimiters of commands outputs" in str(err.value)
+
+
+@pytest.fixture
+def command_output_and_expected_result():
+    data = """host:~ # echo 'BATCH_2'_0; pwd; echo 'BATCH_2'_1; hostname; echo 'BATCH_2'_2
+BATCH_2_0
+/home/ute
+BATCH_2_1
+host
+BATCH_2_2
+host:~ #"""
+    result = [{'full_path': '/home/ute', 'path_to_current': '/home', 'current_path': 'ute'}, {'hostname': 'host'}]
+    return data, result
+
+
+@pytest.fixture
+def command_output_with_failure():
+    data = """host:~ # echo 'BATCH_3'_0; whoami; echo 'BATCH_3'_1; uname -pk; echo 'BATCH_3'_2
+BATCH_3_0
+ute
+BATCH_3_1
+uname: invalid option -- 'k'
+Try 'uname --help' for more information.
+BATCH_3_2
+host:~ #"""
+    return data
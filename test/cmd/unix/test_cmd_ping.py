@@ -23,3 +23,16 @@ def test_ping_observer_timeout(buffer_connection):
     cmd_ping.terminating_timeout = 0
     with pytest.raises(CommandTimeout):
         cmd_ping(timeout=0.1)
+
+
+def test_ping_streams_replies_as_records(buffer_connection):
+    from moler.cmd.unix.ping import COMMAND_OUTPUT, COMMAND_KWARGS, COMMAND_RESULT
+    buffer_connection.remote_inject_response([COMMAND_OUTPUT])
+    cmd_ping = Ping(buffer_connection.moler_connection, **COMMAND_KWARGS)
+    replies = cmd_ping.iter_records()
+    ret = cmd_ping()
+    replies = list(replies)
+    assert [reply['icmp_seq'] for reply in replies] == list(range(1, len(replies) + 1))
+    assert replies[0]['source'] == 'localhost (127.0.0.1)'
+    assert replies[0]['time_unit'] == 'ms'
+    assert ret == COMMAND_RESULT
@@ -25,3 +25,26 @@ ute@debdev:~$"""
     cmd = Tail(connection=buffer_connection.moler_connection, path="test.txt")
     with pytest.raises(CommandFailure):
         cmd()
+
+
+def test_tail_streams_lines_as_records(buffer_connection):
+    from moler.cmd.unix.tail import COMMAND_OUTPUT, COMMAND_KWARGS, COMMAND_RESULT
+    buffer_connection.remote_inject_response([COMMAND_OUTPUT])
+    cmd = Tail(connection=buffer_connection.moler_connection, **COMMAND_KWARGS)
+    records = cmd.iter_records()
+    assert cmd.is_streaming() is True
+    ret = cmd()
+    assert list(records) == COMMAND_RESULT['LINES']
+    assert ret['LINES'] == []
+    assert cmd.is_streaming() is False
+
+
+def test_tail_stores_lines_when_records_iterator_is_closed(buffer_connection):
+    from moler.cmd.unix.tail import COMMAND_OUTPUT, COMMAND_KWARGS, COMMAND_RESULT
+    buffer_connection.remote_inject_response([COMMAND_OUTPUT])
+    cmd = Tail(connection=buffer_connection.moler_connection, **COMMAND_KWARGS)
+    records = cmd.iter_records(maxsize=1)
+    records.close()
+    assert cmd.is_streaming() is False
+    ret = cmd()
+    assert ret['LINES'] == COMMAND_RESULT['LINES']
@@ -13,3 +13,27 @@ from moler.cmd.unix.tcpdump import Tcpdump
 def test_tcpdump_returns_proper_command_string(buffer_connection):
     tcpdump_cmd = Tcpdump(buffer_connection, options="-c 4 -vv")
     assert "tcpdump -c 4 -vv" == tcpdump_cmd.command_string
+
+
+def test_tcpdump_streams_packets_as_records(buffer_connection):
+    from moler.cmd.unix.tcpdump import COMMAND_OUTPUT_vv, COMMAND_KWARGS_vv, COMMAND_RESULT_vv
+    buffer_connection.remote_inject_response([COMMAND_OUTPUT_vv])
+    cmd = Tcpdump(connection=buffer_connection.moler_connection, **COMMAND_KWARGS_vv)
+    records = cmd.iter_records()
+    ret = cmd()
+    packets = dict((number, packet) for number, packet in COMMAND_RESULT_vv.items() if number.isdigit())
+    expected_records = [dict(packet, number=number) for number, packet in sorted(packets.items())]
+    assert list(records) == expected_records
+    assert ret == dict((key, value) for key, value in COMMAND_RESULT_vv.items() if key not in packets)
+
+
+def test_tcpdump_streams_last_packet_once_to_each_consumer(buffer_connection):
+    from moler.cmd.unix.tcpdump import COMMAND_OUTPUT_vv, COMMAND_KWARGS_vv, COMMAND_RESULT_vv
+    buffer_connection.remote_inject_response([COMMAND_OUTPUT_vv])
+    cmd = Tcpdump(connection=buffer_connection.moler_connection, **COMMAND_KWARGS_vv)
+    records_1 = cmd.iter_records()
+    records_2 = cmd.iter_records()
+    cmd()
+    packets_nb = len([number for number in COMMAND_RESULT_vv if number.isdigit()])
+    assert [record['number'] for record in records_1] == [str(number) for number in range(1, packets_nb + 1)]
+    assert [record['number'] for record in records_2] == [str(number) for number in range(1, packets_nb + 1)]
@@ -4,6 +4,9 @@ __author__ = 'Grzegorz Latuszek, Michal Ernst, Marcin Usielski'
 __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'grzegorz.latuszek@nokia.com, michal.ernst@nokia.com, marcin.usielski@nokia.com'
 
+import logging
+
+import mock
 import pytest
 
 
@@ -81,9 +84,86 @@ def test_device_unix_can_return_cd_command(configure_net_1_connection):
     )
 
 
+def test_device_plans_route_through_intermediate_states(buffer_connection):
+    from moler.device.unixlocal import UnixLocal
+
+    dev1 = UnixLocal(io_connection=buffer_connection)
+    dev2 = UnixLocal(io_connection=buffer_connection)
+
+    assert dev1.plan_route("NOT_CONNECTED", "UNIX_LOCAL_ROOT") == ["UNIX_LOCAL", "UNIX_LOCAL_ROOT"]
+    assert dev1.plan_route("UNIX_LOCAL_ROOT", "NOT_CONNECTED") == ["UNIX_LOCAL", "NOT_CONNECTED"]
+    assert dev1.plan_route("UNIX_LOCAL", "UNIX_LOCAL") == []
+    assert dev1._routing_table is dev2._routing_table  # computed once for device class
+
+
+def test_device_state_hops_override_shortest_route(buffer_connection):
+    dev = _three_states_device_class(state_hops={"STATE_A": {"STATE_C": "STATE_B"}})(io_connection=buffer_connection)
+
+    assert dev.plan_route("STATE_A", "STATE_C") == ["STATE_B", "STATE_C"]
+    assert dev.plan_route("STATE_C", "STATE_A") == ["STATE_A"]
+
+
+def test_device_with_unreachable_state_fails_to_plan_route_to_it(buffer_connection):
+    from moler.exceptions import DeviceFailure
+
+    device_class = _three_states_device_class(state_hops={}, without_transition=("STATE_C", "STATE_A"))
+    dev = device_class(io_connection=buffer_connection)
+    with pytest.raises(DeviceFailure) as err:
+        dev.plan_route("STATE_C", "STATE_A")
+    assert "No route from state 'STATE_C' to state 'STATE_A'" in str(err.value)
+
+
+def test_device_with_declared_state_hop_making_loop_can_not_be_created(buffer_connection):
+    from moler.exceptions import DeviceFailure
+
+    device_class = _three_states_device_class(state_hops={"STATE_A": {"STATE_B": "STATE_C"},
+                                                          "STATE_C": {"STATE_B": "STATE_A"}})
+    with pytest.raises(DeviceFailure) as err:
+        device_class(io_connection=buffer_connection)
+    assert "'STATE_A' -> 'STATE_B'" in str(err.value)
+
+
+def test_device_reports_declared_state_hop_not_reachable(buffer_connection):
+    device_class = _three_states_device_class(state_hops={"STATE_A": {"STATE_C": "STATE_D"}})
+    with mock.patch.object(device_class, "_log") as log:
+        dev = device_class(io_connection=buffer_connection)
+
+    assert dev.plan_route("STATE_A", "STATE_C") == ["STATE_C"]
+    log.assert_any_call(logging.WARNING, "State hop 'STATE_D' declared for route 'STATE_A' -> 'STATE_C' is not "
+                                         "reachable from 'STATE_A', shortest route is used instead.")
+
+
 # --------------------------- resources ---------------------------
 
 
+def _three_states_device_class(state_hops, without_transition=None):
+    from moler.device.textualdevice import TextualDevice
+
+    class ThreeStatesDevice(TextualDevice):
+        def _prepare_transitions(self):
+            transitions = dict()
+            for source_state, dest_state in [("NOT_CONNECTED", "STATE_A"), ("STATE_A", "NOT_CONNECTED"),
+                                             ("STATE_A", "STATE_B"), ("STATE_B", "STATE_C"), ("STATE_A", "STATE_C"),
+                                             ("STATE_C", "STATE_A")]:
+                if (source_state, dest_state) != without_transition:
+                    transitions.setdefault(source_state, dict())[dest_state] = {"action": ["_open_connection"]}
+            self._add_transitions(transitions=transitions)
+
+        def _prepare_state_prompts(self):
+            pass
+
+        def _prepare_newline_chars(self):
+            pass
+
+        def _prepare_state_hops(self):
+            self._state_hops = state_hops
+
+        def _get_packages_for_state(self, state, observer):
+            return []
+
+    return ThreeStatesDevice
+
+
 @pytest.yield_fixture
 def configure_net_1_connection():
     from moler.config import connections as conn_cfg
@@ -13,6 +13,7 @@ import pytest
 from moler.util.moler_test import MolerTest
 from moler.connection_observer import ConnectionObserver
 from moler.device import DeviceFactory
+from moler.exceptions import MolerException
 from moler.exceptions import WrongUsage
 
 
@@ -328,6 +329,77 @@ def test_can_select_all_devices_loaded_from_config_file(moler_config, device_fac
     assert device.__class__.__name__ == 'UnixLocal'
 
 
+def test_can_create_devices_in_parallel(moler_config, device_factory):
+    conn_config = os.path.join(os.path.dirname(__file__), os.pardir, "resources", "device_config.yml")
+    moler_config.load_config(config=conn_config, config_type='yaml')
+    names = ['UNIX_LOCAL', 'UNIX_REMOTE', 'UNIX_REMOTE_PROXY_PC', 'NOT_DEFINED_DEVICE']
+
+    summary = device_factory.create_devices(names=names, max_workers=4, max_per_host=1,
+                                            establish_connection=False)
+
+    assert sorted(summary.keys()) == sorted(names)
+    for name in names[:3]:
+        assert summary[name]['error'] is None
+        assert summary[name]['time'] >= 0
+        assert device_factory.get_device(name=name, establish_connection=False) is device_factory._devices[name]
+    assert isinstance(summary['NOT_DEFINED_DEVICE']['error'], KeyError)
+
+
+def test_create_devices_connects_devices_in_parallel(moler_config, device_factory, slow_connection):
+    moler_config.load_config(config={'DEVICES': {'REMOTE_1': _remote_via(host='host_1'),
+                                                 'REMOTE_2': _remote_via(host='host_2'),
+                                                 'REMOTE_3': _remote_via(host='host_3')}}, config_type='dict')
+    names = ['REMOTE_1', 'REMOTE_2', 'REMOTE_3']
+
+    summary = device_factory.create_devices(names=names, max_workers=3)
+
+    for name in names:
+        assert summary[name]['error'] is None
+        assert device_factory._devices[name].current_state == 'UNIX_LOCAL'
+    assert slow_connection.max_opening == 3
+
+
+def test_create_devices_limits_devices_connecting_via_the_same_host(moler_config, device_factory, slow_connection):
+    moler_config.load_config(config={'DEVICES': {'REMOTE_A1': _remote_via(host='host_a'),
+                                                 'REMOTE_A2': _remote_via(host='host_a'),
+                                                 'REMOTE_B1': _remote_via(host='host_b'),
+                                                 'REMOTE_B2': _remote_via(host='host_b')}}, config_type='dict')
+    names = ['REMOTE_A1', 'REMOTE_A2', 'REMOTE_B1', 'REMOTE_B2']
+
+    summary = device_factory.create_devices(names=names, max_workers=4, max_per_host=1)
+
+    for name in names:
+        assert summary[name]['error'] is None
+    assert slow_connection.max_opening == 2  # one per host
+    for same_host_names in (names[:2], names[2:]):
+        (start_1, end_1), (start_2, end_2) = [device_factory._devices[name].io_connection.opening_time
+                                              for name in same_host_names]
+        assert end_1 <= start_2 or end_2 <= start_1
+
+
+def test_load_config_raises_when_devices_created_at_startup_failed(moler_config, device_factory, slow_connection):
+    broken_device = _remote_via(host='host_b')
+    broken_device['CONNECTION_DESC'] = {'io_type': 'not_registered', 'variant': 'threaded'}
+    config = {'DEVICES': {'CREATE_AT_STARTUP': {'max_workers': 2},
+                          'REMOTE_A': _remote_via(host='host_a'),
+                          'REMOTE_B': broken_device}}
+
+    with pytest.raises(MolerException) as err:
+        moler_config.load_config(config=config, config_type='dict')
+
+    assert "Creation of devices at startup failed: 'REMOTE_B'" in str(err.value)
+    assert device_factory._devices['REMOTE_A'].current_state == 'UNIX_LOCAL'
+
+
+def test_first_hop_host_of_device_is_taken_from_config(moler_config, device_factory):
+    conn_config = os.path.join(os.path.dirname(__file__), os.pardir, "resources", "device_config.yml")
+    moler_config.load_config(config=conn_config, config_type='yaml')
+
+    assert device_factory._first_hop_host('UNIX_LOCAL') is None
+    assert device_factory._first_hop_host('UNIX_REMOTE') == 'remote_host'
+    assert device_factory._first_hop_host('UNIX_REMOTE_PROXY_PC') == 'proxy_pc_host'
+
+
 def test_can_select_neighbour_devices_loaded_from_config_file_(moler_config, device_factory):
     conn_config = os.path.join(os.path.dirname(__file__), os.pardir, "resources", "device_config.yml")
     moler_config.load_config(config=conn_config, config_type='yaml')
@@ -726,6 +798,63 @@ def device_factory():
     clear_all_cfg()
 
 
+@pytest.yield_fixture
+def slow_connection():
+    import threading
+    import time
+    from moler.connection_factory import ConnectionFactory
+    from moler.io.raw.memory import ThreadedFifoBuffer
+    from moler.observable_connection import ObservableConnection
+
+    class SlowFifoBuffer(ThreadedFifoBuffer):
+        """Memory connection opening for a while, counts connections opened at the same time."""
+        lock = threading.Lock()
+        opening = 0
+        max_opening = 0
+
+        def open(self):
+            start_time = time.time()
+            with SlowFifoBuffer.lock:
+                SlowFifoBuffer.opening += 1
+                SlowFifoBuffer.max_opening = max(SlowFifoBuffer.max_opening, SlowFifoBuffer.opening)
+            time.sleep(0.3)
+            with SlowFifoBuffer.lock:
+                SlowFifoBuffer.opening -= 1
+            self.opening_time = (start_time, time.time())
+            ret = super(SlowFifoBuffer, self).open()
+            self.inject_response(["moler_bash# "])
+            return ret
+
+    def slow_connection_constructor(name=None):
+        moler_connection = ObservableConnection(encoder=lambda data: data.encode("utf-8"),
+                                                decoder=lambda data: data.decode("utf-8"), name=name)
+        return SlowFifoBuffer(moler_connection=moler_connection, echo=False, name=name)
+
+    ConnectionFactory.register_construction(io_type="slow", variant="threaded",
+                                            constructor=slow_connection_constructor)
+    yield SlowFifoBuffer
+    from moler.device.device import DeviceFactory
+    DeviceFactory.remove_all_devices()
+    del ConnectionFactory._constructors_registry[("slow", "threaded")]
+
+
+def _remote_via(host):
+    return {
+        'DEVICE_CLASS': 'moler.device.unixremote.UnixRemote',
+        'INITIAL_STATE': 'UNIX_LOCAL',
+        'CONNECTION_DESC': {'io_type': 'slow', 'variant': 'threaded'},
+        'CONNECTION_HOPS': {
+            'UNIX_LOCAL': {
+                'UNIX_REMOTE': {
+                    'execute_command': 'ssh',
+                    'command_params': {'expected_prompt': 'remote_prompt#', 'host': host, 'login': 'user',
+                                       'password': 'pass', 'set_timeout': None}
+                }
+            }
+        }
+    }
+
+
 def clear_all_cfg():
     import moler.config as moler_cfg
     import moler.config.devices as dev_cfg
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Testing external-IO subprocess connection based on asyncio
+
+- open/close
+- send/receive (naming may differ)
+- exit of process
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+from moler.io.io_exceptions import RemoteEndpointNotConnected
+from moler.observable_connection import ObservableConnection
+
+
+@pytest.mark.asyncio
+async def test_can_open_and_close_connection():
+    from moler.io.asyncio.subprocess import AsyncioSubprocess
+
+    connection = AsyncioSubprocess(moler_connection=ObservableConnection(),
+                                   command=[sys.executable, '-i'], prompt=r'>>> ')
+    await connection.open()
+    assert connection._shell_operable.is_set()
+    await connection.close()
+    assert connection._transport is None
+
+
+@pytest.mark.asyncio
+async def test_can_send_and_receive_data():
+    from moler.io.asyncio.subprocess import AsyncioSubprocess
+
+    connection = AsyncioSubprocess(moler_connection=ObservableConnection(),
+                                   command=[sys.executable, '-i'], prompt=r'>>> ')
+    received_data = list()
+    answer_received = asyncio.get_event_loop().create_future()
+
+    def receiver(data):
+        received_data.append(data)
+        if '42' in "".join(received_data) and not answer_received.done():
+            answer_received.set_result(True)
+
+    connection.moler_connection.subscribe(receiver, lambda: None)
+    await connection.open()
+    connection.moler_connection.sendline("print(6 * 7)")
+    await asyncio.wait_for(answer_received, timeout=5)
+    await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_open_fails_fast_when_process_exits_before_prompt():
+    from moler.io.asyncio.subprocess import AsyncioSubprocess
+
+    connection = AsyncioSubprocess(moler_connection=ObservableConnection(),
+                                   command=[sys.executable, '-c', 'print("no prompt")'], prompt=r'>>> ')
+    closed = threading.Event()
+    connection.notify(callback=lambda io_connection: closed.set(), when="connection_lost")
+    start_time = time.time()
+    with pytest.raises(RemoteEndpointNotConnected) as err:
+        await asyncio.wait_for(connection.open(), timeout=5)
+    assert time.time() - start_time < 2
+    assert 'no prompt' in str(err.value)
+    assert closed.is_set()
+    assert connection._transport is None
+
+
+@pytest.mark.asyncio
+async def test_connection_lost_is_notified_when_process_exits():
+    from moler.io.asyncio.subprocess import AsyncioSubprocess
+
+    connection = AsyncioSubprocess(moler_connection=ObservableConnection(),
+                                   command=[sys.executable, '-i'], prompt=r'>>> ')
+    closed = threading.Event()
+    connection.notify(callback=lambda io_connection: closed.set(), when="connection_lost")
+    await connection.open()
+    connection.moler_connection.sendline("exit()")
+    start_time = time.time()
+    while not closed.is_set() and time.time() - start_time < 5:
+        await asyncio.sleep(0.01)
+    assert closed.is_set()
+    assert connection._transport is None
+    await connection.close()  # nothing to close
+
+
+def test_in_thread_open_fails_fast_when_process_exits_before_prompt():
+    from moler.io.asyncio.subprocess import AsyncioInThreadSubprocess
+
+    connection = AsyncioInThreadSubprocess(moler_connection=ObservableConnection(),
+                                           command=[sys.executable, '-c', 'print("no prompt")'], prompt=r'>>> ')
+    closed = threading.Event()
+    connection.notify(callback=lambda io_connection: closed.set(), when="connection_lost")
+    start_time = time.time()
+    with pytest.raises(RemoteEndpointNotConnected):
+        connection.open()
+    assert time.time() - start_time < 2
+    assert closed.is_set()
+
+
+def test_in_thread_connection_lost_is_notified_when_process_exits():
+    from moler.io.asyncio.subprocess import AsyncioInThreadSubprocess
+
+    connection = AsyncioInThreadSubprocess(moler_connection=ObservableConnection(),
+                                           command=[sys.executable, '-i'], prompt=r'>>> ')
+    closed = threading.Event()
+    connection.notify(callback=lambda io_connection: closed.set(), when="connection_lost")
+    connection.open()
+    connection.moler_connection.sendline("exit()")
+    assert closed.wait(timeout=5) is True
+    connection.close()  # nothing to close
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Testing IO reactor serving many file descriptors by few threads
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import os
+import threading
+
+import pytest
+
+from moler.io.raw.reactor import IOReactor
+
+
+def test_reactor_serves_many_fds_inside_one_thread(pipes):
+    reactor = IOReactor(threads_nb=1)
+    readers_threads = set()
+    all_read = threading.Event()
+    read_data = dict()
+
+    def reader_of(read_fd):
+        def read():
+            readers_threads.add(threading.current_thread().name)
+            read_data[read_fd] = os.read(read_fd, 100)
+            if len(read_data) == len(pipes):
+                all_read.set()
+        return read
+
+    for read_fd, _ in pipes:
+        reactor.register(read_fd, reader_of(read_fd))
+    for read_fd, write_fd in pipes:
+        os.write(write_fd, "data of {}".format(read_fd).encode("utf-8"))
+    assert all_read.wait(timeout=2) is True
+    assert read_data == dict((read_fd, "data of {}".format(read_fd).encode("utf-8")) for read_fd, _ in pipes)
+    assert readers_threads == {"MolerIOReactor-1"}
+    for read_fd, _ in pipes:
+        reactor.unregister(read_fd)
+    assert reactor.get_statistics() == [0]
+
+
+def test_reactor_spreads_fds_across_threads(pipes):
+    reactor = IOReactor(threads_nb=3)
+    for read_fd, _ in pipes:
+        reactor.register(read_fd, lambda: None)
+    assert reactor.get_statistics() == [4, 3, 3]
+    for read_fd, _ in pipes:
+        reactor.unregister(read_fd)
+
+
+def test_reader_is_not_called_after_unregister_returns(pipes):
+    reactor = IOReactor(threads_nb=1)
+    read_fd, write_fd = pipes[0]
+    reads = list()
+    first_read = threading.Event()
+
+    def read():
+        reads.append(os.read(read_fd, 100))
+        first_read.set()
+
+    reactor.register(read_fd, read)
+    os.write(write_fd, b"first")
+    assert first_read.wait(timeout=2) is True
+    reactor.unregister(read_fd)
+    os.write(write_fd, b"second")
+    reactor.register(pipes[1][0], lambda: None)  # round trip through reactor thread
+    assert reads == [b"first"]
+    reactor.unregister(pipes[1][0])
+
+
+def test_reader_may_unregister_itself(pipes):
+    reactor = IOReactor(threads_nb=1)
+    read_fd, write_fd = pipes[0]
+    unregistered = threading.Event()
+
+    def read():
+        os.read(read_fd, 100)
+        reactor.unregister(read_fd)
+        unregistered.set()
+
+    reactor.register(read_fd, read)
+    os.write(write_fd, b"EOF")
+    assert unregistered.wait(timeout=2) is True
+    assert reactor.get_statistics() == [0]
+
+
+def test_request_to_reactor_blocked_by_reader_times_out(pipes):
+    from moler.io.io_exceptions import ConnectionTimeout
+
+    reactor = IOReactor(threads_nb=1, request_timeout=0.1)
+    read_fd, write_fd = pipes[0]
+    reader_called = threading.Event()
+    unblock_reader = threading.Event()
+
+    def read():
+        os.read(read_fd, 100)
+        reader_called.set()
+        unblock_reader.wait(timeout=2)
+
+    reactor.register(read_fd, read)
+    os.write(write_fd, b"data")
+    assert reader_called.wait(timeout=2) is True
+    with pytest.raises(ConnectionTimeout):
+        reactor.register(pipes[1][0], lambda: None)
+    unblock_reader.set()
+    reactor.unregister(pipes[1][0])
+    reactor.unregister(read_fd)
+    assert reactor.get_statistics() == [0]
+
+
+@pytest.yield_fixture()
+def pipes():
+    pipes = [os.pipe() for _ in range(10)]
+    yield pipes
+    for read_fd, write_fd in pipes:
+        os.close(read_fd)
+        os.close(write_fd)
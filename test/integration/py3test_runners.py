@@ -528,6 +528,45 @@ def test_runner_shutdown_cancels_remaining_feeders_inside_threads(observer_runne
     assert observers_pool[2].cancelled()
 
 
+def test_AsyncioSharedLoopRunner_runs_all_observers_inside_one_loop_thread():
+    from moler.asyncio_runner import AsyncioSharedLoopRunner
+    from moler.observable_connection import ObservableConnection
+
+    runner = AsyncioSharedLoopRunner()
+    moler_conn = ObservableConnection()
+    threads_before = threading.active_count()
+    detectors = [NetworkDownDetector(connection=moler_conn, runner=runner) for _ in range(100)]
+    for detector in detectors:
+        detector.start_time = time.time()  # must start observer lifetime before runner.submit()
+        detector._future = runner.submit(detector)
+    assert threading.active_count() == threads_before
+    moler_conn.data_received("ping: sendmsg: Network is unreachable")
+    for detector in detectors:
+        detector._future.result(timeout=0.5)
+        assert detector.done()
+    assert len(moler_conn._observers) == 0
+    runner.shutdown()
+
+
+def test_AsyncioSharedLoopRunner_times_out_observer_via_loop_timer():
+    from moler.asyncio_runner import AsyncioSharedLoopRunner
+    from moler.exceptions import ConnectionObserverTimeout
+    from moler.observable_connection import ObservableConnection
+
+    runner = AsyncioSharedLoopRunner()
+    net_down_detector = NetworkDownDetector(connection=ObservableConnection(), runner=runner)
+    net_down_detector.timeout = 0.2
+    net_down_detector.start_time = time.time()
+    future = runner.submit(net_down_detector)
+    net_down_detector.timeout = 0.3  # extended timeout is rescheduled inside loop
+    future.result(timeout=1.0)
+    duration = time.time() - net_down_detector.start_time
+    assert 0.3 <= duration < 0.6
+    with pytest.raises(ConnectionObserverTimeout):
+        net_down_detector.result()
+    runner.shutdown()
+
+
 # def test_observer__on_timeout__is_called_once_at_timeout_threads_races(observer_runner):
 #     from moler.exceptions import MolerTimeout
 #     from moler.observable_connection import ObservableConnection
@@ -684,14 +723,16 @@ def is_python36_or_above():
 
 # bg_runners may be called from both 'async def' and raw 'def' functions
 available_bg_runners = []  # 'runner.ThreadPoolExecutorRunner']
-available_bg_runners = ['runner.ThreadPoolExecutorRunner']
+available_bg_runners = ['runner.ThreadPoolExecutorRunner', 'runner_single_thread.RunnerSingleThread']
 # standalone_runners may run without giving up control to some event loop (since they create own thread(s))
-available_standalone_runners = ['runner.ThreadPoolExecutorRunner']
+available_standalone_runners = ['runner.ThreadPoolExecutorRunner', 'runner_single_thread.RunnerSingleThread']
 # async_runners may be called only from 'async def' functions and require already running events-loop
 available_async_runners = []
 if is_python36_or_above():
     available_bg_runners.append('asyncio_runner.AsyncioRunner')
     available_async_runners.append('asyncio_runner.AsyncioRunner')
+    available_bg_runners.append('asyncio_runner.AsyncioSharedLoopRunner')
+    available_standalone_runners.append('asyncio_runner.AsyncioSharedLoopRunner')
     # available_bg_runners.append('asyncio_runner.AsyncioInThreadRunner')
     # available_async_runners.append('asyncio_runner.AsyncioInThreadRunner')
     # available_standalone_runners.append('asyncio_runner.AsyncioInThreadRunner')
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Testing external-IO replay connection
+
+- reading recording made by raw logs
+- replay with original timing and as fast as possible
+- running command against recorded session
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import logging
+import threading
+import time
+
+import pytest
+
+
+def test_reader_yields_recorded_chunks_in_order(recording):
+    from moler.io.raw.replay import RawTraceReader
+
+    raw_log_path = recording([(100.0, '>', b'ls\n'),
+                              (100.1, '<', b'ls\nfile1  file2\n'),
+                              (100.2, '<', b'moler_bash# ')])
+
+    records = list(RawTraceReader(raw_log_path))
+
+    assert records == [(100.0, '>', b'ls\n'), (100.1, '<', b'ls\nfile1  file2\n'), (100.2, '<', b'moler_bash# ')]
+
+
+def test_replay_feeds_received_data_after_recorded_send(recording):
+    from moler.io.raw.replay import ThreadedReplay
+    from moler.observable_connection import ObservableConnection
+
+    raw_log_path = recording([(100.0, '<', b'moler_bash# '),
+                              (100.1, '>', b'ls\n'),
+                              (100.2, '<', b'ls\nfile1  file2\n'),
+                              (100.3, '<', b'moler_bash# ')])
+    received_data = list()
+
+    def receiver(data):
+        received_data.append(data)
+
+    replay = ThreadedReplay(moler_connection=ObservableConnection(), raw_log_path=raw_log_path)
+    replay.moler_connection.subscribe(receiver, lambda: None)
+    with replay.open():
+        time.sleep(0.1)
+        assert received_data == [u'moler_bash# ']
+        replay.moler_connection.sendline(u"ls")
+        assert replay.await_replay_done(timeout=1) is True
+    assert received_data == [u'moler_bash# ', u'ls\nfile1  file2\n', u'moler_bash# ']
+
+
+def test_replay_keeps_original_timing_or_runs_as_fast_as_possible(recording):
+    from moler.io.raw.replay import Replay
+    from moler.observable_connection import ObservableConnection
+
+    raw_log_path = recording([(100.0, '<', b'first'), (100.3, '<', b'second')])
+
+    for speed, min_duration, max_duration in [(1.0, 0.3, 1.0), (None, 0.0, 0.1)]:
+        replay = Replay(moler_connection=ObservableConnection(), raw_log_path=raw_log_path, speed=speed)
+        with replay.open():
+            start_time = time.time()
+            assert replay.replay() == 2
+            assert min_duration <= time.time() - start_time < max_duration
+
+
+def test_replay_decodes_character_split_between_chunks(recording):
+    from moler.io.raw.replay import Replay
+    from moler.observable_connection import ObservableConnection
+
+    raw_log_path = recording([(100.0, '<', b'Zaz\xc3'), (100.1, '<', b'\xb3\xc3\xb3\xc5\x82\xc4\x87\n')])
+    received_data = list()
+
+    def receiver(data):
+        received_data.append(data)
+
+    replay = Replay(moler_connection=ObservableConnection(), raw_log_path=raw_log_path)
+    replay.moler_connection.subscribe(receiver, lambda: None)
+    with replay.open():
+        replay.replay()
+    assert u"".join(received_data) == u'Zazóółć\n'
+
+
+def test_can_run_command_against_recorded_session(recording):
+    from moler.connection_factory import get_connection
+    from moler.cmd.unix.whoami import Whoami
+
+    raw_log_path = recording([(100.0, '>', b'whoami\n'),
+                              (100.1, '<', b'whoami\n'),
+                              (100.2, '<', b'moler\nmoler_bash# ')])
+
+    replay = get_connection(io_type='replay', variant='threaded', raw_log_path=raw_log_path)
+    with replay.open():
+        whoami = Whoami(connection=replay.moler_connection, prompt=r'moler_bash#')
+        assert whoami(timeout=2) == {'USER': 'moler'}
+
+
+# --------------------------- resources ---------------------------
+
+
+@pytest.fixture
+def recording(tmpdir):
+    from moler.config.loggers import RawTraceFormatter
+
+    def record(chunks):
+        """Write raw log and raw trace log the way connection logger does it."""
+        raw_log_path = str(tmpdir.join('moler.recorded.raw.log'))
+        trace_formatter = RawTraceFormatter()
+        with open(raw_log_path, 'wb') as raw_log, open(str(tmpdir.join('moler.recorded.raw.trace.log')), 'w') as trace:
+            for created, direction, data in chunks:
+                record = logging.makeLogRecord({'msg': data, 'transfer_direction': direction, 'created': created,
+                                                'msecs': 0})
+                raw_log.write(data)
+                trace.write(trace_formatter.format(record))
+        return raw_log_path
+
+    return record
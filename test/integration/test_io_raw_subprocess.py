@@ -6,12 +6,16 @@ Testing external-IO subprocess connection
 - send/receive (naming may differ)
 """
 
-__author__ = 'Grzegorz Latuszek'
-__copyright__ = 'Copyright (C) 2018, Nokia'
-__email__ = 'grzegorz.latuszek@nokia.com'
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2018-2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
 
+import getpass
 import importlib
 import sys
+import threading
+import time
+
 import pytest
 
 
@@ -23,7 +27,60 @@ def test_can_open_connection(subprocess_connection_class):
     - full path to python we get from sys.executable
     - not so "atomic" since uses connection's "read" to verify open
     """
-    pass
+    from moler.observable_connection import ObservableConnection
+
+    connection = subprocess_connection_class(moler_connection=ObservableConnection(),
+                                             command=[sys.executable, '-i'], prompt=r'>>> ')
+    with connection.open():
+        if subprocess_connection_class.__name__ == 'Subprocess':  # no thread reading data
+            output = ""
+            start_time = time.time()
+            while ('>>> ' not in output) and (time.time() - start_time < 5):
+                output += connection.receive(timeout=5)
+            assert '>>> ' in output
+        else:
+            assert connection._shell_operable.is_set()
+
+
+def test_can_send_and_receive_data(python_connection):
+    received_data = list()
+    answer_received = threading.Event()
+
+    def receiver(data):
+        received_data.append(data)
+        if '42' in "".join(received_data):
+            answer_received.set()
+
+    python_connection.moler_connection.subscribe(receiver, lambda: None)
+    python_connection.moler_connection.sendline("print(6 * 7)")
+    assert answer_received.wait(timeout=5) is True
+
+
+def test_can_run_command_over_bash_without_terminal(bash_connection):
+    from moler.cmd.unix.whoami import Whoami
+
+    cmd = Whoami(connection=bash_connection.moler_connection)
+    ret = cmd(timeout=5)
+    assert getpass.getuser() == ret['USER']
+
+
+def test_connection_lost_is_notified_when_connection_is_closed(python_connection):
+    closed = threading.Event()
+    python_connection.notify(callback=lambda io_connection: closed.set(), when="connection_lost")
+    python_connection.close()
+    assert closed.is_set()
+
+
+def test_connection_lost_is_notified_when_process_exits(python_connection):
+    closed = threading.Event()
+    python_connection.notify(callback=lambda io_connection: closed.set(), when="connection_lost")
+    python_connection.moler_connection.sendline("exit()")
+    assert closed.wait(timeout=5) is True
+
+
+def test_closing_closed_connection_does_nothing(python_connection):
+    python_connection.close()
+    python_connection.close()
 
 
 # --------------------------- resources ---------------------------
@@ -35,3 +92,23 @@ def subprocess_connection_class(request):
     module = importlib.import_module('moler.io.raw.subprocess')
     connection_class = getattr(module, class_name)
     return connection_class
+
+
+@pytest.yield_fixture()
+def python_connection():
+    from moler.io.raw.subprocess import ThreadedSubprocess
+    from moler.observable_connection import ObservableConnection
+
+    connection = ThreadedSubprocess(moler_connection=ObservableConnection(),
+                                    command=[sys.executable, '-i'], prompt=r'>>> ')
+    with connection.open():
+        yield connection
+
+
+@pytest.yield_fixture()
+def bash_connection():
+    from moler.connection_factory import get_connection
+
+    connection = get_connection(io_type='subprocess', variant='threaded')
+    with connection.open():
+        yield connection
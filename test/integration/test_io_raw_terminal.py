@@ -8,6 +8,8 @@ __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'marcin.usielski@nokia.com, michal.ernst@nokia.com'
 
 import getpass
+import importlib
+import sys
 
 import pytest
 
@@ -16,7 +18,6 @@ from moler.cmd.unix.ping import Ping
 from moler.cmd.unix.whoami import Whoami
 from moler.cmd.unix.lsof import Lsof
 from moler.exceptions import CommandTimeout
-from moler.io.raw.terminal import ThreadedTerminal
 
 
 def test_terminal_cmd_whoami_during_ping(terminal_connection):
@@ -79,12 +80,19 @@ def test_terminal_lsof(terminal_connection):
     assert ret["NUMBER"] > 1
 
 
-@pytest.yield_fixture()
-def terminal_connection():
+terminal_connection_classes = ['io.raw.terminal.ThreadedTerminal']
+if sys.version_info >= (3, 4):
+    terminal_connection_classes.append('io.raw.reactor.ReactorTerminal')
+
+
+@pytest.yield_fixture(params=terminal_connection_classes)
+def terminal_connection(request):
     from moler.observable_connection import ObservableConnection
 
+    module_name, class_name = request.param.rsplit('.', 1)
+    module = importlib.import_module('moler.{}'.format(module_name))
     moler_conn = ObservableConnection()
-    terminal = ThreadedTerminal(moler_connection=moler_conn)
+    terminal = getattr(module, class_name)(moler_connection=moler_conn)
 
     with terminal.open() as connection:
         yield connection.moler_connection
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for pool of pre-warmed terminals
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import getpass
+import threading
+import time
+
+import pytest
+
+from moler.cmd.unix.whoami import Whoami
+
+
+def test_terminal_connection_is_taken_from_pool(terminal_pool):
+    from moler.connection_factory import get_connection
+
+    terminal_pool.enable_terminal_pool(size=1)
+    _await_statistics(terminal_pool, ready=1)
+
+    terminal = get_connection(io_type='terminal', variant='threaded')
+    connection_made = []
+    terminal.notify(callback=connection_made.append, when="connection_made")
+    assert terminal_pool.get_terminal_pool_statistics()['hits'] == 1
+
+    with terminal.open():
+        assert connection_made == [terminal]  # pre-warmed terminal notifies when opened
+        ret = Whoami(connection=terminal.moler_connection)()
+        assert getpass.getuser() == ret['USER']
+    _await_statistics(terminal_pool, ready=1)  # refilled
+
+
+def test_terminal_connection_is_spawned_when_pool_has_no_ready_terminal(terminal_pool):
+    from moler.connection_factory import get_connection
+    from moler.io.raw.terminal import ThreadedTerminal
+
+    terminal_pool.enable_terminal_pool(size=0)
+
+    terminal = get_connection(io_type='terminal', variant='threaded')
+
+    assert isinstance(terminal, ThreadedTerminal)
+    assert not terminal.is_warm()
+    assert terminal_pool.get_terminal_pool_statistics()['misses'] == 1
+
+
+def test_idle_terminals_are_evicted_from_pool(terminal_pool):
+    terminal_pool.enable_terminal_pool(size=1, idle_timeout=0.5)
+    _await_statistics(terminal_pool, evicted=1, ready=0)
+
+    assert terminal_pool.get_terminal() is None  # pool was idle, now it is used again
+    _await_statistics(terminal_pool, ready=1)
+
+
+def test_closing_pool_does_not_wait_for_terminal_warming_up():
+    from moler.io.raw.terminal_pool import TerminalPool
+
+    class SlowTerminal(object):
+        def __init__(self):
+            self.closed = threading.Event()
+
+        def warm_up(self):
+            time.sleep(2)
+            return True
+
+        def close(self):
+            self.closed.set()
+
+    terminals = []
+
+    def terminal_factory():
+        terminals.append(SlowTerminal())
+        return terminals[-1]
+
+    pool = TerminalPool(terminal_factory=terminal_factory, size=1)
+    time.sleep(0.1)  # warm-up started
+    start_time = time.time()
+    pool.close()
+
+    assert time.time() - start_time < 1
+    assert len(terminals) == 1
+    assert terminals[0].closed.wait(timeout=5) is True  # closed by refilling thread when warmed up
+    assert pool.get_statistics()['ready'] == 0
+
+
+# --------------------------- resources ---------------------------
+
+
+def _await_statistics(terminal_pool, timeout=20, **expected):
+    start_time = time.time()
+    while time.time() - start_time < timeout:
+        statistics = terminal_pool.get_terminal_pool_statistics()
+        if all(statistics[key] == value for key, value in expected.items()):
+            return
+        time.sleep(0.05)
+    assert terminal_pool.get_terminal_pool_statistics() == expected
+
+
+@pytest.yield_fixture
+def terminal_pool():
+    from moler.io.raw import terminal_pool
+
+    yield terminal_pool
+    terminal_pool.disable_terminal_pool()
@@ -35,6 +35,34 @@ def test_two_commands_uptime_whoami(buffer_connection, command_output_and_expect
     assert CommandScheduler.is_waiting_for_execution(connection_observer=whoami_cmd) is False
 
 
+def test_command_from_queue_is_not_started_by_thread_finishing_previous_command(
+        buffer_connection, command_output_and_expected_result_uptime_whoami):
+    import threading
+    from moler.cmd.unix.uptime import Uptime
+    from moler.cmd.unix.whoami import Whoami
+    command_output, expected_result = command_output_and_expected_result_uptime_whoami
+    uptime_cmd = Uptime(connection=buffer_connection.moler_connection)
+    whoami_cmd = Whoami(connection=buffer_connection.moler_connection)
+    sending_threads = list()
+    whoami_send_command = whoami_cmd.send_command
+
+    def send_command():
+        sending_threads.append(threading.current_thread())
+        whoami_send_command()
+
+    whoami_cmd.send_command = send_command
+    uptime_cmd.start(timeout=2)
+    whoami_cmd.start(timeout=2)
+    time.sleep(0.05)
+    buffer_connection.moler_connection.data_received(command_output[0].encode("utf-8"))
+    assert uptime_cmd.done()
+    time.sleep(0.2)
+    assert len(sending_threads) == 1
+    assert sending_threads[0] is not threading.current_thread()
+    buffer_connection.moler_connection.data_received(command_output[1].encode("utf-8"))
+    assert whoami_cmd.await_done(timeout=2) == expected_result[1]
+
+
 def test_two_commands_uptime(buffer_connection, command_output_and_expected_result_uptime):
     from moler.cmd.unix.uptime import Uptime
     command_output, expected_result = command_output_and_expected_result_uptime
@@ -71,6 +99,33 @@ def test_timeout_before_command_sent(buffer_connection, command_output_and_expec
     assert ping_ret == expected_result
 
 
+def test_queued_commands_do_not_create_threads(buffer_connection, command_output_and_expected_result_ping):
+    import threading
+    from moler.cmd.unix.uptime import Uptime
+    from moler.cmd.unix.ping import Ping
+    command_output, expected_result = command_output_and_expected_result_ping
+    connection = buffer_connection.moler_connection
+    ping_cmd = Ping(connection=connection, prompt="host:.*#", destination="localhost", options="-w 5")
+    ping_cmd.start(timeout=2)
+    time.sleep(0.05)
+    threads_nb = threading.active_count()
+    uptime_cmds = [Uptime(connection=connection, prompt="host:.*#") for _ in range(20)]
+    for uptime_cmd in uptime_cmds:
+        uptime_cmd.start(timeout=0.2)
+    assert threading.active_count() <= threads_nb + 1  # at most one thread checking timeouts of all queues
+    statistics = CommandScheduler.get_queue_statistics(connection)
+    assert statistics['queue_depth'] == 20
+    assert statistics['max_queue_depth'] >= 20
+    assert EventAwaiter.wait_for_all(timeout=1, events=uptime_cmds) is True
+    for uptime_cmd in uptime_cmds:
+        with pytest.raises(CommandTimeout):
+            uptime_cmd.result()
+    statistics = CommandScheduler.get_queue_statistics(connection)
+    assert statistics['queue_depth'] == 0
+    assert statistics['max_wait_time'] >= 0.15
+    ping_cmd.cancel()
+
+
 @pytest.fixture
 def command_output_and_expected_result_ping():
     data = (
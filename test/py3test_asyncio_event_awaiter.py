@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+__author__ = 'Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'marcin.usielski@nokia.com'
+
+import asyncio
+
+import pytest
+
+from moler.events.unix.wait4prompt import Wait4prompt
+from moler.asyncio_event_awaiter import AsyncioEventAwaiter
+from moler.event_awaiter import EventAwaiter
+from moler.observable_connection import ObservableConnection
+
+
+@pytest.mark.asyncio
+async def test_events_true_all():
+    connection = ObservableConnection()
+    events = list()
+    patterns = ("aaa", "bbb")
+    for pattern in patterns:
+        event = Wait4prompt(connection=connection, till_occurs_times=1, prompt=pattern)
+        event.start()
+        events.append(event)
+    asyncio.get_event_loop().call_later(0.05, connection.data_received, patterns[0])
+    asyncio.get_event_loop().call_later(0.05, connection.data_received, patterns[1])
+    assert await AsyncioEventAwaiter.wait_for_all(timeout=1, events=events) is True
+    EventAwaiter.cancel_all_events(events)
+
+
+@pytest.mark.asyncio
+async def test_events_false_n_of():
+    connection = ObservableConnection()
+    events = list()
+    patterns = ("aaa", "bbb", "ccc")
+    for pattern in patterns:
+        event = Wait4prompt(connection=connection, till_occurs_times=1, prompt=pattern)
+        event.start()
+        events.append(event)
+    connection.data_received(patterns[1])
+    assert await AsyncioEventAwaiter.wait_for_any(timeout=0.1, events=events) is True
+    assert await AsyncioEventAwaiter.wait_for_n_of(timeout=0.1, events=events, n=2) is False
+    EventAwaiter.cancel_all_events(events)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import asyncio
+import threading
+
+import pytest
+
+from moler.asyncio_records import AsyncioRecordsIterator
+from moler.cmd.unix.tail import Tail, COMMAND_OUTPUT, COMMAND_KWARGS, COMMAND_RESULT
+from moler.observable_connection import ObservableConnection
+
+
+@pytest.mark.asyncio
+async def test_records_are_iterated_inside_events_loop():
+    connection = ObservableConnection(how2send=lambda data: None)
+    cmd = Tail(connection=connection, **COMMAND_KWARGS)
+    cmd.start()
+    records = AsyncioRecordsIterator(cmd)
+    asyncio.get_event_loop().call_later(0.05, connection.data_received, COMMAND_OUTPUT)
+    lines = [line async for line in records]
+    assert lines == COMMAND_RESULT['LINES']
+    assert cmd.result()['LINES'] == []
+    assert cmd.is_streaming() is False
+
+
+@pytest.mark.asyncio
+async def test_records_emitted_in_other_thread_wait_for_consumer():
+    connection = ObservableConnection(how2send=lambda data: None)
+    cmd = Tail(connection=connection, **COMMAND_KWARGS)
+    cmd.start()
+    records = AsyncioRecordsIterator(cmd, maxsize=2, put_timeout=5.0)
+    feeder = threading.Thread(target=connection.data_received, args=(COMMAND_OUTPUT,))
+    feeder.start()
+    lines = list()
+    async for line in records:
+        await asyncio.sleep(0.01)
+        assert len(records._items) <= 2
+        lines.append(line)
+    feeder.join()
+    assert lines == COMMAND_RESULT['LINES']
+
+
+@pytest.mark.asyncio
+async def test_records_not_consumed_within_put_timeout_are_dropped():
+    connection = ObservableConnection(how2send=lambda data: None)
+    cmd = Tail(connection=connection, **COMMAND_KWARGS)
+    cmd.start()
+    records = AsyncioRecordsIterator(cmd, maxsize=1, put_timeout=0.05)
+    feeder = threading.Thread(target=connection.data_received, args=(COMMAND_OUTPUT,))
+    feeder.start()
+    feeder.join()  # runner thread waits for consumer only once
+    lines = [line async for line in records]
+    assert lines == COMMAND_RESULT['LINES'][:1]
+    assert records.dropped == len(COMMAND_RESULT['LINES']) - 1
+
+
+@pytest.mark.asyncio
+async def test_records_not_consumed_are_dropped_without_waiting_for_consumer():
+    connection = ObservableConnection(how2send=lambda data: None)
+    cmd = Tail(connection=connection, **COMMAND_KWARGS)
+    cmd.start()
+    records = AsyncioRecordsIterator(cmd, maxsize=1)
+    feeder = threading.Thread(target=connection.data_received, args=(COMMAND_OUTPUT,))
+    feeder.start()
+    feeder.join(timeout=0.5)
+    assert not feeder.is_alive()
+    lines = [line async for line in records]
+    assert lines == COMMAND_RESULT['LINES'][:1]
+    assert records.dropped == len(COMMAND_RESULT['LINES']) - 1
+
+
+@pytest.mark.asyncio
+async def test_closed_records_iterator_does_not_take_records():
+    connection = ObservableConnection(how2send=lambda data: None)
+    cmd = Tail(connection=connection, **COMMAND_KWARGS)
+    cmd.start()
+    records = AsyncioRecordsIterator(cmd, maxsize=1, put_timeout=5.0)
+    records.close()
+    assert records.put("line") is False
+    assert cmd.is_streaming() is False
@@ -493,6 +493,184 @@ def test_garbage_collected_subscriber_is_not_notified():
     moler_conn.data_received("data")
     assert len(received_data) == 1
 
+def test_can_notify_line_oriented_observer_with_data_split_into_lines():
+    from moler.observable_connection import ObservableConnection
+
+    raw_received_data = []
+    received_lines = []
+
+    def raw_observer(data):
+        raw_received_data.append(data)
+
+    def lines_observer(lines):
+        received_lines.extend(lines)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe(observer=raw_observer, connection_closed_handler=do_nothing_func)
+    moler_conn.subscribe_lines(observer=lines_observer, connection_closed_handler=do_nothing_func)
+
+    moler_conn.data_received("line 1\nline")
+    moler_conn.data_received(" 2\r\n")
+
+    assert raw_received_data == ["line 1\nline", " 2\r\n"]
+    assert received_lines == [("line 1\n", "line 1", True), ("line", "line", False), (" 2\r\n", " 2", True)]
+
+
+def test_splits_data_into_lines_once_for_all_line_oriented_observers():
+    from moler.observable_connection import ObservableConnection
+
+    received_lines = []
+
+    class LinesObserver(object):
+        def on_new_lines(self, lines):
+            received_lines.append(lines)
+
+    observers = [LinesObserver() for _ in range(3)]
+    moler_conn = ObservableConnection()
+    for observer in observers:
+        moler_conn.subscribe_lines(observer=observer.on_new_lines, connection_closed_handler=do_nothing_func)
+
+    moler_conn.data_received("line 1\nline 2\n")
+
+    assert len(received_lines) == 3
+    assert received_lines[0] is received_lines[1] is received_lines[2]
+
+
+def test_unsubscribed_line_oriented_observer_is_not_notified():
+    from moler.observable_connection import ObservableConnection
+
+    received_lines = []
+
+    def lines_observer(lines):
+        received_lines.extend(lines)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe_lines(observer=lines_observer, connection_closed_handler=do_nothing_func)
+    moler_conn.unsubscribe(observer=lines_observer, connection_closed_handler=do_nothing_func)
+
+    moler_conn.data_received("line 1\n")
+
+    assert received_lines == []
+
+
+def test_keyword_observer_gets_only_lines_with_its_keywords():
+    from moler.observable_connection import ObservableConnection
+
+    notifications = []
+
+    def lines_observer(lines):
+        notifications.append(lines)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe_lines(observer=lines_observer, connection_closed_handler=do_nothing_func,
+                               keywords=["Unreachable", "no answer"])
+
+    moler_conn.data_received("64 bytes from 10.0.0.1\n64 bytes from 10.0.0.1\n")
+    moler_conn.data_received("line 1\nFrom 10.0.0.1 Destination Host Unreachable\nno answer yet\nline 4\n")
+
+    assert notifications == [(("From 10.0.0.1 Destination Host Unreachable\n",
+                               "From 10.0.0.1 Destination Host Unreachable", True),
+                              ("no answer yet\n", "no answer yet", True))]
+
+
+def test_keyword_observer_gets_line_received_so_far_when_keyword_completes_in_next_chunk():
+    from moler.observable_connection import ObservableConnection
+
+    received_lines = []
+
+    def lines_observer(lines):
+        received_lines.extend(lines)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe_lines(observer=lines_observer, connection_closed_handler=do_nothing_func,
+                               keywords=["Unreachable"])
+
+    moler_conn.data_received("first\nDestination Host Unre")
+    moler_conn.data_received("achable")
+    moler_conn.data_received(" again\nlast\n")
+
+    assert received_lines == [("Destination Host Unreachable", "Destination Host Unreachable", False),
+                              (" again\n", " again", True)]
+
+
+def test_keyword_observer_gets_line_with_keyword_split_by_terminal_control_sequences():
+    from moler.observable_connection import ObservableConnection
+
+    received_lines = []
+
+    def lines_observer(lines):
+        received_lines.extend(lines)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe_lines(observer=lines_observer, connection_closed_handler=do_nothing_func,
+                               keywords=["Network is down"])
+
+    moler_conn.data_received("\x1b[32mok\x1b[0m\nNetwork \x1b[31mis\x1b[0m down\n")
+
+    assert received_lines == [("Network \x1b[31mis\x1b[0m down\n", "Network \x1b[31mis\x1b[0m down", True)]
+
+
+def test_keywords_contained_in_other_keywords_are_found():
+    from moler.observable_connection import ObservableConnection
+
+    received_lines = {"host": [], "destination_host": []}
+
+    def host_observer(lines):
+        received_lines["host"].extend(line for _, line, _ in lines)
+
+    def destination_host_observer(lines):
+        received_lines["destination_host"].extend(line for _, line, _ in lines)
+
+    moler_conn = ObservableConnection()
+    moler_conn.subscribe_lines(observer=host_observer, connection_closed_handler=do_nothing_func,
+                               keywords=["Host"])
+    moler_conn.subscribe_lines(observer=destination_host_observer, connection_closed_handler=do_nothing_func,
+                               keywords=["Destination Host"])
+
+    moler_conn.data_received("Destination Host Unreachable\nHost down\nnothing\n")
+
+    assert received_lines == {"host": ["Destination Host Unreachable", "Host down"],
+                              "destination_host": ["Destination Host Unreachable"]}
+    moler_conn.unsubscribe(observer=host_observer, connection_closed_handler=do_nothing_func)
+    moler_conn.unsubscribe(observer=destination_host_observer, connection_closed_handler=do_nothing_func)
+    assert moler_conn._keywords_index is None
+
+def test_sanitizing_connection_removes_control_sequences_once_for_all_observers():
+    from moler.observable_connection import ObservableConnection
+
+    raw_received_data = []
+    received_lines = []
+
+    def raw_observer(data):
+        raw_received_data.append(data)
+
+    def lines_observer(lines):
+        received_lines.extend(line for _, line, _ in lines)
+
+    moler_conn = ObservableConnection(sanitize_terminal_output=True)
+    moler_conn.subscribe(observer=raw_observer, connection_closed_handler=do_nothing_func)
+    moler_conn.subscribe_lines(observer=lines_observer, connection_closed_handler=do_nothing_func)
+
+    moler_conn.data_received("\x1b[01;34mdir\x1b[0m\nhost:\x1b[0")  # color code split between data chunks
+    moler_conn.data_received("1;32m~ #")
+
+    assert raw_received_data == ["dir\nhost:", "~ #"]
+    assert received_lines == ["dir", "host:", "~ #"]
+
+
+def test_command_of_sanitizing_connection_parses_output_with_split_control_sequences():
+    from moler.cmd.unix.pwd import Pwd
+    from moler.observable_connection import ObservableConnection
+
+    moler_conn = ObservableConnection(how2send=lambda data: None, sanitize_terminal_output=True)
+    pwd_cmd = Pwd(connection=moler_conn, prompt="host:~ #")
+    pwd_cmd.start()
+    for chunk in ["host:~ # pwd\n\x1b[01;", "34m/home/ute\x1b[0m\nhost:\x1b", "[01;32m~ #"]:
+        moler_conn.data_received(chunk)
+
+    assert pwd_cmd.await_done(timeout=2)["full_path"] == "/home/ute"
+
+
 # --------------------------- resources ---------------------------
 
 
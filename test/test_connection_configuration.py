@@ -157,6 +157,18 @@ def test_can_select_connection_loaded_from_dict_as_positional_args(moler_config,
     assert conn.port == 2344
 
 
+def test_connections_loaded_from_config_may_sanitize_terminal_output(moler_config):
+    from moler.connection_factory import get_connection
+
+    moler_config.load_config(config={'NAMED_CONNECTIONS': {'www_server_1': {'io_type': 'tcp', 'host': 'localhost',
+                                                                            'port': 2344}},
+                                     'IO_TYPES': {'default_variant': {'tcp': 'threaded'}},
+                                     'SANITIZE_TERMINAL_OUTPUT': True})
+
+    conn = get_connection(name='www_server_1')
+    assert conn.moler_connection.sanitize_terminal_output is True
+
+
 def test_load_config_checks_env_variable_existence(moler_config):
     with pytest.raises(KeyError) as err:
         moler_config.load_config(from_env_var="MOLER_CONFIG", config_type='yaml')
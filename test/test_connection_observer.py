@@ -473,6 +473,36 @@ def test_connection_observer_exception_do_not_remove():
     assert 0 == len(none_exceptions)
 
 
+def test_done_callback_is_called_once_when_connection_observer_becomes_done(
+        do_nothing_connection_observer__for_major_base_class):
+    connection_observer = do_nothing_connection_observer__for_major_base_class
+    called_with = []
+    connection_observer.add_done_callback(called_with.append)
+    assert called_with == []
+    connection_observer.set_result("done")
+    connection_observer.set_end_of_life()
+    assert called_with == [connection_observer]
+
+
+def test_done_callback_is_called_immediately_for_already_done_connection_observer(
+        do_nothing_connection_observer__for_major_base_class):
+    connection_observer = do_nothing_connection_observer__for_major_base_class
+    connection_observer.cancel()
+    called_with = []
+    connection_observer.add_done_callback(called_with.append)
+    assert called_with == [connection_observer]
+
+
+def test_removed_done_callback_is_not_called(do_nothing_connection_observer__for_major_base_class):
+    connection_observer = do_nothing_connection_observer__for_major_base_class
+    called_with = []
+    connection_observer.add_done_callback(called_with.append)
+    assert connection_observer.remove_done_callback(called_with.append) is True
+    assert connection_observer.remove_done_callback(called_with.append) is False
+    connection_observer.set_exception(Exception("failed"))
+    assert called_with == []
+
+
 # --------------------------- resources ---------------------------
 
 
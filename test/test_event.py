@@ -10,6 +10,7 @@ __copyright__ = 'Copyright (C) 2018-2019, Nokia'
 __email__ = 'michal.ernst@nokia.com, marcin.usielski@nokia.com'
 
 import importlib
+import time
 
 import pytest
 
@@ -130,6 +131,188 @@ def test_event_get_last_occurrence(buffer_connection):
     assert occurrence == dict_output
 
 
+def test_event_gets_lines_split_by_connection(buffer_connection):
+    from moler.events.unix.wait4prompt import Wait4prompt
+    outputs = ["first line\nba", "sh is ", "here\n"]
+    event = Wait4prompt(connection=buffer_connection.moler_connection, prompt="bash is here", till_occurs_times=1)
+    assert event.is_line_oriented() is True
+    event.start(timeout=0.1)
+    for output in outputs:
+        buffer_connection.moler_connection.data_received(output.encode("utf-8"))
+    event.await_done()
+    assert event.get_last_occurrence()['line'] == u'bash is here'
+
+
+def test_line_event_requires_keywords_of_its_patterns():
+    event = LineEvent(detect_patterns=[r'From \S+ Destination Host Unreachable', r'no answer yet'])
+    assert event.get_required_keywords() == {' Destination Host Unreachable', 'no answer yet'}
+    event = LineEvent(detect_patterns=[r'Unreachable', r'\d+ bytes'])
+    assert event.get_required_keywords() == {'Unreachable', ' bytes'}
+    event = LineEvent(detect_patterns=[r'Unreachable', r'\d+'])
+    assert event.get_required_keywords() is None
+
+
+def test_line_event_detects_pattern_split_by_color_codes(buffer_connection):
+    from moler.events.unix.genericunix_lineevent import GenericUnixLineEvent
+
+    class NetworkDown(GenericUnixLineEvent):
+        pass
+
+    event = NetworkDown(connection=buffer_connection.moler_connection, detect_patterns=[r'Network is down'],
+                        till_occurs_times=1)
+    assert event.get_required_keywords() == {'Network is down'}
+    event.start(timeout=0.1)
+    buffer_connection.moler_connection.data_received(u"Network \x1b[31mis\x1b[0m down\n".encode("utf-8"))
+    event.await_done()
+    assert event.get_last_occurrence()['line'] == u'Network is down'
+
+
+def test_event_overriding_data_received_is_not_line_oriented():
+    class Wait4(LineEvent):
+        def data_received(self, data):
+            pass  # not important now
+
+    wait4 = Wait4(detect_patterns=['Connection close'])
+    assert wait4.is_line_oriented() is False
+
+
+def test_line_event_any_matches_first_pattern_on_list():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'second (\w+)', r'(?P<word>first)'])
+    assert event._compiled_any_pattern is not None
+    event.data_received("first second word\n")
+    occurrence = event.get_last_occurrence()
+    assert occurrence['matched'] == 'second word'
+    assert occurrence['groups'] == ('word',)
+    assert occurrence['named_groups'] == {}
+
+
+def test_line_event_any_matches_later_pattern_with_its_own_groups():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'not here', r'(\d+) (?P<word>\w+)'])
+    event.data_received("no match\n")
+    assert event.get_last_occurrence() is None
+    event.data_received("value 12 apples\n")
+    occurrence = event.get_last_occurrence()
+    assert occurrence['groups'] == (12, 'apples')
+    assert occurrence['named_groups'] == {'word': 'apples'}
+
+
+def test_line_event_any_does_not_join_patterns_with_backreferences():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'(\w+) \1', r'(?P<word>first)'])
+    assert event._compiled_any_pattern is None
+    event.data_received("repeat repeat\n")
+    assert event.get_last_occurrence()['matched'] == 'repeat repeat'
+
+
+def test_wait4prompts_matches_first_prompt_in_order_of_patterns():
+    from moler.events.unix.wait4prompts import Wait4prompts
+    moler_conn = ObservableConnection()
+    event = Wait4prompts(connection=moler_conn, prompts={r'host.*#': "UNIX_LOCAL", r'~ #': "UNIX_REMOTE",
+                                                         r'admin>': "ADMIN"})
+    event.data_received("no prompt here\n")
+    assert event.get_last_occurrence() is None
+    event.data_received("host:~ #")
+    assert event.get_last_occurrence()['state'] == "UNIX_LOCAL"
+    event.data_received("\nother:~ #")
+    assert event.get_last_occurrence()['state'] == "UNIX_REMOTE"
+
+
+def test_wait4prompts_shares_matcher_for_the_same_prompts():
+    import re
+    from moler.events.unix.wait4prompts import Wait4prompts
+    moler_conn = ObservableConnection()
+    event1 = Wait4prompts(connection=moler_conn, prompts={r'host:.*#': "UNIX_LOCAL", r'remote\$': "UNIX_REMOTE"})
+    event2 = Wait4prompts(connection=moler_conn, prompts={re.compile(r'remote\$'): "REMOTE",
+                                                          r'host:.*#': "LOCAL"})
+    assert event1._prompts_matcher is event2._prompts_matcher
+    event2.data_received("remote$")
+    assert event2.get_last_occurrence()['state'] == "REMOTE"
+
+
+def test_prompts_matchers_cache_keeps_recently_used_matchers(monkeypatch):
+    import re
+    from collections import OrderedDict
+    from moler.events.prompts_matcher import PromptsMatcher
+    monkeypatch.setattr(PromptsMatcher, '_matchers', OrderedDict())
+    monkeypatch.setattr(PromptsMatcher, '_matchers_maxsize', 2)
+    first = PromptsMatcher.get([re.compile(r'first#')])
+    second = PromptsMatcher.get([re.compile(r'second#')])
+    assert PromptsMatcher.get([re.compile(r'first#')]) is first
+    PromptsMatcher.get([re.compile(r'third#')])
+    assert len(PromptsMatcher._matchers) == 2
+    assert PromptsMatcher.get([re.compile(r'first#')]) is first
+    assert PromptsMatcher.get([re.compile(r'second#')]) is not second
+
+
+def test_event_stores_limited_number_of_occurrences():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'line (\d+)'], till_occurs_times=5)
+    event.set_max_occurrences(2)
+    for number in range(5):
+        event.data_received("line {}\n".format(number))
+    assert event.get_occurrences_count() == 5
+    assert event.get_last_occurrence()['groups'] == (4,)
+    assert [occurrence['groups'] for occurrence in event.result()] == [(3,), (4,)]
+
+
+def test_event_counts_occurrences_only():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'line (\d+)'], till_occurs_times=3)
+    event.enable_count_only()
+    for number in range(3):
+        event.data_received("line {}\n".format(number))
+    assert event.get_occurrences_count() == 3
+    assert event.get_last_occurrence()['groups'] == (2,)
+    assert event.result() == []
+
+
+def test_event_iter_occurrences_ends_when_event_is_done():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'line (\d+)'], till_occurs_times=2)
+    occurrences = event.iter_occurrences(maxsize=10)
+    event.data_received("line 1\nline 2\n")
+    assert [occurrence['groups'] for occurrence in occurrences] == [(1,), (2,)]
+    assert len(event._occurrences_streams) == 0
+
+
+def test_event_drops_not_consumed_occurrences_without_waiting_for_consumer():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'line (\d+)'], till_occurs_times=4)
+    occurrences = event.iter_occurrences(maxsize=1)
+    start_time = time.time()
+    event.data_received("line 1\nline 2\nline 3\n")
+    assert time.time() - start_time < 0.05
+    assert occurrences.dropped == 2
+    assert next(occurrences)['groups'] == (1,)
+    event.data_received("line 4\n")
+    assert [occurrence['groups'] for occurrence in occurrences] == [(4,)]
+
+
+def test_event_not_consumed_occurrences_stop_waiting_for_consumer_at_timeout():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'line (\d+)'], till_occurs_times=4)
+    occurrences = event.iter_occurrences(maxsize=1, put_timeout=0.05)
+    event.data_received("line 1\nline 2\nline 3\n")  # waits 0.05 sec for consumer only once
+    assert occurrences.dropped == 2
+    assert next(occurrences)['groups'] == (1,)
+    event.data_received("line 4\n")
+    assert [occurrence['groups'] for occurrence in occurrences] == [(4,)]
+
+
+def test_event_forgets_occurrences_iterators_not_used_by_consumer():
+    moler_conn = ObservableConnection()
+    event = LineEvent(connection=moler_conn, detect_patterns=[r'line (\d+)'], till_occurs_times=3)
+    event.iter_occurrences(maxsize=1)  # never iterated, not referenced
+    with event.iter_occurrences(maxsize=1) as occurrences:
+        event.data_received("line 1\n")
+        assert next(occurrences)['groups'] == (1,)
+    assert len(event._occurrences_streams) == 0
+    event.data_received("line 2\nline 3\n")  # no waiting for consumers
+    assert event.done()
+
+
 def test_get_not_supported_parser():
     le = LineEvent(connection=None, detect_patterns=['Sample pattern'], match='not_supported_value')
     le._get_parser()
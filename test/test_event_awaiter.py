@@ -86,3 +86,45 @@ def test_events_false_any():
     assert 0 == len(done)
     assert 2 == len(not_done)
     EventAwaiter.cancel_all_events(events)
+
+
+def test_events_n_of():
+    connection = ObservableConnection()
+    events = list()
+    patterns = ("aaa", "bbb", "ccc")
+    for pattern in patterns:
+        event = Wait4prompt(connection=connection, till_occurs_times=1, prompt=pattern)
+        event.start()
+        events.append(event)
+    connection.data_received(patterns[0])
+    connection.data_received(patterns[2])
+    assert EventAwaiter.wait_for_n_of(timeout=0.1, events=events, n=2) is True
+    assert EventAwaiter.wait_for_n_of(timeout=0.1, events=events, n=3) is False
+    EventAwaiter.cancel_all_events(events)
+
+
+def test_events_wake_up_waiter_when_done():
+    import threading
+    import time
+    connection = ObservableConnection()
+    event = Wait4prompt(connection=connection, till_occurs_times=1, prompt="aaa")
+    event.start()
+    threading.Timer(0.05, connection.data_received, args=("aaa",)).start()
+    start_time = time.time()
+    assert EventAwaiter.wait_for_all(timeout=5, events=[event]) is True
+    assert time.time() - start_time < 1
+
+
+def test_events_as_completed():
+    connection = ObservableConnection()
+    events = list()
+    patterns = ("aaa", "bbb", "ccc")
+    for pattern in patterns:
+        event = Wait4prompt(connection=connection, till_occurs_times=1, prompt=pattern)
+        event.start()
+        events.append(event)
+    completed = EventAwaiter.as_completed(timeout=0.1, events=events)
+    connection.data_received(patterns[2])
+    connection.data_received(patterns[0])
+    assert list(completed) == [events[2], events[0]]
+    EventAwaiter.cancel_all_events(events)
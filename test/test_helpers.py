@@ -107,3 +107,54 @@ def test_groups_at_regex_helper():
     assert uppers == 'ABC'
     assert lowers == 'ef'
     assert twos == '222'
+
+
+def test_split_into_lines():
+    from moler.helpers import split_into_lines
+    lines = split_into_lines("first\r\nsecond\nthi")
+    assert lines == (("first\r\n", "first", True), ("second\n", "second", True), ("thi", "thi", False))
+
+
+def test_split_into_lines_with_custom_newline_chars():
+    from moler.helpers import split_into_lines
+    lines = split_into_lines("first\rsecond\n", newline_chars=("\n",))
+    assert lines == (("first\r", "first\r", False), ("second\n", "second", True))
+
+
+def test_terminal_output_sanitizer_removes_control_sequences():
+    from moler.helpers import TerminalOutputSanitizer
+    sanitizer = TerminalOutputSanitizer()
+    assert sanitizer.sanitize("\x1b]0;user@host: ~\x07\x1b[01;32muser@host\x1b[00m:~$ ls\n") == "user@host:~$ ls\n"
+    assert sanitizer.sanitize("no sequences\n") == "no sequences\n"
+    assert sanitizer.sanitize("\x1b(B not CSI nor OSC\n") == "\x1b(B not CSI nor OSC\n"
+
+
+def test_terminal_output_sanitizer_removes_control_sequences_split_between_chunks():
+    from moler.helpers import TerminalOutputSanitizer
+    sanitizer = TerminalOutputSanitizer()
+    chunks = ["host:\x1b", "[01", ";32m~ #\x1b]0;ti", "tle\x1b", "\\ ls\n"]
+    assert [sanitizer.sanitize(chunk) for chunk in chunks] == ["host:", "", "~ #", "", " ls\n"]
+    assert sanitizer.flush() == ""
+    assert sanitizer.sanitize("end\x1b[1") == "end"
+    assert sanitizer.flush() == "\x1b[1"
+
+
+def test_required_literal_chars_of_prompts():
+    import re
+    from moler.helpers import required_literal_chars
+    assert required_literal_chars(re.compile(r'^moler_bash#')) == {'#'}
+    assert required_literal_chars(re.compile(r'user@host:.*\$\s*$')) == {'$'}
+    assert required_literal_chars(re.compile(r'(host|router)[#>]\s*')) == {'#', '>'}
+    assert required_literal_chars(re.compile(r'\w+')) is None
+    assert required_literal_chars(re.compile(r'abc#', re.IGNORECASE)) is None
+
+
+def test_required_literal_strings_of_detect_patterns():
+    import re
+    from moler.helpers import required_literal_strings
+    assert required_literal_strings(re.compile(r'system is going down for (\w+)')) == {'system is going down for '}
+    assert required_literal_strings(re.compile(r'(no\s+answer.*)|(.*Destination\s+Host)')) == {'answer', 'Destination'}
+    assert required_literal_strings(re.compile(r'^host:.*#')) == {'host:'}
+    assert required_literal_strings(re.compile(r'\d+')) is None
+    assert required_literal_strings(re.compile(r'(abc)?\d+')) is None
+    assert required_literal_strings(re.compile(r'abc', re.IGNORECASE)) is None
@@ -315,3 +315,88 @@ def test_reconfigure_moler_loggers():
         assert new_path in dummy_handler[0].baseFilename
 
     reconfigure_moler_loggers()
+
+
+def test_async_raw_logger_writes_binary_raw_data_in_background(monkeypatch):
+    import os
+    import moler.config.loggers as m_logger
+
+    binary_msg = b"1 0.000000000    127.0.0.1 \xe2\x86\x92 127.0.0.1    ICMP 98 Echo (ping) request  id=0x693b"
+    writer = m_logger.AsyncLogWriter(queue_size=100, flush_interval=10)
+    monkeypatch.setattr(m_logger, 'raw_logs_active', True)
+    monkeypatch.setattr(m_logger, 'async_logging_active', True)
+    monkeypatch.setattr(m_logger, 'async_log_writer', writer)
+    device_data_logger = m_logger.configure_device_logger(connection_name='Linux_xyz_async', propagate=False)
+    device_data_logger.log(level=m_logger.RAW_DATA, msg=binary_msg, extra={'transfer_direction': '<'})
+    device_data_logger.log(level=m_logger.RAW_DATA, msg=binary_msg, extra={'transfer_direction': '<'})
+    writer.flush()
+    raw_logfile_full_path = ''
+    created_files = []
+    for hndl in device_data_logger.handlers:
+        assert isinstance(hndl, m_logger.QueueingHandler)
+        created_files.append(hndl.baseFilename)
+        if isinstance(hndl.target, m_logger.RawFileHandler) and \
+                not isinstance(hndl.target.formatter, m_logger.RawTraceFormatter):
+            raw_logfile_full_path = hndl.baseFilename
+    with open(raw_logfile_full_path, mode='rb') as logfh:
+        content = logfh.read()
+        assert content == binary_msg + binary_msg
+    for hndl in device_data_logger.handlers:
+        hndl.close()
+    writer.stop()
+    statistics = writer.get_statistics()
+    assert statistics['dropped'] == 0
+    assert statistics['written'] == statistics['queued']
+    for filename in created_files:
+        os.remove(filename)
+
+
+def test_async_log_writer_reports_records_dropped_when_queue_is_full():
+    import threading
+    from moler.config.loggers import AsyncLogWriter
+
+    class BlockingHandler(logging.Handler):
+        def __init__(self):
+            super(BlockingHandler, self).__init__()
+            self.unblock = threading.Event()
+            self.written = []
+
+        def write_record(self, record):
+            self.unblock.wait(timeout=5)
+            self.written.append(record.msg)
+
+    handler = BlockingHandler()
+    writer = AsyncLogWriter(queue_size=2, drop_when_full=True, flush_interval=0.1)
+    for nb in range(10):
+        record = logging.LogRecord(name=None, level=logging.INFO, pathname="", lineno=0,
+                                   msg="line {}".format(nb), args=(), exc_info=None)
+        writer.put(handler, record)
+    handler.unblock.set()
+    writer.stop()
+    statistics = writer.get_statistics()
+    assert statistics['dropped'] >= 7  # writer may take first record before queue fills up
+    assert statistics['queued'] + statistics['dropped'] == 10
+    assert statistics['written'] == statistics['queued'] == len(handler.written)
+    assert statistics['max_queue_depth'] == 2
+
+
+def test_queueing_handler_puts_record_with_message_merged_with_its_args():
+    from moler.config.loggers import QueueingHandler
+
+    class QueueStub(object):
+        def __init__(self):
+            self.records = []
+
+        def put(self, handler, record):
+            self.records.append(record)
+
+    queue = QueueStub()
+    handler = QueueingHandler(target=logging.NullHandler(), writer=queue)
+    mutable_arg = ["before"]
+    record = logging.LogRecord(name=None, level=logging.INFO, pathname="", lineno=0,
+                               msg="value: %s", args=(mutable_arg,), exc_info=None)
+    handler.handle(record)
+    mutable_arg[0] = "after"
+    assert queue.records[0].getMessage() == "value: ['before']"
+    assert queue.records[0].args is None
+    assert record.args == (mutable_arg,)  # original record not changed for other handlers
@@ -153,14 +153,69 @@ def test_ThreadPoolExecutorRunner_logs_about_reused_executor():
     external_executor.shutdown()
 
 
+def test_RunnerSingleThread_completes_future_when_observer_gets_result():
+    from moler.runner_single_thread import RunnerSingleThread
+
+    with RunnerSingleThread() as runner:
+        moler_conn = ObservableConnection()
+        net_down_detector = NetworkDownDetector(connection=moler_conn, runner=runner)
+        net_down_detector.start_time = time.time()  # must start observer lifetime before runner.submit()
+        future = runner.submit(net_down_detector)
+        assert not future.done()
+        moler_conn.data_received("ping: sendmsg: Network is unreachable")
+        assert future.done()
+        assert len(moler_conn._observers) == 0
+        assert net_down_detector.done()
+
+
+def test_RunnerSingleThread_times_out_observer_inside_timer_thread():
+    from moler.runner_single_thread import RunnerSingleThread
+    from moler.exceptions import ConnectionObserverTimeout
+
+    with RunnerSingleThread() as runner:
+        moler_conn = ObservableConnection()
+        net_down_detector = NetworkDownDetector(connection=moler_conn, runner=runner)
+        net_down_detector.timeout = 0.2
+        net_down_detector.start_time = time.time()
+        future = runner.submit(net_down_detector)
+        future.result(timeout=1.0)
+        duration = time.time() - net_down_detector.start_time
+        assert 0.2 <= duration < 0.5
+        assert len(moler_conn._observers) == 0
+        with pytest.raises(ConnectionObserverTimeout):
+            net_down_detector.result()
+
+
+def test_RunnerSingleThread_does_not_create_thread_per_observer():
+    import threading
+    from moler.runner_single_thread import RunnerSingleThread
+
+    with RunnerSingleThread() as runner:
+        threads_before = threading.active_count()
+        moler_conn = ObservableConnection()
+        detectors = [NetworkDownDetector(connection=moler_conn, runner=runner) for _ in range(50)]
+        for detector in detectors:
+            detector.start_time = time.time()
+            detector._future = runner.submit(detector)
+        assert threading.active_count() == threads_before
+        moler_conn.data_received("ping: sendmsg: Network is unreachable")
+        for detector in detectors:
+            runner.wait_for(detector, detector._future, timeout=0.5)
+            assert detector.done()
+
+
 # --------------------------- resources ---------------------------
 
 
-@pytest.fixture()
-def observer_runner():
-    from moler.runner import ThreadPoolExecutorRunner
-    runner = ThreadPoolExecutorRunner()
-    return runner
+@pytest.yield_fixture(params=['runner.ThreadPoolExecutorRunner', 'runner_single_thread.RunnerSingleThread'])
+def observer_runner(request):
+    import importlib
+    module_name, class_name = request.param.rsplit('.', 1)
+    module = importlib.import_module('moler.{}'.format(module_name))
+    runner_class = getattr(module, class_name)
+    runner = runner_class()
+    yield runner
+    runner.shutdown()
 
 
 class NetworkDownDetector(ConnectionObserver):
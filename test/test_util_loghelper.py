@@ -119,3 +119,48 @@ def test_passing_extra_param_into_helper_logging_functions():
         fun_using_helper_logging()
 
     assert logged_record[0].transfer_direction == "<"
+
+
+def test_lazy_message_is_built_only_when_logging_level_is_enabled():
+    import logging
+    from moler.util.loghelper import log_into_logger
+
+    logger = logging.getLogger('moler.lazy')
+    built_messages = []
+
+    def build_message():
+        built_messages.append("expensive message")
+        return "expensive message"
+
+    logged_records = []
+
+    def log_record_receiver(logger, log_record):
+        logged_records.append(log_record)
+
+    logger.setLevel(logging.INFO)
+    with mock.patch.object(logger.__class__, "handle", new=log_record_receiver):
+        log_into_logger(logger, logging.DEBUG, build_message)
+        assert built_messages == []
+        log_into_logger(logger, logging.INFO, build_message)
+    logger.setLevel(logging.NOTSET)
+
+    assert built_messages == ["expensive message"]
+    assert len(logged_records) == 1
+    assert logged_records[0].msg == "expensive message"
+
+
+def test_logging_is_enabled_when_any_logger_is_enabled_for_level():
+    import logging
+    from moler.util.loghelper import is_logging_enabled
+
+    info_logger = logging.getLogger('moler.enabled.info')
+    info_logger.setLevel(logging.INFO)
+    warning_logger = logging.getLogger('moler.enabled.warning')
+    warning_logger.setLevel(logging.WARNING)
+
+    assert is_logging_enabled(logging.INFO, warning_logger, info_logger)
+    assert not is_logging_enabled(logging.DEBUG, warning_logger, info_logger)
+    assert not is_logging_enabled(logging.INFO, warning_logger, None)
+    assert not is_logging_enabled(logging.INFO)
+    info_logger.setLevel(logging.NOTSET)
+    warning_logger.setLevel(logging.NOTSET)
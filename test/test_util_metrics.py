@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for hot-path metrics of connections, runners and observers.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import json
+
+import pytest
+
+
+def test_disabled_metrics_record_nothing(buffer_connection):
+    from moler.util import metrics
+
+    buffer_connection.moler_connection.data_received(u"some data\n".encode("utf-8"))
+
+    assert metrics.get_metrics_snapshot()['connections'] == {}
+
+
+def test_metrics_count_bytes_and_chunks_of_connection(buffer_connection, metrics_enabled):
+    moler_conn = buffer_connection.moler_connection
+    moler_conn.data_received(u"first line\n".encode("utf-8"))
+    moler_conn.data_received(u"second".encode("utf-8"))
+    moler_conn.sendline(u"ls")
+
+    connection_metrics = metrics_enabled.get_metrics_snapshot()['connections']['buffer']
+    assert connection_metrics == {'bytes_in': 17, 'chunks_in': 2, 'bytes_out': 3, 'chunks_out': 1}
+
+
+def test_metrics_measure_observers_and_runner(buffer_connection, metrics_enabled):
+    from moler.events.unix.wait4prompt import Wait4prompt
+
+    event = Wait4prompt(connection=buffer_connection.moler_connection, prompt="bash", till_occurs_times=1)
+    event.start(timeout=0.5)
+    buffer_connection.moler_connection.data_received(u"first line\nsecond line\nbash\n".encode("utf-8"))
+    event.await_done()
+
+    snapshot = metrics_enabled.get_metrics_snapshot()
+    observer_metrics = snapshot['observers']['Wait4prompt']
+    assert observer_metrics['notifications'] == 1
+    assert observer_metrics['lines'] == 1  # only line with its keyword is passed to observer
+    assert 0.0 < observer_metrics['max_time'] == observer_metrics['total_time']
+    runner_metrics = snapshot['runners'][event.runner.__class__.__name__]
+    assert runner_metrics['submitted'] == 1
+    assert runner_metrics['max_queue_depth'] == 1
+
+
+def test_metrics_are_dumped_as_json_into_log(buffer_connection, metrics_enabled):
+    class LoggerStub(object):
+        def __init__(self):
+            self.messages = []
+
+        def log(self, level, msg):
+            self.messages.append(msg)
+
+    buffer_connection.moler_connection.data_received(u"data".encode("utf-8"))
+
+    logger = LoggerStub()
+    metrics_enabled.dump_metrics(logger=logger)
+    assert logger.messages[0].startswith("metrics: ")
+    snapshot = json.loads(logger.messages[0][len("metrics: "):])
+    assert snapshot['connections']['buffer']['bytes_in'] == 4
+    assert snapshot['enabled'] is True
+
+
+def test_commands_queues_of_connections_without_name_are_in_snapshot(metrics_enabled, empty_command_scheduler):
+    from moler.helpers import instance_id
+
+    class ConnectionWithoutName(object):
+        pass
+
+    connection = ConnectionWithoutName()
+    empty_command_scheduler._lock_for_connection(connection)
+
+    queues = metrics_enabled.get_metrics_snapshot()['command_scheduler']
+    assert list(queues) == [instance_id(connection)]
+    assert queues[instance_id(connection)]['queue_depth'] == 0
+
+
+# --------------------------- resources ---------------------------
+
+
+@pytest.fixture(autouse=True)
+def empty_command_scheduler(monkeypatch):
+    """Commands queues of other tests (kept by process-wide scheduler) are not visible to metrics tests."""
+    from moler.command_scheduler import CommandScheduler
+
+    monkeypatch.setattr(CommandScheduler, '_scheduler', None)
+    return CommandScheduler._get_scheduler()
+
+
+@pytest.fixture
+def metrics_enabled():
+    from moler.util import metrics
+
+    metrics.reset_metrics()
+    metrics.enable_metrics()
+    yield metrics
+    metrics.disable_metrics()
+    metrics.reset_metrics()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for registry of commands and events available in packages.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import sys
+
+import pytest
+
+
+def test_registry_maps_observer_names_into_class_fullnames_without_importing_modules(observers_package):
+    from moler.util import observers_registry
+
+    observers = observers_registry.get_observers_of_package(observers_package)
+
+    assert observers == {'ip_addr': '{}.ip_addr.IpAddr'.format(observers_package),
+                         'ping_watch': '{}.ping_watch.PingWatch'.format(observers_package),
+                         'ping_loss': '{}.ping_watch.PingLossWatch'.format(observers_package),
+                         'ping_loss_in_row': '{}.ping_watch.PingLossInRowWatch'.format(observers_package)}
+    assert '{}.ip_addr'.format(observers_package) not in sys.modules
+    assert observers_registry.get_observers_of_package(observers_package) is observers  # once per process
+
+
+def test_registry_skips_classes_which_are_not_observers(observers_package):
+    from moler.util import observers_registry
+
+    observers = observers_registry.get_observers_of_package(observers_package)
+
+    assert 'ping_error' not in observers  # exception
+    assert 'ping_mixin' not in observers  # mixin with other bases than observers
+    assert 'helper' not in observers
+
+
+def test_registry_imports_module_of_observer_name_computed_at_runtime(observers_package, tmpdir):
+    from moler.util import observers_registry
+
+    tmpdir.join(observers_package).join('ls.py').write("from moler.command import Command\n\n\n"
+                                                      "class Ls(Command):\n    observer_name = 'ls' + '_cmd'\n")
+    observers = observers_registry.get_observers_of_package(observers_package)
+
+    assert observers['ls_cmd'] == '{}.ls.Ls'.format(observers_package)
+    assert '{}.ls'.format(observers_package) in sys.modules
+
+
+def test_registry_of_moler_package_contains_commands():
+    from moler.util import observers_registry
+
+    observers = observers_registry.get_observers_of_package('moler.cmd.unix')
+
+    assert observers['ls'] == 'moler.cmd.unix.ls.Ls'
+    assert observers['ip_addr'] == 'moler.cmd.unix.ip_addr.IpAddr'
+
+
+def test_registry_uses_manifest_till_package_is_changed(observers_package, tmpdir, monkeypatch):
+    from moler.util import observers_registry
+
+    monkeypatch.setattr(observers_registry, '_manifest_path', str(tmpdir.join('manifest.json')))
+    observers = observers_registry.get_observers_of_package(observers_package)
+    observers_registry.clear()
+
+    def source_must_not_be_parsed(module_name, path):
+        raise AssertionError("{} parsed instead of taken from manifest".format(path))
+
+    parse_source = observers_registry._observers_from_module_source
+    monkeypatch.setattr(observers_registry, '_observers_from_module_source', source_must_not_be_parsed)
+    assert observers_registry.get_observers_of_package(observers_package) == observers
+    monkeypatch.setattr(observers_registry, '_observers_from_module_source', parse_source)
+    observers_registry.clear()
+
+    package_dir = tmpdir.join(observers_package)
+    package_dir.join('ls.py').write("from moler.command import Command\n\n\nclass Ls(Command):\n    pass\n")
+    observers = observers_registry.get_observers_of_package(observers_package)
+    assert observers['ls'] == '{}.ls.Ls'.format(observers_package)
+
+
+@pytest.fixture
+def observers_package(tmpdir, monkeypatch):
+    from moler.util import observers_registry
+
+    package_name = 'observers_registry_test_pkg'
+    package_dir = tmpdir.mkdir(package_name)
+    package_dir.join('__init__.py').write("")
+    package_dir.join('ip_addr.py').write("from moler.command import Command\n\n\n"
+                                         "class IpAddr(Command):\n    pass\n")
+    package_dir.join('ping_watch.py').write("from moler import event\n\n\n"
+                                            "class _Helper(object):\n    pass\n\n\n"
+                                            "class PingError(Exception):\n    pass\n\n\n"
+                                            "class PingMixin(_Helper, PingError):\n    pass\n\n\n"
+                                            "class PingWatch(event.Event):\n    pass\n\n\n"
+                                            "class PingLossWatch(PingMixin, PingWatch):\n"
+                                            "    observer_name = 'ping_loss'\n\n\n"
+                                            "class PingLossInRowWatch(PingLossWatch):\n"
+                                            "    observer_name = 'ping_loss_in_row'\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+    observers_registry.clear()
+    yield package_name
+    observers_registry.clear()
+    for module_name in list(sys.modules):
+        if module_name.split('.')[0] == package_name:
+            del sys.modules[module_name]
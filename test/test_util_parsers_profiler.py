@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for regex cost profiler of command and event parsers.
+"""
+
+__author__ = 'Grzegorz Latuszek, Marcin Usielski'
+__copyright__ = 'Copyright (C) 2019, Nokia'
+__email__ = 'grzegorz.latuszek@nokia.com, marcin.usielski@nokia.com'
+
+import re
+
+import pytest
+
+from moler.cmd.unix.genericunix import GenericUnixCommand
+from moler.util.parsers_profiler import ParsersProfiler, format_report
+
+
+def test_profiler_attributes_time_to_patterns_and_on_new_line():
+    from moler.cmd.unix.whoami import Whoami, COMMAND_OUTPUT, COMMAND_KWARGS
+
+    profiler = ParsersProfiler(repeat=3, scale=2)
+    profiler.profile(Whoami, output=COMMAND_OUTPUT, kwargs=COMMAND_KWARGS)
+    report = profiler.get_report()
+
+    assert report['errors'] == []
+    assert report['parsers']['Whoami.on_new_line']['calls'] == 3 * 2  # user line and prompt, 3 times
+    assert 'Whoami._re_user' in report['patterns']
+    assert report['patterns']['Whoami._re_user']['pattern'] == Whoami._re_user.pattern
+    assert 'Whoami._re_user' in format_report(report)
+
+
+def test_profiler_restores_class_patterns():
+    from moler.cmd.unix.whoami import Whoami, COMMAND_OUTPUT, COMMAND_KWARGS
+
+    pattern = Whoami._re_user
+    ParsersProfiler(repeat=1, scale=2).profile(Whoami, output=COMMAND_OUTPUT, kwargs=COMMAND_KWARGS)
+
+    assert Whoami._re_user is pattern
+    assert re.search.__module__ == 're'
+
+
+def test_profiler_flags_super_linear_pattern(command_with_backtracking_pattern):
+    output = "host:~ # backtrack\n{}\n{}\nhost:~ # ".format("x" * 300, "12345")
+
+    profiler = ParsersProfiler(repeat=3, scale=8, threshold=1.5)
+    profiler.profile(command_with_backtracking_pattern, output=output, kwargs={})
+    report = profiler.get_report()
+
+    flagged = set((item['name'], item['enlargement']) for item in report['super_linear'])
+    assert ('Backtrack._re_slow', 'width') in flagged
+    assert 'Backtrack._re_fast' not in set(item['name'] for item in report['super_linear'])
+    assert report['patterns']['Backtrack._re_slow']['growth']['width'] > 1.5
+
+
+# --------------------------- resources ---------------------------
+
+
+@pytest.fixture
+def command_with_backtracking_pattern():
+    class Backtrack(GenericUnixCommand):
+        _re_slow = re.compile(r".*=END")  # search of not matching line is quadratic
+        _re_fast = re.compile(r"^\d+$")
+
+        def build_command_string(self):
+            return "backtrack"
+
+        def on_new_line(self, line, is_full_line):
+            if is_full_line:
+                self._re_slow.search(line)
+                self._re_fast.match(line)
+            return super(Backtrack, self).on_new_line(line, is_full_line)
+
+    return Backtrack